@@ -0,0 +1,115 @@
+"""
+Benchmark memory held per tracked position
+
+Compares the per-position footprint of the previous in-memory layout
+(one dict per stored row plus decision sets and a sorted distance list),
+fully materialised StockInDB models, and the columnar PortfolioStore used
+by JSONStockRepository, and times a full listing from each.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_portfolio_memory.py [--rows 50000]
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from stock_agent.models.enums import DecisionType
+from stock_agent.models.stock import StockInDB
+from stock_agent.repositories.portfolio_store import PortfolioStore
+from stock_agent.repositories.stock_repository import distance_to_target
+from stock_agent.utils.serialization import dumps, loads
+
+
+def make_content(count: int) -> bytes:
+    """Build the storage file contents for count positions"""
+    now = datetime(2024, 1, 1, 9, 15)
+    rows = []
+    for i in range(count):
+        stamp = (now + timedelta(seconds=i)).isoformat()
+        rows.append({
+            "symbol": f"SYM{i:06d}.NS",
+            "buy_price": 100.0 + i % 500,
+            "target_price": 150.0 + i % 500,
+            "created_at": stamp,
+            "updated_at": stamp,
+            "last_price": 120.0 + i % 500,
+            "last_price_at": stamp,
+        })
+    return dumps(rows, indent=True)
+
+
+def dict_layout(content: bytes):
+    """Rows keyed by symbol with decision sets and a sorted distance list"""
+    rows = {row["symbol"]: row for row in loads(content)}
+    decisions = {decision: set() for decision in DecisionType}
+    distances = []
+    for symbol, row in rows.items():
+        last = row["last_price"]
+        decisions[DecisionType.from_prices(last, row["buy_price"], row["target_price"])].add(symbol)
+        distances.append((distance_to_target(last, row["target_price"]), symbol))
+    distances.sort()
+    return rows, sorted(rows), decisions, distances
+
+
+def model_layout(content: bytes):
+    """One validated StockInDB per position"""
+    return [StockInDB(**row) for row in loads(content)]
+
+
+def store_layout(content: bytes):
+    """Columnar store plus the sorted symbol index kept by the repository"""
+    store = PortfolioStore.from_rows(loads(content))
+    return store, sorted(store.symbols)
+
+
+def retained(build, content: bytes, count: int):
+    """Bytes per position retained by the result of build"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build(content)
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, (after - before) / count
+
+
+def timed(func, arg, repeat: int = 3) -> float:
+    """Best wall time of func(arg) in milliseconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(arg)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=50000)
+    args = parser.parse_args()
+    
+    content = make_content(args.rows)
+    print(f"Portfolio of {args.rows} positions\n")
+    print(f"{'layout':<40} {'bytes/position':>14} {'list (ms)':>10}")
+    
+    layouts = [
+        ("dict rows + decision/distance indexes", dict_layout,
+         lambda r: dumps(list(r[0].values()))),
+        ("StockInDB models", model_layout,
+         lambda r: dumps([m.model_dump(mode="json") for m in r])),
+        ("PortfolioStore + symbol index", store_layout,
+         lambda r: dumps(r[0].rows(r[0].live_rows()))),
+    ]
+    for label, build, listing in layouts:
+        result, per_position = retained(build, content, args.rows)
+        elapsed = timed(listing, result)
+        del result
+        print(f"{label:<40} {per_position:>14.0f} {elapsed:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark loading and serializing a large stock listing
+
+Compares the validated path (StockInDB(**row) + FastAPI response_model
+serialization + stdlib JSON) with the trusted path used by the stocks
+router (stored rows written straight out by FastJSONResponse), and the
+stdlib and orjson encoders for the storage file.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_serialization.py [--rows 50000]
+"""
+
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.testclient import TestClient
+from fastapi.utils import create_response_field
+
+from stock_agent.api.app import create_app
+from stock_agent.api.dependencies import get_repository
+from stock_agent.api.responses import FastJSONResponse
+from stock_agent.models.stock import StockInDB
+from stock_agent.repositories.stock_repository import JSONStockRepository
+from stock_agent.utils.serialization import dumps
+
+
+def make_rows(count: int) -> List[dict]:
+    """Build stored rows as the repository writes them"""
+    now = datetime(2024, 1, 1, 9, 15)
+    rows = []
+    for i in range(count):
+        stamp = (now + timedelta(seconds=i)).isoformat()
+        rows.append({
+            "symbol": f"SYM{i:06d}.NS",
+            "buy_price": 100.0 + i % 500,
+            "target_price": 150.0 + i % 500,
+            "rules": ["trailing_stop 8%"] if i % 10 == 0 else [],
+            "created_at": stamp,
+            "updated_at": stamp,
+            "last_price": 120.0 + i % 500,
+            "last_price_at": stamp,
+            "high_water": 125.0 + i % 500,
+        })
+    return rows
+
+
+def timed(label: str, func, repeat: int = 3):
+    """Run func a few times and print the best wall time"""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<48} {best * 1000:9.1f} ms")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=50000)
+    args = parser.parse_args()
+    
+    rows = make_rows(args.rows)
+    field = create_response_field(name="response", type_=List[StockInDB])
+    print(f"Listing of {args.rows} rows\n")
+    
+    def validated_path():
+        models = [StockInDB(**row) for row in rows]
+        content = asyncio.run(serialize_response(field=field, response_content=models))
+        return JSONResponse(content).body
+    
+    def trusted_path():
+        return FastJSONResponse(rows).body
+    
+    old_body = timed("list: StockInDB(**row) + response_model", validated_path)
+    new_body = timed("list: stored rows + FastJSONResponse", trusted_path)
+    assert json.loads(old_body) == json.loads(new_body)
+    
+    timed("store: json.dumps(indent=2)", lambda: json.dumps(rows, indent=2, ensure_ascii=False))
+    timed("store: serialization.dumps(indent=True)", lambda: dumps(rows, indent=True))
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "stocks.json"
+        path.write_bytes(dumps(rows, indent=True))
+        repository = JSONStockRepository(str(path))
+        app = create_app()
+        app.dependency_overrides[get_repository] = lambda: repository
+        client = TestClient(app)
+        client.get("/api/v1/stocks")
+        timed("GET /api/v1/stocks (end to end)", lambda: client.get("/api/v1/stocks"))
+
+
+if __name__ == "__main__":
+    main()
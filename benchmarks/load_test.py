@@ -0,0 +1,337 @@
+"""
+Load test the HTTP API against offline market and alert backends
+
+Drives the FastAPI app with a weighted mix of requests from concurrent
+workers and reports throughput, latency percentiles and error rates as
+JSON. By default the app runs in process over ASGI; --serve runs it
+under uvicorn on a local port, and --url targets a server that is
+already running (start it with MARKET_DATA_PROVIDER=replay for an
+offline run).
+
+The in-process and --serve modes work in a temporary directory: market
+data comes from a generated replay file (REPLAY_LATENCY_MS and the other
+replay settings simulate upstream latency and errors), Telegram is not
+configured so alerts are only logged, the upstream rate limit is off,
+and every cache and store starts empty. Settings can still be
+overridden through the environment.
+
+Usage:
+    PYTHONPATH=src python benchmarks/load_test.py [--mix analyze=8,agent_run=1,list=1]
+        [--concurrency 16] [--duration 10] [--positions 50] [--serve | --url URL]
+        [--output report.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+
+ENDPOINTS = ("analyze", "agent_run", "list", "summary", "analysis", "health")
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """Parse name=weight pairs such as 'analyze=8,agent_run=1'"""
+    mix = {}
+    for item in text.split(","):
+        name, _, weight = item.strip().partition("=")
+        if name not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"Unknown endpoint '{name}' (expected one of: {', '.join(ENDPOINTS)})")
+        try:
+            mix[name] = float(weight or 1)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Invalid weight for '{name}': {weight!r}")
+    if not any(weight > 0 for weight in mix.values()):
+        raise argparse.ArgumentTypeError("The request mix needs at least one positive weight")
+    return mix
+
+
+def make_symbols(count: int) -> List[str]:
+    """Synthetic universe, half listed in the US and half on the NSE"""
+    return [f"LOAD{i:04d}" if i % 2 == 0 else f"LOAD{i:04d}.NS" for i in range(count)]
+
+
+def write_replay_file(path: str, symbols: List[str], days: int = 120) -> None:
+    """Write daily bars for every symbol (and the INR rate) as a replay CSV"""
+    rng = np.random.default_rng(7)
+    start = date.today() - timedelta(days=days - 1)
+    lines = ["date,symbol,open,high,low,close,volume,name,currency"]
+    for symbol in symbols + ["INRUSD=X"]:
+        base = 0.012 if symbol == "INRUSD=X" else (3000.0 if symbol.endswith(".NS") else 150.0)
+        currency = "INR" if symbol.endswith(".NS") else "USD"
+        closes = base * np.exp(np.cumsum(rng.normal(0, 0.01, days)))
+        for offset, close in enumerate(closes):
+            day = (start + timedelta(days=offset)).isoformat()
+            lines.append(
+                f"{day},{symbol},{close:.4f},{close * 1.01:.4f},{close * 0.99:.4f},"
+                f"{close:.4f},{1000 + offset},{symbol} Corp,{currency}"
+            )
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def offline_environment(workdir: str, symbols: List[str], latency_ms: float) -> None:
+    """Point every setting at the working directory and the replay provider"""
+    write_replay_file(os.path.join(workdir, "replay.csv"), symbols)
+    os.environ.setdefault("MARKET_DATA_PROVIDER", "replay")
+    os.environ.setdefault("REPLAY_DATA_PATH", "replay.csv")
+    os.environ.setdefault("REPLAY_LATENCY_MS", str(latency_ms))
+    os.environ.setdefault("REPLAY_SEED", "7")
+    # The upstream rate limit protects Yahoo, not the replay file
+    os.environ.setdefault("MARKET_DATA_RATE_LIMIT", "0")
+    os.environ["TELEGRAM_BOT_TOKEN"] = ""
+    os.environ["TELEGRAM_CHAT_ID"] = ""
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    # Relative default paths (data/, logs/) now land in the working directory
+    os.chdir(workdir)
+
+
+def request_builders(
+    symbols: List[str],
+    rng: random.Random
+) -> Dict[str, Callable[[], Tuple[str, str, Optional[dict]]]]:
+    """(method, path, JSON body) factories per endpoint"""
+    def analyze():
+        price = rng.uniform(50, 500)
+        return "POST", "/api/v1/stocks/analyze", {
+            "symbol": rng.choice(symbols), "buy_price": round(price, 2), "target_price": round(price * 1.2, 2)
+        }
+    
+    return {
+        "analyze": analyze,
+        "agent_run": lambda: ("GET", "/api/v1/agent/run", None),
+        "list": lambda: ("GET", "/api/v1/stocks?limit=100", None),
+        "summary": lambda: ("GET", "/api/v1/portfolio/summary", None),
+        "analysis": lambda: ("GET", f"/api/v1/stocks/{rng.choice(symbols)}/analysis", None),
+        "health": lambda: ("GET", "/health", None),
+    }
+
+
+async def prepare_portfolio(client: httpx.AsyncClient, symbols: List[str]) -> None:
+    """Track every symbol and run the agent once so every position has an analysis"""
+    for i, symbol in enumerate(symbols):
+        price = 3000.0 if symbol.endswith(".NS") else 150.0
+        response = await client.post("/api/v1/stocks/track", json={
+            "symbol": symbol,
+            "buy_price": price * (0.9 + i % 5 * 0.05),
+            "target_price": price * 1.15,
+            "rules": ["percent_move 2%"],
+        })
+        if response.status_code not in (200, 400):
+            raise RuntimeError(f"Failed to track {symbol}: {response.status_code} {response.text}")
+    response = await client.get("/api/v1/agent/run")
+    response.raise_for_status()
+
+
+async def generate_load(
+    client: httpx.AsyncClient,
+    mix: Dict[str, float],
+    symbols: List[str],
+    concurrency: int,
+    duration: float,
+    max_requests: Optional[int],
+    warmup: float,
+    seed: int
+) -> Tuple[List[Tuple[str, float, int]], float]:
+    """
+    Run closed-loop workers until the duration or request count is reached
+    
+    Returns:
+        (endpoint, latency in seconds, status code or 0 for a transport
+        error) per measured request, and the measured wall time
+    """
+    rng = random.Random(seed)
+    builders = request_builders(symbols, rng)
+    names = [name for name in mix if mix[name] > 0]
+    weights = [mix[name] for name in names]
+    samples: List[Tuple[str, float, int]] = []
+    
+    loop_start = time.perf_counter()
+    measure_from = loop_start + warmup
+    deadline = measure_from + duration
+    issued = 0
+    
+    async def worker():
+        nonlocal issued
+        while True:
+            now = time.perf_counter()
+            if now >= deadline or (max_requests is not None and issued >= max_requests):
+                return
+            name = rng.choices(names, weights)[0]
+            method, path, body = builders[name]()
+            started = time.perf_counter()
+            measured = started >= measure_from
+            issued += measured
+            try:
+                response = await client.request(method, path, json=body)
+                status = response.status_code
+            except httpx.HTTPError:
+                status = 0
+            if measured:
+                samples.append((name, time.perf_counter() - started, status))
+    
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return samples, time.perf_counter() - max(measure_from, loop_start)
+
+
+def latency_stats(latencies: np.ndarray) -> Dict[str, Optional[float]]:
+    """Mean, percentiles and maximum in milliseconds"""
+    if not len(latencies):
+        return {"mean": None, "p50": None, "p95": None, "p99": None, "max": None}
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+    return {
+        "mean": round(float(latencies.mean() * 1000), 3),
+        "p50": round(float(p50), 3),
+        "p95": round(float(p95), 3),
+        "p99": round(float(p99), 3),
+        "max": round(float(latencies.max() * 1000), 3),
+    }
+
+
+def summarize(samples: List[Tuple[str, float, int]], elapsed: float) -> dict:
+    """Aggregate samples overall and per endpoint (errors: transport failures and 4xx/5xx)"""
+    def block(rows: List[Tuple[str, float, int]]) -> dict:
+        statuses = defaultdict(int)
+        for _, _, status in rows:
+            statuses[str(status)] += 1
+        errors = sum(1 for _, _, status in rows if status == 0 or status >= 400)
+        return {
+            "requests": len(rows),
+            "errors": errors,
+            "error_rate": round(errors / len(rows), 6) if rows else 0.0,
+            "throughput_rps": round(len(rows) / elapsed, 3) if elapsed > 0 else 0.0,
+            "latency_ms": latency_stats(np.array([latency for _, latency, _ in rows])),
+            "status_codes": dict(sorted(statuses.items())),
+        }
+    
+    by_endpoint = defaultdict(list)
+    for row in samples:
+        by_endpoint[row[0]].append(row)
+    report = block(samples)
+    report["elapsed_seconds"] = round(elapsed, 3)
+    report["endpoints"] = {name: block(rows) for name, rows in sorted(by_endpoint.items())}
+    return report
+
+
+def free_port() -> int:
+    """Ask the OS for an unused local port"""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def run(args: argparse.Namespace, symbols: List[str]) -> dict:
+    """Set up the target, track positions, generate load and build the report"""
+    server = thread = None
+    lifespan = None
+    
+    if args.url:
+        target = args.url
+        client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout)
+    else:
+        # Imported after the environment is set up, so settings, logs and
+        # caches all resolve inside the working directory
+        from stock_agent.api.app import create_app
+        app = create_app()
+        if args.serve:
+            import uvicorn
+            port = free_port()
+            server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+            thread = threading.Thread(target=server.run, daemon=True)
+            thread.start()
+            while not server.started:
+                await asyncio.sleep(0.05)
+            target = f"http://127.0.0.1:{port}"
+            client = httpx.AsyncClient(base_url=target, timeout=args.timeout)
+        else:
+            target = "asgi"
+            lifespan = app.router.lifespan_context(app)
+            await lifespan.__aenter__()
+            client = httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app), base_url="http://loadtest", timeout=args.timeout
+            )
+    
+    try:
+        async with client:
+            await prepare_portfolio(client, symbols)
+            samples, elapsed = await generate_load(
+                client, args.mix, symbols, args.concurrency, args.duration,
+                args.requests, args.warmup, args.seed
+            )
+    finally:
+        if lifespan is not None:
+            await lifespan.__aexit__(None, None, None)
+        if server is not None:
+            server.should_exit = True
+            thread.join(timeout=10)
+    
+    report = summarize(samples, elapsed)
+    report = {
+        "target": target,
+        "mix": args.mix,
+        "concurrency": args.concurrency,
+        "positions": len(symbols),
+        **report,
+    }
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("analyze=8,agent_run=1,list=1"),
+                        help=f"Weighted request mix (endpoints: {', '.join(ENDPOINTS)})")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent workers")
+    parser.add_argument("--duration", type=float, default=10.0, help="Measured seconds")
+    parser.add_argument("--requests", type=int, default=None, help="Stop after this many measured requests")
+    parser.add_argument("--warmup", type=float, default=1.0, help="Seconds of load before measuring")
+    parser.add_argument("--positions", type=int, default=50, help="Tracked positions")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Simulated market data latency")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=1, help="Seed of the request sequence")
+    parser.add_argument("--output", default="-", help="Report file (stdout by default)")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--serve", action="store_true", help="Serve the offline app with uvicorn on a local port")
+    target.add_argument("--url", help="Base URL of a running server")
+    args = parser.parse_args()
+    
+    symbols = make_symbols(args.positions)
+    output = args.output if args.output == "-" else os.path.abspath(args.output)
+    
+    with tempfile.TemporaryDirectory(prefix="stock-agent-load-") as workdir:
+        cwd = os.getcwd()
+        if not args.url:
+            offline_environment(workdir, symbols, args.latency_ms)
+        try:
+            report = asyncio.run(run(args, symbols))
+        finally:
+            os.chdir(cwd)
+    
+    content = json.dumps(report, indent=2)
+    if output == "-":
+        print(content)
+    else:
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(content + "\n")
+    
+    latency = report["latency_ms"]
+    print(
+        f"{report['requests']} requests in {report['elapsed_seconds']}s: "
+        f"{report['throughput_rps']} req/s, p50 {latency['p50']} ms, p95 {latency['p95']} ms, "
+        f"p99 {latency['p99']} ms, error rate {report['error_rate']:.2%}",
+        file=sys.stderr
+    )
+
+
+if __name__ == "__main__":
+    main()
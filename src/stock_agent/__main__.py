@@ -1,12 +1,75 @@
 """CLI entry point for Stock Agent"""
 
 import sys
+import signal
+import time
 import argparse
+from typing import Optional
+from stock_agent.services.batch_analysis import BatchAnalyzer, read_requests, write_csv, write_json_lines
+from stock_agent.services.factory import create_stock_service
 from stock_agent.services.stock_service import StockService
-from stock_agent.services.market_data_service import MarketDataService
-from stock_agent.services.alert_service import AlertService
-from stock_agent.repositories.stock_repository import JSONStockRepository
-from stock_agent.config import get_settings
+from stock_agent.services.watcher import AgentWatcher
+from stock_agent.config import Settings, get_settings
+
+
+def analyze_batch(
+    stock_service: StockService,
+    settings: Settings,
+    source: str,
+    input_format: str,
+    output_format: str
+) -> None:
+    """
+    Analyze positions from a file or stdin and stream the results to stdout
+    
+    Args:
+        stock_service: Stock service
+        settings: Application settings
+        source: Input file path, or "-" for stdin
+        input_format: "auto", "csv" or "ndjson"
+        output_format: "csv" or "json" (JSON lines)
+    """
+    analyzer = BatchAnalyzer(
+        stock_service,
+        chunk_size=settings.market_data_batch_size,
+        workers=settings.batch_analyze_workers
+    )
+    write = write_json_lines if output_format == "json" else write_csv
+    
+    stream = sys.stdin if source == "-" else open(source, newline="", encoding="utf-8")
+    try:
+        started = time.perf_counter()
+        count = write(analyzer.run(read_requests(stream, input_format)), sys.stdout)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    print(f"Analyzed {count} position(s) in {time.perf_counter() - started:.2f}s", file=sys.stderr)
+
+
+def watch(interval: Optional[float] = None, iterations: Optional[int] = None) -> None:
+    """
+    Run the agent repeatedly in this process until SIGTERM or Ctrl+C
+    
+    SIGHUP reloads the configuration (environment and .env) and rebuilds
+    the services before the next iteration.
+    
+    Args:
+        interval: Seconds between runs (watch_interval_seconds if None)
+        iterations: Stop after this many runs (run until stopped if None)
+    """
+    def load_settings() -> Settings:
+        get_settings.cache_clear()
+        return get_settings()
+    
+    watcher = AgentWatcher(load_settings, create_stock_service, interval_seconds=interval)
+    signal.signal(signal.SIGTERM, lambda signum, frame: watcher.stop())
+    signal.signal(signal.SIGINT, lambda signum, frame: watcher.stop())
+    if hasattr(signal, "SIGHUP"):
+        signal.signal(signal.SIGHUP, lambda signum, frame: watcher.reload())
+    
+    print(f"👀 Running the agent every {watcher.interval_seconds:g}s (Ctrl+C to stop)")
+    count = watcher.run(iterations)
+    print(f"Stopped after {count} run(s)")
 
 
 def main():
@@ -16,24 +79,43 @@ def main():
     )
     parser.add_argument(
         "command",
-        choices=["analyze", "track", "list", "run"],
+        choices=["analyze", "track", "list", "run", "watch"],
         help="Command to execute"
     )
     parser.add_argument("--symbol", help="Stock symbol (e.g., TCS.NS, AAPL)")
     parser.add_argument("--buy-price", type=float, help="Buy price")
     parser.add_argument("--target-price", type=float, help="Target price")
+    parser.add_argument(
+        "--input",
+        help="Analyze positions from a CSV or NDJSON file ('-' for stdin) instead of --symbol"
+    )
+    parser.add_argument(
+        "--input-format", choices=["auto", "csv", "ndjson"], default="auto",
+        help="Format of --input (detected from the content by default)"
+    )
+    parser.add_argument(
+        "--output-format", choices=["csv", "json"], default="csv",
+        help="Output of batch analysis: CSV or JSON lines"
+    )
+    parser.add_argument("--interval", type=float, help="Seconds between runs in watch mode")
+    parser.add_argument("--iterations", type=int, help="Stop watch mode after this many runs")
     
     args = parser.parse_args()
     
+    if args.command == "watch":
+        # Builds (and on SIGHUP rebuilds) its own services
+        watch(args.interval, args.iterations)
+        return
+    
     # Initialize services
     settings = get_settings()
-    market_service = MarketDataService()
-    alert_service = AlertService(settings)
-    repository = JSONStockRepository(settings.data_file_path)
-    stock_service = StockService(market_service, alert_service, repository)
+    stock_service = create_stock_service(settings)
     
     try:
-        if args.command == "analyze":
+        if args.command == "analyze" and args.input:
+            analyze_batch(stock_service, settings, args.input, args.input_format, args.output_format)
+        
+        elif args.command == "analyze":
             if not all([args.symbol, args.buy_price, args.target_price]):
                 print("Error: --symbol, --buy-price, and --target-price are required for analyze")
                 sys.exit(1)
@@ -66,14 +148,21 @@ def main():
                     print(f"  • {stock.symbol}: ${stock.buy_price:.2f} → ${stock.target_price:.2f}")
                     
         elif args.command == "run":
-            results = stock_service.run_agent()
-            print(f"\n🤖 Agent analyzed {len(results)} stock(s)\n")
-            for result in results:
+            diff = stock_service.run_agent_diff()
+            print(
+                f"\n🤖 Agent analyzed {len(diff.changed)} changed stock(s), "
+                f"{len(diff.unchanged)} unchanged, {len(diff.errored)} failed\n"
+            )
+            for result in diff.changed:
                 print(f"{result.decision} - {result.symbol}: ${result.current_price:.2f}")
+            for error in diff.errored:
+                print(f"❌ {error['symbol']}: {error['error']}")
                 
     except Exception as e:
         print(f"❌ Error: {e}")
         sys.exit(1)
+    finally:
+        stock_service.close()
 
 
 if __name__ == "__main__":
@@ -1,11 +1,22 @@
 """FastAPI application factory"""
 
+import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from stock_agent.api.routers import agent_router, health_router, stocks_router
+from stock_agent.api.dependencies import get_container, reset_container
+from stock_agent.api.responses import FastJSONResponse
+from stock_agent.api.routers import (
+    agent_router,
+    debug_router,
+    health_router,
+    history_router,
+    portfolio_router,
+    stocks_router,
+    stream_router,
+)
 from stock_agent.config import get_settings
 from stock_agent.utils.logger import setup_logger
 
@@ -17,7 +28,8 @@ async def lifespan(app: FastAPI):
     """
     Application lifespan events
     
-    Handles startup and shutdown logic
+    Builds the service container and warms it up before the server
+    accepts requests, and closes it on shutdown
     """
     # Startup
     settings = get_settings()
@@ -25,10 +37,20 @@ async def lifespan(app: FastAPI):
     logger.info(f"Environment: {settings.environment}")
     logger.info(f"Telegram configured: {settings.telegram_configured}")
     
+    container = get_container()
+    app.state.container = container
+    if settings.warm_up_on_startup:
+        await asyncio.to_thread(container.warm_up)
+    else:
+        container.ready = True
+    container.start()
+    
     yield
     
     # Shutdown
     logger.info("Shutting down application")
+    container.close()
+    reset_container()
 
 
 def create_app() -> FastAPI:
@@ -45,6 +67,7 @@ def create_app() -> FastAPI:
         version=settings.app_version,
         description="An intelligent, autonomous stock monitoring agent with real-time alerts",
         lifespan=lifespan,
+        default_response_class=FastJSONResponse,
         docs_url="/docs",
         redoc_url="/redoc"
     )
@@ -56,12 +79,17 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["ETag", "Last-Modified", "X-Next-Cursor"],
     )
     
     # Register routers
     app.include_router(health_router)
     app.include_router(stocks_router)
     app.include_router(agent_router)
+    app.include_router(history_router)
+    app.include_router(portfolio_router)
+    app.include_router(stream_router)
+    app.include_router(debug_router)
     
     # Root endpoint
     @app.get("/", tags=["Root"])
@@ -0,0 +1,59 @@
+"""Conditional request (ETag / Last-Modified) helpers"""
+
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Request, Response
+
+
+def make_etag(version: str) -> str:
+    """Build a weak entity tag from a repository version"""
+    return f'W/"{version}"'
+
+
+def to_http_date(value: datetime) -> str:
+    """Format a datetime as an HTTP date (naive values are local time)"""
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check If-None-Match against an entity tag using weak comparison"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in header.split(",")
+    )
+
+
+def not_modified_since(request: Request, last_modified: datetime) -> bool:
+    """Check If-Modified-Since against a modification time (second precision)"""
+    header = request.headers.get("if-modified-since")
+    if not header or request.headers.get("if-none-match"):
+        return False
+    
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    
+    modified = last_modified.astimezone(timezone.utc).replace(microsecond=0)
+    return modified <= since
+
+
+def not_modified(etag: Optional[str] = None, last_modified: Optional[datetime] = None) -> Response:
+    """Build an empty 304 response carrying the validators"""
+    headers = {}
+    if etag:
+        headers["ETag"] = etag
+    if last_modified:
+        headers["Last-Modified"] = to_http_date(last_modified)
+    return Response(status_code=304, headers=headers)
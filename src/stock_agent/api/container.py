@@ -0,0 +1,133 @@
+"""Application service container"""
+
+import time
+from typing import Optional
+
+from stock_agent.config import Settings
+from stock_agent.models.enums import DecisionType
+from stock_agent.repositories.stock_repository import StockRepository
+from stock_agent.services.broadcaster import Broadcaster
+from stock_agent.services.jobs import JobManager
+from stock_agent.services.market_data_service import MarketDataService
+from stock_agent.services.metadata_refresher import MetadataRefresher
+from stock_agent.services.sharding import ShardCoordinator
+from stock_agent.services.stock_service import StockService
+from stock_agent.utils.exceptions import MarketDataError, StorageError
+from stock_agent.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ServiceContainer:
+    """
+    Long-lived services of the application, built once per process
+    
+    Request handlers share the container's StockService instead of
+    building one per request. warm_up() loads the repository and
+    prefetches quotes for tracked symbols so the first requests after a
+    deploy do not pay for cold reads; the container reports ready only
+    once it has run. start() begins the background metadata refresh
+    (which also fills a cold metadata cache) and shard heartbeat; close() stops background work and closes the
+    stock service (saving its state and leaving the shard ring).
+    """
+    
+    def __init__(
+        self,
+        settings: Settings,
+        stock_service: StockService,
+        job_manager: JobManager,
+        broadcaster: Broadcaster,
+        metadata_refresher: Optional[MetadataRefresher] = None
+    ):
+        """
+        Initialize service container
+        
+        Args:
+            settings: Application settings
+            stock_service: Stock service shared by all requests
+            job_manager: Background agent job manager
+            broadcaster: Streaming update broadcaster
+            metadata_refresher: Keeps metadata of tracked symbols fresh (optional)
+        """
+        self.settings = settings
+        self.stock_service = stock_service
+        self.job_manager = job_manager
+        self.broadcaster = broadcaster
+        self.metadata_refresher = metadata_refresher
+        self.ready = False
+        self.warm_up_report: Optional[dict] = None
+    
+    @property
+    def market_service(self) -> MarketDataService:
+        return self.stock_service.market_service
+    
+    @property
+    def repository(self) -> StockRepository:
+        return self.stock_service.repository
+    
+    @property
+    def shard_coordinator(self) -> Optional[ShardCoordinator]:
+        return self.stock_service.shard_coordinator
+    
+    def warm_up(self) -> dict:
+        """
+        Load the repository and prefetch quotes for tracked symbols
+        
+        Failures are logged and reported but do not keep the container
+        from becoming ready: a cold cache is slower, not broken. Metadata
+        is left to the background refresher, since fetching it for every
+        symbol would hold readiness back for minutes.
+        
+        Returns:
+            Warm-up report (positions loaded, quotes prefetched, errors,
+            seconds)
+        """
+        started = time.perf_counter()
+        report = {"positions": 0, "quotes_prefetched": 0, "errors": []}
+        
+        try:
+            stocks = self.repository.get_all()
+            # Build the price indexes listing filters use
+            self.repository.query(decision=DecisionType.HOLD, limit=1)
+            report["positions"] = len(stocks)
+        except StorageError as e:
+            logger.error(f"Warm-up failed to load the repository: {e}")
+            report["errors"].append(f"repository: {e}")
+            stocks = []
+        
+        if stocks and self.market_service.quote_cache is None:
+            logger.info("Quote cache disabled, skipping quote prefetch")
+        elif stocks:
+            try:
+                prices = self.market_service.get_live_prices([stock.symbol for stock in stocks])
+                report["quotes_prefetched"] = len(prices)
+            except (MarketDataError, StorageError) as e:
+                logger.error(f"Warm-up failed to prefetch quotes: {e}")
+                report["errors"].append(f"quotes: {e}")
+        
+        report["seconds"] = round(time.perf_counter() - started, 3)
+        self.warm_up_report = report
+        self.ready = True
+        logger.info(
+            f"Warm-up complete: {report['positions']} positions, "
+            f"{report['quotes_prefetched']} quotes in {report['seconds']}s"
+        )
+        return report
+    
+    def start(self) -> None:
+        """Start background work"""
+        if self.metadata_refresher is not None:
+            self.metadata_refresher.start()
+        if self.shard_coordinator is not None:
+            self.shard_coordinator.start()
+    
+    def close(self) -> None:
+        """Stop background jobs, end open streams and close the stock service"""
+        self.ready = False
+        if self.metadata_refresher is not None:
+            self.metadata_refresher.stop()
+        self.job_manager.shutdown()
+        # End open streams so the server can stop
+        self.broadcaster.close()
+        self.stock_service.close()
+        logger.info("Service container closed")
@@ -1,61 +1,75 @@
 """Dependency injection for FastAPI"""
 
 from functools import lru_cache
+from typing import Optional
 
-from stock_agent.config import Settings, get_settings
-from stock_agent.repositories.stock_repository import JSONStockRepository, StockRepository
-from stock_agent.services.alert_service import AlertService
+from stock_agent.api.container import ServiceContainer
+from stock_agent.config import get_settings
+from stock_agent.repositories.stock_repository import StockRepository
+from stock_agent.services.broadcaster import Broadcaster
+from stock_agent.services.factory import create_stock_service
+from stock_agent.services.jobs import JobManager
 from stock_agent.services.market_data_service import MarketDataService
+from stock_agent.services.memory_monitor import MemoryMonitor
+from stock_agent.services.metadata_refresher import MetadataRefresher
 from stock_agent.services.stock_service import StockService
 
 
 @lru_cache()
-def get_market_service() -> MarketDataService:
-    """Get market data service instance"""
-    settings = get_settings()
-    return MarketDataService(
-        timeout=settings.market_data_timeout,
-        retry_attempts=settings.market_data_retry_attempts
-    )
+def get_broadcaster() -> Broadcaster:
+    """Get broadcaster of agent updates to streaming clients"""
+    return Broadcaster(max_buffer=get_settings().stream_buffer_size)
 
 
 @lru_cache()
-def get_alert_service() -> AlertService:
-    """Get alert service instance"""
-    settings = get_settings()
-    return AlertService(settings)
+def get_job_manager() -> JobManager:
+    """Get background agent job manager instance"""
+    return JobManager(max_finished=get_settings().agent_jobs_kept)
 
 
 @lru_cache()
-def get_repository() -> StockRepository:
-    """Get stock repository instance"""
+def get_container() -> ServiceContainer:
+    """Get the application service container (built once, with the CLI's wiring)"""
     settings = get_settings()
-    return JSONStockRepository(settings.data_file_path)
+    stock_service = create_stock_service(settings, broadcaster=get_broadcaster())
+    metadata_refresher = None
+    if settings.metadata_cache_path and settings.metadata_refresh_interval_seconds > 0:
+        metadata_refresher = MetadataRefresher(
+            stock_service.market_service,
+            stock_service.repository,
+            interval_seconds=settings.metadata_refresh_interval_seconds
+        )
+    return ServiceContainer(
+        settings, stock_service, get_job_manager(), get_broadcaster(), metadata_refresher
+    )
+
+
+def get_market_service() -> MarketDataService:
+    """Get the market data service of the container"""
+    return get_container().market_service
+
+
+def get_repository() -> StockRepository:
+    """Get the stock repository of the container"""
+    return get_container().repository
 
 
-def get_stock_service(
-    market_service: MarketDataService = None,
-    alert_service: AlertService = None,
-    repository: StockRepository = None
-) -> StockService:
+def get_memory_monitor() -> Optional[MemoryMonitor]:
+    """Get the memory monitor of the container (None when memory tracking is disabled)"""
+    return get_container().stock_service.memory_monitor
+
+
+def get_stock_service() -> StockService:
     """
-    Get stock service instance with dependency injection
-    
-    Args:
-        market_service: Market data service (optional, will use cached if not provided)
-        alert_service: Alert service (optional, will use cached if not provided)
-        repository: Stock repository (optional, will use cached if not provided)
+    Get the stock service shared by all requests
         
     Returns:
-        StockService instance
+        StockService instance held by the service container
     """
-    if market_service is None:
-        market_service = get_market_service()
-    
-    if alert_service is None:
-        alert_service = get_alert_service()
-    
-    if repository is None:
-        repository = get_repository()
-    
-    return StockService(market_service, alert_service, repository)
+    return get_container().stock_service
+
+
+def reset_container() -> None:
+    """Forget the container and every cached component (after closing it)"""
+    for getter in (get_container, get_job_manager, get_broadcaster):
+        getter.cache_clear()
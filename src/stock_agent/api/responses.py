@@ -0,0 +1,14 @@
+"""Fast JSON response classes"""
+
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+from stock_agent.utils.serialization import dumps
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson when it is installed"""
+    
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -3,9 +3,17 @@
 from stock_agent.api.routers.health import router as health_router
 from stock_agent.api.routers.stocks import router as stocks_router
 from stock_agent.api.routers.agent import router as agent_router
+from stock_agent.api.routers.debug import router as debug_router
+from stock_agent.api.routers.history import router as history_router
+from stock_agent.api.routers.portfolio import router as portfolio_router
+from stock_agent.api.routers.stream import router as stream_router
 
 __all__ = [
     "health_router",
     "stocks_router",
     "agent_router",
+    "history_router",
+    "portfolio_router",
+    "stream_router",
+    "debug_router",
 ]
@@ -1,44 +1,107 @@
-"""Agent execution router"""
-
-from datetime import datetime
-from typing import List
-
-import pytz
-from fastapi import APIRouter, Depends, HTTPException
-
-from stock_agent.api.dependencies import get_stock_service
-from stock_agent.config import get_settings
-from stock_agent.models.stock import AgentRunResult, StockAnalysis
-from stock_agent.services.stock_service import StockService
-
-router = APIRouter(prefix="/api/v1/agent", tags=["Agent"])
-
-
-@router.get("/run", response_model=AgentRunResult)
-async def run_agent(
-    stock_service: StockService = Depends(get_stock_service)
-):
-    """
-    Run the autonomous agent
-    
-    Analyzes all tracked stocks and sends alerts if:
-    - Target price is reached
-    - It's the daily update time (12 PM IST)
-    
-    This endpoint should be called periodically (e.g., via cron job)
-    to enable autonomous monitoring.
-    """
-    try:
-        settings = get_settings()
-        timezone = pytz.timezone(settings.timezone)
-        now_ist = datetime.now(timezone)
-        
-        results = stock_service.run_agent()
-        
-        return AgentRunResult(
-            time_ist=now_ist.strftime("%Y-%m-%d %H:%M:%S"),
-            total_stocks=len(results),
-            results=results
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Agent execution failed: {str(e)}")
+"""Agent execution router"""
+
+from datetime import datetime
+
+import pytz
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+
+from stock_agent.api.dependencies import get_job_manager, get_stock_service
+from stock_agent.config import get_settings
+from stock_agent.models.stock import AgentJobStatus, AgentRunResult
+from stock_agent.services.jobs import JobManager
+from stock_agent.services.stock_service import StockService
+
+router = APIRouter(prefix="/api/v1/agent", tags=["Agent"])
+
+
+@router.get("/run", response_model=AgentRunResult)
+def run_agent(
+    stock_service: StockService = Depends(get_stock_service)
+):
+    """
+    Run the autonomous agent
+    
+    Analyzes all tracked stocks (only this instance's shard when sharding
+    is enabled) and sends alerts if:
+    - Target price is reached
+    - It's the daily update time (12 PM IST)
+    
+    This endpoint should be called periodically (e.g., via cron job)
+    to enable autonomous monitoring. Only positions whose price or
+    definition changed since the previous run are re-analyzed and returned
+    in results; the others are listed in unchanged. Runs in the
+    threadpool and waits for a background job that is already running.
+    """
+    try:
+        settings = get_settings()
+        timezone = pytz.timezone(settings.timezone)
+        now_ist = datetime.now(timezone)
+        
+        diff = stock_service.run_agent_diff()
+        
+        shard = None
+        if stock_service.shard_coordinator is not None:
+            shard = stock_service.shard_coordinator.snapshot()
+        
+        return AgentRunResult(
+            time_ist=now_ist.strftime("%Y-%m-%d %H:%M:%S"),
+            total_stocks=len(diff.changed) + len(diff.unchanged),
+            results=diff.changed,
+            unchanged=[analysis.symbol for analysis in diff.unchanged],
+            errors=diff.errored or None,
+            shard=shard,
+            memory=diff.memory
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Agent execution failed: {str(e)}")
+
+
+@router.post("/jobs", response_model=AgentJobStatus, status_code=status.HTTP_202_ACCEPTED)
+async def start_agent_job(
+    response: Response,
+    stock_service: StockService = Depends(get_stock_service),
+    job_manager: JobManager = Depends(get_job_manager)
+):
+    """
+    Start the autonomous agent as a background job
+    
+    Returns at once with a job ID; poll GET /jobs/{job_id} for progress
+    and partial results. Only one job runs at a time: while a job is
+    queued or running, that job is returned instead of starting another.
+    Prefer this over GET /run for large portfolios.
+    """
+    job, _ = job_manager.submit(lambda progress: stock_service.run_agent_diff(progress))
+    response.headers["Location"] = f"{router.prefix}/jobs/{job.job_id}"
+    return job.to_status()
+
+
+@router.get("/jobs/{job_id}", response_model=AgentJobStatus)
+async def get_agent_job(
+    job_id: str,
+    job_manager: JobManager = Depends(get_job_manager)
+):
+    """
+    Get the status, progress counters and results so far of an agent job
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Agent job '{job_id}' not found")
+    return job.to_status()
+
+
+@router.delete("/jobs/{job_id}", response_model=AgentJobStatus)
+async def cancel_agent_job(
+    job_id: str,
+    job_manager: JobManager = Depends(get_job_manager)
+):
+    """
+    Cancel an agent job
+    
+    A running job stops after the position it is analyzing; alerts and
+    prices of the positions already processed are kept. Cancelling a
+    finished job has no effect.
+    """
+    job = job_manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Agent job '{job_id}' not found")
+    return job.to_status()
@@ -0,0 +1,102 @@
+"""Memory debugging router"""
+
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel
+
+from stock_agent.api.dependencies import get_memory_monitor
+from stock_agent.models.stock import RunMemory
+from stock_agent.services.memory_monitor import MemoryMonitor
+
+router = APIRouter(prefix="/debug/memory", tags=["Debug"])
+
+
+class MemoryStats(BaseModel):
+    """Traced memory and recent run measurements"""
+    tracing: bool
+    traced_bytes: int
+    traced_peak_bytes: int
+    rss_bytes: Optional[int] = None
+    runs_measured: int
+    retained_bytes_recent_runs: int
+    last_run: Optional[RunMemory] = None
+    snapshots: List[int]
+
+
+class AllocationSite(BaseModel):
+    """Memory allocated from one source line"""
+    location: str
+    size_bytes: int
+    count: int
+    size_diff_bytes: Optional[int] = None
+    count_diff: Optional[int] = None
+
+
+class MemorySnapshot(BaseModel):
+    """Captured tracemalloc snapshot"""
+    id: int
+    taken_at: datetime
+    traced_bytes: int
+    top: List[AllocationSite]
+
+
+class MemoryDiff(BaseModel):
+    """Change between two snapshots"""
+    id: int
+    base_id: int
+    seconds_between: float
+    size_diff_bytes: int
+    top: List[AllocationSite]
+
+
+def require_monitor(monitor: Optional[MemoryMonitor] = Depends(get_memory_monitor)) -> MemoryMonitor:
+    """Memory monitor, or 404 when memory tracking is disabled"""
+    if monitor is None:
+        raise HTTPException(status_code=404, detail="Memory tracking is disabled (set MEMORY_TRACKING=true)")
+    return monitor
+
+
+@router.get("", response_model=MemoryStats)
+async def get_memory_stats(monitor: MemoryMonitor = Depends(require_monitor)):
+    """
+    Get traced memory
+    
+    Reports the memory currently traced, the process RSS and the peak and
+    retained memory of recent agent runs
+    """
+    return monitor.stats()
+
+
+@router.post("/snapshots", response_model=MemorySnapshot, status_code=201)
+async def take_memory_snapshot(
+    limit: int = Query(default=20, ge=1, le=200, description="Largest allocation sites to return"),
+    monitor: MemoryMonitor = Depends(require_monitor)
+):
+    """
+    Capture a tracemalloc snapshot
+    
+    Garbage is collected first. The snapshot is kept (up to
+    MEMORY_SNAPSHOTS_KEPT of them) so later snapshots can be diffed against it.
+    """
+    return monitor.snapshot(limit=limit)
+
+
+@router.get("/snapshots/{snapshot_id}/diff", response_model=MemoryDiff)
+async def diff_memory_snapshots(
+    snapshot_id: int,
+    base: Optional[int] = Query(default=None, description="Snapshot to compare with (the previous one by default)"),
+    limit: int = Query(default=20, ge=1, le=200, description="Allocation sites with the largest change to return"),
+    monitor: MemoryMonitor = Depends(require_monitor)
+):
+    """
+    Diff two snapshots by source line
+    
+    Sites are ordered by the size of their change, so whatever keeps
+    growing between two snapshots comes first
+    """
+    diff = monitor.diff(snapshot_id, base_id=base, limit=limit)
+    if diff is None:
+        raise HTTPException(status_code=404, detail="Snapshot not found (it may have been evicted)")
+    return diff
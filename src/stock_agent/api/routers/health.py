@@ -1,12 +1,18 @@
 """Health check router"""
 
+from typing import Optional
+
 from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 
-from stock_agent.api.dependencies import get_market_service, get_repository
+from stock_agent.api.container import ServiceContainer
+from stock_agent.api.dependencies import get_container, get_market_service, get_repository
 from stock_agent.config import get_settings
-from stock_agent.services.market_data_service import MarketDataService
 from stock_agent.repositories.stock_repository import StockRepository
+from stock_agent.services.market_data_service import MarketDataService
+from stock_agent.utils.exceptions import RateLimitedError
+from stock_agent.utils.rate_limiter import CallPriority, call_priority
 
 router = APIRouter(prefix="/health", tags=["Health"])
 
@@ -19,15 +25,23 @@ class HealthResponse(BaseModel):
     dependencies: dict
 
 
+class ReadinessResponse(BaseModel):
+    """Readiness probe response model"""
+    ready: bool
+    warm_up: Optional[dict] = None
+
+
 @router.get("", response_model=HealthResponse)
-async def health_check(
+def health_check(
     market_service: MarketDataService = Depends(get_market_service),
     repository: StockRepository = Depends(get_repository)
 ):
     """
     Health check endpoint
     
-    Returns system status and dependency health
+    Returns system status and dependency health. The market data probe
+    can wait on the rate limiter and retry with backoff, so this runs in
+    the threadpool rather than on the event loop.
     """
     settings = get_settings()
     
@@ -38,12 +52,24 @@ async def health_check(
         "telegram": "configured" if settings.telegram_configured else "not_configured"
     }
     
-    # Test market data service
-    try:
-        # Try to validate a known symbol
-        market_service.validate_symbol("AAPL")
-    except Exception:
-        dependencies["market_data"] = "unhealthy"
+    # Report the breaker and skip the probe while it is failing fast
+    circuit = market_service.circuit_breaker.snapshot()
+    dependencies["market_data_circuit"] = circuit
+    if market_service.rate_limiter is not None:
+        dependencies["market_data_rate_limit"] = market_service.rate_limiter.snapshot()
+    if circuit["state"] != "closed":
+        dependencies["market_data"] = "degraded"
+    else:
+        # Test market data service with probe priority, so the probe is
+        # skipped rather than taking request slots agent runs need
+        try:
+            # Quote a known symbol (answered from the quote cache while it is fresh)
+            with call_priority(CallPriority.HEALTH_PROBE):
+                market_service.get_live_price("AAPL")
+        except RateLimitedError:
+            dependencies["market_data"] = "throttled"
+        except Exception:
+            dependencies["market_data"] = "unhealthy"
     
     # Test repository
     try:
@@ -57,3 +83,18 @@ async def health_check(
         environment=settings.environment,
         dependencies=dependencies
     )
+
+
+@router.get("/ready", response_model=ReadinessResponse, responses={503: {"model": ReadinessResponse}})
+async def readiness_check(container: ServiceContainer = Depends(get_container)):
+    """
+    Readiness probe
+    
+    Returns 503 until the service container has warmed up (repository
+    loaded, quotes prefetched), so load balancers only route traffic to
+    warm instances
+    """
+    body = ReadinessResponse(ready=container.ready, warm_up=container.warm_up_report)
+    if not container.ready:
+        return JSONResponse(status_code=503, content=body.model_dump())
+    return body
@@ -0,0 +1,66 @@
+"""Agent run history router"""
+
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from stock_agent.api.dependencies import get_stock_service
+from stock_agent.models.stock import HistoryPoint, RunSummary
+from stock_agent.services.stock_service import StockService
+from stock_agent.utils.exceptions import StorageError
+
+router = APIRouter(prefix="/api/v1/history", tags=["History"])
+
+DEFAULT_RANGE = timedelta(days=7)
+MAX_RANGE = timedelta(days=366)
+
+
+def _time_range(start: Optional[datetime], end: Optional[datetime]) -> Tuple[datetime, datetime]:
+    """Resolve query bounds (the last week by default)"""
+    end = end or datetime.now()
+    start = start or end - DEFAULT_RANGE
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    if end - start > MAX_RANGE:
+        raise HTTPException(status_code=400, detail="Time range must not exceed 366 days")
+    return start, end
+
+
+@router.get("/runs", response_model=List[RunSummary])
+async def get_run_history(
+    start: Optional[datetime] = Query(default=None, description="Start of the range (default: a week before end)"),
+    end: Optional[datetime] = Query(default=None, description="End of the range (default: now)"),
+    stock_service: StockService = Depends(get_stock_service)
+):
+    """
+    List recorded agent runs
+    
+    Each run lists the symbols it re-analyzed, its errors and the alerts it
+    sent, for auditing.
+    """
+    start, end = _time_range(start, end)
+    try:
+        return stock_service.get_run_history(start, end)
+    except StorageError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/{symbol}", response_model=List[HistoryPoint])
+async def get_symbol_history(
+    symbol: str,
+    start: Optional[datetime] = Query(default=None, description="Start of the range (default: a week before end)"),
+    end: Optional[datetime] = Query(default=None, description="End of the range (default: now)"),
+    stock_service: StockService = Depends(get_stock_service)
+):
+    """
+    Get a symbol's analysis series
+    
+    One point per recorded run that priced the symbol; days older than the
+    downsampling age hold one point per bucket.
+    """
+    start, end = _time_range(start, end)
+    try:
+        return stock_service.get_symbol_history(symbol, start, end)
+    except StorageError as e:
+        raise HTTPException(status_code=500, detail=str(e))
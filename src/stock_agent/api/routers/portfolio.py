@@ -0,0 +1,29 @@
+"""Portfolio summary router"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from stock_agent.api.dependencies import get_stock_service
+from stock_agent.models.stock import PortfolioSummary
+from stock_agent.services.stock_service import StockService
+from stock_agent.utils.exceptions import StorageError
+
+router = APIRouter(prefix="/api/v1/portfolio", tags=["Portfolio"])
+
+
+@router.get("/summary", response_model=PortfolioSummary)
+def get_portfolio_summary(
+    holdings: bool = Query(default=True, description="Include per-position values and weights"),
+    stock_service: StockService = Depends(get_stock_service)
+):
+    """
+    Get portfolio totals
+    
+    Cost basis, market value and P/L come from running totals updated on
+    every change, so the summary never re-analyzes positions. Each position
+    counts as one unit; market value and P/L cover positions priced by the
+    agent.
+    """
+    try:
+        return stock_service.get_portfolio_summary(with_holdings=holdings)
+    except StorageError as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,19 +1,33 @@
 """Stock management router"""
 
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 
+from stock_agent.api.conditional import (
+    etag_matches,
+    make_etag,
+    not_modified,
+    not_modified_since,
+    to_http_date,
+)
 from stock_agent.api.dependencies import get_stock_service
-from stock_agent.models.stock import StockAnalysis, StockCreate, StockInDB
+from stock_agent.api.responses import FastJSONResponse
+from stock_agent.models.enums import DecisionType
+from stock_agent.models.stock import StockAnalysis, StockCreate, StockInDB, StockMetadata, StockUpdate
 from stock_agent.services.stock_service import StockService
-from stock_agent.utils.exceptions import DuplicateStockError, InvalidSymbolError, MarketDataError
+from stock_agent.utils.exceptions import (
+    DuplicateStockError,
+    InvalidSymbolError,
+    MarketDataError,
+    StockNotFoundError,
+)
 
 router = APIRouter(prefix="/api/v1/stocks", tags=["Stocks"])
 
 
 @router.post("/analyze", response_model=StockAnalysis)
-async def analyze_stock(
+def analyze_stock(
     stock: StockCreate,
     stock_service: StockService = Depends(get_stock_service)
 ):
@@ -22,6 +36,8 @@ async def analyze_stock(
     
     Performs instant analysis on a stock to check current price,
     profit/loss, and decision (TARGET_REACHED, HOLD, BELOW_BUY_PRICE).
+    Runs in the threadpool, so waiting for a market data request slot
+    does not hold up other requests.
     """
     try:
         analysis = stock_service.analyze_stock(
@@ -39,7 +55,7 @@ async def analyze_stock(
 
 
 @router.post("/track", response_model=dict)
-async def track_stock(
+def track_stock(
     stock: StockCreate,
     stock_service: StockService = Depends(get_stock_service)
 ):
@@ -47,12 +63,15 @@ async def track_stock(
     Add a stock to the tracking list
     
     The stock will be monitored continuously by the autonomous agent.
+    Unknown symbols are rejected with 400; validation results are cached,
+    so a repeated bad symbol is rejected without a market data lookup.
     """
     try:
         stock_service.track_stock(
             symbol=stock.symbol,
             buy_price=stock.buy_price,
-            target_price=stock.target_price
+            target_price=stock.target_price,
+            rules=stock.rules
         )
         return {"message": f"{stock.symbol} added successfully"}
     except DuplicateStockError as e:
@@ -64,16 +83,169 @@ async def track_stock(
 
 
 @router.get("", response_model=List[StockInDB])
-async def list_stocks(
+def list_stocks(
+    request: Request,
+    prefix: Optional[str] = Query(None, description="Only symbols starting with this prefix"),
+    decision: Optional[str] = Query(
+        None, description="Decision at the last recorded price (TARGET_REACHED, HOLD, BELOW_BUY_PRICE)"
+    ),
+    within_percent: Optional[float] = Query(
+        None, ge=0, description="Only stocks whose last price is within this percent of target"
+    ),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Page size"),
+    with_metadata: bool = Query(False, description="Include cached name, sector, currency and exchange"),
+    stock_service: StockService = Depends(get_stock_service)
+):
+    """
+    Get tracked stocks
+    
+    Returns stocks ordered by symbol. When more stocks match than `limit`,
+    the cursor for the next page is returned in the `X-Next-Cursor` header.
+    Supports conditional requests: send the returned `ETag` back in
+    `If-None-Match` to get `304 Not Modified` while nothing has changed.
+    With `with_metadata`, each stock carries its cached metadata (null
+    until the metadata has been loaded); the ETag then also changes when
+    metadata is loaded or refreshed.
+    """
+    try:
+        version = stock_service.portfolio_version()
+        if with_metadata:
+            version = f"{version}-metadata-{stock_service.market_service.metadata_version()}"
+        etag = make_etag(version)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
+    if etag_matches(request, etag):
+        return not_modified(etag=etag)
+    
+    decision_type = None
+    if decision is not None:
+        decision_type = DecisionType.parse(decision)
+        if decision_type is None:
+            raise HTTPException(status_code=400, detail=f"Unknown decision: {decision}")
+    
+    try:
+        rows, next_cursor = stock_service.list_stock_rows(
+            prefix=prefix,
+            decision=decision_type,
+            within_percent=within_percent,
+            cursor=cursor,
+            limit=limit,
+            with_metadata=with_metadata
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
+    
+    # Stored rows are already in response form; skip response_model validation
+    headers = {"ETag": etag}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    return FastJSONResponse(content=rows, headers=headers)
+
+
+@router.get("/{symbol}", response_model=StockInDB)
+def get_stock(
+    symbol: str,
     stock_service: StockService = Depends(get_stock_service)
 ):
     """
-    Get all tracked stocks
+    Get a tracked stock
+    """
+    try:
+        return stock_service.get_stock(symbol)
+    except StockNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
+
+
+@router.get("/{symbol}/metadata", response_model=StockMetadata)
+def get_stock_metadata(
+    symbol: str,
+    stock_service: StockService = Depends(get_stock_service)
+):
+    """
+    Get name, sector, industry, currency and exchange of a symbol
     
-    Returns the list of stocks currently being monitored.
+    Served from the metadata cache; fetched from market data on a miss.
+    """
+    info = stock_service.market_service.get_stock_info(symbol)
+    if info is None:
+        raise HTTPException(status_code=404, detail=f"No metadata available for '{symbol}'")
+    return info
+
+
+@router.get("/{symbol}/analysis", response_model=StockAnalysis)
+def get_last_analysis(
+    symbol: str,
+    request: Request,
+    response: Response,
+    stock_service: StockService = Depends(get_stock_service)
+):
+    """
+    Get the analysis of a tracked stock as of the last agent run
+    
+    Served from the recorded price without fetching market data. Supports
+    `If-Modified-Since` and `If-None-Match` for cheap polling.
+    """
+    try:
+        analysis = stock_service.get_last_analysis(symbol)
+    except StockNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
+    
+    if analysis is None:
+        raise HTTPException(status_code=404, detail=f"No analysis recorded yet for '{symbol}'")
+    
+    last_modified = analysis.analyzed_at
+    etag = make_etag(f"{analysis.symbol}-{last_modified.timestamp():.6f}")
+    if etag_matches(request, etag) or not_modified_since(request, last_modified):
+        return not_modified(etag=etag, last_modified=last_modified)
+    
+    response.headers["ETag"] = etag
+    response.headers["Last-Modified"] = to_http_date(last_modified)
+    return analysis
+
+
+@router.put("/{symbol}", response_model=StockInDB)
+def update_stock(
+    symbol: str,
+    stock: StockUpdate,
+    stock_service: StockService = Depends(get_stock_service)
+):
+    """
+    Update buy and target prices of a tracked stock
+    
+    Alert rules are replaced when given and kept when omitted.
+    """
+    try:
+        return stock_service.update_stock(
+            symbol=symbol,
+            buy_price=stock.buy_price,
+            target_price=stock.target_price,
+            rules=stock.rules
+        )
+    except StockNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
+
+
+@router.delete("/{symbol}", response_model=dict)
+def delete_stock(
+    symbol: str,
+    stock_service: StockService = Depends(get_stock_service)
+):
+    """
+    Remove a stock from the tracking list
     """
     try:
-        stocks = stock_service.get_tracked_stocks()
-        return stocks
+        stock_service.delete_stock(symbol)
+        return {"message": f"{symbol.strip().upper()} removed successfully"}
+    except StockNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
@@ -0,0 +1,59 @@
+"""Streaming agent updates router"""
+
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+
+from stock_agent.api.dependencies import get_broadcaster
+from stock_agent.config import get_settings
+from stock_agent.services.broadcaster import Broadcaster
+
+router = APIRouter(prefix="/api/v1/stream", tags=["Stream"])
+
+
+@router.get("/analyses")
+async def stream_analyses(
+    request: Request,
+    symbols: Optional[str] = Query(None, description="Comma-separated symbols to stream (all by default)"),
+    broadcaster: Broadcaster = Depends(get_broadcaster)
+):
+    """
+    Stream agent updates as server-sent events
+    
+    Every agent run (synchronous or background job) pushes one "analysis"
+    event per changed position and a "run" event summarizing the run.
+    With symbols, only the analyses of those symbols are streamed (run
+    summaries still are). Idle streams receive keep-alive comments. A client that falls too far
+    behind receives a "dropped" event and is disconnected; it should
+    reconnect and re-read the current state from the REST endpoints.
+    """
+    keepalive = get_settings().stream_keepalive_seconds
+    wanted = None
+    if symbols is not None:
+        wanted = {symbol.strip().upper() for symbol in symbols.split(",") if symbol.strip()}
+    subscription = broadcaster.subscribe(wanted)
+    
+    async def events():
+        try:
+            yield b": connected\n\n"
+            while True:
+                try:
+                    frame = await subscription.next(timeout=keepalive)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield b": keep-alive\n\n"
+                    continue
+                if frame is None:
+                    break
+                yield frame
+        finally:
+            broadcaster.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,5 +1,6 @@
 """Configuration management using Pydantic Settings"""
 
+from datetime import date
 from functools import lru_cache
 from pathlib import Path
 from typing import Optional
@@ -34,10 +35,170 @@ class Settings(BaseSettings):
     
     # Data Storage
     data_file_path: str = Field(default="data/stocks.json", description="Path to JSON storage file")
+    snapshot_file_path: str = Field(
+        default="data/snapshots.json",
+        description="Last analysis per position for incremental runs"
+    )
+    incremental_runs: bool = Field(
+        default=True,
+        description="Re-analyze only positions whose price or definition changed"
+    )
+    
+    # Portfolio
+    reporting_currency: str = Field(default="USD", description="Currency portfolio totals are reported in")
+    fx_ttl_seconds: int = Field(default=3600, description="Seconds an FX rate is reused before it is fetched again")
+    portfolio_check_interval: int = Field(
+        default=1000,
+        description="Changes between consistency checks of the running portfolio totals"
+    )
+    
+    # Caches
+    history_cache_dir: str = Field(default="data/history", description="Directory of the daily price history cache")
+    quote_cache_path: str = Field(
+        default="data/quotes.db",
+        description="SQLite file of the quote cache shared by worker processes"
+    )
+    quote_cache_ttl_seconds: float = Field(
+        default=60.0,
+        description="Seconds a cached quote is served (0 disables the quote cache)"
+    )
+    symbol_cache_path: str = Field(
+        default="data/symbols.db",
+        description="SQLite file of symbol validation results (empty disables it)"
+    )
+    symbol_valid_ttl_seconds: float = Field(default=7 * 86400, description="Seconds a symbol found valid is trusted")
+    symbol_invalid_ttl_seconds: float = Field(
+        default=3600.0,
+        description="Seconds a symbol found invalid is rejected without a lookup"
+    )
+    metadata_cache_path: str = Field(
+        default="data/metadata.db",
+        description="SQLite file of symbol metadata (empty disables it)"
+    )
+    metadata_ttl_seconds: float = Field(default=30 * 86400, description="Seconds cached symbol metadata is served")
+    metadata_refresh_after_seconds: float = Field(
+        default=7 * 86400,
+        description="Age after which cached metadata is refreshed"
+    )
+    metadata_refresh_interval_seconds: float = Field(
+        default=3600.0,
+        description="Seconds between background metadata refreshes (0 disables them)"
+    )
+    
+    # Run History
+    run_history_dir: str = Field(
+        default="data/runs",
+        description="Directory of the agent run history (empty disables it)"
+    )
+    run_history_retention_days: int = Field(default=365, description="Days of run history to keep (0 keeps everything)")
+    run_history_downsample_after_days: int = Field(
+        default=30,
+        description="Age in days after which run history is downsampled (0 disables)"
+    )
+    run_history_downsample_minutes: int = Field(
+        default=60,
+        description="Bucket width of downsampled run history in minutes"
+    )
+    
+    # Background Jobs and Streaming
+    warm_up_on_startup: bool = Field(
+        default=True,
+        description="Load the repository and prefetch quotes before serving requests"
+    )
+    agent_jobs_kept: int = Field(default=20, description="Finished background agent jobs kept for polling")
+    stream_buffer_size: int = Field(
+        default=100,
+        description="Updates a streaming client may fall behind before it is dropped"
+    )
+    stream_keepalive_seconds: float = Field(
+        default=15.0,
+        description="Seconds between keep-alive comments on idle streams"
+    )
+    
+    # CLI
+    batch_analyze_workers: int = Field(
+        default=8,
+        description="Batched price fetches in flight during CLI batch analysis"
+    )
+    watch_interval_seconds: float = Field(default=60.0, description="Seconds between agent runs in CLI watch mode")
     
     # Market Data
     market_data_timeout: int = Field(default=10, description="Market data API timeout in seconds")
     market_data_retry_attempts: int = Field(default=3, description="Number of retry attempts for market data")
+    market_data_backoff_base: float = Field(
+        default=0.5,
+        description="Backoff ceiling after the first failed attempt, in seconds"
+    )
+    market_data_backoff_max: float = Field(default=8.0, description="Maximum backoff between attempts, in seconds")
+    market_data_breaker_threshold: int = Field(
+        default=5,
+        description="Consecutive upstream failures that open the circuit breaker"
+    )
+    market_data_breaker_reset_seconds: float = Field(
+        default=30.0,
+        description="Seconds the circuit stays open before probing"
+    )
+    market_data_provider: str = Field(default="yfinance", description="Market data provider (yfinance/replay)")
+    market_data_batch_size: int = Field(default=50, description="Symbols per batched quote request")
+    market_data_rate_limit: float = Field(
+        default=2.0,
+        description="Upstream requests per second (0 disables rate limiting)"
+    )
+    market_data_rate_burst: int = Field(default=10, description="Upstream requests allowed in a burst")
+    market_data_rate_reserve: float = Field(
+        default=3.0,
+        description="Requests of the burst that health probes leave for agent runs"
+    )
+    market_data_rate_max_wait: float = Field(default=30.0, description="Longest wait for a request slot in seconds")
+    market_data_rate_limit_path: Optional[str] = Field(
+        default=None,
+        description="SQLite file sharing the rate limit across processes"
+    )
+    
+    # Replay Provider
+    replay_data_path: str = Field(
+        default="data/replay.csv",
+        description="CSV or Parquet file replayed by the replay provider"
+    )
+    replay_as_of: Optional[date] = Field(default=None, description="Replay date (last date in the file if unset)")
+    replay_latency_ms: float = Field(default=0.0, description="Simulated latency per replay request in milliseconds")
+    replay_latency_jitter_ms: float = Field(default=0.0, description="Random extra replay latency in milliseconds")
+    replay_error_rate: float = Field(default=0.0, description="Probability (0-1) that a replay request fails")
+    replay_error_kinds: str = Field(
+        default="timeout",
+        description="Injected error kinds (timeout, rate_limit, server_error)"
+    )
+    replay_seed: Optional[int] = Field(default=None, description="Random seed for replay latency and errors")
+    
+    # Sharding
+    shard_enabled: bool = Field(default=False, description="Split agent runs across instances sharing shard_store_path")
+    shard_store_path: str = Field(
+        default="data/shards.db",
+        description="SQLite file with shard membership, leases and sent alerts"
+    )
+    instance_id: Optional[str] = Field(default=None, description="Unique instance id (hostname-pid if unset)")
+    shard_lease_seconds: float = Field(default=120.0, description="Symbol lease duration (renewed during runs)")
+    shard_heartbeat_seconds: float = Field(default=10.0, description="Seconds between member heartbeats")
+    shard_member_ttl_seconds: float = Field(
+        default=30.0,
+        description="Seconds without a heartbeat after which an instance leaves the ring"
+    )
+    shard_vnodes: int = Field(default=64, description="Hash ring points per instance")
+    alert_dedupe_window_seconds: float = Field(
+        default=300.0,
+        description="How long a sent alert is remembered across instances"
+    )
+    
+    # Technical Indicators
+    indicators_enabled: bool = Field(default=True, description="Compute technical indicators during analysis")
+    indicator_state_path: str = Field(default="data/indicators.json", description="Path to persisted indicator state")
+    indicator_lookback_days: int = Field(default=400, description="Calendar days of history used to seed indicators")
+    sma_period: int = Field(default=20, description="Simple moving average window")
+    ema_period: int = Field(default=20, description="Exponential moving average period")
+    rsi_period: int = Field(default=14, description="RSI period")
+    atr_period: int = Field(default=14, description="ATR period")
+    rsi_overbought: float = Field(default=70.0, description="RSI level signalling overbought")
+    rsi_oversold: float = Field(default=30.0, description="RSI level signalling oversold")
     
     # Logging
     log_level: str = Field(default="INFO", description="Logging level")
@@ -45,6 +206,14 @@ class Settings(BaseSettings):
     log_max_bytes: int = Field(default=10485760, description="Max log file size (10MB)")
     log_backup_count: int = Field(default=5, description="Number of log backups to keep")
     
+    # Memory Instrumentation
+    memory_tracking: bool = Field(
+        default=False,
+        description="Trace allocations to report per-run memory and serve /debug/memory"
+    )
+    memory_trace_frames: int = Field(default=1, description="Stack frames recorded per traced allocation")
+    memory_snapshots_kept: int = Field(default=5, description="tracemalloc snapshots kept for diffing")
+    
     # Timezone
     timezone: str = Field(default="Asia/Kolkata", description="Timezone for scheduled tasks")
     
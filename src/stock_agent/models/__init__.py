@@ -1,20 +1,49 @@
 """Models package"""
 
-from stock_agent.models.enums import DecisionType, AlertType
+from stock_agent.models.enums import DecisionType, AlertType, IndicatorSignal, JobStatus
+from stock_agent.models.rules import AlertRule, parse_rule
 from stock_agent.models.stock import (
     StockBase,
     StockCreate,
+    StockUpdate,
     StockInDB,
+    StockPage,
     StockAnalysis,
-    AgentRunResult
+    TechnicalIndicators,
+    AgentRunDiff,
+    AgentRunResult,
+    HistoryPoint,
+    RunSummary,
+    RunMemory,
+    JobProgress,
+    AgentJobStatus,
+    StockMetadata,
+    PortfolioHolding,
+    PortfolioSummary,
 )
 
 __all__ = [
     "DecisionType",
     "AlertType",
+    "IndicatorSignal",
+    "JobStatus",
     "StockBase",
     "StockCreate",
+    "StockUpdate",
     "StockInDB",
+    "StockPage",
     "StockAnalysis",
+    "TechnicalIndicators",
+    "AgentRunDiff",
     "AgentRunResult",
+    "HistoryPoint",
+    "RunSummary",
+    "RunMemory",
+    "JobProgress",
+    "AgentJobStatus",
+    "StockMetadata",
+    "PortfolioHolding",
+    "PortfolioSummary",
+    "AlertRule",
+    "parse_rule",
 ]
@@ -1,6 +1,7 @@
 """Enumerations for stock agent"""
 
 from enum import Enum
+from typing import Optional
 
 
 class DecisionType(str, Enum):
@@ -12,6 +13,45 @@ class DecisionType(str, Enum):
     
     def __str__(self) -> str:
         return self.value
+    
+    @classmethod
+    def from_prices(
+        cls,
+        current_price: float,
+        buy_price: float,
+        target_price: float
+    ) -> "DecisionType":
+        """Derive the decision for a position at the given price"""
+        if current_price >= target_price:
+            return cls.TARGET_REACHED
+        if current_price < buy_price:
+            return cls.BELOW_BUY_PRICE
+        return cls.HOLD
+    
+    @classmethod
+    def parse(cls, value: str) -> Optional["DecisionType"]:
+        """Look up a decision by member name (e.g. HOLD) or by value"""
+        member = cls.__members__.get(value.strip().upper())
+        if member is not None:
+            return member
+        try:
+            return cls(value)
+        except ValueError:
+            return None
+
+
+class IndicatorSignal(str, Enum):
+    """Signals derived from technical indicators"""
+    
+    OVERBOUGHT = "overbought"
+    OVERSOLD = "oversold"
+    ABOVE_SMA = "above_sma"
+    BELOW_SMA = "below_sma"
+    ABOVE_EMA = "above_ema"
+    BELOW_EMA = "below_ema"
+    
+    def __str__(self) -> str:
+        return self.value
 
 
 class AlertType(str, Enum):
@@ -20,6 +60,28 @@ class AlertType(str, Enum):
     TARGET_REACHED = "target_reached"
     DAILY_UPDATE = "daily_update"
     CUSTOM = "custom"
+    STOP_LOSS = "stop_loss"
+    TRAILING_STOP = "trailing_stop"
+    PERCENT_MOVE = "percent_move"
+    BAND = "band"
+    
+    def __str__(self) -> str:
+        return self.value
+
+
+class JobStatus(str, Enum):
+    """Lifecycle of a background agent job"""
+    
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+    
+    @property
+    def finished(self) -> bool:
+        """Whether the job has stopped for good"""
+        return self in (JobStatus.SUCCEEDED, JobStatus.FAILED, JobStatus.CANCELLED)
     
     def __str__(self) -> str:
         return self.value
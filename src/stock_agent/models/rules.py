@@ -0,0 +1,118 @@
+"""Per-position alert rule language"""
+
+from functools import lru_cache
+from typing import NamedTuple
+
+from stock_agent.models.enums import AlertType
+
+# Prices a rule threshold can be relative to; rows of the reference matrix
+# built by the rule engine
+REFERENCES = ("constant", "buy_price", "high_water", "previous_price")
+CONSTANT, BUY_PRICE, HIGH_WATER, PREVIOUS_PRICE = range(len(REFERENCES))
+
+RULE_TYPES = (AlertType.STOP_LOSS, AlertType.TRAILING_STOP, AlertType.PERCENT_MOVE, AlertType.BAND)
+
+
+class AlertRule(NamedTuple):
+    """
+    A rule compiled to a pair of thresholds
+    
+    The rule fires when the price is at or below reference[lower_ref] *
+    lower, or at or above reference[upper_ref] * upper. Every rule type
+    reduces to this form, so the engine evaluates all of them with the
+    same vectorised expression.
+    """
+    
+    text: str
+    alert_type: AlertType
+    lower_ref: int
+    lower: float
+    upper_ref: int
+    upper: float
+    
+    def __str__(self) -> str:
+        return self.text
+
+
+@lru_cache(maxsize=4096)
+def parse_rule(text: str) -> AlertRule:
+    """
+    Parse a rule
+    
+    Syntax (case-insensitive):
+        stop_loss 95        price at or below 95
+        stop_loss 5%        price 5% or more below the buy price
+        trailing_stop 8%    price 8% or more below the highest price seen
+        percent_move 5%     price moved 5% or more since the previous run
+        band 90 120         price at or outside 90..120
+    
+    Args:
+        text: Rule text
+    
+    Returns:
+        Compiled rule with canonical text
+    
+    Raises:
+        ValueError: If the rule is malformed
+    """
+    tokens = text.strip().lower().split()
+    if not tokens:
+        raise ValueError("Empty alert rule")
+    
+    kind, args = tokens[0], tokens[1:]
+    try:
+        alert_type = AlertType(kind)
+    except ValueError:
+        alert_type = None
+    if alert_type not in RULE_TYPES:
+        expected = ", ".join(t.value for t in RULE_TYPES)
+        raise ValueError(f"Unknown alert rule '{kind}' (expected one of: {expected})")
+    
+    expected_args = 2 if alert_type == AlertType.BAND else 1
+    if len(args) != expected_args:
+        raise ValueError(f"Alert rule '{kind}' takes {expected_args} argument(s)")
+    
+    none_above = (CONSTANT, float("inf"))
+    
+    if alert_type == AlertType.BAND:
+        low, high = _price(args[0]), _price(args[1])
+        if low >= high:
+            raise ValueError("Band lower bound must be below the upper bound")
+        return AlertRule(f"band {low:g} {high:g}", alert_type, CONSTANT, low, CONSTANT, high)
+    
+    if alert_type == AlertType.STOP_LOSS and not args[0].endswith("%"):
+        price = _price(args[0])
+        return AlertRule(f"stop_loss {price:g}", alert_type, CONSTANT, price, *none_above)
+    
+    percent = _percent(args[0])
+    fraction = percent / 100
+    canonical = f"{kind} {percent:g}%"
+    if alert_type == AlertType.STOP_LOSS:
+        return AlertRule(canonical, alert_type, BUY_PRICE, 1 - fraction, *none_above)
+    if alert_type == AlertType.TRAILING_STOP:
+        return AlertRule(canonical, alert_type, HIGH_WATER, 1 - fraction, *none_above)
+    return AlertRule(canonical, alert_type, PREVIOUS_PRICE, 1 - fraction, PREVIOUS_PRICE, 1 + fraction)
+
+
+def _price(token: str) -> float:
+    """Parse a positive price"""
+    try:
+        value = float(token)
+    except ValueError:
+        raise ValueError(f"Invalid price '{token}'")
+    if not value > 0:
+        raise ValueError(f"Price must be positive, got '{token}'")
+    return value
+
+
+def _percent(token: str) -> float:
+    """Parse a percentage such as 5%"""
+    if not token.endswith("%"):
+        raise ValueError(f"Expected a percentage such as 5%, got '{token}'")
+    try:
+        value = float(token[:-1])
+    except ValueError:
+        raise ValueError(f"Invalid percentage '{token}'")
+    if not 0 < value < 100:
+        raise ValueError(f"Percentage must be between 0 and 100, got '{token}'")
+    return value
@@ -1,11 +1,19 @@
 """Stock data models"""
 
-from datetime import datetime
+from datetime import date, datetime
 from typing import List, Optional
 
 from pydantic import BaseModel, Field, field_validator
 
-from stock_agent.models.enums import DecisionType
+from stock_agent.models.enums import DecisionType, IndicatorSignal, JobStatus
+from stock_agent.models.rules import parse_rule
+
+
+def _normalize_rules(rules: Optional[List[str]]) -> Optional[List[str]]:
+    """Validate alert rules and return their canonical text"""
+    if rules is None:
+        return None
+    return [parse_rule(rule).text for rule in rules]
 
 
 class StockBase(BaseModel):
@@ -14,6 +22,10 @@ class StockBase(BaseModel):
     symbol: str = Field(..., description="Stock symbol (e.g., TCS.NS, AAPL)")
     buy_price: float = Field(..., gt=0, description="Purchase price")
     target_price: float = Field(..., gt=0, description="Target selling price")
+    rules: List[str] = Field(
+        default_factory=list,
+        description="Alert rules, e.g. 'stop_loss 5%', 'trailing_stop 8%', 'percent_move 3%', 'band 90 120'"
+    )
     
     @field_validator("symbol")
     @classmethod
@@ -28,6 +40,12 @@ class StockBase(BaseModel):
         if "buy_price" in info.data and v <= info.data["buy_price"]:
             raise ValueError("Target price must be greater than buy price")
         return v
+    
+    @field_validator("rules")
+    @classmethod
+    def validate_rules(cls, v: List[str]) -> List[str]:
+        """Parse alert rules and normalize their text"""
+        return _normalize_rules(v)
 
 
 class StockCreate(StockBase):
@@ -35,16 +53,115 @@ class StockCreate(StockBase):
     pass
 
 
+class StockUpdate(BaseModel):
+    """Model for updating an existing stock"""
+    
+    buy_price: float = Field(..., gt=0, description="Purchase price")
+    target_price: float = Field(..., gt=0, description="Target selling price")
+    rules: Optional[List[str]] = Field(default=None, description="Alert rules (unchanged if omitted)")
+    
+    @field_validator("target_price")
+    @classmethod
+    def validate_target_price(cls, v: float, info) -> float:
+        """Ensure target price is greater than buy price"""
+        if "buy_price" in info.data and v <= info.data["buy_price"]:
+            raise ValueError("Target price must be greater than buy price")
+        return v
+    
+    @field_validator("rules")
+    @classmethod
+    def validate_rules(cls, v: Optional[List[str]]) -> Optional[List[str]]:
+        """Parse alert rules and normalize their text"""
+        return _normalize_rules(v)
+
+
 class StockInDB(StockBase):
     """Model for stock stored in database"""
     
     created_at: Optional[datetime] = Field(default_factory=datetime.now)
     updated_at: Optional[datetime] = Field(default_factory=datetime.now)
+    last_price: Optional[float] = Field(default=None, description="Last observed market price")
+    last_price_at: Optional[datetime] = Field(default=None, description="When last_price was observed")
+    high_water: Optional[float] = Field(default=None, description="Highest price observed by the agent")
+
+
+class TechnicalIndicators(BaseModel):
+    """Technical indicator values for a symbol (None while warming up)"""
     
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
+    as_of: date = Field(..., description="Date of the last bar included")
+    bars: int = Field(..., description="Number of daily bars seen")
+    sma: Optional[float] = Field(default=None, description="Simple moving average of closes")
+    ema: Optional[float] = Field(default=None, description="Exponential moving average of closes")
+    rsi: Optional[float] = Field(default=None, description="Relative strength index (0-100)")
+    atr: Optional[float] = Field(default=None, description="Average true range")
+    
+    def signals(
+        self,
+        price: float,
+        overbought: float = 70.0,
+        oversold: float = 30.0
+    ) -> List[IndicatorSignal]:
+        """
+        Derive signals for a price from the indicator values
+        
+        Args:
+            price: Current price
+            overbought: RSI at or above which the stock is overbought
+            oversold: RSI at or below which the stock is oversold
+        
+        Returns:
+            Signals that currently hold
+        """
+        signals = []
+        if self.rsi is not None:
+            if self.rsi >= overbought:
+                signals.append(IndicatorSignal.OVERBOUGHT)
+            elif self.rsi <= oversold:
+                signals.append(IndicatorSignal.OVERSOLD)
+        if self.sma is not None:
+            signals.append(IndicatorSignal.ABOVE_SMA if price > self.sma else IndicatorSignal.BELOW_SMA)
+        if self.ema is not None:
+            signals.append(IndicatorSignal.ABOVE_EMA if price > self.ema else IndicatorSignal.BELOW_EMA)
+        return signals
+
+
+class StockMetadata(BaseModel):
+    """Descriptive metadata of a symbol"""
+    
+    symbol: str
+    name: Optional[str] = None
+    sector: Optional[str] = None
+    industry: Optional[str] = None
+    currency: Optional[str] = None
+    exchange: Optional[str] = None
+    
+    @classmethod
+    def from_info(cls, symbol: str, info: dict) -> "StockMetadata":
+        """
+        Pick metadata out of a provider's info dictionary
+        
+        Args:
+            symbol: Stock symbol
+            info: Provider info (Yahoo quote summary or replay columns)
+        
+        Returns:
+            Metadata with the fields the provider knows
+        """
+        def text(*keys):
+            for key in keys:
+                value = info.get(key)
+                if isinstance(value, str) and value:
+                    return value
+            return None
+        
+        return cls(
+            symbol=symbol,
+            name=text("longName", "shortName", "name"),
+            sector=text("sector"),
+            industry=text("industry"),
+            currency=text("currency"),
+            exchange=text("fullExchangeName", "exchange")
+        )
 
 
 class StockAnalysis(BaseModel):
@@ -58,11 +175,106 @@ class StockAnalysis(BaseModel):
     profit_percent: float
     decision: DecisionType
     analyzed_at: datetime = Field(default_factory=datetime.now)
+    indicators: Optional[TechnicalIndicators] = None
+    signals: List[IndicatorSignal] = Field(default_factory=list)
+    triggered_rules: List[str] = Field(default_factory=list)
+    metadata: Optional[StockMetadata] = Field(default=None, description="Cached symbol metadata, if known")
+    currency: Optional[str] = Field(default=None, description="Currency the prices are quoted in")
+
+
+class PortfolioHolding(BaseModel):
+    """A position's share of the portfolio"""
     
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
+    symbol: str
+    currency: str = Field(..., description="Currency the position trades in")
+    cost_basis: Optional[float] = Field(default=None, description="Buy price in the reporting currency")
+    market_value: Optional[float] = Field(default=None, description="Last recorded price in the reporting currency")
+    profit: Optional[float] = None
+    weight: Optional[float] = Field(default=None, description="Share of the portfolio's market value (0-1)")
+
+
+class PortfolioSummary(BaseModel):
+    """Portfolio totals in a reporting currency (each position counts as one unit)"""
+    
+    currency: str = Field(..., description="Reporting currency of all amounts")
+    positions: int = Field(..., description="Number of tracked positions")
+    priced_positions: int = Field(..., description="Positions with a recorded price")
+    cost_basis: float = Field(..., description="Sum of buy prices of all positions")
+    market_value: float = Field(..., description="Sum of last prices of the priced positions")
+    profit: float = Field(..., description="Unrealised P/L of the priced positions")
+    profit_percent: float = Field(..., description="P/L relative to the cost of the priced positions")
+    unconverted: List[str] = Field(
+        default_factory=list,
+        description="Currencies left out of the totals for lack of an FX rate"
+    )
+    holdings: List[PortfolioHolding] = Field(default_factory=list, description="Positions by descending weight")
+
+
+class StockPage(BaseModel):
+    """A page of tracked stocks with an opaque continuation cursor"""
+    
+    items: List[StockInDB]
+    next_cursor: Optional[str] = None
+
+
+class RunMemory(BaseModel):
+    """Memory used by an agent run, as traced by tracemalloc"""
+    
+    peak_bytes: int = Field(..., description="Highest traced memory during the run, above its level at the start")
+    retained_bytes: int = Field(..., description="Traced memory still held after the run, above its level at the start")
+    traced_bytes: int = Field(..., description="Traced memory after the run")
+    rss_bytes: Optional[int] = Field(default=None, description="Resident set size of the process after the run")
+
+
+class AgentRunDiff(BaseModel):
+    """Outcome of an agent run relative to the previous run"""
+    
+    changed: List[StockAnalysis] = Field(
+        default_factory=list,
+        description="Positions re-analyzed because their price or definition changed"
+    )
+    unchanged: List[StockAnalysis] = Field(
+        default_factory=list,
+        description="Positions whose previous analysis still holds"
+    )
+    errored: List[dict] = Field(
+        default_factory=list,
+        description="Positions that could not be analyzed, with the error"
+    )
+    alerts: List[dict] = Field(default_factory=list, description="Alerts sent by the run, as symbol and kind")
+    memory: Optional[RunMemory] = Field(
+        default=None,
+        description="Memory used by the run, when memory tracking is enabled"
+    )
+    
+    @property
+    def analyses(self) -> List[StockAnalysis]:
+        """Current analysis of every position that was priced"""
+        return self.changed + self.unchanged
+
+
+class HistoryPoint(BaseModel):
+    """A position's analysis as recorded by one agent run"""
+    
+    time: datetime = Field(..., description="Time of the run (UTC)")
+    current_price: float
+    profit: float
+    profit_percent: float
+    decision: DecisionType
+    signals: List[IndicatorSignal] = Field(default_factory=list)
+    triggered_rules: List[str] = Field(default_factory=list)
+    changed: bool = Field(..., description="Whether the run re-analyzed the position")
+
+
+class RunSummary(BaseModel):
+    """A recorded agent run"""
+    
+    time: datetime = Field(..., description="Time of the run (UTC)")
+    changed: List[str] = Field(default_factory=list, description="Symbols re-analyzed by the run")
+    unchanged: int = Field(default=0, description="Number of positions whose analysis was reused")
+    errors: List[dict] = Field(default_factory=list)
+    alerts: List[dict] = Field(default_factory=list, description="Alerts sent, as symbol and kind")
+    memory: Optional[RunMemory] = Field(default=None, description="Memory used by the run, if it was tracked")
 
 
 class AgentRunResult(BaseModel):
@@ -70,5 +282,33 @@ class AgentRunResult(BaseModel):
     
     time_ist: str
     total_stocks: int
-    results: List[StockAnalysis]
+    results: List[StockAnalysis] = Field(description="Analyses that changed since the previous run")
+    unchanged: List[str] = Field(default_factory=list, description="Symbols whose analysis did not change")
     errors: Optional[List[dict]] = None
+    shard: Optional[dict] = None
+    memory: Optional[RunMemory] = None
+
+
+class JobProgress(BaseModel):
+    """Progress counters of a background agent job"""
+    
+    total: int = Field(default=0, description="Positions the run will price")
+    done: int = Field(default=0, description="Positions processed so far")
+    changed: int = 0
+    unchanged: int = 0
+    errored: int = 0
+
+
+class AgentJobStatus(BaseModel):
+    """State and (partial) results of a background agent job"""
+    
+    job_id: str
+    status: JobStatus
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    progress: JobProgress = Field(default_factory=JobProgress)
+    results: List[StockAnalysis] = Field(default_factory=list, description="Changed analyses so far")
+    unchanged: List[str] = Field(default_factory=list, description="Unchanged symbols so far")
+    errors: List[dict] = Field(default_factory=list)
+    error: Optional[str] = Field(default=None, description="Why the job failed")
@@ -0,0 +1,14 @@
+"""Market data providers package"""
+
+from stock_agent.providers.base import MarketDataProvider
+from stock_agent.providers.factory import create_provider, create_rate_limiter
+from stock_agent.providers.replay_provider import ReplayProvider
+from stock_agent.providers.yfinance_provider import YFinanceProvider
+
+__all__ = [
+    "MarketDataProvider",
+    "YFinanceProvider",
+    "ReplayProvider",
+    "create_provider",
+    "create_rate_limiter",
+]
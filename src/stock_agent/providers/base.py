@@ -0,0 +1,55 @@
+"""Market data provider interface"""
+
+from abc import ABC, abstractmethod
+from datetime import date
+from typing import Dict, List
+
+from stock_agent.repositories.history_cache import PriceHistory
+
+
+class MarketDataProvider(ABC):
+    """
+    Source of quotes, daily history and symbol metadata
+    
+    Providers only talk to their upstream. Retries, circuit breaking and
+    caching are applied by MarketDataService, so transient failures should
+    be raised as they are (timeouts, connection errors, HTTP errors) and
+    unknown symbols as InvalidSymbolError.
+    """
+    
+    name = "provider"
+    
+    @abstractmethod
+    def get_quote(self, symbol: str) -> float:
+        """
+        Get the latest price of a symbol
+        
+        Raises:
+            InvalidSymbolError: If the symbol is unknown
+        """
+        pass
+    
+    @abstractmethod
+    def get_quotes(self, symbols: List[str]) -> Dict[str, float]:
+        """
+        Get the latest prices of several symbols in one request
+        
+        Returns:
+            Prices by symbol; unknown symbols are left out
+        """
+        pass
+    
+    @abstractmethod
+    def get_history(self, symbol: str, start: date, end: date) -> PriceHistory:
+        """
+        Get daily bars between two dates (inclusive)
+        
+        Returns:
+            Daily bars (empty if there was no trading in the range)
+        """
+        pass
+    
+    @abstractmethod
+    def get_info(self, symbol: str) -> dict:
+        """Get descriptive metadata of a symbol"""
+        pass
@@ -0,0 +1,68 @@
+"""Provider selection from settings"""
+
+from typing import Optional
+
+from stock_agent.config import Settings
+from stock_agent.providers.base import MarketDataProvider
+from stock_agent.providers.replay_provider import ReplayProvider
+from stock_agent.providers.yfinance_provider import YFinanceProvider
+from stock_agent.utils.rate_limiter import RateLimiter, SQLiteTokenBucket, TokenBucket
+
+
+def create_provider(settings: Settings) -> MarketDataProvider:
+    """
+    Create the market data provider selected by settings.market_data_provider
+    
+    Args:
+        settings: Application settings
+    
+    Returns:
+        Configured provider
+    
+    Raises:
+        ValueError: If the provider name is unknown
+    """
+    name = settings.market_data_provider.strip().lower()
+    if name == YFinanceProvider.name:
+        return YFinanceProvider(timeout=settings.market_data_timeout)
+    if name == ReplayProvider.name:
+        return ReplayProvider(
+            settings.replay_data_path,
+            latency_ms=settings.replay_latency_ms,
+            latency_jitter_ms=settings.replay_latency_jitter_ms,
+            error_rate=settings.replay_error_rate,
+            error_kinds=settings.replay_error_kinds,
+            as_of=settings.replay_as_of,
+            seed=settings.replay_seed
+        )
+    raise ValueError(f"Unknown market data provider '{settings.market_data_provider}'")
+
+
+def create_rate_limiter(settings: Settings) -> Optional[RateLimiter]:
+    """
+    Create the upstream rate limiter configured by settings
+    
+    The bucket lives in memory, or in market_data_rate_limit_path when set
+    so that every process using that file shares it.
+    
+    Args:
+        settings: Application settings
+    
+    Returns:
+        Rate limiter, or None if market_data_rate_limit is 0
+    """
+    rate = settings.market_data_rate_limit
+    if rate <= 0:
+        return None
+    
+    burst = max(settings.market_data_rate_burst, 1)
+    if settings.market_data_rate_limit_path:
+        bucket = SQLiteTokenBucket(settings.market_data_rate_limit_path, rate, burst)
+    else:
+        bucket = TokenBucket(rate, burst)
+    return RateLimiter(
+        "market_data",
+        bucket,
+        reserve=settings.market_data_rate_reserve,
+        max_wait=settings.market_data_rate_max_wait
+    )
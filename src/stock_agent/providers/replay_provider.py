@@ -0,0 +1,186 @@
+"""Offline market data provider replaying recorded bars"""
+
+import random
+import time
+from datetime import date
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import requests
+
+from stock_agent.providers.base import MarketDataProvider
+from stock_agent.repositories.history_cache import VALUE_COLUMNS, PriceHistory
+from stock_agent.utils.exceptions import InvalidSymbolError
+from stock_agent.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+ERROR_KINDS = ("timeout", "rate_limit", "server_error")
+
+
+class ReplayProvider(MarketDataProvider):
+    """
+    Market data replayed from a CSV or Parquet file
+    
+    The file has one row per symbol and day with columns date, symbol and
+    close; open, high, low and volume are optional, and any other columns
+    (name, currency, ...) are returned by get_info. Quotes are the last
+    close on or before as_of (the last date in the file by default).
+    
+    Every request can be slowed down by a simulated latency and can fail
+    with an injected transient error, so retries, the circuit breaker and
+    timeouts can be exercised without network access.
+    """
+    
+    name = "replay"
+    
+    def __init__(
+        self,
+        path: str,
+        latency_ms: float = 0.0,
+        latency_jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        error_kinds: str = "timeout",
+        as_of: Optional[date] = None,
+        seed: Optional[int] = None,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        """
+        Initialize replay provider
+        
+        Args:
+            path: CSV or Parquet (.parquet/.pq) file with daily bars
+            latency_ms: Simulated latency of every request
+            latency_jitter_ms: Random extra latency of up to this much
+            error_rate: Probability (0-1) that a request fails
+            error_kinds: Comma-separated kinds of injected errors
+                (timeout, rate_limit, server_error)
+            as_of: Replay date; later bars are not visible to quotes
+            seed: Random seed for reproducible latency and errors
+            sleep: Function used to wait out the latency
+        
+        Raises:
+            ValueError: If the file lacks required columns or an error kind is unknown
+        """
+        self.path = Path(path)
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.error_rate = error_rate
+        self.error_kinds = [kind.strip() for kind in error_kinds.split(",") if kind.strip()]
+        unknown = set(self.error_kinds) - set(ERROR_KINDS)
+        if unknown:
+            raise ValueError(f"Unknown replay error kinds: {', '.join(sorted(unknown))}")
+        
+        self.as_of = np.datetime64(as_of, "D") if as_of else None
+        self._rng = random.Random(seed)
+        self._sleep = sleep
+        self._histories: Dict[str, PriceHistory] = {}
+        self._info: Dict[str, dict] = {}
+        self._load()
+        logger.info(f"Loaded replay data for {len(self._histories)} symbols from {self.path}")
+    
+    def get_quote(self, symbol: str) -> float:
+        """Get the last close on or before the replay date"""
+        self._simulate_request()
+        return self._quote(symbol)
+    
+    def get_quotes(self, symbols: List[str]) -> Dict[str, float]:
+        """Get last closes as one simulated request"""
+        self._simulate_request()
+        prices = {}
+        for symbol in symbols:
+            try:
+                prices[symbol] = self._quote(symbol)
+            except InvalidSymbolError:
+                continue
+        return prices
+    
+    def get_history(self, symbol: str, start: date, end: date) -> PriceHistory:
+        """Get recorded bars between two dates"""
+        self._simulate_request()
+        history = self._history(symbol)
+        if self.as_of is not None:
+            end = min(end, self.as_of.astype(date))
+        lo = np.searchsorted(history.dates, np.datetime64(start, "D"))
+        hi = np.searchsorted(history.dates, np.datetime64(end, "D"), side="right")
+        return history.slice(int(lo), int(hi))
+    
+    def get_info(self, symbol: str) -> dict:
+        """Get the extra columns recorded for a symbol"""
+        self._simulate_request()
+        self._history(symbol)
+        return dict(self._info.get(symbol, {}), symbol=symbol)
+    
+    def _quote(self, symbol: str) -> float:
+        """Last visible close of a symbol"""
+        history = self._history(symbol)
+        stop = len(history)
+        if self.as_of is not None:
+            stop = int(np.searchsorted(history.dates, self.as_of, side="right"))
+        if stop == 0:
+            raise InvalidSymbolError(symbol, "No replay data on or before the replay date")
+        return float(history.close[stop - 1])
+    
+    def _history(self, symbol: str) -> PriceHistory:
+        """Recorded bars of a symbol"""
+        history = self._histories.get(symbol.strip().upper())
+        if history is None:
+            raise InvalidSymbolError(symbol, "Symbol not present in replay data")
+        return history
+    
+    def _simulate_request(self) -> None:
+        """Apply the configured latency and maybe raise an injected error"""
+        delay = self.latency_ms + self._rng.uniform(0, self.latency_jitter_ms)
+        if delay > 0:
+            self._sleep(delay / 1000)
+        
+        if self.error_kinds and self._rng.random() < self.error_rate:
+            raise _injected_error(self._rng.choice(self.error_kinds))
+    
+    def _load(self) -> None:
+        """Read the replay file into per-symbol arrays"""
+        import pandas as pd
+        
+        if self.path.suffix.lower() in (".parquet", ".pq"):
+            try:
+                frame = pd.read_parquet(self.path)
+            except ImportError as e:
+                raise ImportError(f"Parquet replay files require pyarrow: {e}") from e
+        else:
+            frame = pd.read_csv(self.path)
+        
+        frame.columns = [str(column).strip().lower() for column in frame.columns]
+        missing = {"date", "symbol", "close"} - set(frame.columns)
+        if missing:
+            raise ValueError(f"Replay file {self.path} lacks columns: {', '.join(sorted(missing))}")
+        
+        frame["symbol"] = frame["symbol"].astype(str).str.strip().str.upper()
+        frame["date"] = pd.to_datetime(frame["date"]).dt.normalize()
+        for column in VALUE_COLUMNS:
+            if column not in frame.columns:
+                frame[column] = 0.0 if column == "volume" else frame["close"]
+        frame = frame.sort_values(["symbol", "date"], kind="stable")
+        
+        extra = [c for c in frame.columns if c not in ("date", "symbol") + VALUE_COLUMNS]
+        for symbol, rows in frame.groupby("symbol", sort=False):
+            self._histories[symbol] = PriceHistory(
+                rows["date"].to_numpy().astype("datetime64[D]"),
+                *(rows[column].to_numpy(dtype=float) for column in VALUE_COLUMNS)
+            )
+            if extra:
+                last = rows.iloc[-1]
+                self._info[symbol] = {
+                    column: last[column].item() if hasattr(last[column], "item") else last[column]
+                    for column in extra
+                }
+
+
+def _injected_error(kind: str) -> Exception:
+    """Build an error that looks like the real upstream failure"""
+    if kind == "timeout":
+        return requests.Timeout("Injected replay timeout")
+    
+    response = requests.Response()
+    response.status_code = 429 if kind == "rate_limit" else 503
+    return requests.HTTPError(f"Injected replay HTTP {response.status_code}", response=response)
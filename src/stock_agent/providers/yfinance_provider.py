@@ -0,0 +1,113 @@
+"""Yahoo Finance market data provider"""
+
+from datetime import date, timedelta
+from typing import Dict, List
+
+import numpy as np
+import yfinance as yf
+
+from stock_agent.providers.base import MarketDataProvider
+from stock_agent.repositories.history_cache import PriceHistory
+from stock_agent.utils.exceptions import InvalidSymbolError
+from stock_agent.utils.logger import get_logger
+from stock_agent.utils.resilience import is_retryable
+
+logger = get_logger(__name__)
+
+OHLCV_COLUMNS = ("Open", "High", "Low", "Close", "Volume")
+
+
+def _is_symbol_error(error: Exception) -> bool:
+    """Whether Yahoo rejected the symbol itself rather than failing transiently"""
+    return "symbol may be delisted" in str(error) and not is_retryable(error)
+
+
+class YFinanceProvider(MarketDataProvider):
+    """Market data from Yahoo Finance via yfinance"""
+    
+    name = "yfinance"
+    
+    def __init__(self, timeout: int = 10):
+        """
+        Initialize Yahoo Finance provider
+        
+        Args:
+            timeout: Request timeout in seconds
+        """
+        self.timeout = timeout
+    
+    def get_quote(self, symbol: str) -> float:
+        """Get the latest close from today's bar"""
+        stock = yf.Ticker(symbol)
+        try:
+            # Without raise_errors yfinance turns network failures into empty frames
+            data = stock.history(period="1d", raise_errors=True, timeout=self.timeout)
+        except Exception as e:
+            if _is_symbol_error(e):
+                raise InvalidSymbolError(symbol, str(e))
+            raise
+        
+        if data.empty:
+            raise InvalidSymbolError(
+                symbol,
+                "No data available - symbol may be invalid or market is closed"
+            )
+        
+        return float(data["Close"].iloc[-1])
+    
+    def get_quotes(self, symbols: List[str]) -> Dict[str, float]:
+        """Get latest closes for many symbols with a single download"""
+        if len(symbols) == 1:
+            # A single-ticker download is not grouped by ticker
+            try:
+                return {symbols[0]: self.get_quote(symbols[0])}
+            except InvalidSymbolError:
+                return {}
+        
+        data = yf.download(
+            symbols,
+            period="1d",
+            group_by="ticker",
+            threads=True,
+            progress=False,
+            timeout=self.timeout
+        )
+        
+        prices = {}
+        if data.empty:
+            return prices
+        for symbol in symbols:
+            try:
+                close = data[symbol]["Close"].dropna()
+            except KeyError:
+                continue
+            if not close.empty:
+                prices[symbol] = float(close.iloc[-1])
+        return prices
+    
+    def get_history(self, symbol: str, start: date, end: date) -> PriceHistory:
+        """Get unadjusted daily bars"""
+        try:
+            data = yf.Ticker(symbol).history(
+                start=start.isoformat(),
+                end=(end + timedelta(days=1)).isoformat(),
+                auto_adjust=False,
+                raise_errors=True,
+                timeout=self.timeout
+            )
+        except Exception as e:
+            # Ranges without trading (weekends, holidays) are reported like
+            # unknown symbols; treat them as empty
+            if _is_symbol_error(e) and "no price data found" in str(e).lower():
+                return PriceHistory.empty()
+            raise
+        
+        if data.empty:
+            return PriceHistory.empty()
+        
+        dates = np.array([ts.date() for ts in data.index], dtype="datetime64[D]")
+        return PriceHistory(dates, *(data[column].to_numpy(dtype=float) for column in OHLCV_COLUMNS))
+    
+    def get_info(self, symbol: str) -> dict:
+        """Get the Yahoo quote summary"""
+        return yf.Ticker(symbol).info
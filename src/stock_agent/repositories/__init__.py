@@ -1,5 +1,14 @@
 """Repositories package"""
 
+from stock_agent.repositories.history_cache import HistoryCache, PriceHistory
+from stock_agent.repositories.lease_store import LeaseStore
+from stock_agent.repositories.metadata_cache import MetadataCache
+from stock_agent.repositories.portfolio_aggregates import PortfolioAggregates
+from stock_agent.repositories.portfolio_store import PortfolioStore
+from stock_agent.repositories.quote_cache import QuoteCache
+from stock_agent.repositories.run_history import RunHistoryStore
+from stock_agent.repositories.snapshot_store import SnapshotStore
+from stock_agent.repositories.symbol_cache import SymbolCache, SymbolStatus
 from stock_agent.repositories.stock_repository import (
     StockRepository,
     JSONStockRepository,
@@ -8,4 +17,15 @@ from stock_agent.repositories.stock_repository import (
 __all__ = [
     "StockRepository",
     "JSONStockRepository",
+    "PortfolioStore",
+    "PortfolioAggregates",
+    "HistoryCache",
+    "PriceHistory",
+    "QuoteCache",
+    "LeaseStore",
+    "SnapshotStore",
+    "RunHistoryStore",
+    "SymbolCache",
+    "SymbolStatus",
+    "MetadataCache",
 ]
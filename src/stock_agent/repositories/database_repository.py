@@ -1,9 +1,11 @@
 """Database repository implementation (stub for future use)"""
 
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
-from stock_agent.models.stock import StockCreate, StockInDB
+from stock_agent.models.enums import DecisionType
+from stock_agent.models.stock import PortfolioSummary, StockCreate, StockInDB, StockPage
 from stock_agent.repositories.stock_repository import StockRepository
+from stock_agent.utils.currency import DEFAULT_CURRENCY
 
 
 class DatabaseStockRepository(StockRepository):
@@ -44,3 +46,48 @@ class DatabaseStockRepository(StockRepository):
     def update(self, symbol: str, stock: StockCreate) -> StockInDB:
         """Update a stock by its symbol"""
         raise NotImplementedError("Database repository not yet implemented")
+    
+    @property
+    def version(self) -> str:
+        """Opaque token that changes whenever the stored data changes"""
+        raise NotImplementedError("Database repository not yet implemented")
+    
+    def record_prices(self, prices: Dict[str, float]) -> None:
+        """Record the last observed market price for tracked stocks"""
+        raise NotImplementedError("Database repository not yet implemented")
+    
+    def query(
+        self,
+        prefix: Optional[str] = None,
+        decision: Optional[DecisionType] = None,
+        within_percent: Optional[float] = None,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> StockPage:
+        """Get a page of stocks ordered by symbol, matching the given filters"""
+        raise NotImplementedError("Database repository not yet implemented")
+    
+    def query_rows(
+        self,
+        prefix: Optional[str] = None,
+        decision: Optional[DecisionType] = None,
+        within_percent: Optional[float] = None,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        """Same as query, but returns stored rows in JSON form instead of models"""
+        raise NotImplementedError("Database repository not yet implemented")
+    
+    @property
+    def currencies(self) -> List[str]:
+        """Currencies of the tracked positions"""
+        raise NotImplementedError("Database repository not yet implemented")
+    
+    def summary(
+        self,
+        with_holdings: bool = True,
+        currency: str = DEFAULT_CURRENCY,
+        rates: Optional[Dict[str, float]] = None
+    ) -> PortfolioSummary:
+        """Portfolio totals and per-position weights in a reporting currency"""
+        raise NotImplementedError("Database repository not yet implemented")
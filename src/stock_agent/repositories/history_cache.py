@@ -0,0 +1,358 @@
+"""On-disk columnar cache of daily OHLCV history"""
+
+import os
+import re
+import shutil
+import threading
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from stock_agent.utils.exceptions import MarketDataError, StorageError
+from stock_agent.utils.file_lock import file_lock
+from stock_agent.utils.logger import get_logger
+from stock_agent.utils.serialization import dumps, loads
+
+logger = get_logger(__name__)
+
+VALUE_COLUMNS = ("open", "high", "low", "close", "volume")
+
+
+class PriceHistory(NamedTuple):
+    """Daily bars as parallel NumPy arrays (dates are datetime64[D])"""
+    
+    dates: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+    
+    @classmethod
+    def empty(cls) -> "PriceHistory":
+        """History without any bars"""
+        return cls(np.array([], dtype="datetime64[D]"), *(np.array([]) for _ in VALUE_COLUMNS))
+    
+    def __len__(self) -> int:
+        return len(self.dates)
+    
+    def slice(self, start: int, stop: int) -> "PriceHistory":
+        """Bars in [start, stop) as views of the same arrays"""
+        return PriceHistory(*(column[start:stop] for column in self))
+
+
+HistoryFetcher = Callable[[str, date, date], PriceHistory]
+"""Fetch bars for a symbol between two dates (inclusive) from a provider"""
+
+
+class HistoryCache:
+    """
+    Per-symbol daily OHLCV history stored as memory-mapped columns
+    
+    Each symbol has a directory holding meta.json and one generation
+    directory of .npy files, one per column. meta.json records the date
+    ranges already fetched (including days without trading) and the
+    current generation; it is replaced atomically after a new generation
+    is written, so readers never see a partial update.
+    
+    Reads return slices of read-only memory maps, so no data is copied.
+    Only the ranges not yet covered are fetched. Today is never marked as
+    covered because its bar is still changing, so it is fetched again on
+    the next request that includes it; callers that only need completed
+    bars should end their range yesterday. A fetch that brings no new or
+    changed bars (weekends, holidays) only extends the covered ranges in
+    meta.json instead of writing a new generation.
+    
+    Workers sharing the directory fill a symbol one at a time under a
+    per-symbol lock file. The previous generation is kept when a new one
+    is written, so a reader that loaded meta.json just before the switch
+    can still open the generation it names.
+    """
+    
+    def __init__(self, root: str):
+        """
+        Initialize history cache
+        
+        Args:
+            root: Directory holding one subdirectory per symbol
+        """
+        self.root = Path(root)
+        self._loaded: Dict[str, Tuple[int, PriceHistory]] = {}
+        self._lock = threading.Lock()
+        logger.info(f"Initialized history cache at {self.root}")
+    
+    def coverage(self, symbol: str) -> List[Tuple[date, date]]:
+        """
+        Get the date ranges already held for a symbol
+        
+        Args:
+            symbol: Stock symbol
+        
+        Returns:
+            Sorted, non-overlapping inclusive (start, end) ranges
+        """
+        meta = self._read_meta(symbol.strip().upper())
+        return [(date.fromisoformat(s), date.fromisoformat(e)) for s, e in meta["ranges"]]
+    
+    def read(
+        self,
+        symbol: str,
+        start: Optional[date] = None,
+        end: Optional[date] = None
+    ) -> PriceHistory:
+        """
+        Read cached bars without contacting the provider
+        
+        Args:
+            symbol: Stock symbol
+            start: First date to include (from the beginning if None)
+            end: Last date to include (to the end if None)
+        
+        Returns:
+            Views over the memory-mapped columns
+        """
+        symbol = symbol.strip().upper()
+        history = self._open(symbol, self._read_meta(symbol))
+        
+        lo = 0 if start is None else np.searchsorted(history.dates, np.datetime64(start, "D"))
+        hi = len(history) if end is None else np.searchsorted(
+            history.dates, np.datetime64(end, "D"), side="right"
+        )
+        return history.slice(int(lo), int(hi))
+    
+    def get(
+        self,
+        symbol: str,
+        start: date,
+        end: Optional[date] = None,
+        fetch: Optional[HistoryFetcher] = None
+    ) -> PriceHistory:
+        """
+        Get bars for a date range, fetching only the ranges not yet held
+        
+        Args:
+            symbol: Stock symbol
+            start: First date to include
+            end: Last date to include (today if None)
+            fetch: Provider to fill missing ranges from (cache only if None)
+        
+        Returns:
+            Views over the memory-mapped columns
+        
+        Raises:
+            MarketDataError: If fetching fails and nothing is cached for the range
+        """
+        symbol = symbol.strip().upper()
+        today = date.today()
+        end = min(end or today, today)
+        
+        if fetch is not None:
+            with self._lock, file_lock(self._symbol_dir(symbol) / ".lock", "lock history"):
+                gaps = missing_ranges(self.coverage(symbol), start, end, today)
+                if gaps:
+                    try:
+                        self._fill(symbol, gaps, fetch, today)
+                    except MarketDataError as e:
+                        cached = self.read(symbol, start, end)
+                        if not len(cached):
+                            raise
+                        logger.warning(f"Serving cached history for {symbol}: {e}")
+                        return cached
+        
+        return self.read(symbol, start, end)
+    
+    def close(self) -> None:
+        """Drop the open memory maps (views already returned stay valid)"""
+        with self._lock:
+            self._loaded.clear()
+    
+    def _fill(
+        self,
+        symbol: str,
+        gaps: List[Tuple[date, date]],
+        fetch: HistoryFetcher,
+        today: date
+    ) -> None:
+        """Fetch missing ranges and write a new generation"""
+        meta = self._read_meta(symbol)
+        fetched = []
+        for gap_start, gap_end in gaps:
+            logger.debug(f"Fetching history for {symbol} from {gap_start} to {gap_end}")
+            fetched.append(fetch(symbol, gap_start, gap_end))
+        
+        existing = self._open(symbol, meta)
+        history = merge_history(existing, fetched)
+        
+        # Today's bar may still change, so it is stored but not marked as held
+        covered = [(s, min(e, today - timedelta(days=1))) for s, e in gaps]
+        ranges = merge_ranges(self.coverage(symbol) + [(s, e) for s, e in covered if s <= e])
+        if same_history(existing, history):
+            if ranges != self.coverage(symbol):
+                self._write_meta(symbol, meta["generation"], ranges)
+            logger.debug(f"No new bars for {symbol}")
+            return
+        self._write(symbol, meta["generation"] + 1, history, ranges)
+        logger.info(f"Cached {len(history)} bars for {symbol}")
+    
+    def _symbol_dir(self, symbol: str) -> Path:
+        """Directory for a symbol (unsafe characters are replaced)"""
+        return self.root / re.sub(r"[^A-Z0-9.^=_-]", "_", symbol)
+    
+    def _read_meta(self, symbol: str) -> dict:
+        """Load meta.json for a symbol (empty metadata if not cached)"""
+        path = self._symbol_dir(symbol) / "meta.json"
+        try:
+            return loads(path.read_bytes())
+        except FileNotFoundError:
+            return {"generation": 0, "ranges": []}
+        except ValueError as e:
+            raise StorageError("load history", f"{path}: {e}")
+    
+    def _open(self, symbol: str, meta: dict) -> PriceHistory:
+        """Memory-map the columns of the current generation"""
+        generation = meta["generation"]
+        if generation == 0:
+            return PriceHistory.empty()
+        
+        loaded = self._loaded.get(symbol)
+        if loaded is not None and loaded[0] == generation:
+            return loaded[1]
+        
+        directory = self._symbol_dir(symbol) / str(generation)
+        try:
+            history = PriceHistory(*(
+                np.load(directory / f"{name}.npy", mmap_mode="r")
+                for name in PriceHistory._fields
+            ))
+        except (OSError, ValueError) as e:
+            raise StorageError("load history", f"{directory}: {e}")
+        
+        self._loaded[symbol] = (generation, history)
+        return history
+    
+    def _write(
+        self,
+        symbol: str,
+        generation: int,
+        history: PriceHistory,
+        ranges: List[Tuple[date, date]]
+    ) -> None:
+        """Write a new generation and switch meta.json over to it"""
+        symbol_dir = self._symbol_dir(symbol)
+        directory = symbol_dir / str(generation)
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            for name, column in zip(PriceHistory._fields, history):
+                np.save(directory / f"{name}.npy", np.ascontiguousarray(column))
+        except OSError as e:
+            raise StorageError("save history", str(e))
+        self._write_meta(symbol, generation, ranges)
+        
+        # Readers may still be opening the previous generation; open maps survive unlinking
+        keep = {str(generation), str(generation - 1)}
+        for old in symbol_dir.iterdir():
+            if old.is_dir() and old.name not in keep:
+                shutil.rmtree(old, ignore_errors=True)
+    
+    def _write_meta(self, symbol: str, generation: int, ranges: List[Tuple[date, date]]) -> None:
+        """Atomically replace meta.json"""
+        symbol_dir = self._symbol_dir(symbol)
+        meta = {
+            "symbol": symbol,
+            "generation": generation,
+            "ranges": [[s.isoformat(), e.isoformat()] for s, e in ranges],
+        }
+        try:
+            symbol_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = symbol_dir / "meta.json.tmp"
+            tmp_path.write_bytes(dumps(meta, indent=True))
+            os.replace(tmp_path, symbol_dir / "meta.json")
+        except OSError as e:
+            raise StorageError("save history", str(e))
+
+
+def missing_ranges(
+    covered: List[Tuple[date, date]],
+    start: date,
+    end: date,
+    today: Optional[date] = None
+) -> List[Tuple[date, date]]:
+    """
+    Subtract covered ranges from [start, end]
+    
+    Args:
+        covered: Sorted, non-overlapping inclusive ranges
+        start: First date wanted
+        end: Last date wanted
+        today: Current date (treated as never covered)
+    
+    Returns:
+        Inclusive ranges still to fetch
+    """
+    gaps = []
+    cursor = start
+    for covered_start, covered_end in covered:
+        if covered_end < cursor:
+            continue
+        if covered_start > end:
+            break
+        if covered_start > cursor:
+            gaps.append((cursor, covered_start - timedelta(days=1)))
+        cursor = covered_end + timedelta(days=1)
+    if cursor <= end:
+        gaps.append((cursor, end))
+    
+    if today is not None and start <= today <= end and not any(s <= today <= e for s, e in gaps):
+        gaps.append((today, today))
+    return gaps
+
+
+def merge_ranges(ranges: List[Tuple[date, date]]) -> List[Tuple[date, date]]:
+    """Merge overlapping or adjacent inclusive date ranges"""
+    merged: List[Tuple[date, date]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + timedelta(days=1):
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def same_history(a: PriceHistory, b: PriceHistory) -> bool:
+    """Check whether two histories hold the same bars"""
+    if a is b:
+        return True
+    if len(a) != len(b) or not np.array_equal(a.dates, b.dates):
+        return False
+    return all(np.array_equal(x, y, equal_nan=True) for x, y in zip(a[1:], b[1:]))
+
+
+def merge_history(existing: PriceHistory, fetched: List[PriceHistory]) -> PriceHistory:
+    """
+    Combine cached and newly fetched bars, newer bars winning on equal dates
+    
+    Args:
+        existing: Bars already cached
+        fetched: Bars from the provider
+    
+    Returns:
+        Bars sorted by date without duplicates
+    """
+    parts = [existing] + [h for h in fetched if len(h)]
+    if len(parts) == 1:
+        return existing
+    
+    new_dates = np.concatenate([h.dates for h in parts[1:]])
+    keep = ~np.isin(existing.dates, new_dates)
+    columns = [
+        np.concatenate([existing[i][keep]] + [h[i] for h in parts[1:]])
+        for i in range(len(PriceHistory._fields))
+    ]
+    
+    # Later fetches win over earlier ones for the same date
+    reversed_dates = columns[0][::-1]
+    _, first = np.unique(reversed_dates, return_index=True)
+    order = len(reversed_dates) - 1 - first
+    return PriceHistory(*(column[order] for column in columns))
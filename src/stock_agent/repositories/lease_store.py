@@ -0,0 +1,192 @@
+"""Membership, lease and sent-alert records shared by agent instances"""
+
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List
+
+from stock_agent.utils.exceptions import StorageError
+from stock_agent.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS members (
+    instance_id TEXT PRIMARY KEY,
+    heartbeat_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS leases (
+    symbol TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+DROP TABLE IF EXISTS sent_alerts;
+CREATE TABLE IF NOT EXISTS alert_claims (
+    key TEXT PRIMARY KEY,
+    instance_id TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+
+class LeaseStore:
+    """
+    Coordination records in a SQLite file on a volume shared by instances
+    
+    Holds the live members (instances that heartbeated recently), per-symbol
+    leases with an expiry so a crashed holder cannot block a symbol for
+    long, and the keys of alerts already sent, each kept for as long as
+    its sender asked.
+    """
+    
+    def __init__(self, path: str, clock: Callable[[], float] = time.time):
+        """
+        Initialize lease store
+        
+        Args:
+            path: SQLite database file
+            clock: Wall-clock time source (shared between instances)
+        
+        Raises:
+            StorageError: If the database cannot be opened
+        """
+        self.path = Path(path)
+        self._clock = clock
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = self._conn()
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+        except (OSError, sqlite3.Error) as e:
+            raise StorageError("open lease store", f"{self.path}: {e}")
+    
+    def heartbeat(self, instance_id: str, ttl_seconds: float) -> List[str]:
+        """
+        Record that an instance is alive and list the live members
+        
+        Args:
+            instance_id: Calling instance
+            ttl_seconds: Members without a heartbeat for this long are dropped
+        
+        Returns:
+            Sorted ids of live members, including the caller
+        """
+        now = self._clock()
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO members VALUES (?, ?) "
+                "ON CONFLICT (instance_id) DO UPDATE SET heartbeat_at = excluded.heartbeat_at",
+                (instance_id, now)
+            )
+            conn.execute("DELETE FROM members WHERE heartbeat_at <= ?", (now - ttl_seconds,))
+            rows = conn.execute("SELECT instance_id FROM members ORDER BY instance_id").fetchall()
+        return [row[0] for row in rows]
+    
+    def leave(self, instance_id: str) -> None:
+        """Remove an instance and release its leases"""
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM members WHERE instance_id = ?", (instance_id,))
+            conn.execute("DELETE FROM leases WHERE owner = ?", (instance_id,))
+    
+    def acquire(self, instance_id: str, symbols: Iterable[str], ttl_seconds: float) -> List[str]:
+        """
+        Take leases on symbols that are free, expired or already held
+        
+        Args:
+            instance_id: Calling instance
+            symbols: Symbols wanted
+            ttl_seconds: Lease duration
+        
+        Returns:
+            Symbols now leased to the caller
+        """
+        now = self._clock()
+        acquired = []
+        with self._transaction() as conn:
+            for symbol in symbols:
+                cursor = conn.execute(
+                    "INSERT INTO leases VALUES (?, ?, ?) "
+                    "ON CONFLICT (symbol) DO UPDATE SET owner = excluded.owner, "
+                    "expires_at = excluded.expires_at "
+                    "WHERE leases.owner = excluded.owner OR leases.expires_at <= ?",
+                    (symbol, instance_id, now + ttl_seconds, now)
+                )
+                if cursor.rowcount == 1:
+                    acquired.append(symbol)
+        return acquired
+    
+    def release(self, instance_id: str, symbols: Iterable[str]) -> None:
+        """Release leases held by an instance"""
+        with self._transaction() as conn:
+            conn.executemany(
+                "DELETE FROM leases WHERE symbol = ? AND owner = ?",
+                [(symbol, instance_id) for symbol in symbols]
+            )
+    
+    def holds(self, instance_id: str, symbol: str) -> bool:
+        """Whether an instance holds an unexpired lease on a symbol"""
+        row = self._conn().execute(
+            "SELECT 1 FROM leases WHERE symbol = ? AND owner = ? AND expires_at > ?",
+            (symbol, instance_id, self._clock())
+        ).fetchone()
+        return row is not None
+    
+    def record_alert(self, instance_id: str, key: str, retention_seconds: float) -> bool:
+        """
+        Record an alert unless it was already sent
+        
+        Args:
+            instance_id: Sending instance
+            key: Alert identity (symbol, kind and triggering transition)
+            retention_seconds: How long this record is kept
+        
+        Returns:
+            True if this caller recorded it and should send the alert
+        """
+        now = self._clock()
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM alert_claims WHERE expires_at <= ?", (now,))
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO alert_claims VALUES (?, ?, ?)", (key, instance_id, now + retention_seconds)
+            )
+        return cursor.rowcount == 1
+    
+    def forget_alert(self, key: str) -> None:
+        """Drop an alert record so the alert can be retried"""
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM alert_claims WHERE key = ?", (key,))
+    
+    def _conn(self) -> sqlite3.Connection:
+        """Connection of the calling thread"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+            self._local.conn = conn
+            self._connections.append(conn)
+        return conn
+    
+    def close(self) -> None:
+        """Close the connections of every thread (later calls reconnect)"""
+        connections, self._connections = self._connections, []
+        self._local = threading.local()
+        for conn in connections:
+            conn.close()
+    
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run statements as one write transaction"""
+        conn = self._conn()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            raise StorageError("lease store", str(e))
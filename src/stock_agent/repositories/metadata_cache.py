@@ -0,0 +1,166 @@
+"""Persistent cache of symbol metadata"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from stock_agent.utils.exceptions import StorageError
+from stock_agent.utils.logger import get_logger
+from stock_agent.utils.serialization import dumps, loads
+
+logger = get_logger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS metadata (
+    symbol TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+"""
+
+
+class MetadataCache:
+    """
+    Descriptive metadata per symbol (name, sector, currency, ...) in SQLite
+    
+    Metadata barely changes, so entries are served for a long TTL and
+    only become due for a refresh after refresh_after_seconds; a
+    background refresher re-fetches due entries while the old ones keep
+    being served. Entries read once are kept in process memory, so
+    listings and alerts read metadata without touching the database.
+    version counts the writes made through this instance, so responses
+    that embed metadata can be revalidated when it is loaded or refreshed.
+    """
+    
+    def __init__(
+        self,
+        path: str,
+        ttl_seconds: float = 30 * 86400,
+        refresh_after_seconds: float = 7 * 86400,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Initialize metadata cache
+        
+        Args:
+            path: SQLite database file shared by the processes
+            ttl_seconds: How long an entry is served after it was fetched
+            refresh_after_seconds: Age after which an entry is due for a refresh
+            clock: Wall-clock time source (shared between processes)
+        
+        Raises:
+            StorageError: If the database cannot be opened
+        """
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.refresh_after_seconds = refresh_after_seconds
+        self._clock = clock
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._memo: Dict[str, Tuple[dict, float]] = {}
+        self.version = 0
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = self._conn()
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+        except (OSError, sqlite3.Error) as e:
+            raise StorageError("open metadata cache", f"{self.path}: {e}")
+        logger.info(f"Initialized metadata cache at {self.path}")
+    
+    def get_many(self, symbols: Iterable[str]) -> Dict[str, dict]:
+        """
+        Get unexpired metadata for several symbols
+        
+        Args:
+            symbols: Stock symbols (upper case)
+        
+        Returns:
+            Metadata by symbol for the symbols with an unexpired entry
+        """
+        now = self._clock()
+        return {
+            symbol: data
+            for symbol, (data, fetched_at) in self._entries(symbols).items()
+            if now - fetched_at < self.ttl_seconds
+        }
+    
+    def due(self, symbols: Iterable[str]) -> List[str]:
+        """
+        Symbols without metadata or whose metadata is due for a refresh
+        
+        Args:
+            symbols: Stock symbols (upper case)
+        
+        Returns:
+            Symbols to fetch, in the given order
+        """
+        symbols = list(symbols)
+        now = self._clock()
+        entries = self._entries(symbols)
+        return [
+            symbol for symbol in symbols
+            if symbol not in entries or now - entries[symbol][1] >= self.refresh_after_seconds
+        ]
+    
+    def put_many(self, metadata: Dict[str, dict]) -> None:
+        """
+        Store freshly fetched metadata
+        
+        Args:
+            metadata: Metadata by symbol
+        """
+        if not metadata:
+            return
+        
+        now = self._clock()
+        try:
+            self._conn().executemany(
+                "INSERT OR REPLACE INTO metadata (symbol, data, fetched_at) VALUES (?, ?, ?)",
+                [(symbol, dumps(data).decode(), now) for symbol, data in metadata.items()]
+            )
+        except sqlite3.Error as e:
+            raise StorageError("save metadata", str(e))
+        for symbol, data in metadata.items():
+            self._memo[symbol] = (data, now)
+        self.version += 1
+    
+    def _entries(self, symbols: Iterable[str]) -> Dict[str, Tuple[dict, float]]:
+        """Entries of the given symbols, from memory or the database"""
+        symbols = list(symbols)
+        entries = {symbol: self._memo[symbol] for symbol in symbols if symbol in self._memo}
+        missing = [symbol for symbol in symbols if symbol not in entries]
+        if not missing:
+            return entries
+        
+        placeholders = ",".join("?" * len(missing))
+        try:
+            rows = self._conn().execute(
+                f"SELECT symbol, data, fetched_at FROM metadata WHERE symbol IN ({placeholders})",
+                missing
+            ).fetchall()
+        except sqlite3.Error as e:
+            raise StorageError("load metadata", str(e))
+        
+        for symbol, data, fetched_at in rows:
+            entries[symbol] = self._memo[symbol] = (loads(data), fetched_at)
+        return entries
+    
+    def _conn(self) -> sqlite3.Connection:
+        """Connection of the calling thread"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._connections.append(conn)
+        return conn
+    
+    def close(self) -> None:
+        """Close the connections of every thread (later calls reconnect)"""
+        connections, self._connections = self._connections, []
+        self._local = threading.local()
+        for conn in connections:
+            conn.close()
@@ -0,0 +1,105 @@
+"""Running portfolio totals kept up to date on every change"""
+
+import math
+from typing import Optional
+
+import numpy as np
+
+
+class PortfolioAggregates:
+    """
+    Portfolio totals maintained incrementally
+    
+    Every add, delete, update and recorded price adjusts the totals in O(1)
+    instead of summing the whole portfolio again. Positions carry no
+    quantity, so each counts as one unit: the cost basis is the sum of buy
+    prices, and market value and P/L cover the positions with a recorded
+    price. Running float sums drift slowly, so the owner periodically
+    compares them with a full recomputation (from_columns) and replaces
+    them when they disagree.
+    """
+    
+    def __init__(self):
+        """Initialize empty totals"""
+        self.positions = 0
+        self.priced = 0
+        self.cost_basis = 0.0
+        self.priced_cost = 0.0
+        self.market_value = 0.0
+    
+    @classmethod
+    def from_columns(cls, buy_price: np.ndarray, last_price: np.ndarray) -> "PortfolioAggregates":
+        """
+        Recompute totals from scratch
+        
+        Args:
+            buy_price: Buy prices of live positions
+            last_price: Last recorded prices (NaN when unknown), aligned with buy_price
+        
+        Returns:
+            Exact totals
+        """
+        aggregates = cls()
+        priced = ~np.isnan(last_price)
+        aggregates.positions = len(buy_price)
+        aggregates.priced = int(priced.sum())
+        aggregates.cost_basis = math.fsum(buy_price.tolist())
+        aggregates.priced_cost = math.fsum(buy_price[priced].tolist())
+        aggregates.market_value = math.fsum(last_price[priced].tolist())
+        return aggregates
+    
+    @property
+    def profit(self) -> float:
+        """Unrealised P/L of the priced positions"""
+        return self.market_value - self.priced_cost
+    
+    def add(self, buy_price: float, last_price: Optional[float]) -> None:
+        """Account for a new position"""
+        self.positions += 1
+        self.cost_basis += buy_price
+        if last_price is not None:
+            self.priced += 1
+            self.priced_cost += buy_price
+            self.market_value += last_price
+    
+    def remove(self, buy_price: float, last_price: Optional[float]) -> None:
+        """Account for a deleted position"""
+        self.positions -= 1
+        self.cost_basis -= buy_price
+        if last_price is not None:
+            self.priced -= 1
+            self.priced_cost -= buy_price
+            self.market_value -= last_price
+    
+    def reprice(self, buy_price: float, old_price: Optional[float], new_price: float) -> None:
+        """Account for a newly recorded price of a position"""
+        if old_price is None:
+            self.priced += 1
+            self.priced_cost += buy_price
+            self.market_value += new_price
+        else:
+            self.market_value += new_price - old_price
+    
+    def matches(self, other: "PortfolioAggregates", rel_tol: float = 1e-9) -> bool:
+        """
+        Compare with another set of totals
+        
+        Args:
+            other: Totals to compare with (usually a full recomputation)
+            rel_tol: Tolerance for the sums, relative to the larger of cost basis
+                and market value
+        
+        Returns:
+            True if counts are equal and sums agree within the tolerance
+        """
+        if (self.positions, self.priced) != (other.positions, other.priced):
+            return False
+        scale = max(abs(other.cost_basis), abs(other.market_value), 1.0)
+        return all(
+            abs(mine - theirs) <= rel_tol * scale
+            for mine, theirs in (
+                (self.cost_basis, other.cost_basis),
+                (self.priced_cost, other.priced_cost),
+                (self.market_value, other.market_value),
+            )
+        )
@@ -0,0 +1,264 @@
+"""Compact struct-of-arrays storage for tracked positions"""
+
+import sys
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from stock_agent.models.stock import StockInDB
+
+NOT_A_TIME = np.datetime64("NaT", "us")
+
+
+class PortfolioStore:
+    """
+    In-memory portfolio held as columns instead of one object per position
+    
+    Prices are float64 columns (NaN when unknown) and timestamps are
+    datetime64[us] columns (NaT when unknown), grown by doubling so that
+    appends are amortised O(1). Symbols are interned and mapped to their
+    row through a dict, and alert rules are kept as a tuple of strings per
+    row (shared empty tuple when there are none). Deleted rows become
+    tombstones until compaction so that insertion order is preserved.
+    
+    Pydantic models and JSON rows are only materialised on request, by
+    model() and rows(), at the API boundary. JSON rows are cached per row
+    until the row changes, so repeated listings only format what changed.
+    """
+    
+    PRICE_COLUMNS = ("buy_price", "target_price", "last_price", "high_water")
+    TIME_COLUMNS = ("created_at", "updated_at", "last_price_at")
+    FIELD_ORDER = (
+        "buy_price", "target_price", "rules", "created_at", "updated_at",
+        "last_price", "last_price_at", "high_water"
+    )
+    
+    def __init__(self, capacity: int = 1024):
+        """
+        Initialize an empty store
+        
+        Args:
+            capacity: Initial number of rows to allocate
+        """
+        self._symbols: List[Optional[str]] = []
+        self._rules: List[Tuple[str, ...]] = []
+        self._formatted: List[Optional[dict]] = []
+        self._index: Dict[str, int] = {}
+        self._size = 0
+        self._capacity = max(capacity, 1)
+        self._columns: Dict[str, np.ndarray] = {}
+        for name in self.PRICE_COLUMNS:
+            self._columns[name] = np.full(self._capacity, np.nan)
+        for name in self.TIME_COLUMNS:
+            self._columns[name] = np.full(self._capacity, NOT_A_TIME)
+        self._alive = np.zeros(self._capacity, dtype=bool)
+    
+    @classmethod
+    def from_rows(cls, rows: List[dict]) -> "PortfolioStore":
+        """
+        Build a store from stored rows (the JSON form of StockInDB)
+        
+        Args:
+            rows: Rows in insertion order
+        
+        Returns:
+            Populated store
+        """
+        store = cls(capacity=len(rows))
+        count = len(rows)
+        store._symbols = [sys.intern(row["symbol"]) for row in rows]
+        store._index = {symbol: i for i, symbol in enumerate(store._symbols)}
+        store._rules = [tuple(row.get("rules") or ()) for row in rows]
+        store._formatted = [None] * count
+        for name in cls.PRICE_COLUMNS:
+            values = [row.get(name) for row in rows]
+            store._columns[name][:count] = np.array(values, dtype=float)
+        for name in cls.TIME_COLUMNS:
+            values = [row.get(name) for row in rows]
+            store._columns[name][:count] = np.array(values, dtype="datetime64[us]")
+        store._alive[:count] = True
+        store._size = count
+        return store
+    
+    def __len__(self) -> int:
+        return len(self._index)
+    
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._index
+    
+    @property
+    def symbols(self) -> List[Optional[str]]:
+        """Symbol of each row, None for deleted rows"""
+        return self._symbols
+    
+    def row_of(self, symbol: str) -> Optional[int]:
+        """Get the row holding a symbol"""
+        return self._index.get(symbol)
+    
+    def live_rows(self) -> np.ndarray:
+        """Row numbers of live positions in insertion order"""
+        return np.flatnonzero(self._alive[:self._size])
+    
+    def column(self, name: str) -> np.ndarray:
+        """
+        Get a column as a NumPy view over the used rows
+        
+        Deleted rows are included; mask them with alive(). A view is a
+        snapshot of the current buffer: it does not cover rows appended
+        later and goes stale once growth or compaction reallocates or
+        reorders the column, so call column() again after any change.
+        """
+        return self._columns[name][:self._size]
+    
+    def alive(self) -> np.ndarray:
+        """Mask of live rows"""
+        return self._alive[:self._size]
+    
+    def get(self, row: int, name: str):
+        """Get a single value (None for NaN/NaT)"""
+        if name == "rules":
+            return list(self._rules[row])
+        value = self._columns[name][row]
+        if name in self.TIME_COLUMNS:
+            return None if np.isnat(value) else value.astype(datetime)
+        return None if np.isnan(value) else float(value)
+    
+    def set(self, row: int, **values) -> None:
+        """Set column values of a row (None clears the value)"""
+        self._formatted[row] = None
+        for name, value in values.items():
+            if name == "rules":
+                self._rules[row] = tuple(value or ())
+                continue
+            column = self._columns[name]
+            if name in self.TIME_COLUMNS:
+                column[row] = NOT_A_TIME if value is None else np.datetime64(value, "us")
+            else:
+                column[row] = np.nan if value is None else value
+    
+    def append(self, symbol: str, **values) -> int:
+        """
+        Add a position
+        
+        Args:
+            symbol: Stock symbol (must not be present)
+            **values: Column values
+        
+        Returns:
+            Row number of the new position
+        """
+        if self._size == self._capacity:
+            self._grow()
+        row = self._size
+        self._size += 1
+        self._symbols.append(sys.intern(symbol))
+        self._rules.append(())
+        self._formatted.append(None)
+        self._index[self._symbols[row]] = row
+        self._alive[row] = True
+        self.set(row, **values)
+        return row
+    
+    def remove(self, symbol: str) -> None:
+        """Delete a position, compacting once tombstones dominate"""
+        row = self._index.pop(symbol)
+        self._symbols[row] = None
+        self._rules[row] = ()
+        self._alive[row] = False
+        self.set(row, **{name: None for name in self.PRICE_COLUMNS + self.TIME_COLUMNS})
+        
+        tombstones = self._size - len(self._index)
+        if tombstones > 1024 and tombstones > len(self._index):
+            self._compact()
+    
+    def model(self, row: int) -> StockInDB:
+        """Materialise a row as a validated StockInDB"""
+        return StockInDB(
+            symbol=self._symbols[row],
+            **{name: self.get(row, name) for name in self.FIELD_ORDER}
+        )
+    
+    def rows(self, rows: Iterable[int]) -> List[dict]:
+        """
+        Materialise rows in their stored JSON form
+        
+        Rows formatted before and unchanged since are reused; the others
+        are converted from the columns in bulk, so this is much cheaper
+        than building models for large pages. The returned dicts are shared
+        with later calls and must not be modified.
+        """
+        rows = np.fromiter(rows, dtype=np.intp)
+        formatted = self._formatted
+        missing = [row for row in rows.tolist() if formatted[row] is None]
+        if missing:
+            for row, values in zip(missing, self._format(np.array(missing, dtype=np.intp))):
+                formatted[row] = values
+        return [formatted[row] for row in rows.tolist()]
+    
+    def nbytes(self) -> int:
+        """Approximate memory held by the columns and the symbol table (not the row cache)"""
+        total = sum(column.nbytes for column in self._columns.values()) + self._alive.nbytes
+        total += sys.getsizeof(self._symbols) + sys.getsizeof(self._index)
+        total += sum(sys.getsizeof(symbol) for symbol in self._index)
+        total += sys.getsizeof(self._rules)
+        total += sum(sys.getsizeof(rules) for rules in self._rules if rules)
+        return total
+    
+    def _grow(self) -> None:
+        """Double the allocated capacity"""
+        self._capacity *= 2
+        for name, column in self._columns.items():
+            fill = NOT_A_TIME if name in self.TIME_COLUMNS else np.nan
+            grown = np.full(self._capacity, fill, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            self._columns[name] = grown
+        alive = np.zeros(self._capacity, dtype=bool)
+        alive[:self._size] = self._alive[:self._size]
+        self._alive = alive
+    
+    def _compact(self) -> None:
+        """Drop tombstones, keeping insertion order"""
+        live = self.live_rows()
+        count = len(live)
+        for name, column in self._columns.items():
+            column[:count] = column[live]
+            column[count:self._size] = NOT_A_TIME if name in self.TIME_COLUMNS else np.nan
+        self._alive[:count] = True
+        self._alive[count:self._size] = False
+        self._symbols = [self._symbols[row] for row in live.tolist()]
+        self._rules = [self._rules[row] for row in live.tolist()]
+        self._formatted = [self._formatted[row] for row in live.tolist()]
+        self._index = {symbol: i for i, symbol in enumerate(self._symbols)}
+        self._size = count
+    
+    def _format(self, rows: np.ndarray) -> List[dict]:
+        """Convert rows to their JSON form, column by column"""
+        symbols = [self._symbols[row] for row in rows.tolist()]
+        columns = {"rules": [list(self._rules[row]) for row in rows.tolist()]}
+        for name in self.PRICE_COLUMNS:
+            values = self._columns[name][rows]
+            columns[name] = [None if v != v else v for v in values.tolist()]
+        for name in self.TIME_COLUMNS:
+            # Rows recorded together share timestamps: format (and keep) each one once
+            values, positions = np.unique(self._columns[name][rows], return_inverse=True)
+            text = [None if v == "NaT" else v for v in np.datetime_as_string(values, unit="us").tolist()]
+            columns[name] = [text[position] for position in positions.tolist()]
+        
+        return [
+            {
+                "symbol": symbol,
+                "buy_price": buy_price,
+                "target_price": target_price,
+                "rules": rules,
+                "created_at": created_at,
+                "updated_at": updated_at,
+                "last_price": last_price,
+                "last_price_at": last_price_at,
+                "high_water": high_water,
+            }
+            for (
+                symbol, buy_price, target_price, rules, created_at, updated_at,
+                last_price, last_price_at, high_water
+            ) in zip(symbols, *(columns[name] for name in self.FIELD_ORDER))
+        ]
@@ -0,0 +1,276 @@
+"""Quote cache shared by all processes on the host"""
+
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from stock_agent.utils.exceptions import StorageError
+from stock_agent.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS quotes (
+    symbol TEXT PRIMARY KEY,
+    price REAL,
+    fetched_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS fills (
+    symbol TEXT PRIMARY KEY,
+    expires_at REAL NOT NULL
+);
+"""
+
+
+class QuoteCache:
+    """
+    Latest prices with a TTL, stored in a SQLite file in WAL mode
+    
+    Every API worker process opens the same file, so a quote fetched by
+    one worker serves the others until it expires. WAL lets readers run
+    while a writer commits, and every write is a single short statement,
+    so workers rarely wait on each other.
+    
+    Entries are stamped with the time the fetch started, not when it
+    finished, and a write never replaces a newer stamp. Invalidation
+    stores an empty entry stamped with the invalidation time, so a fetch
+    that was already running when the symbol was invalidated cannot
+    bring the old price back.
+    
+    To keep workers from fetching the same symbol at once after a miss,
+    the first one claims the fill for a short lease and the others wait
+    for its result (see claim and wait_for).
+    """
+    
+    def __init__(
+        self,
+        path: str,
+        ttl_seconds: float = 60.0,
+        fill_lease_seconds: float = 5.0,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        """
+        Initialize quote cache
+        
+        Args:
+            path: SQLite database file shared by the processes
+            ttl_seconds: How long a quote is served after its fetch started
+            fill_lease_seconds: How long other processes wait for a claimed fill
+            clock: Wall-clock time source (shared between processes)
+            sleep: Function used while waiting for another process's fill
+        
+        Raises:
+            StorageError: If the database cannot be opened
+        """
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.fill_lease_seconds = fill_lease_seconds
+        self._clock = clock
+        self._sleep = sleep
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = self._conn()
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+        except (OSError, sqlite3.Error) as e:
+            raise StorageError("open quote cache", f"{self.path}: {e}")
+        logger.info(f"Initialized quote cache at {self.path} (TTL {ttl_seconds:g}s)")
+    
+    def now(self) -> float:
+        """Current time on the cache clock (stamp for put)"""
+        return self._clock()
+    
+    def get(self, symbol: str) -> Optional[float]:
+        """
+        Get a fresh quote
+        
+        Args:
+            symbol: Stock symbol
+        
+        Returns:
+            Price, or None if missing, expired or invalidated
+        """
+        return self.get_many([symbol]).get(symbol)
+    
+    def get_many(self, symbols: Iterable[str]) -> Dict[str, float]:
+        """
+        Get fresh quotes for several symbols with one query
+        
+        Args:
+            symbols: Stock symbols
+        
+        Returns:
+            Prices by symbol for the symbols with a fresh quote
+        """
+        symbols = list(symbols)
+        if not symbols:
+            return {}
+        
+        placeholders = ",".join("?" * len(symbols))
+        rows = self._execute(
+            f"SELECT symbol, price FROM quotes WHERE symbol IN ({placeholders}) "
+            "AND price IS NOT NULL AND fetched_at > ?",
+            (*symbols, self._clock() - self.ttl_seconds)
+        ).fetchall()
+        return dict(rows)
+    
+    def put(self, symbol: str, price: float, fetched_at: float) -> bool:
+        """
+        Store a quote
+        
+        Args:
+            symbol: Stock symbol
+            price: Fetched price
+            fetched_at: Cache time when the fetch started (from now())
+        
+        Returns:
+            False if a newer quote or invalidation was already stored
+        """
+        return self.put_many({symbol: price}, fetched_at) == 1
+    
+    def put_many(self, prices: Dict[str, float], fetched_at: float) -> int:
+        """
+        Store quotes fetched together and release their fill claims
+        
+        Args:
+            prices: Fetched prices by symbol
+            fetched_at: Cache time when the fetch started (from now())
+        
+        Returns:
+            Number of quotes stored
+        """
+        if not prices:
+            return 0
+        
+        try:
+            with self._transaction() as conn:
+                stored = conn.executemany(
+                    "INSERT INTO quotes (symbol, price, fetched_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT (symbol) DO UPDATE SET price = excluded.price, "
+                    "fetched_at = excluded.fetched_at WHERE excluded.fetched_at >= quotes.fetched_at",
+                    [(symbol, price, fetched_at) for symbol, price in prices.items()]
+                ).rowcount
+                conn.executemany("DELETE FROM fills WHERE symbol = ?", [(s,) for s in prices])
+        except sqlite3.Error as e:
+            raise StorageError("save quotes", str(e))
+        return stored
+    
+    def invalidate(self, symbols: Optional[Iterable[str]] = None) -> None:
+        """
+        Drop quotes so the next read fetches again
+        
+        Args:
+            symbols: Symbols to drop (every symbol if None)
+        """
+        now = self._clock()
+        if symbols is None:
+            self._execute("UPDATE quotes SET price = NULL, fetched_at = ?", (now,))
+            return
+        
+        try:
+            with self._transaction() as conn:
+                conn.executemany(
+                    "INSERT INTO quotes (symbol, price, fetched_at) VALUES (?, NULL, ?) "
+                    "ON CONFLICT (symbol) DO UPDATE SET price = NULL, fetched_at = excluded.fetched_at",
+                    [(symbol, now) for symbol in symbols]
+                )
+        except sqlite3.Error as e:
+            raise StorageError("invalidate quotes", str(e))
+    
+    def claim(self, symbol: str) -> bool:
+        """
+        Claim the fill of a missing quote
+        
+        Args:
+            symbol: Stock symbol
+        
+        Returns:
+            True if this caller should fetch; False if another fill is in progress
+        """
+        now = self._clock()
+        cursor = self._execute(
+            "INSERT INTO fills (symbol, expires_at) VALUES (?, ?) "
+            "ON CONFLICT (symbol) DO UPDATE SET expires_at = excluded.expires_at "
+            "WHERE fills.expires_at <= ?",
+            (symbol, now + self.fill_lease_seconds, now)
+        )
+        return cursor.rowcount == 1
+    
+    def release(self, symbol: str) -> None:
+        """Give up a claimed fill (after the fetch failed)"""
+        self._execute("DELETE FROM fills WHERE symbol = ?", (symbol,))
+    
+    def wait_for(self, symbol: str, poll_seconds: float = 0.05) -> Optional[float]:
+        """
+        Wait for another process to fill a quote
+        
+        Args:
+            symbol: Stock symbol
+            poll_seconds: Interval between checks
+        
+        Returns:
+            Price, or None if the fill did not arrive within the lease
+        """
+        deadline = self._clock() + self.fill_lease_seconds
+        while self._clock() < deadline:
+            price = self.get(symbol)
+            if price is not None:
+                return price
+            self._sleep(poll_seconds)
+        return self.get(symbol)
+    
+    def purge(self) -> int:
+        """
+        Delete expired entries and stale fill claims
+        
+        Returns:
+            Number of quotes deleted
+        """
+        now = self._clock()
+        deleted = self._execute(
+            "DELETE FROM quotes WHERE fetched_at <= ?", (now - self.ttl_seconds,)
+        ).rowcount
+        self._execute("DELETE FROM fills WHERE expires_at <= ?", (now,))
+        return deleted
+    
+    def _conn(self) -> sqlite3.Connection:
+        """Connection of the calling thread"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._connections.append(conn)
+        return conn
+    
+    def close(self) -> None:
+        """Close the connections of every thread (later calls reconnect)"""
+        connections, self._connections = self._connections, []
+        self._local = threading.local()
+        for conn in connections:
+            conn.close()
+    
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run statements as one write transaction"""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+    
+    def _execute(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+        """Run one autocommitted statement"""
+        try:
+            return self._conn().execute(sql, params)
+        except sqlite3.Error as e:
+            raise StorageError("quote cache", str(e))
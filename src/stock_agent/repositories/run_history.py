@@ -0,0 +1,240 @@
+"""Append-only, compressed store of agent runs partitioned by day"""
+
+import bisect
+import os
+import shutil
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from stock_agent.utils.exceptions import StorageError
+from stock_agent.utils.file_lock import file_lock
+from stock_agent.utils.logger import get_logger
+from stock_agent.utils.serialization import dumps, loads
+
+logger = get_logger(__name__)
+
+DATA_FILE = "runs.bin"
+INDEX_FILE = "index.ndjson"
+DOWNSAMPLED_DATA_FILE = "runs-ds.bin"
+DOWNSAMPLED_INDEX_FILE = "index-ds.ndjson"
+
+
+class RunHistoryStore:
+    """
+    Agent run records grouped into one directory per UTC day
+    
+    Each run is appended to the day's data file as a zlib-compressed JSON
+    block, and a line with its timestamp, offset and length is appended to
+    the day's index. A range query opens only the days it overlaps, bisects
+    their indexes by time and decompresses just the blocks in range.
+    
+    Days older than the retention period are deleted. Days older than
+    downsample_after_days keep only the last run of every
+    downsample_seconds bucket; the thinned copy is written next to the
+    original and its index is renamed into place last, so readers switch
+    over atomically.
+    """
+    
+    def __init__(
+        self,
+        root: str,
+        retention_days: int = 365,
+        downsample_after_days: int = 30,
+        downsample_seconds: float = 3600.0,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Initialize run history store
+        
+        Args:
+            root: Directory holding one subdirectory per day
+            retention_days: Days of history to keep (0 keeps everything)
+            downsample_after_days: Age in days after which a day is thinned
+                (0 disables downsampling)
+            downsample_seconds: Bucket width of thinned days, in seconds
+            clock: Wall-clock time source
+        """
+        self.root = Path(root)
+        self.retention_days = retention_days
+        self.downsample_after_days = downsample_after_days
+        self.downsample_seconds = downsample_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._compacted_on: Optional[str] = None
+    
+    def append(self, record: dict, ts: Optional[float] = None) -> float:
+        """
+        Append a run record
+        
+        Old days are compacted by the first append of every day.
+        
+        Args:
+            record: JSON-compatible run record
+            ts: Run time as a Unix timestamp (now if None)
+        
+        Returns:
+            Timestamp stored with the record
+        
+        Raises:
+            StorageError: If the record cannot be written
+        """
+        ts = self._clock() if ts is None else ts
+        block = zlib.compress(dumps(record))
+        directory = self.root / _day(ts)
+        
+        with self._locked():
+            try:
+                directory.mkdir(parents=True, exist_ok=True)
+                with open(directory / DATA_FILE, "ab") as data:
+                    offset = data.tell()
+                    data.write(block)
+                    data.flush()
+                    os.fsync(data.fileno())
+                with open(directory / INDEX_FILE, "ab") as index:
+                    index.write(dumps({"ts": ts, "offset": offset, "length": len(block)}) + b"\n")
+            except OSError as e:
+                raise StorageError("append run history", str(e))
+        
+        today = _day(self._clock())
+        if self._compacted_on != today:
+            self._compacted_on = today
+            try:
+                self.compact()
+            except StorageError as e:
+                logger.error(f"Run history compaction failed: {e}")
+        return ts
+    
+    def runs(self, start: float, end: float) -> Iterator[Tuple[float, dict]]:
+        """
+        Iterate over the runs in a time range, oldest first
+        
+        Args:
+            start: First timestamp to include
+            end: Last timestamp to include
+        
+        Yields:
+            (timestamp, record) pairs
+        """
+        for directory in self._days(start, end):
+            stamps, locations, data_file = self._read_index(directory)
+            lo = bisect.bisect_left(stamps, start)
+            hi = bisect.bisect_right(stamps, end)
+            if lo == hi:
+                continue
+            try:
+                with open(directory / data_file, "rb") as data:
+                    for ts, (offset, length) in zip(stamps[lo:hi], locations[lo:hi]):
+                        data.seek(offset)
+                        yield ts, loads(zlib.decompress(data.read(length)))
+            except (OSError, zlib.error, ValueError) as e:
+                raise StorageError("read run history", f"{directory}: {e}")
+    
+    def compact(self, now: Optional[float] = None) -> Dict[str, int]:
+        """
+        Apply retention and downsampling to old days
+        
+        Args:
+            now: Current timestamp (clock time if None)
+        
+        Returns:
+            Number of days removed and downsampled
+        """
+        today = datetime.fromtimestamp(self._clock() if now is None else now, timezone.utc).date()
+        removed = downsampled = 0
+        
+        with self._locked():
+            for directory in self._all_days():
+                age = (today - datetime.strptime(directory.name, "%Y-%m-%d").date()).days
+                if self.retention_days and age > self.retention_days:
+                    shutil.rmtree(directory, ignore_errors=True)
+                    removed += 1
+                elif (
+                    self.downsample_after_days and age > self.downsample_after_days
+                    and not (directory / DOWNSAMPLED_INDEX_FILE).exists()
+                ):
+                    self._downsample(directory)
+                    downsampled += 1
+        
+        if removed or downsampled:
+            logger.info(f"Run history compacted: {removed} day(s) removed, {downsampled} downsampled")
+        return {"removed": removed, "downsampled": downsampled}
+    
+    def _downsample(self, directory: Path) -> None:
+        """Keep the last run of every bucket of a day"""
+        stamps, locations, _ = self._read_index(directory)
+        keep: Dict[int, int] = {}
+        for i, ts in enumerate(stamps):
+            keep[int(ts // self.downsample_seconds)] = i
+        
+        try:
+            entries = []
+            with open(directory / DATA_FILE, "rb") as source, \
+                    open(directory / DOWNSAMPLED_DATA_FILE, "wb") as target:
+                for i in sorted(keep.values()):
+                    offset, length = locations[i]
+                    source.seek(offset)
+                    entries.append({"ts": stamps[i], "offset": target.tell(), "length": length})
+                    target.write(source.read(length))
+            
+            tmp_path = directory / (DOWNSAMPLED_INDEX_FILE + ".tmp")
+            tmp_path.write_bytes(b"".join(dumps(entry) + b"\n" for entry in entries))
+            os.replace(tmp_path, directory / DOWNSAMPLED_INDEX_FILE)
+            (directory / INDEX_FILE).unlink()
+            (directory / DATA_FILE).unlink()
+        except OSError as e:
+            raise StorageError("downsample run history", f"{directory}: {e}")
+    
+    def _read_index(self, directory: Path) -> Tuple[List[float], List[Tuple[int, int]], str]:
+        """Timestamps and block locations of a day, sorted by time"""
+        if (directory / DOWNSAMPLED_INDEX_FILE).exists():
+            index_file, data_file = DOWNSAMPLED_INDEX_FILE, DOWNSAMPLED_DATA_FILE
+        else:
+            index_file, data_file = INDEX_FILE, DATA_FILE
+        
+        try:
+            lines = (directory / index_file).read_bytes().splitlines()
+        except FileNotFoundError:
+            return [], [], data_file
+        except OSError as e:
+            raise StorageError("read run history", f"{directory}: {e}")
+        
+        # A torn last line (crash mid-append) is skipped
+        entries = []
+        for line in lines:
+            try:
+                entries.append(loads(line))
+            except ValueError:
+                logger.warning(f"Skipping damaged index entry in {directory}")
+        entries.sort(key=lambda entry: entry["ts"])
+        return (
+            [entry["ts"] for entry in entries],
+            [(entry["offset"], entry["length"]) for entry in entries],
+            data_file,
+        )
+    
+    def _days(self, start: float, end: float) -> List[Path]:
+        """Existing day directories overlapping a time range"""
+        first, last = _day(start), _day(end)
+        return [d for d in self._all_days() if first <= d.name <= last]
+    
+    def _all_days(self) -> List[Path]:
+        """All day directories, oldest first"""
+        if not self.root.exists():
+            return []
+        return sorted(d for d in self.root.iterdir() if d.is_dir() and len(d.name) == 10)
+    
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Serialize writers in this process and, where supported, across processes"""
+        with self._lock, file_lock(self.root / ".lock", "lock run history"):
+            yield
+
+
+def _day(ts: float) -> str:
+    """UTC day of a timestamp as YYYY-MM-DD"""
+    return datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%d")
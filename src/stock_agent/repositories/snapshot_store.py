@@ -0,0 +1,134 @@
+"""Last analysis of every position, keyed by what it was computed from"""
+
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from stock_agent.utils.exceptions import StorageError
+from stock_agent.utils.file_lock import file_lock
+from stock_agent.utils.logger import get_logger
+from stock_agent.utils.serialization import dumps, loads
+
+logger = get_logger(__name__)
+
+
+class SnapshotStore:
+    """
+    Analysis snapshots stored in a JSON file
+    
+    Each snapshot is saved with a fingerprint of its inputs (price and
+    position definition). A snapshot is only returned for a matching
+    fingerprint, so a stale one can never be served after the price or the
+    position changed. Changes are kept in memory until save(); the file is
+    re-read when another process replaced it, with the unsaved changes
+    applied on top.
+    
+    Instances sharing the file save under a lock file and write only the
+    symbols they changed into the latest copy, so one instance never drops
+    the snapshots another one saved.
+    """
+    
+    def __init__(self, file_path: str):
+        """
+        Initialize snapshot store
+        
+        Args:
+            file_path: Path to the JSON file
+        """
+        self.file_path = Path(file_path)
+        self.lock_path = self.file_path.with_name(self.file_path.name + ".lock")
+        self._snapshots: Optional[Dict[str, Tuple[str, dict]]] = None
+        self._stat: Optional[Tuple[int, int, int]] = None
+        # Unsaved changes by symbol (None for a discarded snapshot)
+        self._pending: Dict[str, Optional[Tuple[str, dict]]] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, symbol: str, fingerprint: str) -> Optional[dict]:
+        """
+        Get the snapshot of a position if it was computed from the same inputs
+        
+        Args:
+            symbol: Stock symbol
+            fingerprint: Fingerprint of the current inputs
+        
+        Returns:
+            Serialized analysis, or None if missing or computed from other inputs
+        """
+        entry = self._load().get(symbol)
+        if entry is None or entry[0] != fingerprint:
+            return None
+        return entry[1]
+    
+    def put(self, symbol: str, fingerprint: str, analysis: dict) -> None:
+        """
+        Replace the snapshot of a position
+        
+        Args:
+            symbol: Stock symbol
+            fingerprint: Fingerprint of the inputs the analysis was computed from
+            analysis: Serialized analysis
+        """
+        with self._lock:
+            self._load()[symbol] = self._pending[symbol] = (fingerprint, analysis)
+    
+    def discard(self, symbols: Iterable[str]) -> None:
+        """Drop the snapshots of positions that are no longer tracked"""
+        with self._lock:
+            snapshots = self._load()
+            for symbol in symbols:
+                if snapshots.pop(symbol, None) is not None:
+                    self._pending[symbol] = None
+    
+    def save(self) -> None:
+        """
+        Merge pending changes into the file and write it atomically
+        
+        Raises:
+            StorageError: If the file cannot be written
+        """
+        with self._lock:
+            if not self._pending:
+                return
+            with file_lock(self.lock_path, "lock snapshots"):
+                payload = {
+                    symbol: {"fingerprint": fingerprint, "analysis": analysis}
+                    for symbol, (fingerprint, analysis) in self._load().items()
+                }
+                tmp_path = self.file_path.with_name(self.file_path.name + ".tmp")
+                try:
+                    tmp_path.write_bytes(dumps(payload))
+                    os.replace(tmp_path, self.file_path)
+                except OSError as e:
+                    raise StorageError("save snapshots", str(e))
+                self._stat = self._stat_file()
+            self._pending.clear()
+    
+    def _load(self) -> Dict[str, Tuple[str, dict]]:
+        """Snapshots by symbol, re-read (plus pending changes) when the file changed on disk"""
+        if self._snapshots is None or self._stat_file() != self._stat:
+            self._stat = self._stat_file()
+            try:
+                payload = loads(self.file_path.read_bytes())
+            except FileNotFoundError:
+                payload = {}
+            except ValueError as e:
+                logger.warning(f"Ignoring unreadable snapshots in {self.file_path}: {e}")
+                payload = {}
+            self._snapshots = {
+                symbol: (entry["fingerprint"], entry["analysis"]) for symbol, entry in payload.items()
+            }
+            for symbol, entry in self._pending.items():
+                if entry is None:
+                    self._snapshots.pop(symbol, None)
+                else:
+                    self._snapshots[symbol] = entry
+        return self._snapshots
+    
+    def _stat_file(self) -> Optional[Tuple[int, int, int]]:
+        """Inode, modification time and size of the file (None if missing)"""
+        try:
+            stat = self.file_path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
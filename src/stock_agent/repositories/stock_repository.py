@@ -1,13 +1,32 @@
 """Stock repository implementations"""
 
-import json
+import base64
+import hashlib
+import os
 from abc import ABC, abstractmethod
+from bisect import bisect_left, bisect_right, insort
+from contextlib import contextmanager
+from datetime import datetime
 from pathlib import Path
-from typing import List, Optional
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 
-from stock_agent.models.stock import StockCreate, StockInDB
+import numpy as np
+
+from stock_agent.models.enums import DecisionType
+from stock_agent.models.stock import (
+    PortfolioHolding,
+    PortfolioSummary,
+    StockCreate,
+    StockInDB,
+    StockPage,
+)
+from stock_agent.repositories.portfolio_aggregates import PortfolioAggregates
+from stock_agent.repositories.portfolio_store import PortfolioStore
+from stock_agent.utils.currency import DEFAULT_CURRENCY, convert_amounts, symbol_currency
 from stock_agent.utils.exceptions import DuplicateStockError, StorageError, StockNotFoundError
+from stock_agent.utils.file_lock import file_lock
 from stock_agent.utils.logger import get_logger
+from stock_agent.utils.serialization import dumps, loads
 
 logger = get_logger(__name__)
 
@@ -39,19 +58,136 @@ class StockRepository(ABC):
     def update(self, symbol: str, stock: StockCreate) -> StockInDB:
         """Update a stock by its symbol"""
         pass
+    
+    @property
+    @abstractmethod
+    def version(self) -> str:
+        """Opaque token that changes whenever the stored data changes"""
+        pass
+    
+    @abstractmethod
+    def record_prices(self, prices: Dict[str, float]) -> None:
+        """Record the last observed market price (and high-water mark) for tracked stocks"""
+        pass
+    
+    @abstractmethod
+    def query(
+        self,
+        prefix: Optional[str] = None,
+        decision: Optional[DecisionType] = None,
+        within_percent: Optional[float] = None,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> StockPage:
+        """Get a page of stocks ordered by symbol, matching the given filters"""
+        pass
+    
+    @abstractmethod
+    def query_rows(
+        self,
+        prefix: Optional[str] = None,
+        decision: Optional[DecisionType] = None,
+        within_percent: Optional[float] = None,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        """Same as query, but returns stored rows in JSON form instead of models"""
+        pass
+    
+    @property
+    @abstractmethod
+    def currencies(self) -> List[str]:
+        """Currencies of the tracked positions"""
+        pass
+    
+    @abstractmethod
+    def summary(
+        self,
+        with_holdings: bool = True,
+        currency: str = DEFAULT_CURRENCY,
+        rates: Optional[Dict[str, float]] = None
+    ) -> PortfolioSummary:
+        """Portfolio totals and per-position weights in a reporting currency"""
+        pass
+
+
+def encode_cursor(symbol: str) -> str:
+    """Encode the last symbol of a page as an opaque cursor"""
+    return base64.urlsafe_b64encode(symbol.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> str:
+    """
+    Decode a cursor produced by encode_cursor
+    
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        symbol = base64.b64decode(padded.encode("ascii"), altchars=b"-_", validate=True).decode("utf-8")
+    except Exception:
+        symbol = ""
+    if not symbol:
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return symbol
+
+
+def distance_to_target(last_price, target_price):
+    """
+    Signed distance from the last price to the target, as a percent of target
+    
+    Works element-wise on NumPy arrays as well as on plain floats.
+    """
+    return (target_price - last_price) / target_price * 100
 
 
 class JSONStockRepository(StockRepository):
-    """JSON file-based stock repository implementation"""
+    """
+    JSON file-based stock repository implementation
+    
+    Positions are held in memory in a compact PortfolioStore, alongside a
+    sorted symbol index and lazily rebuilt price indexes (rows sorted by
+    distance to target and by decision) so that lookups and filtered pages
+    never scan the whole portfolio. The file is re-read only when its
+    modification stamp changes, and the content hash of the file doubles
+    as the repository version.
+    
+    Instances sharing the file never overwrite each other's changes: every
+    write takes a lock file, re-reads the file if another process replaced
+    it, applies its own symbols to that copy and atomically replaces it.
     
-    def __init__(self, file_path: str):
+    Portfolio totals are kept per currency as running aggregates adjusted
+    by every change, and checked against a full recomputation after every
+    aggregate_check_interval changes.
+    """
+    
+    def __init__(
+        self,
+        file_path: str,
+        aggregate_check_interval: int = 1000,
+        currency_of: Callable[[str], str] = symbol_currency
+    ):
         """
         Initialize JSON repository
         
         Args:
             file_path: Path to JSON storage file
+            aggregate_check_interval: Changes between consistency checks of
+                the running portfolio totals
+            currency_of: Currency a symbol trades in
         """
         self.file_path = Path(file_path)
+        self.lock_path = self.file_path.with_name(self.file_path.name + ".lock")
+        self.aggregate_check_interval = max(aggregate_check_interval, 1)
+        self.currency_of = currency_of
+        self._store = PortfolioStore()
+        self._aggregates: Dict[str, PortfolioAggregates] = {}
+        self._changes_since_check = 0
+        self._symbols: List[str] = []
+        self._price_index: Optional[Dict[str, np.ndarray]] = None
+        self._file_stamp: Optional[Tuple[int, int, int]] = None
+        self._version = ""
         self._ensure_file_exists()
         logger.info(f"Initialized JSON repository at {self.file_path}")
     
@@ -59,23 +195,32 @@ class JSONStockRepository(StockRepository):
         """Ensure the JSON file and its directory exist"""
         try:
             self.file_path.parent.mkdir(parents=True, exist_ok=True)
-            if not self.file_path.exists():
-                self._save_stocks([])
-                logger.info(f"Created new storage file at {self.file_path}")
+            with self._locked():
+                if not self.file_path.exists():
+                    self._save_stocks([])
+                    logger.info(f"Created new storage file at {self.file_path}")
         except Exception as e:
             raise StorageError("initialize", str(e))
     
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Serialize writers of the file across threads and processes"""
+        with file_lock(self.lock_path, "lock stocks"):
+            yield
+    
     def _load_stocks(self) -> List[dict]:
         """Load stocks from JSON file"""
         try:
             if not self.file_path.exists():
                 return []
             
-            with open(self.file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                logger.debug(f"Loaded {len(data)} stocks from storage")
-                return data
-        except json.JSONDecodeError as e:
+            with open(self.file_path, "rb") as f:
+                content = f.read()
+            data = loads(content)
+            self._version = self._content_hash(content)
+            logger.debug(f"Loaded {len(data)} stocks from storage")
+            return data
+        except ValueError as e:
             logger.error(f"Failed to parse JSON file: {e}")
             raise StorageError("load", f"Invalid JSON format: {e}")
         except Exception as e:
@@ -83,76 +228,464 @@ class JSONStockRepository(StockRepository):
             raise StorageError("load", str(e))
     
     def _save_stocks(self, stocks: List[dict]) -> None:
-        """Save stocks to JSON file"""
+        """Save stocks to JSON file atomically (readers never see a partial file)"""
         try:
-            with open(self.file_path, "w", encoding="utf-8") as f:
-                json.dump(stocks, f, indent=2, ensure_ascii=False)
-                logger.debug(f"Saved {len(stocks)} stocks to storage")
+            content = dumps(stocks, indent=True)
+            tmp_path = self.file_path.with_name(self.file_path.name + ".tmp")
+            with open(tmp_path, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, self.file_path)
+            logger.debug(f"Saved {len(stocks)} stocks to storage")
+            self._file_stamp = self._stat_file()
+            self._version = self._content_hash(content)
         except Exception as e:
             logger.error(f"Failed to save stocks: {e}")
             raise StorageError("save", str(e))
     
+    @staticmethod
+    def _content_hash(content: bytes) -> str:
+        """Short digest of the storage file contents"""
+        return hashlib.blake2b(content, digest_size=8).hexdigest()
+    
+    def _stat_file(self) -> Optional[Tuple[int, int, int]]:
+        """
+        Return the (inode, mtime_ns, size) stamp of the storage file
+        
+        Every save replaces the file, so the inode changes even when two
+        writes land within the same mtime tick.
+        """
+        try:
+            stat = self.file_path.stat()
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    
+    def _refresh(self) -> None:
+        """Reload positions and rebuild indexes if the file changed on disk"""
+        stamp = self._stat_file()
+        if stamp is not None and stamp == self._file_stamp:
+            return
+        
+        self._store = PortfolioStore.from_rows(self._load_stocks())
+        self._symbols = sorted(self._store.symbols)
+        self._price_index = None
+        self._aggregates = self._recompute_aggregates()
+        self._changes_since_check = 0
+        self._file_stamp = stamp
+    
+    @property
+    def version(self) -> str:
+        """Content hash of the storage file, identical across processes"""
+        self._refresh()
+        return self._version
+    
+    @property
+    def store(self) -> PortfolioStore:
+        """Columnar view of all positions (read-only for callers)"""
+        self._refresh()
+        return self._store
+    
+    def _persist(self) -> None:
+        """Write all positions back to the JSON file"""
+        self._price_index = None
+        self._save_stocks(self._store.rows(self._store.live_rows()))
+    
+    def _row_currencies(self, rows: np.ndarray) -> np.ndarray:
+        """Currency code of each row"""
+        symbols = self._store.symbols
+        return np.array([self.currency_of(symbols[row]) for row in rows.tolist()], dtype=str)
+    
+    def _recompute_aggregates(self) -> Dict[str, PortfolioAggregates]:
+        """Portfolio totals per currency computed from every live position"""
+        rows = self._store.live_rows()
+        buy = self._store.column("buy_price")[rows]
+        last = self._store.column("last_price")[rows]
+        currencies = self._row_currencies(rows)
+        return {
+            code: PortfolioAggregates.from_columns(buy[currencies == code], last[currencies == code])
+            for code in np.unique(currencies).tolist()
+        }
+    
+    def _totals(self, symbol: str) -> PortfolioAggregates:
+        """Running totals of the currency a symbol trades in"""
+        code = self.currency_of(symbol)
+        totals = self._aggregates.get(code)
+        if totals is None:
+            totals = self._aggregates[code] = PortfolioAggregates()
+        return totals
+    
+    def _changed(self, count: int = 1) -> None:
+        """Count changes applied to the aggregates, checking them when due"""
+        self._changes_since_check += count
+        if self._changes_since_check >= self.aggregate_check_interval:
+            self.check_aggregates()
+    
+    def check_aggregates(self) -> bool:
+        """
+        Compare the running totals with a full recomputation
+        
+        Totals that drifted are replaced by the recomputed ones.
+        
+        Returns:
+            True if the running totals were consistent
+        """
+        self._refresh()
+        expected = self._recompute_aggregates()
+        drifted = [
+            code for code in sorted(set(self._aggregates) | set(expected))
+            if not self._aggregates.get(code, PortfolioAggregates()).matches(
+                expected.get(code, PortfolioAggregates())
+            )
+        ]
+        consistent = not drifted
+        if not consistent:
+            logger.warning(
+                f"Portfolio aggregates drifted for {', '.join(drifted)}; "
+                f"replaced with recomputed totals"
+            )
+        self._aggregates = expected
+        self._changes_since_check = 0
+        return consistent
+    
+    def _get_price_index(self) -> Dict[str, np.ndarray]:
+        """
+        Build (or reuse) the price-derived indexes
+    
+        Rows with a recorded price are sorted once by distance to target and
+        once by decision code; filters then resolve with binary searches.
+        """
+        if self._price_index is not None:
+            return self._price_index
+    
+        store = self._store
+        rows = store.live_rows()
+        last = store.column("last_price")[rows]
+        rows = rows[~np.isnan(last)]
+        last = store.column("last_price")[rows]
+        buy = store.column("buy_price")[rows]
+        target = store.column("target_price")[rows]
+    
+        distance = distance_to_target(last, target)
+        codes = _decision_codes(last, buy, target)
+        by_distance = np.argsort(distance, kind="stable")
+        by_decision = np.argsort(codes, kind="stable")
+        
+        self._price_index = {
+            "distance": distance[by_distance],
+            "distance_rows": rows[by_distance],
+            "decision": codes[by_decision],
+            "decision_rows": rows[by_decision],
+        }
+        return self._price_index
+    
     def add(self, stock: StockCreate) -> StockInDB:
         """Add a new stock to the repository"""
-        stocks = self._load_stocks()
+        with self._locked():
+            self._refresh()
         
-        # Check for duplicates
-        if any(s["symbol"] == stock.symbol for s in stocks):
-            logger.warning(f"Attempted to add duplicate stock: {stock.symbol}")
-            raise DuplicateStockError(stock.symbol)
+            # Check for duplicates
+            if stock.symbol in self._store:
+                logger.warning(f"Attempted to add duplicate stock: {stock.symbol}")
+                raise DuplicateStockError(stock.symbol)
         
-        # Create StockInDB instance
-        stock_in_db = StockInDB(**stock.model_dump())
+            # Create StockInDB instance
+            stock_in_db = StockInDB(**stock.model_dump())
         
-        # Add to list and save
-        stocks.append(stock_in_db.model_dump())
-        self._save_stocks(stocks)
+            # Add to store and index, then save
+            self._store.append(stock.symbol, **stock_in_db.model_dump(exclude={"symbol"}))
+            insort(self._symbols, stock.symbol)
+            self._totals(stock.symbol).add(stock_in_db.buy_price, stock_in_db.last_price)
+            self._persist()
+            self._changed()
         
-        logger.info(f"Added stock: {stock.symbol}")
-        return stock_in_db
+            logger.info(f"Added stock: {stock.symbol}")
+            return stock_in_db
     
     def get_all(self) -> List[StockInDB]:
         """Get all stocks from the repository"""
-        stocks = self._load_stocks()
-        return [StockInDB(**stock) for stock in stocks]
+        self._refresh()
+        return [self._store.model(row) for row in self._store.live_rows().tolist()]
     
     def get_by_symbol(self, symbol: str) -> Optional[StockInDB]:
         """Get a stock by its symbol"""
-        stocks = self._load_stocks()
-        
-        for stock in stocks:
-            if stock["symbol"] == symbol.upper():
-                return StockInDB(**stock)
-        
-        return None
+        self._refresh()
+        row = self._store.row_of(symbol.strip().upper())
+        return self._store.model(row) if row is not None else None
     
     def delete(self, symbol: str) -> bool:
         """Delete a stock by its symbol"""
-        stocks = self._load_stocks()
-        original_count = len(stocks)
-        
-        stocks = [s for s in stocks if s["symbol"] != symbol.upper()]
+        with self._locked():
+            self._refresh()
+            symbol = symbol.strip().upper()
         
-        if len(stocks) == original_count:
-            logger.warning(f"Stock not found for deletion: {symbol}")
-            raise StockNotFoundError(symbol)
+            if symbol not in self._store:
+                logger.warning(f"Stock not found for deletion: {symbol}")
+                raise StockNotFoundError(symbol)
         
-        self._save_stocks(stocks)
-        logger.info(f"Deleted stock: {symbol}")
-        return True
+            row = self._store.row_of(symbol)
+            removed = (self._store.get(row, "buy_price"), self._store.get(row, "last_price"))
+            self._store.remove(symbol)
+            del self._symbols[bisect_left(self._symbols, symbol)]
+            self._totals(symbol).remove(*removed)
+            self._persist()
+            self._changed()
+            logger.info(f"Deleted stock: {symbol}")
+            return True
     
     def update(self, symbol: str, stock: StockCreate) -> StockInDB:
         """Update a stock by its symbol"""
-        stocks = self._load_stocks()
-        
-        for i, s in enumerate(stocks):
-            if s["symbol"] == symbol.upper():
-                # Update the stock
-                updated_stock = StockInDB(**stock.model_dump())
-                stocks[i] = updated_stock.model_dump()
-                self._save_stocks(stocks)
-                logger.info(f"Updated stock: {symbol}")
-                return updated_stock
-        
-        logger.warning(f"Stock not found for update: {symbol}")
-        raise StockNotFoundError(symbol)
+        with self._locked():
+            self._refresh()
+            symbol = symbol.strip().upper()
+        
+            row = self._store.row_of(symbol)
+            if row is None:
+                logger.warning(f"Stock not found for update: {symbol}")
+                raise StockNotFoundError(symbol)
+        
+            if stock.symbol != symbol and stock.symbol in self._store:
+                raise DuplicateStockError(stock.symbol)
+        
+            # Keep creation time; observed prices only carry over for the same symbol
+            same_symbol = stock.symbol == symbol
+            updated_stock = StockInDB(
+                **stock.model_dump(),
+                created_at=self._store.get(row, "created_at"),
+                updated_at=datetime.now(),
+                last_price=self._store.get(row, "last_price") if same_symbol else None,
+                last_price_at=self._store.get(row, "last_price_at") if same_symbol else None,
+                high_water=self._store.get(row, "high_water") if same_symbol else None
+            )
+            values = updated_stock.model_dump(exclude={"symbol"})
+            previous = (self._store.get(row, "buy_price"), self._store.get(row, "last_price"))
+        
+            if same_symbol:
+                self._store.set(row, **values)
+            else:
+                self._store.remove(symbol)
+                del self._symbols[bisect_left(self._symbols, symbol)]
+                self._store.append(stock.symbol, **values)
+                insort(self._symbols, stock.symbol)
+        
+            self._totals(symbol).remove(*previous)
+            self._totals(stock.symbol).add(updated_stock.buy_price, updated_stock.last_price)
+            self._persist()
+            self._changed()
+            logger.info(f"Updated stock: {symbol}")
+            return updated_stock
+    
+    def record_prices(self, prices: Dict[str, float]) -> None:
+        """Record the last observed market price for tracked stocks"""
+        with self._locked():
+            self._refresh()
+            observed_at = datetime.now()
+            changed = 0
+        
+            for symbol, price in prices.items():
+                row = self._store.row_of(symbol)
+                if row is None:
+                    continue
+                self._totals(symbol).reprice(
+                    self._store.get(row, "buy_price"), self._store.get(row, "last_price"), price
+                )
+                high_water = self._store.get(row, "high_water")
+                self._store.set(
+                    row,
+                    last_price=price,
+                    last_price_at=observed_at,
+                    high_water=price if high_water is None else max(high_water, price)
+                )
+                changed += 1
+        
+            if changed:
+                self._persist()
+                self._changed(changed)
+                logger.debug(f"Recorded prices for {len(prices)} stocks")
+    
+    def query(
+        self,
+        prefix: Optional[str] = None,
+        decision: Optional[DecisionType] = None,
+        within_percent: Optional[float] = None,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> StockPage:
+        """Get a page of stocks ordered by symbol, matching the given filters"""
+        rows, next_cursor = self._query(prefix, decision, within_percent, cursor, limit)
+        return StockPage(items=[self._store.model(row) for row in rows], next_cursor=next_cursor)
+    
+    def query_rows(
+        self,
+        prefix: Optional[str] = None,
+        decision: Optional[DecisionType] = None,
+        within_percent: Optional[float] = None,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        """
+        Get a page of stored rows ordered by symbol, matching the given filters
+        
+        Rows are the JSON form of StockInDB, converted from the columnar
+        store in bulk, so they can be serialized without building and
+        re-validating models.
+        
+        Args:
+            prefix: Only include symbols starting with this prefix
+            decision: Only include stocks whose last price yields this decision
+            within_percent: Only include stocks whose last price is within
+                this percent of their target (on either side)
+            cursor: Cursor returned with the previous page
+            limit: Maximum number of stocks to return (all if None)
+        
+        Returns:
+            Stored rows and the cursor for the next page, if any
+        
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        rows, next_cursor = self._query(prefix, decision, within_percent, cursor, limit)
+        return self._store.rows(rows), next_cursor
+    
+    @property
+    def currencies(self) -> List[str]:
+        """Currencies of the tracked positions"""
+        self._refresh()
+        return sorted(code for code, totals in self._aggregates.items() if totals.positions)
+    
+    def summary(
+        self,
+        with_holdings: bool = True,
+        currency: str = DEFAULT_CURRENCY,
+        rates: Optional[Dict[str, float]] = None
+    ) -> PortfolioSummary:
+        """
+        Portfolio totals from the running aggregates
+        
+        Totals are converted once per currency, without touching the
+        positions; holdings are converted and divided by the total market
+        value in one vectorised pass.
+        
+        Args:
+            with_holdings: Include per-position values and weights
+            currency: Reporting currency
+            rates: Units of the reporting currency per unit of each other
+                currency; currencies without a rate are left out of the
+                totals and listed as unconverted
+        
+        Returns:
+            Portfolio summary
+        """
+        self._refresh()
+        rates = {**(rates or {}), currency: 1.0}
+        positions = priced = 0
+        cost_basis = priced_cost = market_value = 0.0
+        unconverted = []
+        for code, totals in sorted(self._aggregates.items()):
+            if not totals.positions:
+                continue
+            positions += totals.positions
+            priced += totals.priced
+            rate = rates.get(code)
+            if rate is None:
+                unconverted.append(code)
+                continue
+            cost_basis += totals.cost_basis * rate
+            priced_cost += totals.priced_cost * rate
+            market_value += totals.market_value * rate
+        
+        holdings = []
+        if with_holdings:
+            rows = self._store.live_rows()
+            currencies = self._row_currencies(rows)
+            buy = convert_amounts(self._store.column("buy_price")[rows], currencies, rates)
+            last = convert_amounts(self._store.column("last_price")[rows], currencies, rates)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                weight = last / market_value if market_value else np.full(len(rows), np.nan)
+            order = np.lexsort((rows, -np.nan_to_num(weight, nan=-1.0)))
+            symbols = self._store.symbols
+            holdings = [
+                PortfolioHolding(
+                    symbol=symbols[row],
+                    currency=code,
+                    cost_basis=None if cost != cost else cost,
+                    market_value=None if value != value else value,
+                    profit=None if value != value else value - cost,
+                    weight=None if share != share else share
+                )
+                for row, code, cost, value, share in zip(
+                    rows[order].tolist(), currencies[order].tolist(), buy[order].tolist(),
+                    last[order].tolist(), weight[order].tolist()
+                )
+            ]
+        
+        profit = market_value - priced_cost
+        return PortfolioSummary(
+            currency=currency,
+            positions=positions,
+            priced_positions=priced,
+            cost_basis=cost_basis,
+            market_value=market_value,
+            profit=profit,
+            profit_percent=profit / priced_cost * 100 if priced_cost else 0.0,
+            unconverted=unconverted,
+            holdings=holdings
+        )
+    
+    def _query(
+        self,
+        prefix: Optional[str],
+        decision: Optional[DecisionType],
+        within_percent: Optional[float],
+        cursor: Optional[str],
+        limit: Optional[int]
+    ) -> Tuple[List[int], Optional[str]]:
+        """Resolve filters and cursor to store rows"""
+        self._refresh()
+        after = decode_cursor(cursor) if cursor else None
+        prefix = prefix.strip().upper() if prefix else ""
+        
+        # Narrow with the price-derived indexes first, smallest set first
+        candidate_sets = []
+        if decision is not None or within_percent is not None:
+            index = self._get_price_index()
+            symbols_of = self._store.symbols
+            if decision is not None:
+                code = _DECISIONS.index(decision)
+                lo, hi = np.searchsorted(index["decision"], [code, code + 1])
+                rows = index["decision_rows"][lo:hi]
+                candidate_sets.append({symbols_of[row] for row in rows.tolist()})
+            if within_percent is not None:
+                lo = np.searchsorted(index["distance"], -within_percent, side="left")
+                hi = np.searchsorted(index["distance"], within_percent, side="right")
+                rows = index["distance_rows"][lo:hi]
+                candidate_sets.append({symbols_of[row] for row in rows.tolist()})
+        
+        if candidate_sets:
+            candidate_sets.sort(key=len)
+            selected = candidate_sets[0].intersection(*candidate_sets[1:])
+            symbols = sorted(s for s in selected if s.startswith(prefix))
+            start, end = 0, len(symbols)
+        else:
+            symbols = self._symbols
+            start = bisect_left(symbols, prefix)
+            end = bisect_left(symbols, prefix + "\uffff") if prefix else len(symbols)
+        
+        if after is not None:
+            start = max(start, bisect_right(symbols, after, 0, end))
+        
+        stop = end if limit is None else min(end, start + limit)
+        page = symbols[start:stop]
+        next_cursor = encode_cursor(page[-1]) if page and stop < end else None
+        
+        return [self._store.row_of(symbol) for symbol in page], next_cursor
+
+
+_DECISIONS = list(DecisionType)
+
+
+def _decision_codes(last: np.ndarray, buy: np.ndarray, target: np.ndarray) -> np.ndarray:
+    """Vectorised DecisionType.from_prices, as indexes into _DECISIONS"""
+    codes = np.full(len(last), _DECISIONS.index(DecisionType.HOLD), dtype=np.int8)
+    codes[last < buy] = _DECISIONS.index(DecisionType.BELOW_BUY_PRICE)
+    codes[last >= target] = _DECISIONS.index(DecisionType.TARGET_REACHED)
+    return codes
@@ -0,0 +1,160 @@
+"""Cache of symbol validation results"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from stock_agent.utils.exceptions import StorageError
+from stock_agent.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS symbols (
+    symbol TEXT PRIMARY KEY,
+    valid INTEGER NOT NULL,
+    reason TEXT NOT NULL,
+    checked_at REAL NOT NULL
+);
+"""
+
+
+class SymbolStatus(NamedTuple):
+    """Outcome of a symbol check"""
+    
+    valid: bool
+    reason: str
+    checked_at: float
+
+
+class SymbolCache:
+    """
+    Whether symbols exist, with separate TTLs for valid and invalid results
+    
+    Results are stored in a SQLite file (WAL mode) shared by all worker
+    processes and mirrored in an in-process dict, so a repeated lookup is
+    a dict access. Valid symbols rarely stop existing and are kept long;
+    invalid results expire sooner because a symbol can be listed later
+    or a rejection can be mistaken. Only definite answers are stored:
+    a check that failed for upstream reasons says nothing about the
+    symbol.
+    """
+    
+    def __init__(
+        self,
+        path: str,
+        valid_ttl_seconds: float = 7 * 86400,
+        invalid_ttl_seconds: float = 3600,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Initialize symbol cache
+        
+        Args:
+            path: SQLite database file shared by the processes
+            valid_ttl_seconds: How long a valid result is trusted
+            invalid_ttl_seconds: How long an invalid result is trusted
+            clock: Wall-clock time source (shared between processes)
+        
+        Raises:
+            StorageError: If the database cannot be opened
+        """
+        self.path = Path(path)
+        self.valid_ttl_seconds = valid_ttl_seconds
+        self.invalid_ttl_seconds = invalid_ttl_seconds
+        self._clock = clock
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._memo: Dict[str, SymbolStatus] = {}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = self._conn()
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+        except (OSError, sqlite3.Error) as e:
+            raise StorageError("open symbol cache", f"{self.path}: {e}")
+        logger.info(
+            f"Initialized symbol cache at {self.path} "
+            f"(valid {valid_ttl_seconds:g}s, invalid {invalid_ttl_seconds:g}s)"
+        )
+    
+    def get(self, symbol: str) -> Optional[SymbolStatus]:
+        """
+        Get the unexpired result of a previous check
+        
+        Args:
+            symbol: Stock symbol (upper case)
+        
+        Returns:
+            Status, or None if the symbol has not been checked recently
+        """
+        now = self._clock()
+        status = self._memo.get(symbol)
+        if status is not None and self._fresh(status, now):
+            return status
+        
+        try:
+            row = self._conn().execute(
+                "SELECT valid, reason, checked_at FROM symbols WHERE symbol = ?", (symbol,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            raise StorageError("load symbol status", str(e))
+        if row is None:
+            return None
+        
+        status = SymbolStatus(bool(row[0]), row[1], row[2])
+        if not self._fresh(status, now):
+            return None
+        self._memo[symbol] = status
+        return status
+    
+    def put(self, symbol: str, valid: bool, reason: str = "") -> None:
+        """
+        Store the result of a check
+        
+        Args:
+            symbol: Stock symbol (upper case)
+            valid: Whether the symbol exists
+            reason: Why it was rejected (for invalid symbols)
+        """
+        status = SymbolStatus(valid, reason, self._clock())
+        self._memo[symbol] = status
+        try:
+            self._conn().execute(
+                "INSERT OR REPLACE INTO symbols (symbol, valid, reason, checked_at) VALUES (?, ?, ?, ?)",
+                (symbol, int(valid), reason, status.checked_at)
+            )
+        except sqlite3.Error as e:
+            raise StorageError("save symbol status", str(e))
+    
+    def forget(self, symbol: str) -> None:
+        """Drop a stored result so the symbol is checked again"""
+        self._memo.pop(symbol, None)
+        try:
+            self._conn().execute("DELETE FROM symbols WHERE symbol = ?", (symbol,))
+        except sqlite3.Error as e:
+            raise StorageError("delete symbol status", str(e))
+    
+    def _fresh(self, status: SymbolStatus, now: float) -> bool:
+        """Whether a result is still within its TTL"""
+        ttl = self.valid_ttl_seconds if status.valid else self.invalid_ttl_seconds
+        return now - status.checked_at < ttl
+    
+    def _conn(self) -> sqlite3.Connection:
+        """Connection of the calling thread"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._connections.append(conn)
+        return conn
+    
+    def close(self) -> None:
+        """Close the connections of every thread (later calls reconnect)"""
+        connections, self._connections = self._connections, []
+        self._local = threading.local()
+        for conn in connections:
+            conn.close()
@@ -3,9 +3,20 @@
 from stock_agent.services.market_data_service import MarketDataService
 from stock_agent.services.alert_service import AlertService
 from stock_agent.services.stock_service import StockService
+from stock_agent.services.indicator_engine import IndicatorEngine
+from stock_agent.services.sharding import HashRing, ShardCoordinator
+from stock_agent.services.fx_service import FxService, market_fx_source
+from stock_agent.services.factory import create_market_service, create_stock_service
 
 __all__ = [
     "MarketDataService",
     "AlertService",
     "StockService",
+    "IndicatorEngine",
+    "HashRing",
+    "ShardCoordinator",
+    "FxService",
+    "market_fx_source",
+    "create_market_service",
+    "create_stock_service",
 ]
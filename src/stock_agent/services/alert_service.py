@@ -1,15 +1,38 @@
 """Alert service for sending notifications"""
 
+import html
+
 import requests
 
 from stock_agent.config import Settings
 from stock_agent.models.enums import AlertType
+from stock_agent.models.rules import AlertRule
 from stock_agent.models.stock import StockAnalysis
+from stock_agent.utils.currency import format_price, symbol_currency
 from stock_agent.utils.exceptions import AlertError
 from stock_agent.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+RULE_ALERT_TITLES = {
+    AlertType.STOP_LOSS: "\U0001f6d1 STOP LOSS HIT",
+    AlertType.TRAILING_STOP: "\U0001f4c9 TRAILING STOP HIT",
+    AlertType.PERCENT_MOVE: "\u26a1 PRICE MOVE",
+    AlertType.BAND: "\u2195\ufe0f PRICE OUTSIDE BAND",
+}
+
+
+def stock_label(analysis: StockAnalysis) -> str:
+    """Symbol followed by the company name when its metadata is cached"""
+    if analysis.metadata is not None and analysis.metadata.name:
+        return f"{analysis.symbol} ({html.escape(analysis.metadata.name)})"
+    return analysis.symbol
+
+
+def money(analysis: StockAnalysis, amount: float) -> str:
+    """Amount formatted in the currency the position trades in"""
+    return format_price(amount, analysis.currency or symbol_currency(analysis.symbol))
+
 
 class AlertService:
     """Service for sending alerts via Telegram"""
@@ -74,11 +97,11 @@ class AlertService:
         """
         message = (
             f"🎯 <b>TARGET REACHED!</b>\n\n"
-            f"<b>Stock:</b> {analysis.symbol}\n"
-            f"<b>Buy Price:</b> ${analysis.buy_price:.2f}\n"
-            f"<b>Current Price:</b> ${analysis.current_price:.2f}\n"
-            f"<b>Target Price:</b> ${analysis.target_price:.2f}\n"
-            f"<b>Profit:</b> ${analysis.profit:.2f} ({analysis.profit_percent:.2f}%)"
+            f"<b>Stock:</b> {stock_label(analysis)}\n"
+            f"<b>Buy Price:</b> {money(analysis, analysis.buy_price)}\n"
+            f"<b>Current Price:</b> {money(analysis, analysis.current_price)}\n"
+            f"<b>Target Price:</b> {money(analysis, analysis.target_price)}\n"
+            f"<b>Profit:</b> {money(analysis, analysis.profit)} ({analysis.profit_percent:.2f}%)"
         )
         
         try:
@@ -96,11 +119,11 @@ class AlertService:
         """
         message = (
             f"📊 <b>DAILY PRICE UPDATE (12 PM IST)</b>\n\n"
-            f"<b>Stock:</b> {analysis.symbol}\n"
-            f"<b>Buy Price:</b> ${analysis.buy_price:.2f}\n"
-            f"<b>Current Price:</b> ${analysis.current_price:.2f}\n"
-            f"<b>Target Price:</b> ${analysis.target_price:.2f}\n"
-            f"<b>Profit/Loss:</b> ${analysis.profit:.2f} ({analysis.profit_percent:.2f}%)"
+            f"<b>Stock:</b> {stock_label(analysis)}\n"
+            f"<b>Buy Price:</b> {money(analysis, analysis.buy_price)}\n"
+            f"<b>Current Price:</b> {money(analysis, analysis.current_price)}\n"
+            f"<b>Target Price:</b> {money(analysis, analysis.target_price)}\n"
+            f"<b>Profit/Loss:</b> {money(analysis, analysis.profit)} ({analysis.profit_percent:.2f}%)"
         )
         
         try:
@@ -109,6 +132,30 @@ class AlertService:
         except AlertError as e:
             logger.error(f"Failed to send daily update: {e}")
     
+    def send_rule_alert(self, analysis: StockAnalysis, rule: AlertRule) -> None:
+        """
+        Send an alert for a position rule that fired
+        
+        Args:
+            analysis: Stock analysis result
+            rule: Rule that fired
+        """
+        title = RULE_ALERT_TITLES.get(rule.alert_type, "ALERT")
+        message = (
+            f"<b>{title}</b>\n\n"
+            f"<b>Stock:</b> {stock_label(analysis)}\n"
+            f"<b>Rule:</b> {rule.text}\n"
+            f"<b>Buy Price:</b> {money(analysis, analysis.buy_price)}\n"
+            f"<b>Current Price:</b> {money(analysis, analysis.current_price)}\n"
+            f"<b>Profit/Loss:</b> {money(analysis, analysis.profit)} ({analysis.profit_percent:.2f}%)"
+        )
+        
+        try:
+            self._send_telegram_message(message)
+            logger.info(f"Sent {rule.alert_type} alert for {analysis.symbol}")
+        except AlertError as e:
+            logger.error(f"Failed to send {rule.alert_type} alert: {e}")
+    
     def send_custom_alert(self, message: str) -> None:
         """
         Send a custom alert message
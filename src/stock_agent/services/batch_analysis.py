@@ -0,0 +1,219 @@
+"""Batch analysis of ad-hoc positions read from CSV or NDJSON"""
+
+import csv
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from itertools import chain, islice
+from typing import IO, Iterable, Iterator, List, NamedTuple, Optional, Set
+
+from stock_agent.services.stock_service import StockService
+from stock_agent.utils.logger import get_logger
+from stock_agent.utils.serialization import dumps, loads
+
+logger = get_logger(__name__)
+
+OUTPUT_FIELDS = (
+    "symbol", "buy_price", "target_price", "current_price",
+    "profit", "profit_percent", "decision", "error",
+)
+
+# Accepted spellings of the input columns
+_COLUMN_ALIASES = {
+    "symbol": ("symbol", "ticker"),
+    "buy_price": ("buy_price", "buy", "buy-price"),
+    "target_price": ("target_price", "target", "target-price"),
+}
+
+
+class AnalysisRequest(NamedTuple):
+    """One input row (error is set when the row could not be parsed)"""
+    
+    line: int
+    symbol: str
+    buy_price: Optional[float]
+    target_price: Optional[float]
+    error: Optional[str] = None
+
+
+def read_requests(stream: Iterable[str], fmt: str = "auto") -> Iterator[AnalysisRequest]:
+    """
+    Parse positions from CSV (with a header row) or NDJSON
+    
+    Args:
+        stream: Text input (lines)
+        fmt: "csv", "ndjson" or "auto" (NDJSON if the first non-blank
+            character is "{")
+    
+    Returns:
+        Requests in input order; malformed rows carry an error
+    """
+    if fmt == "auto":
+        stream = iter(stream)
+        head = next((line for line in stream if line.strip()), None)
+        if head is None:
+            return
+        fmt = "ndjson" if head.lstrip().startswith("{") else "csv"
+        stream = chain([head], stream)
+    
+    if fmt == "ndjson":
+        records = _ndjson_records(stream)
+    elif fmt == "csv":
+        records = ((reader.line_num, row) for reader in [csv.DictReader(stream)] for row in reader)
+    else:
+        raise ValueError(f"Unknown input format '{fmt}' (expected csv, ndjson or auto)")
+    
+    for line, record in records:
+        yield _to_request(line, record)
+
+
+def _ndjson_records(stream: Iterable[str]) -> Iterator[tuple]:
+    """Numbered JSON objects, one per non-blank line"""
+    for line, text in enumerate(stream, start=1):
+        if not text.strip():
+            continue
+        try:
+            record = loads(text.encode())
+        except ValueError as e:
+            yield line, {"__error__": f"Invalid JSON: {e}"}
+            continue
+        yield line, record if isinstance(record, dict) else {"__error__": "Expected a JSON object"}
+
+
+def _to_request(line: int, record: dict) -> AnalysisRequest:
+    """Validate a parsed record"""
+    if "__error__" in record:
+        return AnalysisRequest(line, "", None, None, record["__error__"])
+    
+    values = {}
+    lowered = {str(key).strip().lower(): value for key, value in record.items() if key is not None}
+    for field, aliases in _COLUMN_ALIASES.items():
+        values[field] = next((lowered[a] for a in aliases if lowered.get(a) not in (None, "")), None)
+    
+    symbol = str(values["symbol"] or "").strip().upper()
+    if not symbol:
+        return AnalysisRequest(line, "", None, None, "Missing symbol")
+    try:
+        buy_price = float(values["buy_price"])
+        target_price = float(values["target_price"])
+    except (TypeError, ValueError):
+        return AnalysisRequest(line, symbol, None, None, "buy_price and target_price must be numbers")
+    if buy_price <= 0 or target_price <= 0:
+        return AnalysisRequest(line, symbol, buy_price, target_price, "Prices must be positive")
+    return AnalysisRequest(line, symbol, buy_price, target_price)
+
+
+class BatchAnalyzer:
+    """
+    Analyzes many positions with batched, concurrent price fetches
+    
+    Requests are grouped into chunks of chunk_size symbols; each chunk is
+    priced with one batched fetch (MarketDataService.get_live_prices) and
+    up to workers chunks are in flight at once. Results are yielded chunk
+    by chunk as they complete, so output starts after the first chunk
+    and memory stays bounded however long the input is. Indicators are
+    not computed: they need each symbol's daily history.
+    """
+    
+    def __init__(self, stock_service: StockService, chunk_size: int = 50, workers: int = 8):
+        """
+        Initialize batch analyzer
+        
+        Args:
+            stock_service: Stock service used for pricing and analysis
+            chunk_size: Positions priced per batched fetch
+            workers: Chunks priced concurrently
+        """
+        self.stock_service = stock_service
+        self.chunk_size = max(chunk_size, 1)
+        self.workers = max(workers, 1)
+    
+    def run(self, requests: Iterable[AnalysisRequest]) -> Iterator[dict]:
+        """
+        Analyze positions
+        
+        Args:
+            requests: Parsed input rows
+        
+        Returns:
+            One output row (OUTPUT_FIELDS) per request, in chunk completion order
+        """
+        requests = iter(requests)
+        pending: Set[Future] = set()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="batch-analyze") as executor:
+            while True:
+                while len(pending) < self.workers * 2:
+                    chunk = list(islice(requests, self.chunk_size))
+                    if not chunk:
+                        break
+                    pending.add(executor.submit(self._analyze_chunk, chunk))
+                if not pending:
+                    return
+                
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+    
+    def _analyze_chunk(self, chunk: List[AnalysisRequest]) -> List[dict]:
+        """Price and analyze one chunk"""
+        valid = [request for request in chunk if request.error is None]
+        prices = self.stock_service.market_service.get_live_prices(
+            [request.symbol for request in valid]
+        ) if valid else {}
+        
+        rows = []
+        for request in chunk:
+            row = {
+                "symbol": request.symbol,
+                "buy_price": request.buy_price,
+                "target_price": request.target_price,
+                "current_price": None,
+                "profit": None,
+                "profit_percent": None,
+                "decision": None,
+                "error": request.error,
+            }
+            price = prices.get(request.symbol)
+            if request.error is None and price is None:
+                row["error"] = "No price available"
+            elif request.error is None:
+                analysis = self.stock_service.analyze_at_price(
+                    request.symbol, request.buy_price, request.target_price, price
+                )
+                row.update(
+                    current_price=analysis.current_price,
+                    profit=analysis.profit,
+                    profit_percent=analysis.profit_percent,
+                    decision=analysis.decision.name
+                )
+            rows.append(row)
+        return rows
+
+
+def write_csv(rows: Iterable[dict], out: IO[str]) -> int:
+    """
+    Stream output rows as CSV with a header
+    
+    Returns:
+        Number of rows written
+    """
+    writer = csv.DictWriter(out, fieldnames=OUTPUT_FIELDS, lineterminator="\n")
+    writer.writeheader()
+    count = 0
+    for count, row in enumerate(rows, start=1):
+        writer.writerow(row)
+        out.flush()
+    return count
+
+
+def write_json_lines(rows: Iterable[dict], out: IO[str]) -> int:
+    """
+    Stream output rows as JSON lines
+    
+    Returns:
+        Number of rows written
+    """
+    count = 0
+    for count, row in enumerate(rows, start=1):
+        out.write(dumps(row).decode())
+        out.write("\n")
+        out.flush()
+    return count
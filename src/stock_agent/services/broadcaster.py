@@ -0,0 +1,187 @@
+"""Fan-out of agent updates to streaming clients"""
+
+import asyncio
+import itertools
+import threading
+from typing import Any, FrozenSet, Iterable, List, Optional
+
+from stock_agent.utils.logger import get_logger
+from stock_agent.utils.serialization import dumps
+
+logger = get_logger(__name__)
+
+DROPPED_FRAME = b"event: dropped\ndata: {\"reason\": \"client too slow\"}\n\n"
+
+
+def sse_frame(event: str, data: Any, event_id: Optional[int] = None) -> bytes:
+    """Encode an event as a server-sent events frame"""
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\ndata: ".encode() + dumps(data) + b"\n\n"
+
+
+class Subscription:
+    """
+    One streaming client's buffer of pending frames
+    
+    The buffer lives on the client's event loop. When it is full the
+    client is dropped: pending frames are discarded and it receives a
+    final "dropped" frame, so one slow reader never holds back the others
+    or grows memory without bound. A subscription with symbols receives
+    only the updates of those symbols and updates tied to no symbol.
+    """
+    
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        max_buffer: int,
+        symbols: Optional[FrozenSet[str]] = None
+    ):
+        self._loop = loop
+        self.symbols = symbols
+        # Room for the dropped notice and the end marker
+        self._queue: "asyncio.Queue[Optional[bytes]]" = asyncio.Queue(maxsize=max(max_buffer, 2))
+        self.dropped = False
+        self.closed = False
+    
+    async def next(self, timeout: Optional[float] = None) -> Optional[bytes]:
+        """
+        Wait for the next frame
+        
+        Args:
+            timeout: Seconds to wait (forever if None)
+        
+        Returns:
+            Frame, or None once the subscription ended
+        
+        Raises:
+            asyncio.TimeoutError: If nothing arrived within timeout
+        """
+        return await asyncio.wait_for(self._queue.get(), timeout)
+    
+    def wants(self, symbol: Optional[str]) -> bool:
+        """Whether an update about a symbol (None for none) goes to this client"""
+        return self.symbols is None or symbol is None or symbol in self.symbols
+    
+    def _deliver(self, frame: bytes) -> None:
+        """Queue a frame (runs on the client's loop)"""
+        if self.closed:
+            return
+        try:
+            self._queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            self.dropped = True
+            self._end(DROPPED_FRAME)
+    
+    def _end(self, notice: Optional[bytes] = None) -> None:
+        """Discard pending frames and end the stream (runs on the client's loop)"""
+        if self.closed:
+            return
+        self.closed = True
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        if notice is not None:
+            self._queue.put_nowait(notice)
+        self._queue.put_nowait(None)
+
+
+class Broadcaster:
+    """
+    Publishes agent updates to every subscribed client
+    
+    Each update is serialised once into an SSE frame and the same bytes
+    are handed to every subscriber's buffer, so the cost of an update does
+    not grow with the payload times the number of clients; a client's
+    symbol filter only decides which clients get the frame. publish() is
+    thread-safe and never blocks on clients: frames are handed to each
+    client's event loop.
+    """
+    
+    def __init__(self, max_buffer: int = 100):
+        """
+        Initialize broadcaster
+        
+        Args:
+            max_buffer: Frames a client may fall behind before it is dropped
+        """
+        self.max_buffer = max_buffer
+        self._subscriptions: List[Subscription] = []
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._published = 0
+        self._dropped = 0
+    
+    def subscribe(self, symbols: Optional[Iterable[str]] = None) -> Subscription:
+        """
+        Add a client (must be called from the client's event loop)
+        
+        Args:
+            symbols: Only receive updates of these symbols (all if None)
+        
+        Returns:
+            Subscription to read frames from
+        """
+        subscription = Subscription(
+            asyncio.get_running_loop(),
+            self.max_buffer,
+            frozenset(symbols) if symbols is not None else None
+        )
+        with self._lock:
+            self._subscriptions.append(subscription)
+        logger.debug(f"Stream client subscribed ({len(self._subscriptions)} connected)")
+        return subscription
+    
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Remove a client"""
+        with self._lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+                if subscription.dropped:
+                    self._dropped += 1
+    
+    def publish(self, event: str, data: Any, symbol: Optional[str] = None) -> int:
+        """
+        Send an update to every client that wants it
+        
+        Args:
+            event: Event name
+            data: JSON-serialisable payload
+            symbol: Symbol the update is about (None sends it to every client)
+        
+        Returns:
+            Number of clients the update was handed to
+        """
+        with self._lock:
+            subscriptions = [s for s in self._subscriptions if not s.closed and s.wants(symbol)]
+            if not subscriptions:
+                return 0
+            frame = sse_frame(event, data, next(self._ids))
+            self._published += 1
+        
+        delivered = 0
+        for subscription in subscriptions:
+            try:
+                subscription._loop.call_soon_threadsafe(subscription._deliver, frame)
+                delivered += 1
+            except RuntimeError:
+                # The client's loop is gone
+                self.unsubscribe(subscription)
+        return delivered
+    
+    def close(self) -> None:
+        """End every client's stream"""
+        with self._lock:
+            subscriptions, self._subscriptions = self._subscriptions, []
+        for subscription in subscriptions:
+            try:
+                subscription._loop.call_soon_threadsafe(subscription._end)
+            except RuntimeError:
+                pass
+    
+    def snapshot(self) -> dict:
+        """Counters for health reporting"""
+        with self._lock:
+            return {
+                "clients": len(self._subscriptions),
+                "published": self._published,
+                "dropped_clients": self._dropped + sum(s.dropped for s in self._subscriptions),
+            }
@@ -0,0 +1,137 @@
+"""Build the stock service and its components from settings"""
+
+import os
+import socket
+from typing import Optional
+
+from stock_agent.config import Settings
+from stock_agent.providers import create_provider, create_rate_limiter
+from stock_agent.repositories.history_cache import HistoryCache
+from stock_agent.repositories.lease_store import LeaseStore
+from stock_agent.repositories.metadata_cache import MetadataCache
+from stock_agent.repositories.quote_cache import QuoteCache
+from stock_agent.repositories.run_history import RunHistoryStore
+from stock_agent.repositories.snapshot_store import SnapshotStore
+from stock_agent.repositories.stock_repository import JSONStockRepository
+from stock_agent.repositories.symbol_cache import SymbolCache
+from stock_agent.services.alert_service import AlertService
+from stock_agent.services.broadcaster import Broadcaster
+from stock_agent.services.fx_service import FxService, market_fx_source
+from stock_agent.services.indicator_engine import IndicatorEngine
+from stock_agent.services.market_data_service import MarketDataService
+from stock_agent.services.memory_monitor import MemoryMonitor
+from stock_agent.services.sharding import ShardCoordinator
+from stock_agent.services.stock_service import StockService
+from stock_agent.utils.resilience import CircuitBreaker, RetryPolicy
+
+
+def create_market_service(settings: Settings) -> MarketDataService:
+    """
+    Create the market data service configured by settings
+    
+    Caches, retries, the circuit breaker and the rate limiter all come
+    from settings.
+    
+    Args:
+        settings: Application settings
+    
+    Returns:
+        Market data service
+    """
+    return MarketDataService(
+        timeout=settings.market_data_timeout,
+        provider=create_provider(settings),
+        batch_size=settings.market_data_batch_size,
+        history_cache=HistoryCache(settings.history_cache_dir),
+        quote_cache=(
+            QuoteCache(settings.quote_cache_path, settings.quote_cache_ttl_seconds)
+            if settings.quote_cache_ttl_seconds > 0 else None
+        ),
+        retry_policy=RetryPolicy(
+            attempts=settings.market_data_retry_attempts,
+            base_delay=settings.market_data_backoff_base,
+            max_delay=settings.market_data_backoff_max
+        ),
+        circuit_breaker=CircuitBreaker(
+            "market_data",
+            failure_threshold=settings.market_data_breaker_threshold,
+            reset_timeout=settings.market_data_breaker_reset_seconds
+        ),
+        rate_limiter=create_rate_limiter(settings),
+        symbol_cache=SymbolCache(
+            settings.symbol_cache_path,
+            valid_ttl_seconds=settings.symbol_valid_ttl_seconds,
+            invalid_ttl_seconds=settings.symbol_invalid_ttl_seconds
+        ) if settings.symbol_cache_path else None,
+        metadata_cache=MetadataCache(
+            settings.metadata_cache_path,
+            ttl_seconds=settings.metadata_ttl_seconds,
+            refresh_after_seconds=settings.metadata_refresh_after_seconds
+        ) if settings.metadata_cache_path else None
+    )
+
+
+def create_stock_service(settings: Settings, broadcaster: Optional[Broadcaster] = None) -> StockService:
+    """
+    Create the stock service and every component enabled by settings
+    
+    The API container and the CLI both build their services here, so
+    they run with the same configuration.
+    
+    Args:
+        settings: Application settings
+        broadcaster: Receives updates for streaming clients (optional)
+    
+    Returns:
+        Stock service
+    """
+    market_service = create_market_service(settings)
+    
+    indicator_engine = None
+    if settings.indicators_enabled:
+        indicator_engine = IndicatorEngine(
+            settings.indicator_state_path,
+            sma_period=settings.sma_period,
+            ema_period=settings.ema_period,
+            rsi_period=settings.rsi_period,
+            atr_period=settings.atr_period,
+            lookback_days=settings.indicator_lookback_days
+        )
+    
+    shard_coordinator = None
+    if settings.shard_enabled:
+        shard_coordinator = ShardCoordinator(
+            LeaseStore(settings.shard_store_path),
+            settings.instance_id or f"{socket.gethostname()}-{os.getpid()}",
+            lease_seconds=settings.shard_lease_seconds,
+            vnodes=settings.shard_vnodes,
+            alert_window_seconds=settings.alert_dedupe_window_seconds,
+            member_ttl_seconds=settings.shard_member_ttl_seconds,
+            heartbeat_seconds=settings.shard_heartbeat_seconds
+        )
+    
+    return StockService(
+        market_service,
+        AlertService(settings),
+        JSONStockRepository(settings.data_file_path, settings.portfolio_check_interval),
+        settings,
+        indicator_engine=indicator_engine,
+        shard_coordinator=shard_coordinator,
+        snapshot_store=SnapshotStore(settings.snapshot_file_path) if settings.incremental_runs else None,
+        run_history=RunHistoryStore(
+            settings.run_history_dir,
+            retention_days=settings.run_history_retention_days,
+            downsample_after_days=settings.run_history_downsample_after_days,
+            downsample_seconds=settings.run_history_downsample_minutes * 60
+        ) if settings.run_history_dir else None,
+        broadcaster=broadcaster,
+        fx_service=FxService(
+            market_fx_source(market_service),
+            reporting_currency=settings.reporting_currency,
+            ttl_seconds=settings.fx_ttl_seconds
+        ),
+        memory_monitor=MemoryMonitor(
+            frames=settings.memory_trace_frames,
+            max_snapshots=settings.memory_snapshots_kept
+        ) if settings.memory_tracking else None
+    )
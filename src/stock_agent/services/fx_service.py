@@ -0,0 +1,130 @@
+"""Exchange rate table for reporting in a single currency"""
+
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from stock_agent.utils.currency import convert_amounts, fx_pair
+from stock_agent.utils.exceptions import MarketDataError
+from stock_agent.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+FxSource = Callable[[List[str], str], Dict[str, float]]
+"""Fetch rates of several currencies into a reporting currency in one request"""
+
+
+def market_fx_source(market_service) -> FxSource:
+    """
+    FX source quoting currency pairs (e.g. INRUSD=X) through the market data service
+    
+    Args:
+        market_service: Market data service (batched, cached and rate limited)
+    
+    Returns:
+        Source fetching all requested pairs with one get_live_prices call
+    """
+    def fetch(currencies: List[str], reporting_currency: str) -> Dict[str, float]:
+        pairs = {fx_pair(currency, reporting_currency): currency for currency in currencies}
+        prices = market_service.get_live_prices(list(pairs))
+        return {pairs[pair]: price for pair, price in prices.items() if pair in pairs}
+    
+    return fetch
+
+
+class FxService:
+    """
+    Exchange rates into the reporting currency, cached with a TTL
+    
+    refresh() requests every missing or expired rate in one batch, so an
+    agent run or a summary costs at most one upstream call however many
+    positions share a currency. A rate that cannot be refreshed keeps its
+    last value until it is fetched again.
+    """
+    
+    def __init__(
+        self,
+        source: FxSource,
+        reporting_currency: str = "USD",
+        ttl_seconds: float = 3600,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize FX service
+        
+        Args:
+            source: Fetches rates for a batch of currencies
+            reporting_currency: Currency positions are converted into
+            ttl_seconds: Age after which a rate is fetched again
+            clock: Monotonic time source (for tests)
+        """
+        self.source = source
+        self.reporting_currency = reporting_currency.upper()
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._rates: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+    
+    def refresh(self, currencies: Iterable[str]) -> Dict[str, float]:
+        """
+        Fetch the rates of currencies that are missing or expired
+        
+        Args:
+            currencies: Currencies that need a rate
+        
+        Returns:
+            Known rates of the requested currencies (the reporting
+            currency included)
+        """
+        wanted = {currency.upper() for currency in currencies}
+        with self._lock:
+            now = self._clock()
+            due = sorted(
+                currency for currency in wanted - {self.reporting_currency}
+                if currency not in self._rates or now - self._rates[currency][1] >= self.ttl_seconds
+            )
+            if due:
+                try:
+                    fetched = self.source(due, self.reporting_currency)
+                except MarketDataError as e:
+                    logger.warning(f"Failed to refresh FX rates for {', '.join(due)}: {e}")
+                    fetched = {}
+                for currency, rate in fetched.items():
+                    self._rates[currency] = (rate, now)
+                missing = [currency for currency in due if currency not in fetched]
+                if missing:
+                    logger.warning(f"No FX rate into {self.reporting_currency} for {', '.join(missing)}")
+                logger.debug(f"Refreshed {len(fetched)} FX rate(s) in one batch")
+        return self.rates(wanted)
+    
+    def rates(self, currencies: Optional[Iterable[str]] = None) -> Dict[str, float]:
+        """
+        Cached rates, including expired ones, without contacting the source
+        
+        Args:
+            currencies: Currencies to include (all if None)
+        
+        Returns:
+            Units of the reporting currency per unit of each currency
+        """
+        with self._lock:
+            rates = {currency: rate for currency, (rate, _) in self._rates.items()}
+        rates[self.reporting_currency] = 1.0
+        if currencies is None:
+            return rates
+        return {currency: rates[currency] for currency in currencies if currency in rates}
+    
+    def convert(self, amounts: np.ndarray, currencies: Sequence[str]) -> np.ndarray:
+        """
+        Convert amounts into the reporting currency using cached rates
+        
+        Args:
+            amounts: Amounts (NaN allowed)
+            currencies: Currency of each amount
+        
+        Returns:
+            Converted amounts, NaN where no rate is cached
+        """
+        return convert_amounts(amounts, currencies, self.rates())
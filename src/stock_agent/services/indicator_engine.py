@@ -0,0 +1,416 @@
+"""Technical indicators computed over history and updated incrementally"""
+
+import os
+import threading
+from collections import deque
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+from stock_agent.models.stock import TechnicalIndicators
+from stock_agent.repositories.history_cache import PriceHistory
+from stock_agent.utils.exceptions import StorageError
+from stock_agent.utils.logger import get_logger
+from stock_agent.utils.serialization import dumps, loads
+
+logger = get_logger(__name__)
+
+# Chunk length for the vectorised recurrence; keeps decay ** -k finite for
+# every alpha <= 2/3 (periods of 2 and more)
+_CHUNK = 128
+
+
+def sma(close: np.ndarray, period: int) -> np.ndarray:
+    """Simple moving average (NaN until period closes are available)"""
+    out = np.full(len(close), np.nan)
+    if len(close) >= period:
+        windows = np.lib.stride_tricks.sliding_window_view(close, period)
+        out[period - 1:] = windows.mean(axis=1)
+    return out
+
+
+def ema(close: np.ndarray, period: int) -> np.ndarray:
+    """Exponential moving average seeded with the SMA of the first period closes"""
+    return _smoothed(np.asarray(close, dtype=float), period, 2.0 / (period + 1))
+
+
+def rsi(close: np.ndarray, period: int) -> np.ndarray:
+    """Relative strength index with Wilder smoothing"""
+    close = np.asarray(close, dtype=float)
+    out = np.full(len(close), np.nan)
+    if len(close) > period:
+        gains, losses = _gains_losses(close)
+        out[1:] = _rsi(_smoothed(gains, period, 1.0 / period), _smoothed(losses, period, 1.0 / period))
+    return out
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int) -> np.ndarray:
+    """Average true range with Wilder smoothing"""
+    out = np.full(len(close), np.nan)
+    if len(close) > period:
+        out[1:] = _smoothed(_true_range(high, low, close), period, 1.0 / period)
+    return out
+
+
+def _ewm(values: np.ndarray, alpha: float, initial: float) -> np.ndarray:
+    """
+    Evaluate y[t] = y[t-1] + alpha * (x[t] - y[t-1]) from y[-1] = initial
+    
+    The recurrence is solved in closed form one chunk at a time, so the work
+    is vectorised while the weights stay within floating-point range.
+    """
+    out = np.empty(len(values))
+    decay = 1.0 - alpha
+    previous = initial
+    for start in range(0, len(values), _CHUNK):
+        chunk = values[start:start + _CHUNK]
+        k = np.arange(len(chunk))
+        weighted = alpha * np.cumsum(chunk * decay ** -k) * decay ** k
+        out[start:start + len(chunk)] = previous * decay ** (k + 1) + weighted
+        previous = out[start + len(chunk) - 1]
+    return out
+
+
+def _smoothed(values: np.ndarray, period: int, alpha: float) -> np.ndarray:
+    """Exponential smoothing seeded with the mean of the first period values"""
+    out = np.full(len(values), np.nan)
+    if len(values) >= period:
+        seed = values[:period].mean()
+        out[period - 1] = seed
+        out[period:] = _ewm(values[period:], alpha, seed)
+    return out
+
+
+def _gains_losses(close: np.ndarray):
+    """Upward and downward close-to-close changes"""
+    change = np.diff(close)
+    return np.clip(change, 0, None), np.clip(-change, 0, None)
+
+
+def _true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """True range of every bar after the first"""
+    previous = close[:-1]
+    return np.maximum.reduce([
+        high[1:] - low[1:],
+        np.abs(high[1:] - previous),
+        np.abs(low[1:] - previous),
+    ])
+
+
+def _rsi(avg_gain, avg_loss):
+    """RSI from smoothed gains and losses (50 when flat, 100 without losses)"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        value = 100.0 - 100.0 / (1.0 + np.divide(avg_gain, avg_loss))
+    return np.where(avg_loss == 0, np.where(avg_gain == 0, 50.0, 100.0), value)
+
+
+class IndicatorState:
+    """
+    Running indicator state of one symbol
+    
+    While an indicator is warming up its field holds the plain sum of its
+    inputs; once period inputs have been seen it holds the smoothed value.
+    """
+    
+    __slots__ = ("last_date", "count", "last_close", "closes", "ema", "avg_gain", "avg_loss", "atr")
+    
+    def __init__(self, sma_period: int):
+        self.last_date: Optional[date] = None
+        self.count = 0
+        self.last_close = 0.0
+        self.closes = deque(maxlen=sma_period)
+        self.ema = 0.0
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+        self.atr = 0.0
+    
+    def copy(self) -> "IndicatorState":
+        """Independent copy for provisional updates"""
+        clone = IndicatorState(self.closes.maxlen)
+        for name in self.__slots__:
+            setattr(clone, name, getattr(self, name))
+        clone.closes = deque(self.closes, maxlen=self.closes.maxlen)
+        return clone
+    
+    def to_dict(self) -> dict:
+        """Persisted form"""
+        data = {name: getattr(self, name) for name in self.__slots__}
+        data["last_date"] = self.last_date.isoformat() if self.last_date else None
+        data["closes"] = list(self.closes)
+        return data
+    
+    @classmethod
+    def from_dict(cls, data: dict, sma_period: int) -> "IndicatorState":
+        """Restore from the persisted form"""
+        state = cls(sma_period)
+        for name in cls.__slots__:
+            setattr(state, name, data[name])
+        state.last_date = date.fromisoformat(data["last_date"]) if data["last_date"] else None
+        state.closes = deque(data["closes"], maxlen=sma_period)
+        return state
+
+
+class IndicatorEngine:
+    """
+    SMA/EMA/RSI/ATR per symbol, seeded vectorised and then updated per bar
+    
+    The first time a symbol is seen its indicators are computed with NumPy
+    over the whole available history. After that only bars newer than the
+    persisted state are applied, each in O(1). Only completed daily bars
+    are folded into the persisted state; today's bar (or the live price)
+    is applied to a copy so intraday values never leak into the state.
+    """
+    
+    def __init__(
+        self,
+        state_path: Optional[str] = None,
+        sma_period: int = 20,
+        ema_period: int = 20,
+        rsi_period: int = 14,
+        atr_period: int = 14,
+        lookback_days: int = 400
+    ):
+        """
+        Initialize indicator engine
+        
+        Args:
+            state_path: JSON file holding the running state (in memory only if None)
+            sma_period: Simple moving average window
+            ema_period: Exponential moving average period
+            rsi_period: RSI period
+            atr_period: ATR period
+            lookback_days: Calendar days of history used to seed a new symbol
+        
+        Raises:
+            ValueError: If a period is shorter than 2
+        """
+        self.periods = {"sma": sma_period, "ema": ema_period, "rsi": rsi_period, "atr": atr_period}
+        if min(self.periods.values()) < 2:
+            raise ValueError("Indicator periods must be at least 2")
+        
+        self.lookback_days = lookback_days
+        self.state_path = Path(state_path) if state_path else None
+        self._states: Dict[str, IndicatorState] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._load()
+        logger.info(f"Initialized IndicatorEngine with {len(self._states)} symbols")
+    
+    def history_start(self, symbol: str, today: Optional[date] = None) -> date:
+        """
+        Get the first date of history needed to bring a symbol up to date
+        
+        Args:
+            symbol: Stock symbol
+            today: Current date (today if None)
+        
+        Returns:
+            Start date for the history request
+        """
+        state = self._states.get(symbol)
+        if state is not None and state.last_date is not None:
+            return state.last_date + timedelta(days=1)
+        return (today or date.today()) - timedelta(days=self.lookback_days)
+    
+    def refresh(
+        self,
+        symbol: str,
+        history: PriceHistory,
+        current_price: Optional[float] = None,
+        today: Optional[date] = None
+    ) -> Optional[TechnicalIndicators]:
+        """
+        Fold new completed bars into the state and get current values
+        
+        Args:
+            symbol: Stock symbol
+            history: Daily bars from history_start(symbol) onwards
+            current_price: Live price, used as today's close (optional)
+            today: Current date (today if None)
+        
+        Returns:
+            Indicator values including today's provisional bar, or None if
+            no bars are known for the symbol
+        """
+        today = today or date.today()
+        with self._lock:
+            state = self._states.get(symbol)
+            complete = history.dates < np.datetime64(today, "D")
+            
+            if state is None or state.last_date is None:
+                state = self._seed(history.slice(0, int(complete.sum())))
+                self._states[symbol] = state
+                self._dirty = True
+            else:
+                after = history.dates > np.datetime64(state.last_date, "D")
+                for i in np.flatnonzero(complete & after).tolist():
+                    self._update(state, history.high[i], history.low[i], history.close[i])
+                    state.last_date = history.dates[i].astype(date)
+                    self._dirty = True
+            
+            provisional = state
+            today_bars = np.flatnonzero(~complete)
+            if len(today_bars) or current_price is not None:
+                provisional = state.copy()
+                if len(today_bars):
+                    i = today_bars[-1]
+                    high, low, close = history.high[i], history.low[i], history.close[i]
+                    if current_price is not None:
+                        close = current_price
+                        high, low = max(high, close), min(low, close)
+                else:
+                    high = low = close = current_price
+                self._update(provisional, high, low, close)
+                provisional.last_date = today
+            
+            return self._values(provisional)
+    
+    def values(self, symbol: str) -> Optional[TechnicalIndicators]:
+        """
+        Get indicator values as of the last completed bar
+        
+        Args:
+            symbol: Stock symbol
+        
+        Returns:
+            Persisted indicator values, or None if the symbol is unknown
+        """
+        state = self._states.get(symbol)
+        return self._values(state) if state is not None else None
+    
+    def save(self) -> None:
+        """
+        Persist the running state if it changed
+        
+        Raises:
+            StorageError: If the state file cannot be written
+        """
+        if self.state_path is None or not self._dirty:
+            return
+        
+        with self._lock:
+            payload = {
+                "periods": self.periods,
+                "states": {symbol: state.to_dict() for symbol, state in self._states.items()},
+            }
+            try:
+                self.state_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.state_path.with_suffix(".tmp")
+                tmp_path.write_bytes(dumps(payload))
+                os.replace(tmp_path, self.state_path)
+            except OSError as e:
+                raise StorageError("save indicators", str(e))
+            self._dirty = False
+        logger.debug(f"Saved indicator state for {len(self._states)} symbols")
+    
+    def _load(self) -> None:
+        """Restore persisted state, discarding it if the periods changed"""
+        if self.state_path is None or not self.state_path.exists():
+            return
+        
+        try:
+            payload = loads(self.state_path.read_bytes())
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable indicator state {self.state_path}: {e}")
+            return
+        
+        if payload.get("periods") != self.periods:
+            logger.info("Indicator periods changed, state will be rebuilt from history")
+            return
+        
+        self._states = {
+            symbol: IndicatorState.from_dict(data, self.periods["sma"])
+            for symbol, data in payload["states"].items()
+        }
+    
+    def _seed(self, history: PriceHistory) -> IndicatorState:
+        """Build the state from a full history in one vectorised pass"""
+        state = IndicatorState(self.periods["sma"])
+        count = len(history)
+        if count == 0:
+            return state
+        
+        close = np.asarray(history.close, dtype=float)
+        high = np.asarray(history.high, dtype=float)
+        low = np.asarray(history.low, dtype=float)
+        
+        state.count = count
+        state.last_date = history.dates[-1].astype(date)
+        state.last_close = float(close[-1])
+        state.closes.extend(close[-self.periods["sma"]:].tolist())
+        state.ema = _last_smoothed(close, self.periods["ema"], 2.0 / (self.periods["ema"] + 1))
+        
+        if count > 1:
+            gains, losses = _gains_losses(close)
+            period = self.periods["rsi"]
+            state.avg_gain = _last_smoothed(gains, period, 1.0 / period)
+            state.avg_loss = _last_smoothed(losses, period, 1.0 / period)
+            period = self.periods["atr"]
+            state.atr = _last_smoothed(_true_range(high, low, close), period, 1.0 / period)
+        
+        return state
+    
+    def _update(self, state: IndicatorState, high: float, low: float, close: float) -> None:
+        """Apply one bar to the state in O(1)"""
+        high, low, close = float(high), float(low), float(close)
+        state.count += 1
+        state.closes.append(close)
+        
+        period = self.periods["ema"]
+        if state.count <= period:
+            state.ema += close
+            if state.count == period:
+                state.ema /= period
+        else:
+            state.ema += 2.0 / (period + 1) * (close - state.ema)
+        
+        changes = state.count - 1
+        if changes >= 1:
+            previous = state.last_close
+            change = close - previous
+            true_range = max(high - low, abs(high - previous), abs(low - previous))
+            
+            period = self.periods["rsi"]
+            if changes <= period:
+                state.avg_gain += max(change, 0.0)
+                state.avg_loss += max(-change, 0.0)
+                if changes == period:
+                    state.avg_gain /= period
+                    state.avg_loss /= period
+            else:
+                state.avg_gain += (max(change, 0.0) - state.avg_gain) / period
+                state.avg_loss += (max(-change, 0.0) - state.avg_loss) / period
+            
+            period = self.periods["atr"]
+            if changes <= period:
+                state.atr += true_range
+                if changes == period:
+                    state.atr /= period
+            else:
+                state.atr += (true_range - state.atr) / period
+        
+        state.last_close = close
+    
+    def _values(self, state: IndicatorState) -> Optional[TechnicalIndicators]:
+        """Indicator values of a state (None for indicators still warming up)"""
+        if state.count == 0:
+            return None
+        
+        changes = state.count - 1
+        return TechnicalIndicators(
+            as_of=state.last_date,
+            bars=state.count,
+            sma=sum(state.closes) / len(state.closes) if state.count >= self.periods["sma"] else None,
+            ema=state.ema if state.count >= self.periods["ema"] else None,
+            rsi=float(_rsi(state.avg_gain, state.avg_loss)) if changes >= self.periods["rsi"] else None,
+            atr=state.atr if changes >= self.periods["atr"] else None
+        )
+
+
+def _last_smoothed(values: np.ndarray, period: int, alpha: float) -> float:
+    """Last smoothed value, or the running sum while still warming up"""
+    if len(values) < period:
+        return float(values.sum())
+    return float(_smoothed(values, period, alpha)[-1])
@@ -0,0 +1,195 @@
+"""Background execution of agent runs"""
+
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Optional, Tuple
+
+from stock_agent.models.enums import JobStatus
+from stock_agent.models.stock import AgentJobStatus, AgentRunDiff, JobProgress
+from stock_agent.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class RunProgress:
+    """
+    Live view of a running agent run, with a cancellation flag
+    
+    The run registers its diff with begin() and keeps appending to it;
+    readers take copies, so they see partial results without locking the
+    run. Cancellation is checked by the run between positions.
+    """
+    
+    def __init__(self):
+        self.total = 0
+        self.diff = AgentRunDiff()
+        self._cancelled = threading.Event()
+    
+    def begin(self, total: int, diff: AgentRunDiff) -> None:
+        """Start tracking a run over total positions"""
+        self.total = total
+        self.diff = diff
+    
+    def cancel(self) -> None:
+        """Ask the run to stop after the current position"""
+        self._cancelled.set()
+    
+    @property
+    def cancelled(self) -> bool:
+        """Whether cancellation was requested"""
+        return self._cancelled.is_set()
+    
+    def counters(self) -> JobProgress:
+        """Progress counters"""
+        changed, unchanged, errored = (
+            len(self.diff.changed), len(self.diff.unchanged), len(self.diff.errored)
+        )
+        return JobProgress(
+            total=self.total,
+            done=changed + unchanged + errored,
+            changed=changed,
+            unchanged=unchanged,
+            errored=errored
+        )
+
+
+class AgentJob:
+    """A queued, running or finished agent run"""
+    
+    def __init__(self):
+        self.job_id = uuid.uuid4().hex
+        self.status = JobStatus.QUEUED
+        self.created_at = datetime.now()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.error: Optional[str] = None
+        self.progress = RunProgress()
+    
+    def to_status(self) -> AgentJobStatus:
+        """Snapshot for the API"""
+        diff = self.progress.diff
+        return AgentJobStatus(
+            job_id=self.job_id,
+            status=self.status,
+            created_at=self.created_at,
+            started_at=self.started_at,
+            finished_at=self.finished_at,
+            progress=self.progress.counters(),
+            results=list(diff.changed),
+            unchanged=[analysis.symbol for analysis in list(diff.unchanged)],
+            errors=list(diff.errored),
+            error=self.error
+        )
+
+
+AgentRunner = Callable[[RunProgress], AgentRunDiff]
+"""Runs the agent, reporting into a RunProgress"""
+
+
+class JobManager:
+    """
+    Runs agent jobs one at a time on a background thread
+    
+    Only one job is active at a time: submitting while a job is queued or
+    running returns that job, so a retried request does not start a
+    second run. Finished jobs are kept for polling, up to max_finished.
+    """
+    
+    def __init__(self, max_finished: int = 20):
+        """
+        Initialize job manager
+        
+        Args:
+            max_finished: Finished jobs kept for polling
+        """
+        self.max_finished = max_finished
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="agent-job")
+        self._jobs: "OrderedDict[str, AgentJob]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def submit(self, runner: AgentRunner) -> Tuple[AgentJob, bool]:
+        """
+        Start an agent job unless one is already active
+        
+        Args:
+            runner: Function running the agent
+        
+        Returns:
+            The job, and whether it was created by this call
+        """
+        with self._lock:
+            for job in self._jobs.values():
+                if not job.status.finished:
+                    return job, False
+            
+            job = AgentJob()
+            self._jobs[job.job_id] = job
+            self._prune()
+        
+        self._executor.submit(self._execute, job, runner)
+        logger.info(f"Queued agent job {job.job_id}")
+        return job, True
+    
+    def get(self, job_id: str) -> Optional[AgentJob]:
+        """Look up a job"""
+        with self._lock:
+            return self._jobs.get(job_id)
+    
+    def cancel(self, job_id: str) -> Optional[AgentJob]:
+        """
+        Cancel a job; a running job stops after its current position
+        
+        Args:
+            job_id: Job to cancel
+        
+        Returns:
+            The job, or None if unknown
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status.finished:
+                return job
+            job.progress.cancel()
+            if job.status == JobStatus.QUEUED:
+                job.status = JobStatus.CANCELLED
+                job.finished_at = datetime.now()
+        logger.info(f"Cancellation requested for agent job {job_id}")
+        return job
+    
+    def shutdown(self) -> None:
+        """Cancel active jobs and wait for the worker to stop"""
+        with self._lock:
+            active = [job.job_id for job in self._jobs.values() if not job.status.finished]
+        for job_id in active:
+            self.cancel(job_id)
+        self._executor.shutdown(wait=True, cancel_futures=True)
+    
+    def _execute(self, job: AgentJob, runner: AgentRunner) -> None:
+        """Run a job on the worker thread"""
+        with self._lock:
+            if job.status.finished:
+                return
+            job.status = JobStatus.RUNNING
+            job.started_at = datetime.now()
+        
+        try:
+            runner(job.progress)
+            status = JobStatus.CANCELLED if job.progress.cancelled else JobStatus.SUCCEEDED
+        except Exception as e:
+            logger.error(f"Agent job {job.job_id} failed: {e}")
+            job.error = str(e)
+            status = JobStatus.FAILED
+        
+        with self._lock:
+            job.status = status
+            job.finished_at = datetime.now()
+        logger.info(f"Agent job {job.job_id} {status}: {job.progress.counters().done} position(s) processed")
+    
+    def _prune(self) -> None:
+        """Drop the oldest finished jobs beyond max_finished (lock must be held)"""
+        finished = [job_id for job_id, job in self._jobs.items() if job.status.finished]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
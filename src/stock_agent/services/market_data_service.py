@@ -1,35 +1,156 @@
 """Market data service for fetching stock prices"""
 
 import time
-from typing import Optional
+from datetime import date
+from typing import Callable, Dict, List, Optional, TypeVar
 
-import yfinance as yf
-
-from stock_agent.utils.exceptions import InvalidSymbolError, MarketDataError
+from stock_agent.models.stock import StockMetadata
+from stock_agent.providers.base import MarketDataProvider
+from stock_agent.providers.yfinance_provider import YFinanceProvider
+from stock_agent.repositories.history_cache import HistoryCache, PriceHistory
+from stock_agent.repositories.metadata_cache import MetadataCache
+from stock_agent.repositories.quote_cache import QuoteCache
+from stock_agent.repositories.symbol_cache import SymbolCache, SymbolStatus
+from stock_agent.utils.exceptions import (
+    InvalidSymbolError,
+    MarketDataError,
+    RateLimitedError,
+    StorageError,
+)
 from stock_agent.utils.logger import get_logger
+from stock_agent.utils.rate_limiter import RateLimiter
+from stock_agent.utils.resilience import (
+    CircuitBreaker,
+    RetryPolicy,
+    is_retryable,
+    retry_after,
+    status_code_of,
+)
 
 logger = get_logger(__name__)
 
+T = TypeVar("T")
+
 
 class MarketDataService:
-    """Service for fetching market data from Yahoo Finance"""
+    """Service for fetching market data through a provider (Yahoo Finance by default)"""
     
-    def __init__(self, timeout: int = 10, retry_attempts: int = 3):
+    def __init__(
+        self,
+        timeout: int = 10,
+        retry_attempts: int = 3,
+        provider: Optional[MarketDataProvider] = None,
+        batch_size: int = 50,
+        history_cache: Optional[HistoryCache] = None,
+        quote_cache: Optional[QuoteCache] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        symbol_cache: Optional[SymbolCache] = None,
+        metadata_cache: Optional[MetadataCache] = None,
+        sleep: Callable[[float], None] = time.sleep
+    ):
         """
         Initialize market data service
         
         Args:
             timeout: Request timeout in seconds
-            retry_attempts: Number of retry attempts on failure
+            retry_attempts: Number of attempts per call (used when no retry_policy is given)
+            provider: Upstream data source (YFinanceProvider by default)
+            batch_size: Maximum symbols per batched quote request
+            history_cache: Local store for daily history (optional)
+            quote_cache: Latest prices shared with other processes (optional)
+            retry_policy: Backoff between attempts (exponential with jitter by default)
+            circuit_breaker: Breaker shared by all upstream calls of this service
+            rate_limiter: Token bucket every upstream request must pass (unlimited if None)
+            symbol_cache: Remembers which symbols exist and which do not (optional)
+            metadata_cache: Persistent store of symbol metadata (optional)
+            sleep: Function used to wait between attempts
         """
         self.timeout = timeout
-        self.retry_attempts = retry_attempts
-        logger.info("Initialized MarketDataService")
+        self.provider = provider or YFinanceProvider(timeout=timeout)
+        self.batch_size = max(batch_size, 1)
+        self.retry_policy = retry_policy or RetryPolicy(attempts=retry_attempts)
+        self.retry_attempts = self.retry_policy.attempts
+        self.circuit_breaker = circuit_breaker or CircuitBreaker("market_data")
+        self.rate_limiter = rate_limiter
+        self.history_cache = history_cache
+        self.quote_cache = quote_cache
+        self.symbol_cache = symbol_cache
+        self.metadata_cache = metadata_cache
+        self._sleep = sleep
+        logger.info(f"Initialized MarketDataService with provider '{self.provider.name}'")
+    
+    def close(self) -> None:
+        """Close cache connections and the rate limiter and drop history memory maps"""
+        for resource in (
+            self.quote_cache, self.symbol_cache, self.metadata_cache, self.history_cache, self.rate_limiter
+        ):
+            if resource is not None:
+                resource.close()
+    
+    def _call(self, symbol: str, operation: Callable[[], T]) -> T:
+        """
+        Run an upstream call with retries and circuit breaking
+        
+        Symbol errors are raised at once and do not count against the
+        breaker. Transient failures (timeouts, connection errors, 429 and
+        5xx) are retried with jittered exponential backoff, honouring
+        Retry-After, and count as breaker failures. Other errors are not
+        retried. Every attempt first takes a token from the rate limiter,
+        at the priority of the calling context (see call_priority), and a
+        429 response drains the bucket so all callers back off together.
+        
+        Args:
+            symbol: Symbol the call is for
+            operation: The upstream call
+        
+        Returns:
+            Result of the call
+        
+        Raises:
+            InvalidSymbolError: If the upstream rejects the symbol
+            RateLimitedError: If no request slot became available in time
+            CircuitOpenError: If the breaker is open
+            MarketDataError: If the call keeps failing
+        """
+        attempts = self.retry_policy.attempts
+        for attempt in range(1, attempts + 1):
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(symbol=symbol)
+            self.circuit_breaker.before_call(symbol)
+            try:
+                result = operation()
+            except InvalidSymbolError:
+                self.circuit_breaker.record_success()
+                raise
+            except Exception as e:
+                if not is_retryable(e):
+                    self.circuit_breaker.record_success()
+                    raise MarketDataError(symbol, str(e))
+                
+                self.circuit_breaker.record_failure()
+                if self.rate_limiter is not None and status_code_of(e) == 429:
+                    self.rate_limiter.throttled()
+                logger.warning(f"Attempt {attempt}/{attempts} failed for {symbol}: {e}")
+                if attempt == attempts:
+                    raise MarketDataError(symbol, str(e))
+                self._sleep(self.retry_policy.delay(attempt, retry_after(e)))
+            else:
+                self.circuit_breaker.record_success()
+                return result
+        
+        raise MarketDataError(symbol, "Max retry attempts reached")
     
     def get_live_price(self, symbol: str) -> float:
         """
         Fetch latest closing price for a stock symbol
         
+        With a quote cache, a fresh cached price is returned without an
+        upstream call. On a miss, only one process fetches the symbol and
+        the others wait for its result. Symbols the symbol cache knows to
+        be invalid are rejected without an upstream call.
+        
         Args:
             symbol: Stock symbol (e.g., TCS.NS, INFY.NS, AAPL)
             
@@ -41,54 +162,291 @@ class MarketDataService:
             MarketDataError: If data cannot be fetched
         """
         symbol = symbol.strip().upper()
+        self._reject_known_invalid(symbol)
+        if self.quote_cache is None:
+            return self._fetch_quote(symbol)
+        
+        try:
+            price = self.quote_cache.get(symbol)
+            if price is None and not self.quote_cache.claim(symbol):
+                logger.debug(f"Waiting for another process to fetch {symbol}")
+                price = self.quote_cache.wait_for(symbol)
+        except StorageError as e:
+            logger.warning(f"Quote cache unavailable: {e}")
+            return self._fetch_quote(symbol)
+        
+        if price is not None:
+            logger.debug(f"Serving cached price for {symbol}: ${price:.2f}")
+            return price
+        
+        started = self.quote_cache.now()
+        try:
+            price = self._fetch_quote(symbol)
+        except Exception:
+            self._release_fill(symbol)
+            raise
+        self._cache_quotes({symbol: price}, started)
+        return price
+    
+    def _fetch_quote(self, symbol: str) -> float:
+        """Fetch a price from the provider"""
+        logger.debug(f"Fetching price for {symbol}")
+        try:
+            price = self._call(symbol, lambda: self.provider.get_quote(symbol))
+        except InvalidSymbolError as e:
+            self._remember_symbol(symbol, False, e.reason)
+            raise
+        logger.info(f"Fetched price for {symbol}: ${price:.2f}")
+        return price
+    
+    def _cache_quotes(self, prices: Dict[str, float], started: float) -> None:
+        """Share fetched prices through the quote cache"""
+        try:
+            self.quote_cache.put_many(prices, started)
+        except StorageError as e:
+            logger.warning(f"Failed to cache quotes: {e}")
+    
+    def _symbol_status(self, symbol: str) -> Optional[SymbolStatus]:
+        """Cached validation result for a symbol, if any"""
+        if self.symbol_cache is None:
+            return None
+        try:
+            return self.symbol_cache.get(symbol)
+        except StorageError as e:
+            logger.warning(f"Symbol cache unavailable: {e}")
+            return None
+    
+    def _reject_known_invalid(self, symbol: str) -> None:
+        """Raise InvalidSymbolError for a symbol recently found not to exist"""
+        status = self._symbol_status(symbol)
+        if status is not None and not status.valid:
+            raise InvalidSymbolError(symbol, status.reason)
+    
+    def _remember_symbol(self, symbol: str, valid: bool, reason: str = "") -> None:
+        """Store a definite validation result"""
+        if self.symbol_cache is None:
+            return
+        try:
+            self.symbol_cache.put(symbol, valid, reason)
+        except StorageError as e:
+            logger.warning(f"Failed to cache symbol status for {symbol}: {e}")
+    
+    def _release_fill(self, symbol: str) -> None:
+        """Let other processes fetch a symbol this process failed to fetch"""
+        try:
+            self.quote_cache.release(symbol)
+        except StorageError as e:
+            logger.warning(f"Failed to release quote fill for {symbol}: {e}")
+    
+    def get_live_prices(self, symbols: List[str]) -> Dict[str, float]:
+        """
+        Fetch latest prices for many symbols with batched requests
         
-        for attempt in range(1, self.retry_attempts + 1):
+        Fresh quotes are taken from the quote cache with one lookup and
+        the rest are requested batch_size at a time; each batch is one
+        upstream call with its own retries. A batch that keeps failing is
+        logged and its symbols are left out, like unknown symbols.
+        
+        Args:
+            symbols: Stock symbols
+        
+        Returns:
+            Prices by (upper-cased) symbol for the symbols that were priced
+        """
+        unique = list(dict.fromkeys(symbol.strip().upper() for symbol in symbols))
+        prices: Dict[str, float] = {}
+        started = None
+        if self.quote_cache is not None:
             try:
-                logger.debug(f"Fetching price for {symbol} (attempt {attempt}/{self.retry_attempts})")
-                
-                stock = yf.Ticker(symbol)
-                data = stock.history(period="1d")
-                
-                if data.empty:
-                    raise InvalidSymbolError(
-                        symbol,
-                        "No data available - symbol may be invalid or market is closed"
-                    )
-                
-                price = float(data["Close"].iloc[-1])
-                logger.info(f"Fetched price for {symbol}: ${price:.2f}")
-                return price
-                
-            except InvalidSymbolError:
-                raise
-            except Exception as e:
-                logger.warning(f"Attempt {attempt} failed for {symbol}: {e}")
-                
-                if attempt < self.retry_attempts:
-                    time.sleep(1)  # Wait before retry
-                else:
-                    raise MarketDataError(symbol, str(e))
+                prices = self.quote_cache.get_many(unique)
+                started = self.quote_cache.now()
+            except StorageError as e:
+                logger.warning(f"Quote cache unavailable: {e}")
         
-        raise MarketDataError(symbol, "Max retry attempts reached")
+        missing = [symbol for symbol in unique if symbol not in prices]
+        for i in range(0, len(missing), self.batch_size):
+            batch = missing[i:i + self.batch_size]
+            label = f"{batch[0]} (+{len(batch) - 1})" if len(batch) > 1 else batch[0]
+            try:
+                fetched = self._call(label, lambda: self.provider.get_quotes(batch))
+            except MarketDataError as e:
+                logger.error(f"Failed to fetch prices for {len(batch)} symbols: {e}")
+                continue
+            prices.update(fetched)
+            if started is not None:
+                self._cache_quotes(fetched, started)
+        
+        logger.info(
+            f"Priced {len(prices)}/{len(unique)} symbols "
+            f"({len(unique) - len(missing)} cached, batches of {self.batch_size})"
+        )
+        return prices
+    
+    def get_price_history(
+        self,
+        symbol: str,
+        start: date,
+        end: Optional[date] = None,
+        offline: bool = False
+    ) -> PriceHistory:
+        """
+        Get daily OHLCV bars, served from the history cache when configured
+        
+        Only the ranges the cache does not hold yet are fetched, so repeated
+        calls usually fetch just the latest bars.
+        
+        Args:
+            symbol: Stock symbol
+            start: First date to include
+            end: Last date to include (today if None)
+            offline: Serve from the cache only, without fetching
+        
+        Returns:
+            Daily bars (views over the cache files when cached)
+        
+        Raises:
+            MarketDataError: If data cannot be fetched and nothing is cached
+        """
+        symbol = symbol.strip().upper()
+        if self.history_cache is None:
+            return self.fetch_history(symbol, start, end or date.today())
+        
+        fetch = None if offline else self.fetch_history
+        return self.history_cache.get(symbol, start, end, fetch=fetch)
+    
+    def fetch_history(self, symbol: str, start: date, end: date) -> PriceHistory:
+        """
+        Fetch daily OHLCV bars from the provider
+        
+        Args:
+            symbol: Stock symbol
+            start: First date to include
+            end: Last date to include
+        
+        Returns:
+            Daily bars (empty if there was no trading in the range)
+        
+        Raises:
+            MarketDataError: If data cannot be fetched
+        """
+        return self._call(symbol, lambda: self.provider.get_history(symbol, start, end))
     
     def get_stock_info(self, symbol: str) -> Optional[dict]:
         """
-        Get detailed stock information
+        Get descriptive stock metadata (name, sector, industry, currency, exchange)
+        
+        Served from the metadata cache when present; fetched (and cached)
+        otherwise.
         
         Args:
             symbol: Stock symbol
             
         Returns:
-            Stock information dictionary or None
+            Metadata dictionary (the fields of StockMetadata) or None
+        """
+        symbol = symbol.strip().upper()
+        metadata = self.get_cached_metadata([symbol]).get(symbol)
+        if metadata is None:
+            metadata = self._fetch_metadata([symbol]).get(symbol)
+        return metadata.model_dump() if metadata is not None else None
+    
+    def get_cached_metadata(self, symbols: List[str]) -> Dict[str, StockMetadata]:
+        """
+        Get metadata already held by the metadata cache, without upstream calls
+        
+        Args:
+            symbols: Stock symbols (upper case)
+        
+        Returns:
+            Metadata by symbol for the symbols that have it
         """
+        if self.metadata_cache is None or not symbols:
+            return {}
         try:
-            stock = yf.Ticker(symbol)
-            info = stock.info
+            cached = self.metadata_cache.get_many(symbols)
+        except StorageError as e:
+            logger.warning(f"Metadata cache unavailable: {e}")
+            return {}
+        return {symbol: StockMetadata(**data) for symbol, data in cached.items()}
+    
+    def metadata_version(self) -> int:
+        """
+        Get a counter that changes whenever cached metadata is stored
+        
+        Returns:
+            Metadata cache version (0 without a metadata cache)
+        """
+        return self.metadata_cache.version if self.metadata_cache is not None else 0
+    
+    def preload_metadata(self, symbols: List[str]) -> int:
+        """
+        Fetch metadata for symbols that have none or whose metadata is due for a refresh
+        
+        Args:
+            symbols: Stock symbols
+        
+        Returns:
+            Number of symbols whose metadata was fetched
+        """
+        if self.metadata_cache is None:
+            return 0
+        unique = list(dict.fromkeys(symbol.strip().upper() for symbol in symbols))
+        try:
+            due = self.metadata_cache.due(unique)
+        except StorageError as e:
+            logger.warning(f"Metadata cache unavailable: {e}")
+            return 0
+        
+        fetched = self._fetch_metadata(due)
+        logger.info(f"Refreshed metadata for {len(fetched)}/{len(due)} due symbols ({len(unique)} checked)")
+        return len(fetched)
+    
+    def _fetch_metadata(self, symbols: List[str]) -> Dict[str, StockMetadata]:
+        """Fetch metadata one symbol at a time and store it in the metadata cache"""
+        fetched: Dict[str, StockMetadata] = {}
+        for symbol in symbols:
+            try:
+                info = self._call(symbol, lambda: self.provider.get_info(symbol))
+            except RateLimitedError as e:
+                # Leave the rest for the next refresh rather than queueing behind the limiter
+                logger.warning(f"Stopped fetching metadata: {e}")
+                break
+            except (InvalidSymbolError, MarketDataError) as e:
+                logger.error(f"Failed to fetch info for {symbol}: {e}")
+                continue
+            fetched[symbol] = StockMetadata.from_info(symbol, info or {})
             logger.debug(f"Fetched info for {symbol}")
-            return info
-        except Exception as e:
-            logger.error(f"Failed to fetch info for {symbol}: {e}")
-            return None
+        
+        if self.metadata_cache is not None and fetched:
+            try:
+                self.metadata_cache.put_many({s: m.model_dump() for s, m in fetched.items()})
+            except StorageError as e:
+                logger.warning(f"Failed to cache metadata: {e}")
+        return fetched
+    
+    def check_symbol(self, symbol: str) -> None:
+        """
+        Make sure a stock symbol exists
+        
+        Results are kept in the symbol cache, so a symbol is looked up
+        upstream at most once per TTL; repeated invalid symbols are
+        rejected without an upstream call.
+        
+        Args:
+            symbol: Stock symbol to check
+        
+        Raises:
+            InvalidSymbolError: If the symbol does not exist
+            MarketDataError: If the check could not be made
+        """
+        symbol = symbol.strip().upper()
+        status = self._symbol_status(symbol)
+        if status is not None and status.valid:
+            return
+        
+        # Known invalid symbols are rejected here without an upstream call
+        self.get_live_price(symbol)
+        self._remember_symbol(symbol, True)
     
     def validate_symbol(self, symbol: str) -> bool:
         """
@@ -99,9 +457,15 @@ class MarketDataService:
             
         Returns:
             True if symbol is valid, False otherwise
+        
+        Raises:
+            RateLimitedError: If the check could not be made for lack of request slots
         """
         try:
-            self.get_live_price(symbol)
+            self.check_symbol(symbol)
             return True
+        except RateLimitedError:
+            # Being throttled says nothing about the symbol
+            raise
         except (InvalidSymbolError, MarketDataError):
             return False
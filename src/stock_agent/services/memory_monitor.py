@@ -0,0 +1,203 @@
+"""Opt-in memory accounting of agent runs and tracemalloc snapshots"""
+
+import gc
+import os
+import threading
+import tracemalloc
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+from stock_agent.models.stock import RunMemory
+from stock_agent.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Allocations made by tracemalloc itself and by the import system are noise
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def rss_bytes() -> Optional[int]:
+    """Resident set size of this process (None where /proc is unavailable)"""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+class MemoryMonitor:
+    """
+    Memory accounting with tracemalloc
+    
+    Tracing starts with the first measured run or snapshot; it slows
+    every allocation down, so the monitor is only built when
+    memory_tracking is enabled. A run reports how far traced memory rose
+    above its level at the start (peak) and how much of that rise was
+    still held when it finished (retained), along with the process RSS.
+    Runs that overlap count each other's allocations.
+    
+    Snapshots are kept (the most recent max_snapshots) so that two of
+    them can be diffed by source line to find what keeps growing.
+    """
+    
+    def __init__(self, frames: int = 1, max_snapshots: int = 5, max_runs: int = 100):
+        """
+        Initialize memory monitor
+        
+        Args:
+            frames: Stack frames recorded per allocation (more is slower)
+            max_snapshots: Snapshots kept for diffing
+            max_runs: Run measurements kept for the metrics
+        """
+        self.frames = max(frames, 1)
+        self.max_snapshots = max(max_snapshots, 2)
+        self._runs: deque = deque(maxlen=max(max_runs, 1))
+        self._snapshots: "OrderedDict[int, Tuple[datetime, tracemalloc.Snapshot]]" = OrderedDict()
+        self._next_id = 1
+        self._started = False
+        self._lock = threading.Lock()
+    
+    def start(self) -> None:
+        """Start tracing allocations (no-op if something else already traces)"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started = True
+            logger.info(f"Started tracing memory allocations ({self.frames} frame(s))")
+    
+    def stop(self) -> None:
+        """Stop tracing if this monitor started it, dropping kept snapshots"""
+        with self._lock:
+            self._snapshots.clear()
+        if self._started and tracemalloc.is_tracing():
+            tracemalloc.stop()
+            logger.info("Stopped tracing memory allocations")
+        self._started = False
+    
+    def begin_run(self) -> int:
+        """
+        Mark the start of a run
+        
+        Returns:
+            Traced memory at the start, to pass to end_run
+        """
+        self.start()
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        return current
+    
+    def end_run(self, baseline: int) -> RunMemory:
+        """
+        Measure a run that started at baseline
+        
+        Args:
+            baseline: Value returned by begin_run
+        
+        Returns:
+            Peak and retained memory of the run
+        """
+        current, peak = tracemalloc.get_traced_memory()
+        usage = RunMemory(
+            peak_bytes=max(peak - baseline, 0),
+            retained_bytes=current - baseline,
+            traced_bytes=current,
+            rss_bytes=rss_bytes()
+        )
+        with self._lock:
+            self._runs.append(usage)
+        return usage
+    
+    def stats(self) -> dict:
+        """Current traced memory and RSS, with the recent run measurements"""
+        current, peak = tracemalloc.get_traced_memory()
+        with self._lock:
+            runs = list(self._runs)
+            snapshots = list(self._snapshots)
+        return {
+            "tracing": tracemalloc.is_tracing(),
+            "traced_bytes": current,
+            "traced_peak_bytes": peak,
+            "rss_bytes": rss_bytes(),
+            "runs_measured": len(runs),
+            "retained_bytes_recent_runs": sum(run.retained_bytes for run in runs),
+            "last_run": runs[-1] if runs else None,
+            "snapshots": snapshots,
+        }
+    
+    def snapshot(self, limit: int = 20) -> dict:
+        """
+        Capture a snapshot of live allocations
+        
+        Garbage is collected first, so only reachable objects are counted.
+        
+        Args:
+            limit: Number of largest allocation sites to return
+        
+        Returns:
+            Snapshot id, time, traced total and the largest sites
+        """
+        self.start()
+        gc.collect()
+        snapshot = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+        taken_at = datetime.now(timezone.utc)
+        with self._lock:
+            snapshot_id = self._next_id
+            self._next_id += 1
+            self._snapshots[snapshot_id] = (taken_at, snapshot)
+            while len(self._snapshots) > self.max_snapshots:
+                self._snapshots.popitem(last=False)
+        
+        stats = snapshot.statistics("lineno")
+        return {
+            "id": snapshot_id,
+            "taken_at": taken_at,
+            "traced_bytes": sum(stat.size for stat in stats),
+            "top": [_site(stat) for stat in stats[:limit]],
+        }
+    
+    def diff(self, snapshot_id: int, base_id: Optional[int] = None, limit: int = 20) -> Optional[dict]:
+        """
+        Compare a snapshot with an earlier one by allocation site
+        
+        Args:
+            snapshot_id: Snapshot to inspect
+            base_id: Snapshot to compare with (the one taken before
+                snapshot_id if None)
+            limit: Number of sites with the largest change to return
+        
+        Returns:
+            Size change overall and per site, or None if either snapshot
+            is unknown (or was evicted)
+        """
+        with self._lock:
+            if base_id is None:
+                earlier = [kept for kept in self._snapshots if kept < snapshot_id]
+                base_id = earlier[-1] if earlier else None
+            current = self._snapshots.get(snapshot_id)
+            base = self._snapshots.get(base_id) if base_id is not None else None
+        if current is None or base is None:
+            return None
+        
+        differences = current[1].compare_to(base[1], "lineno")
+        return {
+            "id": snapshot_id,
+            "base_id": base_id,
+            "seconds_between": round((current[0] - base[0]).total_seconds(), 3),
+            "size_diff_bytes": sum(stat.size_diff for stat in differences),
+            "top": [
+                {**_site(stat), "size_diff_bytes": stat.size_diff, "count_diff": stat.count_diff}
+                for stat in differences[:limit]
+            ],
+        }
+
+
+def _site(stat) -> Dict[str, object]:
+    """Allocation site of a tracemalloc statistic"""
+    frame = stat.traceback[0]
+    return {"location": f"{frame.filename}:{frame.lineno}", "size_bytes": stat.size, "count": stat.count}
@@ -0,0 +1,78 @@
+"""Background refresh of symbol metadata"""
+
+import threading
+from typing import Optional
+
+from stock_agent.repositories.stock_repository import StockRepository
+from stock_agent.services.market_data_service import MarketDataService
+from stock_agent.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class MetadataRefresher:
+    """
+    Keeps metadata of tracked symbols in the metadata cache
+    
+    refresh_once() fetches metadata for tracked symbols that have none or
+    whose entry is due for a refresh; start() runs it on a daemon thread
+    right away and then every interval_seconds, so a cold cache fills
+    without delaying startup. Entries stay servable while they are
+    refreshed, so readers never wait for Yahoo.
+    """
+    
+    def __init__(
+        self,
+        market_service: MarketDataService,
+        repository: StockRepository,
+        interval_seconds: float = 3600.0
+    ):
+        """
+        Initialize metadata refresher
+        
+        Args:
+            market_service: Market data service holding the metadata cache
+            repository: Stock repository listing the tracked symbols
+            interval_seconds: Seconds between background refreshes
+        """
+        self.market_service = market_service
+        self.repository = repository
+        self.interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def refresh_once(self) -> int:
+        """
+        Fetch due metadata for all tracked symbols
+        
+        Returns:
+            Number of symbols whose metadata was fetched
+        """
+        symbols = [stock.symbol for stock in self.repository.get_all()]
+        return self.market_service.preload_metadata(symbols)
+    
+    def start(self) -> None:
+        """Refresh in the background until stop() is called"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="metadata-refresh", daemon=True)
+        self._thread.start()
+        logger.info(f"Refreshing metadata every {self.interval_seconds:g}s")
+    
+    def stop(self) -> None:
+        """Stop the background refresh and wait for it to finish"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+    
+    def _loop(self) -> None:
+        """Refresh now and then every interval until stopped"""
+        while True:
+            try:
+                self.refresh_once()
+            except Exception as e:
+                logger.error(f"Metadata refresh failed: {e}")
+            if self._stop.wait(self.interval_seconds):
+                return
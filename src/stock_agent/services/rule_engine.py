@@ -0,0 +1,109 @@
+"""Vectorised evaluation of per-position alert rules"""
+
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from stock_agent.models.rules import AlertRule, parse_rule
+from stock_agent.models.stock import StockInDB
+from stock_agent.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class RuleSet:
+    """
+    Alert rules of a whole portfolio compiled to flat arrays
+    
+    Each rule is one entry in parallel arrays (owning position, lower and
+    upper reference row, lower and upper factor). A run evaluates every rule
+    of every position with a single gather-and-compare over a small matrix
+    of reference prices, so the cost depends on the number of rules, not on
+    how many rule types exist.
+    
+    Rules fire on the transition only: a rule that already held at the
+    previous price (with the previous high-water mark) stays quiet.
+    """
+    
+    def __init__(self, positions: Sequence[Tuple[str, Sequence[AlertRule]]]):
+        """
+        Compile rules
+        
+        Args:
+            positions: (symbol, rules) pairs in portfolio order
+        """
+        self.symbols = [symbol for symbol, _ in positions]
+        self.rules: List[AlertRule] = [rule for _, rules in positions for rule in rules]
+        self.position = np.repeat(
+            np.arange(len(positions), dtype=np.intp),
+            [len(rules) for _, rules in positions]
+        )
+        self.lower_ref = np.array([rule.lower_ref for rule in self.rules], dtype=np.intp)
+        self.lower = np.array([rule.lower for rule in self.rules], dtype=float)
+        self.upper_ref = np.array([rule.upper_ref for rule in self.rules], dtype=np.intp)
+        self.upper = np.array([rule.upper for rule in self.rules], dtype=float)
+    
+    @classmethod
+    def compile(cls, stocks: Sequence[StockInDB]) -> "RuleSet":
+        """
+        Compile the rules stored with tracked positions
+        
+        Args:
+            stocks: Tracked positions in portfolio order
+        
+        Returns:
+            Compiled rule set
+        """
+        rule_set = cls([(stock.symbol, [parse_rule(rule) for rule in stock.rules]) for stock in stocks])
+        logger.debug(f"Compiled {len(rule_set)} alert rules for {len(stocks)} positions")
+        return rule_set
+    
+    def __len__(self) -> int:
+        return len(self.rules)
+    
+    def evaluate(
+        self,
+        price: np.ndarray,
+        previous: np.ndarray,
+        buy_price: np.ndarray,
+        high_water: np.ndarray
+    ) -> List[Tuple[int, AlertRule]]:
+        """
+        Find rules that started firing at the current prices
+        
+        All arrays are aligned with the compiled positions; NaN marks an
+        unknown price and never fires.
+        
+        Args:
+            price: Current prices
+            previous: Prices recorded by the previous run
+            buy_price: Buy prices
+            high_water: High-water marks before this run
+        
+        Returns:
+            (position index, rule) pairs of the rules that fired
+        """
+        if not self.rules:
+            return []
+        
+        ones = np.ones(len(price))
+        new_high_water = np.fmax(high_water, price)
+        now = np.stack([ones, buy_price, new_high_water, previous])
+        before = np.stack([ones, buy_price, high_water, previous])
+        
+        with np.errstate(invalid="ignore"):
+            fired = self._crossed(price, now) & ~self._crossed(previous, before)
+        
+        return [(int(self.position[i]), self.rules[i]) for i in np.flatnonzero(fired)]
+    
+    def _crossed(self, price: np.ndarray, references: np.ndarray) -> np.ndarray:
+        """Rules whose thresholds the price is at or beyond (rows as in REFERENCES)"""
+        value = price[self.position]
+        lower = references[self.lower_ref, self.position] * self.lower
+        upper = references[self.upper_ref, self.position] * self.upper
+        return (value <= lower) | (value >= upper)
+
+
+def price_array(values: Sequence[Optional[float]]) -> np.ndarray:
+    """Float array with NaN for unknown prices"""
+    return np.array([np.nan if value is None else value for value in values], dtype=float)
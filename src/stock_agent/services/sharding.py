@@ -0,0 +1,253 @@
+"""Partitioning of agent runs across instances"""
+
+import bisect
+import hashlib
+import threading
+import time
+from typing import Callable, Iterable, List, Optional, Set
+
+from stock_agent.repositories.lease_store import LeaseStore
+from stock_agent.utils.exceptions import StorageError
+from stock_agent.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def _hash(key: str) -> int:
+    """Stable 64-bit hash (Python's hash() differs between processes)"""
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """
+    Consistent hash ring of instances
+    
+    Each instance is placed on the ring at vnodes points and a symbol
+    belongs to the first instance point at or after its own hash. When an
+    instance joins or leaves, only the symbols next to its points move.
+    """
+    
+    def __init__(self, members: Iterable[str], vnodes: int = 64):
+        """
+        Build the ring
+        
+        Args:
+            members: Instance ids
+            vnodes: Points per instance (more points spread load more evenly)
+        """
+        points = sorted((_hash(f"{member}#{i}"), member) for member in set(members) for i in range(vnodes))
+        self._hashes = [point for point, _ in points]
+        self._members = [member for _, member in points]
+    
+    def owner(self, symbol: str) -> Optional[str]:
+        """Instance owning a symbol (None on an empty ring)"""
+        if not self._hashes:
+            return None
+        index = bisect.bisect_left(self._hashes, _hash(symbol)) % len(self._hashes)
+        return self._members[index]
+
+
+class ShardCoordinator:
+    """
+    Assigns tracked symbols to agent instances and deduplicates alerts
+    
+    start() heartbeats on a background thread so the instance stays a
+    member of the ring between runs. At the start of a run the instance
+    builds the ring from the live members and leases the symbols it owns.
+    The lease keeps any other instance off those symbols while the run
+    lasts, even if membership changed in between and two instances briefly
+    disagree about the ring. renew() extends the leases during long runs;
+    a symbol whose lease could not be renewed is left to whoever took it.
+    Leases are released when the run ends and expire on their own if the
+    instance dies mid-run.
+    
+    Before an alert is sent the instance checks it still holds the lease and
+    records the alert under a key of symbol, alert kind and the transition
+    that triggered it (the trigger price or state); only the instance that
+    records the key sends it. Keys carry no clock bucket, so instances that
+    see the same transition on either side of a window boundary still
+    agree on it.
+    """
+    
+    def __init__(
+        self,
+        store: LeaseStore,
+        instance_id: str,
+        lease_seconds: float = 120.0,
+        vnodes: int = 64,
+        alert_window_seconds: float = 300.0,
+        member_ttl_seconds: float = 30.0,
+        heartbeat_seconds: float = 10.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize shard coordinator
+        
+        Args:
+            store: Shared coordination store
+            instance_id: Unique id of this instance
+            lease_seconds: Lease duration (renewed every third of it during a run)
+            vnodes: Ring points per instance
+            alert_window_seconds: How long a sent alert is remembered by
+                default (an alert for a state that persists is sent again
+                after this)
+            member_ttl_seconds: Members without a heartbeat for this long
+                leave the ring
+            heartbeat_seconds: Seconds between background heartbeats
+            clock: Time source deciding when leases are due for renewal
+        """
+        self.store = store
+        self.instance_id = instance_id
+        self.lease_seconds = lease_seconds
+        self.vnodes = vnodes
+        self.alert_window_seconds = alert_window_seconds
+        self.member_ttl_seconds = member_ttl_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self._clock = clock
+        self._members: List[str] = []
+        self._owned = 0
+        self._contended = 0
+        self._leased: Set[str] = set()
+        self._renewed_at = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        logger.info(f"Sharding enabled for instance '{instance_id}'")
+    
+    def begin_run(self, symbols: List[str]) -> List[str]:
+        """
+        Join the ring and lease this instance's share of the symbols
+        
+        Args:
+            symbols: All tracked symbols
+        
+        Returns:
+            Symbols this instance should analyze in this run
+        """
+        self._members = self.store.heartbeat(self.instance_id, self.member_ttl_seconds)
+        ring = HashRing(self._members, self.vnodes)
+        owned = [symbol for symbol in symbols if ring.owner(symbol) == self.instance_id]
+        leased = self.store.acquire(self.instance_id, owned, self.lease_seconds)
+        self._leased = set(leased)
+        self._renewed_at = self._clock()
+        
+        self._owned = len(owned)
+        self._contended = len(owned) - len(leased)
+        logger.info(
+            f"Instance '{self.instance_id}' owns {len(owned)}/{len(symbols)} symbols "
+            f"across {len(self._members)} member(s); {self._contended} still leased elsewhere"
+        )
+        return leased
+    
+    def renew(self) -> Set[str]:
+        """
+        Extend the leases of the current run once a third of their duration passed
+        
+        Call it often during a run (it only reaches the store when renewal
+        is due). A lease that expired and was taken by another instance is
+        not renewed, and a store failure drops every lease, so the run
+        skips symbols that are no longer its own.
+        
+        Returns:
+            Symbols still leased to this instance
+        """
+        now = self._clock()
+        if not self._leased or now - self._renewed_at < self.lease_seconds / 3:
+            return self._leased
+        
+        try:
+            self._members = self.store.heartbeat(self.instance_id, self.member_ttl_seconds)
+            renewed = set(self.store.acquire(self.instance_id, sorted(self._leased), self.lease_seconds))
+        except StorageError as e:
+            logger.error(f"Failed to renew leases, dropping the rest of the shard: {e}")
+            renewed = set()
+        
+        lost = len(self._leased) - len(renewed)
+        if lost:
+            logger.warning(f"Lost the lease on {lost} symbol(s) during the run; skipping them")
+        self._leased = renewed
+        self._renewed_at = now
+        return renewed
+    
+    def end_run(self, symbols: List[str]) -> None:
+        """Release the leases taken by begin_run"""
+        self._leased = set()
+        self.store.release(self.instance_id, symbols)
+    
+    def claim_alert(
+        self,
+        symbol: str,
+        kind: str,
+        trigger: str,
+        retention_seconds: Optional[float] = None
+    ) -> bool:
+        """
+        Decide whether this instance sends an alert
+        
+        Args:
+            symbol: Stock symbol
+            kind: Alert kind (and rule, for rule alerts)
+            trigger: Transition that raised the alert, identical for every
+                instance that observes it (trigger price or state)
+            retention_seconds: How long the claim is kept (defaults to
+                alert_window_seconds)
+        
+        Returns:
+            True if the lease is still held and nobody sent this alert for
+            the same transition
+        """
+        self.renew()
+        if not self.store.holds(self.instance_id, symbol):
+            logger.warning(f"Lost lease on {symbol}; not sending {kind} alert")
+            return False
+        
+        key = f"{symbol}|{kind}|{trigger}"
+        if retention_seconds is None:
+            retention_seconds = self.alert_window_seconds
+        if not self.store.record_alert(self.instance_id, key, retention_seconds):
+            logger.info(f"{kind} alert for {symbol} already sent for {trigger}")
+            return False
+        return True
+    
+    def start(self) -> None:
+        """Join the ring and heartbeat in the background until leave() is called"""
+        if self._thread is not None:
+            return
+        self._heartbeat()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="shard-heartbeat", daemon=True)
+        self._thread.start()
+        logger.info(f"Heartbeating every {self.heartbeat_seconds:g}s")
+    
+    def leave(self) -> None:
+        """Stop heartbeating and leave the ring so other instances take over at their next run"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        try:
+            self.store.leave(self.instance_id)
+        except StorageError as e:
+            logger.error(f"Failed to leave the ring (members expire on their own): {e}")
+            return
+        logger.info(f"Instance '{self.instance_id}' left the ring")
+    
+    def _loop(self) -> None:
+        """Heartbeat every interval until stopped"""
+        while not self._stop.wait(self.heartbeat_seconds):
+            self._heartbeat()
+    
+    def _heartbeat(self) -> None:
+        """Record that this instance is alive"""
+        try:
+            self._members = self.store.heartbeat(self.instance_id, self.member_ttl_seconds)
+        except StorageError as e:
+            logger.error(f"Shard heartbeat failed: {e}")
+    
+    def snapshot(self) -> dict:
+        """Shard state of the last run"""
+        return {
+            "instance_id": self.instance_id,
+            "members": list(self._members),
+            "owned_symbols": self._owned,
+            "contended_symbols": self._contended,
+        }
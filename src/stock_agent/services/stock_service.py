@@ -1,20 +1,59 @@
 """Stock service for business logic"""
 
-from datetime import datetime
-from typing import List
+import threading
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Optional, Tuple
 
 import pytz
 
 from stock_agent.config import Settings
 from stock_agent.models.enums import DecisionType
-from stock_agent.models.stock import StockAnalysis, StockCreate, StockInDB
+from stock_agent.models.stock import (
+    AgentRunDiff,
+    HistoryPoint,
+    PortfolioSummary,
+    RunSummary,
+    StockAnalysis,
+    StockCreate,
+    StockInDB,
+    StockMetadata,
+    StockPage,
+    TechnicalIndicators,
+)
+from stock_agent.repositories.history_cache import PriceHistory
+from stock_agent.repositories.run_history import RunHistoryStore
+from stock_agent.repositories.snapshot_store import SnapshotStore
 from stock_agent.repositories.stock_repository import StockRepository
 from stock_agent.services.alert_service import AlertService
+from stock_agent.services.broadcaster import Broadcaster
+from stock_agent.services.fx_service import FxService
+from stock_agent.services.indicator_engine import IndicatorEngine
+from stock_agent.services.jobs import RunProgress
 from stock_agent.services.market_data_service import MarketDataService
+from stock_agent.services.memory_monitor import MemoryMonitor
+from stock_agent.services.rule_engine import RuleSet, price_array
+from stock_agent.services.sharding import ShardCoordinator
+from stock_agent.utils.currency import symbol_currency
+from stock_agent.utils.exceptions import MarketDataError, StockNotFoundError, StorageError
 from stock_agent.utils.logger import get_logger
+from stock_agent.utils.rate_limiter import CallPriority, call_priority
 
 logger = get_logger(__name__)
 
+# Analysis fields kept in the run history
+_HISTORY_FIELDS = {"current_price", "profit", "profit_percent", "decision", "signals", "triggered_rules"}
+
+
+def _fingerprint(stock: StockInDB, price: float) -> str:
+    """
+    Inputs a position's analysis depends on
+    
+    The date is included because indicators roll over to a new daily bar
+    even when the price did not move.
+    """
+    rules = ";".join(stock.rules)
+    return f"{date.today().isoformat()}|{price!r}|{stock.buy_price!r}|{stock.target_price!r}|{rules}"
+
 
 class StockService:
     """Service for stock analysis and management"""
@@ -24,7 +63,14 @@ class StockService:
         market_service: MarketDataService,
         alert_service: AlertService,
         repository: StockRepository,
-        settings: Settings = None
+        settings: Settings = None,
+        indicator_engine: Optional[IndicatorEngine] = None,
+        shard_coordinator: Optional[ShardCoordinator] = None,
+        snapshot_store: Optional[SnapshotStore] = None,
+        run_history: Optional[RunHistoryStore] = None,
+        broadcaster: Optional[Broadcaster] = None,
+        fx_service: Optional[FxService] = None,
+        memory_monitor: Optional[MemoryMonitor] = None
     ):
         """
         Initialize stock service
@@ -34,10 +80,25 @@ class StockService:
             alert_service: Alert service
             repository: Stock repository
             settings: Application settings (optional)
+            indicator_engine: Technical indicator engine (optional)
+            shard_coordinator: Splits agent runs across instances (optional)
+            snapshot_store: Last analysis per position, enables incremental runs (optional)
+            run_history: Store every agent run is recorded in (optional)
+            broadcaster: Pushes changed analyses to streaming clients (optional)
+            fx_service: Exchange rates for reporting in one currency (optional)
+            memory_monitor: Measures the memory used by each agent run (optional)
         """
         self.market_service = market_service
         self.alert_service = alert_service
         self.repository = repository
+        self.indicator_engine = indicator_engine
+        self.shard_coordinator = shard_coordinator
+        self.snapshot_store = snapshot_store
+        self.run_history = run_history
+        self.broadcaster = broadcaster
+        self.fx_service = fx_service
+        self.memory_monitor = memory_monitor
+        self._run_lock = threading.Lock()
         
         if settings is None:
             from stock_agent.config import get_settings
@@ -68,18 +129,150 @@ class StockService:
         
         # Fetch current price
         current_price = self.market_service.get_live_price(symbol)
+        indicators = self._compute_indicators(symbol, current_price)
+        
+        analysis = self._build_analysis(
+            symbol, buy_price, target_price, current_price, indicators=indicators
+        )
+        
+        logger.info(f"Analysis complete for {symbol}: {analysis.decision}")
+        return analysis
+    
+    def analyze_at_price(
+        self,
+        symbol: str,
+        buy_price: float,
+        target_price: float,
+        current_price: float
+    ) -> StockAnalysis:
+        """
+        Analyze a position at an already known price (no indicators, no fetch)
+        
+        Args:
+            symbol: Stock symbol
+            buy_price: Purchase price
+            target_price: Target selling price
+            current_price: Market price
+        
+        Returns:
+            Stock analysis result
+        """
+        return self._build_analysis(symbol, buy_price, target_price, current_price)
+    
+    def get_last_analysis(self, symbol: str) -> Optional[StockAnalysis]:
+        """
+        Get the analysis of a tracked stock at its last recorded price
+        
+        Does not fetch market data; the snapshot is as of the last agent run
+        or the last change to the position, whichever is later.
+        
+        Args:
+            symbol: Stock symbol
+        
+        Returns:
+            Analysis snapshot, or None if no price has been recorded yet
+        
+        Raises:
+            StockNotFoundError: If the stock is not tracked
+        """
+        stock = self.get_stock(symbol)
+        if stock.last_price is None:
+            return None
+        
+        return self._build_analysis(
+            stock.symbol,
+            stock.buy_price,
+            stock.target_price,
+            stock.last_price,
+            analyzed_at=max(stock.last_price_at, stock.updated_at),
+            metadata=self.market_service.get_cached_metadata([stock.symbol]).get(stock.symbol)
+        )
+    
+    def _compute_indicators(
+        self,
+        symbol: str,
+        current_price: float
+    ) -> Optional[TechnicalIndicators]:
+        """
+        Bring a symbol's indicators up to date and include the live price
+        
+        History is requested up to yesterday only. Today's bar is still
+        forming and the live price stands in for it, so once the completed
+        bars are cached, analyzing the symbol again the same day makes no
+        history request. Indicators are best effort: failures are logged
+        and yield None.
+        
+        Args:
+            symbol: Stock symbol
+            current_price: Live price, used as today's close
+        
+        Returns:
+            Indicator values, or None if disabled or unavailable
+        """
+        if self.indicator_engine is None:
+            return None
+        
+        symbol = symbol.strip().upper()
+        today = date.today()
+        start = self.indicator_engine.history_start(symbol, today)
+        end = today - timedelta(days=1)
+        try:
+            history = (
+                self.market_service.get_price_history(symbol, start, end)
+                if start <= end else PriceHistory.empty()
+            )
+            return self.indicator_engine.refresh(symbol, history, current_price, today)
+        except (MarketDataError, StorageError) as e:
+            logger.warning(f"Indicators unavailable for {symbol}: {e}")
+            return None
+    
+    def portfolio_version(self) -> str:
+        """
+        Get a token that changes whenever tracked stocks or their prices change
+        
+        Returns:
+            Repository version
+        """
+        return self.repository.version
+    
+    def _build_analysis(
+        self,
+        symbol: str,
+        buy_price: float,
+        target_price: float,
+        current_price: float,
+        analyzed_at: Optional[datetime] = None,
+        indicators: Optional[TechnicalIndicators] = None,
+        metadata: Optional[StockMetadata] = None
+    ) -> StockAnalysis:
+        """
+        Calculate profit and decision for a position at a given price
+        
+        Args:
+            symbol: Stock symbol
+            buy_price: Purchase price
+            target_price: Target selling price
+            current_price: Market price
+            analyzed_at: Time the price was observed (now if None)
+            indicators: Technical indicators at that price (optional)
+            metadata: Cached symbol metadata (optional)
         
+        Returns:
+            Stock analysis result
+        """
         # Calculate profit
         profit = current_price - buy_price
         profit_percent = (profit / buy_price) * 100
         
         # Determine decision
-        if current_price >= target_price:
-            decision = DecisionType.TARGET_REACHED
-        elif current_price < buy_price:
-            decision = DecisionType.BELOW_BUY_PRICE
-        else:
-            decision = DecisionType.HOLD
+        decision = DecisionType.from_prices(current_price, buy_price, target_price)
+        signals = []
+        if indicators is not None:
+            signals = indicators.signals(
+                current_price,
+                overbought=self.settings.rsi_overbought,
+                oversold=self.settings.rsi_oversold
+            )
         
         analysis = StockAnalysis(
             symbol=symbol,
@@ -88,17 +281,21 @@ class StockService:
             target_price=target_price,
             profit=round(profit, 2),
             profit_percent=round(profit_percent, 2),
-            decision=decision
+            decision=decision,
+            analyzed_at=analyzed_at or datetime.now(),
+            indicators=indicators,
+            signals=signals,
+            metadata=metadata,
+            currency=metadata.currency if metadata and metadata.currency else symbol_currency(symbol)
         )
-        
-        logger.info(f"Analysis complete for {symbol}: {decision}")
         return analysis
     
     def track_stock(
         self,
         symbol: str,
         buy_price: float,
-        target_price: float
+        target_price: float,
+        rules: Optional[List[str]] = None
     ) -> StockInDB:
         """
         Add a stock to the tracking list
@@ -107,16 +304,31 @@ class StockService:
             symbol: Stock symbol
             buy_price: Purchase price
             target_price: Target selling price
+            rules: Alert rules for the position (optional)
             
         Returns:
             Created stock record
+        
+        Raises:
+            InvalidSymbolError: If the symbol does not exist
+            DuplicateStockError: If the symbol is already tracked
         """
         logger.info(f"Adding stock to tracking: {symbol}")
         
+        # Already tracked symbols fail in the repository without a lookup
+        if self.repository.get_by_symbol(symbol) is None:
+            try:
+                self.market_service.check_symbol(symbol)
+            except MarketDataError as e:
+                # An upstream outage should not block tracking; the agent
+                # reports the symbol if it keeps failing
+                logger.warning(f"Could not validate {symbol}, tracking it anyway: {e}")
+        
         stock_create = StockCreate(
             symbol=symbol,
             buy_price=buy_price,
-            target_price=target_price
+            target_price=target_price,
+            rules=rules or []
         )
         
         stock = self.repository.add(stock_create)
@@ -134,50 +346,507 @@ class StockService:
         logger.debug(f"Retrieved {len(stocks)} tracked stocks")
         return stocks
     
+    def list_stocks(
+        self,
+        prefix: Optional[str] = None,
+        decision: Optional[DecisionType] = None,
+        within_percent: Optional[float] = None,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> StockPage:
+        """
+        Get a filtered page of tracked stocks
+        
+        Decision and distance filters use the last price recorded by the agent.
+        
+        Args:
+            prefix: Symbol prefix
+            decision: Decision at the last recorded price
+            within_percent: Maximum distance of the last price from target, in percent
+            cursor: Cursor from the previous page
+            limit: Page size (all stocks if None)
+        
+        Returns:
+            Page of tracked stocks
+        """
+        page = self.repository.query(
+            prefix=prefix,
+            decision=decision,
+            within_percent=within_percent,
+            cursor=cursor,
+            limit=limit
+        )
+        logger.debug(f"Retrieved page of {len(page.items)} tracked stocks")
+        return page
+    
+    def list_stock_rows(
+        self,
+        prefix: Optional[str] = None,
+        decision: Optional[DecisionType] = None,
+        within_percent: Optional[float] = None,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        with_metadata: bool = False
+    ) -> Tuple[List[dict], Optional[str]]:
+        """
+        Get a filtered page of tracked stocks as stored rows
+        
+        Same as list_stocks, but returns the repository rows (the JSON form of
+        StockInDB) for serialization without building models.
+        
+        Args:
+            with_metadata: Add cached symbol metadata to each row under
+                "metadata" (None when not cached; never fetched)
+        
+        Returns:
+            Stored rows (read-only) and the next page cursor
+        """
+        rows, next_cursor = self.repository.query_rows(
+            prefix=prefix,
+            decision=decision,
+            within_percent=within_percent,
+            cursor=cursor,
+            limit=limit
+        )
+        if with_metadata:
+            metadata = self.market_service.get_cached_metadata([row["symbol"] for row in rows])
+            rows = [
+                dict(row, metadata=metadata[row["symbol"]].model_dump() if row["symbol"] in metadata else None)
+                for row in rows
+            ]
+        logger.debug(f"Retrieved page of {len(rows)} tracked stock rows")
+        return rows, next_cursor
+    
+    def get_stock(self, symbol: str) -> StockInDB:
+        """
+        Get a tracked stock
+        
+        Args:
+            symbol: Stock symbol
+        
+        Returns:
+            Tracked stock record
+        
+        Raises:
+            StockNotFoundError: If the stock is not tracked
+        """
+        stock = self.repository.get_by_symbol(symbol)
+        if stock is None:
+            raise StockNotFoundError(symbol)
+        return stock
+    
+    def update_stock(
+        self,
+        symbol: str,
+        buy_price: float,
+        target_price: float,
+        rules: Optional[List[str]] = None
+    ) -> StockInDB:
+        """
+        Update buy and target prices (and optionally alert rules) of a tracked stock
+        
+        Args:
+            symbol: Stock symbol
+            buy_price: Purchase price
+            target_price: Target selling price
+            rules: New alert rules (existing rules are kept if None)
+        
+        Returns:
+            Updated stock record
+        """
+        logger.info(f"Updating tracked stock: {symbol}")
+        
+        if rules is None:
+            rules = self.get_stock(symbol).rules
+        
+        stock_update = StockCreate(
+            symbol=symbol,
+            buy_price=buy_price,
+            target_price=target_price,
+            rules=rules
+        )
+        
+        return self.repository.update(symbol, stock_update)
+    
+    def get_portfolio_summary(self, with_holdings: bool = True) -> PortfolioSummary:
+        """
+        Get portfolio totals and per-position weights
+        
+        Args:
+            with_holdings: Include per-position values and weights
+        
+        Returns:
+            Portfolio summary from the repository's running aggregates, in
+            the reporting currency of the FX service (USD without one)
+        """
+        if self.fx_service is None:
+            return self.repository.summary(with_holdings=with_holdings)
+        
+        rates = self.fx_service.refresh(self.repository.currencies)
+        return self.repository.summary(
+            with_holdings=with_holdings,
+            currency=self.fx_service.reporting_currency,
+            rates=rates
+        )
+    
+    def delete_stock(self, symbol: str) -> None:
+        """
+        Remove a stock from the tracking list
+        
+        Args:
+            symbol: Stock symbol
+        """
+        logger.info(f"Removing stock from tracking: {symbol}")
+        self.repository.delete(symbol)
+        if self.snapshot_store is not None:
+            self.snapshot_store.discard([symbol.strip().upper()])
+    
     def run_agent(self) -> List[StockAnalysis]:
         """
         Run autonomous agent to analyze all tracked stocks
         
         Returns:
-            List of analysis results
+            Current analysis of every position that could be priced
+        """
+        return self.run_agent_diff().analyses
+    
+    def run_agent_diff(self, progress: Optional[RunProgress] = None) -> AgentRunDiff:
+        """
+        Run autonomous agent and report what changed since the previous run
+        
+        Every position is priced, but only positions whose price or
+        definition changed since their last snapshot are re-analyzed and
+        re-checked for target and rule alerts; the others reuse their
+        snapshot. Without a snapshot store every position counts as changed.
+        
+        Upstream calls made by the run take precedence over interactive
+        requests and health probes at the market data rate limiter. With a
+        shard coordinator, only the symbols leased to this instance are
+        analyzed, and leases are renewed as the run goes. Runs are serialized: a run started while another is in
+        progress (a background job or a direct call) waits for it to finish.
+        
+        Args:
+            progress: Receives the run's partial results; cancelling it stops
+                the run after the current position (alerts and prices of the
+                positions already processed are still handled)
+        
+        Returns:
+            Changed, unchanged and errored positions
+        """
+        with self._run_lock:
+            logger.info("Running autonomous agent")
+            baseline = self.memory_monitor.begin_run() if self.memory_monitor is not None else None
+        
+            with call_priority(CallPriority.AGENT_RUN):
+                stocks = self.get_tracked_stocks()
+                if self.shard_coordinator is None:
+                    diff = self._run_agent(stocks, progress)
+                else:
+                    leased = self.shard_coordinator.begin_run([stock.symbol for stock in stocks])
+                    try:
+                        shard = set(leased)
+                        diff = self._run_agent(
+                            [stock for stock in stocks if stock.symbol in shard], progress
+                        )
+                    finally:
+                        self.shard_coordinator.end_run(leased)
+    
+            if baseline is not None:
+                diff.memory = self.memory_monitor.end_run(baseline)
+                logger.info(
+                    f"Agent run memory: peak {diff.memory.peak_bytes} B, "
+                    f"retained {diff.memory.retained_bytes} B"
+                )
+        
+            self._record_run(diff)
+            if self.broadcaster is not None:
+                self.broadcaster.publish("run", {
+                    "changed": [analysis.symbol for analysis in diff.changed],
+                    "unchanged": len(diff.unchanged),
+                    "errors": diff.errored,
+                    "alerts": diff.alerts,
+                    "memory": diff.memory.model_dump() if diff.memory is not None else None,
+                })
+            return diff
+    
+    def close(self) -> None:
+        """
+        Save pending state and release what the services hold
+        
+        Waits for a running agent run, saves indicator state and analysis
+        snapshots, leaves the shard ring, closes cache, lease and rate
+        limiter connections, drops history memory maps and stops memory
+        tracing. Positions need no final save: the repository writes every
+        change as it happens.
+        """
+        with self._run_lock:
+            pending = (("indicator state", self.indicator_engine), ("analysis snapshots", self.snapshot_store))
+            for name, store in pending:
+                if store is None:
+                    continue
+                try:
+                    store.save()
+                except StorageError as e:
+                    logger.error(f"Failed to save {name}: {e}")
+            
+            if self.shard_coordinator is not None:
+                # Hand this instance's shard to the others before their next run
+                self.shard_coordinator.leave()
+                self.shard_coordinator.store.close()
+            self.market_service.close()
+            if self.memory_monitor is not None:
+                self.memory_monitor.stop()
+        logger.info("Closed StockService")
+    
+    def _record_run(self, diff: AgentRunDiff) -> None:
+        """Append a run to the run history (runs without positions are skipped)"""
+        if self.run_history is None or not (diff.analyses or diff.errored):
+            return
+        
+        record = {
+            "analyses": {
+                analysis.symbol: analysis.model_dump(mode="json", include=_HISTORY_FIELDS)
+                for analysis in diff.analyses
+            },
+            "changed": [analysis.symbol for analysis in diff.changed],
+            "errored": diff.errored,
+            "alerts": diff.alerts,
+        }
+        if diff.memory is not None:
+            record["memory"] = diff.memory.model_dump()
+        try:
+            self.run_history.append(record)
+        except StorageError as e:
+            logger.error(f"Failed to record agent run: {e}")
+    
+    def get_symbol_history(self, symbol: str, start: datetime, end: datetime) -> List[HistoryPoint]:
+        """
+        Get a position's recorded analyses over a time range
+        
+        Args:
+            symbol: Stock symbol
+            start: Start of the range (naive times are local)
+            end: End of the range (naive times are local)
+        
+        Returns:
+            Points in time order (empty if run history is disabled)
         """
-        logger.info("Running autonomous agent")
+        if self.run_history is None:
+            return []
+        
+        symbol = symbol.strip().upper()
+        points = []
+        for ts, record in self.run_history.runs(start.timestamp(), end.timestamp()):
+            analysis = record["analyses"].get(symbol)
+            if analysis is not None:
+                points.append(HistoryPoint(
+                    time=datetime.fromtimestamp(ts, timezone.utc),
+                    changed=symbol in record["changed"],
+                    **analysis
+                ))
+        return points
+    
+    def get_run_history(self, start: datetime, end: datetime) -> List[RunSummary]:
+        """
+        Get recorded agent runs over a time range
         
-        stocks = self.get_tracked_stocks()
+        Args:
+            start: Start of the range (naive times are local)
+            end: End of the range (naive times are local)
+        
+        Returns:
+            Run summaries in time order (empty if run history is disabled)
+        """
+        if self.run_history is None:
+            return []
+        
+        return [
+            RunSummary(
+                time=datetime.fromtimestamp(ts, timezone.utc),
+                changed=record["changed"],
+                unchanged=len(record["analyses"]) - len(record["changed"]),
+                errors=record["errored"],
+                alerts=record["alerts"],
+                memory=record.get("memory")
+            )
+            for ts, record in self.run_history.runs(start.timestamp(), end.timestamp())
+        ]
+    
+    def _run_agent(self, stocks: List[StockInDB], progress: Optional[RunProgress] = None) -> AgentRunDiff:
+        """Analyze changed stocks, send alerts and record prices"""
         now_ist = datetime.now(self.timezone)
+        diff = AgentRunDiff()
+        if progress is not None:
+            progress.begin(len(stocks), diff)
         
         if not stocks:
             logger.info("No stocks to analyze")
-            return []
+            return diff
         
-        results = []
+        changed_stocks = []
+        fingerprints = {}
+        metadata = self.market_service.get_cached_metadata([stock.symbol for stock in stocks])
         
         for stock in stocks:
+            if progress is not None and progress.cancelled:
+                logger.info(f"Agent run cancelled after {len(diff.analyses) + len(diff.errored)} position(s)")
+                break
+            # A long run outlives its leases unless they are renewed; lost symbols belong to another instance
+            if self.shard_coordinator is not None and stock.symbol not in self.shard_coordinator.renew():
+                continue
+            
             try:
-                # Analyze stock
-                analysis = self.analyze_stock(
-                    symbol=stock.symbol,
-                    buy_price=stock.buy_price,
-                    target_price=stock.target_price
+                current_price = self.market_service.get_live_price(stock.symbol)
+                
+                # Reuse the previous analysis if nothing it depends on changed
+                fingerprint = _fingerprint(stock, current_price)
+                if self.snapshot_store is not None:
+                    snapshot = self.snapshot_store.get(stock.symbol, fingerprint)
+                    if snapshot is not None:
+                        diff.unchanged.append(StockAnalysis.model_validate(snapshot))
+                        continue
+                
+                indicators = self._compute_indicators(stock.symbol, current_price)
+                analysis = self._build_analysis(
+                    stock.symbol,
+                    stock.buy_price,
+                    stock.target_price,
+                    current_price,
+                    indicators=indicators,
+                    metadata=metadata.get(stock.symbol)
                 )
                 
                 # Send target alert if reached
                 if analysis.decision == DecisionType.TARGET_REACHED:
-                    self.alert_service.send_target_alert(analysis)
-                
-                # Send daily update if within time window
-                if self._is_daily_update_time(now_ist):
-                    self.alert_service.send_daily_update(analysis)
+                    if self._claim_alert(analysis.symbol, "target", f"{stock.target_price:g}"):
+                        self.alert_service.send_target_alert(analysis)
+                        diff.alerts.append({"symbol": analysis.symbol, "kind": "target"})
                 
-                results.append(analysis)
+                diff.changed.append(analysis)
+                changed_stocks.append(stock)
+                fingerprints[stock.symbol] = fingerprint
                 
             except Exception as e:
                 logger.error(f"Failed to analyze {stock.symbol}: {e}")
+                diff.errored.append({"symbol": stock.symbol, "error": str(e)})
                 # Continue with other stocks
                 continue
         
-        logger.info(f"Agent run complete: analyzed {len(results)} stocks")
-        return results
+        # Send daily update if within time window
+        if self._is_daily_update_time(now_ist):
+            # Keep the claim for the rest of the day so later runs in the window do not resend it
+            tomorrow = now_ist.date() + timedelta(days=1)
+            end_of_day = self.timezone.localize(datetime.combine(tomorrow, datetime.min.time()))
+            for analysis in diff.analyses:
+                if self._claim_alert(
+                    analysis.symbol,
+                    "daily_update",
+                    now_ist.date().isoformat(),
+                    retention_seconds=(end_of_day - now_ist).total_seconds()
+                ):
+                    self.alert_service.send_daily_update(analysis)
+                    diff.alerts.append({"symbol": analysis.symbol, "kind": "daily_update"})
+        
+        diff.alerts.extend(self._apply_rules(changed_stocks, diff.changed))
+        
+        if self.broadcaster is not None:
+            for analysis in diff.changed:
+                self.broadcaster.publish("analysis", analysis.model_dump(mode="json"), symbol=analysis.symbol)
+        
+        # One FX batch per run keeps the rates of every held currency fresh
+        if self.fx_service is not None:
+            self.fx_service.refresh({analysis.currency for analysis in diff.analyses if analysis.currency})
+        
+        # Remember prices so listings can filter by decision and distance
+        try:
+            self.repository.record_prices(
+                {result.symbol: result.current_price for result in diff.changed}
+            )
+        except StorageError as e:
+            logger.error(f"Failed to record prices: {e}")
+        
+        if self.indicator_engine is not None and diff.changed:
+            try:
+                self.indicator_engine.save()
+            except StorageError as e:
+                logger.error(f"Failed to save indicator state: {e}")
+        
+        if self.snapshot_store is not None:
+            for analysis in diff.changed:
+                # Rules fire on transitions, so a reused analysis triggers none
+                snapshot = analysis.model_dump(mode="json", exclude={"triggered_rules"})
+                self.snapshot_store.put(analysis.symbol, fingerprints[analysis.symbol], snapshot)
+            try:
+                self.snapshot_store.save()
+            except StorageError as e:
+                logger.error(f"Failed to save analysis snapshots: {e}")
+        
+        logger.info(
+            f"Agent run complete: {len(diff.changed)} changed, "
+            f"{len(diff.unchanged)} unchanged, {len(diff.errored)} errored"
+        )
+        return diff
+    
+    def _apply_rules(self, stocks: List[StockInDB], results: List[StockAnalysis]) -> List[dict]:
+        """
+        Evaluate all position rules in one pass and send their alerts
+        
+        Must run before the new prices are recorded, since rules compare
+        against the previous price and high-water mark.
+        
+        Args:
+            stocks: Tracked positions as loaded at the start of the run
+            results: Analyses of this run (failed symbols are missing)
+        
+        Returns:
+            Alerts sent, as symbol and kind
+        """
+        rule_set = RuleSet.compile(stocks)
+        if not len(rule_set):
+            return []
+        
+        by_symbol = {result.symbol: result for result in results}
+        fired = rule_set.evaluate(
+            price=price_array([
+                by_symbol[stock.symbol].current_price if stock.symbol in by_symbol else None
+                for stock in stocks
+            ]),
+            previous=price_array([stock.last_price for stock in stocks]),
+            buy_price=price_array([stock.buy_price for stock in stocks]),
+            high_water=price_array([stock.high_water for stock in stocks])
+        )
+        
+        sent = []
+        for position, rule in fired:
+            stock = stocks[position]
+            analysis = by_symbol[stock.symbol]
+            analysis.triggered_rules.append(rule.text)
+            kind = f"rule:{rule.text}"
+            # Rules fire on the move from the recorded price, so that observation names the transition
+            previous = stock.last_price_at.isoformat() if stock.last_price_at else "unpriced"
+            if self._claim_alert(analysis.symbol, kind, f"from {previous}"):
+                self.alert_service.send_rule_alert(analysis, rule)
+                sent.append({"symbol": analysis.symbol, "kind": kind})
+        
+        if fired:
+            logger.info(f"{len(fired)} alert rule(s) fired")
+        return sent
+    
+    def _claim_alert(
+        self,
+        symbol: str,
+        kind: str,
+        trigger: str,
+        retention_seconds: Optional[float] = None
+    ) -> bool:
+        """Whether this instance should send an alert for a transition (always without sharding)"""
+        if self.shard_coordinator is None:
+            return True
+        try:
+            return self.shard_coordinator.claim_alert(symbol, kind, trigger, retention_seconds)
+        except StorageError as e:
+            logger.error(f"Not sending {kind} alert for {symbol}: {e}")
+            return False
     
     def _is_daily_update_time(self, current_time: datetime) -> bool:
         """
@@ -0,0 +1,143 @@
+"""Resident agent loop for the CLI watch command"""
+
+import threading
+import time
+from typing import Callable, Optional
+
+from stock_agent.config import Settings
+from stock_agent.services.stock_service import StockService
+from stock_agent.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class AgentWatcher:
+    """
+    Runs the agent at a fixed interval in one long-lived process
+    
+    Services are built once and reused by every iteration, so caches,
+    memory maps and database connections stay warm. Iterations start on a
+    fixed schedule; one that overruns the interval is followed at once by
+    the next. stop() and reload() only set flags and wake the loop, so
+    they are safe to call from signal handlers: a stop lets the running
+    iteration finish, and a reload rebuilds the services from freshly
+    loaded settings before the next iteration.
+    """
+    
+    def __init__(
+        self,
+        load_settings: Callable[[], Settings],
+        build_service: Callable[[Settings], StockService],
+        interval_seconds: Optional[float] = None,
+        report: Callable[[str], None] = print,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize watcher
+        
+        Args:
+            load_settings: Loads current settings (called again on reload)
+            build_service: Builds the stock service for a settings instance
+            interval_seconds: Seconds between iteration starts (the
+                watch_interval_seconds setting if None)
+            report: Receives one line per iteration
+            clock: Monotonic time source
+        """
+        self.load_settings = load_settings
+        self.build_service = build_service
+        self.interval_override = interval_seconds
+        self.report = report
+        self._clock = clock
+        self._wake = threading.Event()
+        self._stopping = False
+        self._reload_requested = False
+        self.iterations = 0
+        self._configure()
+    
+    def _configure(self) -> None:
+        """Load settings and build the services"""
+        self.settings = self.load_settings()
+        self.interval_seconds = (
+            self.interval_override if self.interval_override is not None
+            else self.settings.watch_interval_seconds
+        )
+        self.stock_service = self.build_service(self.settings)
+    
+    def stop(self) -> None:
+        """Stop after the current iteration (signal-safe)"""
+        self._stopping = True
+        self._wake.set()
+    
+    def reload(self) -> None:
+        """Reload settings and rebuild services before the next iteration (signal-safe)"""
+        self._reload_requested = True
+        self._wake.set()
+    
+    def run(self, iterations: Optional[int] = None) -> int:
+        """
+        Run iterations until stopped
+        
+        Args:
+            iterations: Stop after this many iterations (run until stopped if None)
+        
+        Returns:
+            Number of iterations run
+        """
+        logger.info(f"Watching every {self.interval_seconds:g}s")
+        next_start = self._clock()
+        while not self._stopping and (iterations is None or self.iterations < iterations):
+            if self._reload_requested:
+                self._reload_requested = False
+                self._close()
+                self._configure()
+                self.report(f"Reloaded configuration (interval {self.interval_seconds:g}s)")
+                next_start = self._clock()
+            
+            self._wait_until(next_start)
+            if self._stopping or self._reload_requested:
+                continue
+            
+            started = self._clock()
+            self._iterate()
+            elapsed = self._clock() - started
+            
+            next_start += self.interval_seconds
+            if next_start < self._clock():
+                logger.warning(f"Iteration took {elapsed:.2f}s, longer than the {self.interval_seconds:g}s interval")
+                next_start = self._clock()
+        
+        self._close()
+        return self.iterations
+    
+    def _iterate(self) -> None:
+        """Run the agent once and report its timing"""
+        self.iterations += 1
+        started = self._clock()
+        try:
+            diff = self.stock_service.run_agent_diff()
+        except Exception as e:
+            logger.error(f"Agent run failed: {e}")
+            self.report(f"[{self.iterations}] failed after {self._clock() - started:.2f}s: {e}")
+            return
+        
+        line = (
+            f"[{self.iterations}] {len(diff.changed)} changed, {len(diff.unchanged)} unchanged, "
+            f"{len(diff.errored)} failed, {len(diff.alerts)} alert(s) in {self._clock() - started:.2f}s"
+        )
+        if diff.memory is not None:
+            line += (
+                f", peak {diff.memory.peak_bytes / 1024:.0f} KiB, "
+                f"retained {diff.memory.retained_bytes / 1024:+.0f} KiB"
+            )
+        self.report(line)
+    
+    def _wait_until(self, deadline: float) -> None:
+        """Sleep until deadline, returning early on stop or reload"""
+        remaining = deadline - self._clock()
+        if remaining > 0:
+            self._wake.wait(remaining)
+        self._wake.clear()
+    
+    def _close(self) -> None:
+        """Save state and release what the current services hold on to"""
+        self.stock_service.close()
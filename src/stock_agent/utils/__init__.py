@@ -6,6 +6,8 @@ from stock_agent.utils.exceptions import (
     StockNotFoundError,
     InvalidSymbolError,
     MarketDataError,
+    CircuitOpenError,
+    RateLimitedError,
     AlertError,
     StorageError,
     DuplicateStockError,
@@ -18,6 +20,8 @@ __all__ = [
     "StockNotFoundError",
     "InvalidSymbolError",
     "MarketDataError",
+    "CircuitOpenError",
+    "RateLimitedError",
     "AlertError",
     "StorageError",
     "DuplicateStockError",
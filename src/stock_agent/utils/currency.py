@@ -0,0 +1,83 @@
+"""Currencies of symbols, price formatting and vectorised conversion"""
+
+from functools import lru_cache
+from typing import Dict, Sequence
+
+import numpy as np
+
+DEFAULT_CURRENCY = "USD"
+
+# Yahoo Finance exchange suffixes and the currency their listings trade in
+SUFFIX_CURRENCIES = {
+    "NS": "INR",
+    "BO": "INR",
+    "L": "GBP",
+    "DE": "EUR",
+    "PA": "EUR",
+    "AS": "EUR",
+    "MI": "EUR",
+    "SW": "CHF",
+    "T": "JPY",
+    "HK": "HKD",
+    "TO": "CAD",
+    "AX": "AUD",
+}
+
+CURRENCY_SIGNS = {
+    "USD": "$",
+    "INR": "₹",
+    "GBP": "£",
+    "EUR": "€",
+    "JPY": "¥",
+}
+
+
+@lru_cache(maxsize=65536)
+def symbol_currency(symbol: str) -> str:
+    """
+    Currency a symbol trades in, inferred from its exchange suffix
+    
+    Args:
+        symbol: Stock symbol (e.g. TCS.NS)
+    
+    Returns:
+        ISO currency code (USD for symbols without a known suffix)
+    """
+    _, dot, suffix = symbol.strip().upper().rpartition(".")
+    return SUFFIX_CURRENCIES.get(suffix, DEFAULT_CURRENCY) if dot else DEFAULT_CURRENCY
+
+
+def format_price(amount: float, currency: str) -> str:
+    """Amount with its currency sign (or code, for currencies without one)"""
+    sign = CURRENCY_SIGNS.get(currency)
+    if sign is None:
+        return f"{amount:.2f} {currency}"
+    if amount < 0:
+        return f"-{sign}{-amount:.2f}"
+    return f"{sign}{amount:.2f}"
+
+
+def fx_pair(currency: str, reporting_currency: str) -> str:
+    """Quote symbol of an exchange rate (price of one unit of currency)"""
+    return f"{currency}{reporting_currency}=X"
+
+
+def convert_amounts(
+    amounts: np.ndarray,
+    currencies: Sequence[str],
+    rates: Dict[str, float]
+) -> np.ndarray:
+    """
+    Convert amounts in mixed currencies with one lookup per distinct currency
+    
+    Args:
+        amounts: Amounts (NaN allowed)
+        currencies: Currency of each amount
+        rates: Units of the target currency per unit of each currency
+    
+    Returns:
+        Converted amounts, NaN where no rate is known
+    """
+    codes, inverse = np.unique(np.asarray(currencies, dtype=str), return_inverse=True)
+    factors = np.array([rates.get(code, np.nan) for code in codes.tolist()], dtype=float)
+    return np.asarray(amounts, dtype=float) * factors[inverse.reshape(-1)]
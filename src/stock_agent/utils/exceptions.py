@@ -38,6 +38,24 @@ class MarketDataError(StockAgentException):
         super().__init__(message)
 
 
+class CircuitOpenError(MarketDataError):
+    """Raised when a call is rejected because the upstream circuit is open"""
+    
+    def __init__(self, name: str, retry_in: float = 0.0, symbol: str = ""):
+        self.name = name
+        self.retry_in = retry_in
+        super().__init__(symbol or name, f"circuit '{name}' is open, retry in {retry_in:.0f}s")
+
+
+class RateLimitedError(MarketDataError):
+    """Raised when no upstream request slot became available in time"""
+    
+    def __init__(self, name: str, priority: str = "", symbol: str = ""):
+        self.name = name
+        self.priority = priority
+        super().__init__(symbol or name, f"rate limit of '{name}' exhausted for {priority or 'caller'}")
+
+
 class AlertError(StockAgentException):
     """Raised when alert sending fails"""
     
@@ -0,0 +1,41 @@
+"""Exclusive locks on files shared by processes"""
+
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+from stock_agent.utils.exceptions import StorageError
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - no cross-process locking on Windows
+    fcntl = None
+
+
+@contextmanager
+def file_lock(path: Path, operation: str) -> Iterator[None]:
+    """
+    Hold an exclusive lock on a lock file while the block runs
+    
+    The lock is taken with flock, so it serializes other processes and
+    other threads that open the same file. Where flock is unavailable the
+    block runs unlocked.
+    
+    Args:
+        path: Lock file (created if missing)
+        operation: Operation reported if the lock file cannot be opened
+    
+    Raises:
+        StorageError: If the lock file cannot be opened
+    """
+    if fcntl is None:
+        yield
+        return
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        lock_file = open(path, "wb")
+    except OSError as e:
+        raise StorageError(operation, str(e))
+    with lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        yield
@@ -0,0 +1,286 @@
+"""Token-bucket rate limiting of upstream calls with caller priorities"""
+
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from pathlib import Path
+from typing import Callable, Iterator, Optional, Tuple
+
+from stock_agent.utils.exceptions import RateLimitedError, StorageError
+from stock_agent.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class CallPriority(IntEnum):
+    """Priority of an upstream call (lower value is served first)"""
+    
+    AGENT_RUN = 0
+    INTERACTIVE = 1
+    HEALTH_PROBE = 2
+
+
+_priority: ContextVar[CallPriority] = ContextVar("call_priority", default=CallPriority.INTERACTIVE)
+
+
+def current_priority() -> CallPriority:
+    """Priority of upstream calls made by the current context"""
+    return _priority.get()
+
+
+@contextmanager
+def call_priority(priority: CallPriority) -> Iterator[None]:
+    """
+    Make upstream calls in this block with the given priority
+    
+    Args:
+        priority: Priority applied until the block exits
+    """
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class TokenBucket:
+    """Token bucket held in process memory"""
+    
+    def __init__(self, rate: float, burst: float, clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize token bucket
+        
+        Args:
+            rate: Tokens added per second
+            burst: Bucket capacity
+            clock: Time source
+        """
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._tokens = float(burst)
+        self._updated = clock()
+    
+    def try_take(self, floor: float = 0.0) -> float:
+        """
+        Take one token if at least floor tokens remain afterwards
+        
+        Args:
+            floor: Tokens that must be left in the bucket
+        
+        Returns:
+            0 if a token was taken, otherwise seconds until one can be
+        """
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens - 1 >= floor:
+            self._tokens -= 1
+            return 0.0
+        return (floor + 1 - self._tokens) / self.rate
+    
+    def drain(self) -> None:
+        """Empty the bucket"""
+        self._tokens = 0.0
+        self._updated = self._clock()
+    
+    def close(self) -> None:
+        """Release what the bucket holds (nothing for an in-memory bucket)"""
+
+
+class SQLiteTokenBucket(TokenBucket):
+    """
+    Token bucket stored in a SQLite file, shared by every process using it
+    
+    Each take runs in an immediate transaction, so concurrent processes
+    refill and spend the same tokens. Wall-clock time is used because
+    monotonic clocks are not comparable between processes.
+    """
+    
+    def __init__(
+        self,
+        path: str,
+        rate: float,
+        burst: float,
+        name: str = "market_data",
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Initialize shared token bucket
+        
+        Args:
+            path: SQLite database file
+            rate: Tokens added per second
+            burst: Bucket capacity
+            name: Bucket name (one file can hold several buckets)
+            clock: Wall-clock time source
+        
+        Raises:
+            StorageError: If the database cannot be opened
+        """
+        self.rate = rate
+        self.burst = burst
+        self.name = name
+        self._clock = clock
+        try:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(path, timeout=10, isolation_level=None, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS token_bucket "
+                "(name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "INSERT OR IGNORE INTO token_bucket VALUES (?, ?, ?)", (name, float(burst), clock())
+            )
+        except sqlite3.Error as e:
+            raise StorageError("open rate limiter", f"{path}: {e}")
+    
+    def try_take(self, floor: float = 0.0) -> float:
+        """Take one token from the shared bucket (see TokenBucket.try_take)"""
+        def take(tokens: float) -> Tuple[float, float]:
+            if tokens - 1 >= floor:
+                return tokens - 1, 0.0
+            return tokens, (floor + 1 - tokens) / self.rate
+        
+        return self._update(take)
+    
+    def drain(self) -> None:
+        """Empty the shared bucket"""
+        self._update(lambda tokens: (0.0, 0.0))
+    
+    def close(self) -> None:
+        """Close the database connection"""
+        self._conn.close()
+    
+    def _update(self, change: Callable[[float], Tuple[float, float]]) -> float:
+        """Refill and apply a change to the stored tokens in one transaction"""
+        try:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                tokens, updated = self._conn.execute(
+                    "SELECT tokens, updated FROM token_bucket WHERE name = ?", (self.name,)
+                ).fetchone()
+                now = self._clock()
+                tokens = min(self.burst, tokens + max(0.0, now - updated) * self.rate)
+                tokens, wait = change(tokens)
+                self._conn.execute(
+                    "UPDATE token_bucket SET tokens = ?, updated = ? WHERE name = ?",
+                    (tokens, now, self.name)
+                )
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return wait
+        except sqlite3.Error as e:
+            raise StorageError("update rate limiter", str(e))
+
+
+class RateLimiter:
+    """
+    Rate limiter shared by all callers of an upstream
+    
+    Callers take one token per request. Priority is enforced two ways:
+    waiting callers are served highest priority first within the process,
+    and lower priorities must leave part of the bucket untouched (the
+    reserve), so agent runs keep headroom even when other processes
+    sharing the bucket are busy with probes.
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        bucket: TokenBucket,
+        reserve: float = 0.0,
+        max_wait: float = 30.0
+    ):
+        """
+        Initialize rate limiter
+        
+        Args:
+            name: Upstream name used in logs and errors
+            bucket: Token storage (in memory or shared)
+            reserve: Tokens the lowest priority must leave in the bucket;
+                priorities in between leave a proportional share
+            max_wait: Longest time a caller waits for a token, in seconds
+        """
+        self.name = name
+        self.bucket = bucket
+        self.reserve = min(max(reserve, 0.0), max(bucket.burst - 1, 0.0))
+        self.max_wait = max_wait
+        self._cond = threading.Condition()
+        self._waiting = {priority: 0 for priority in CallPriority}
+        self._granted = {priority: 0 for priority in CallPriority}
+        self._rejected = {priority: 0 for priority in CallPriority}
+    
+    def floor(self, priority: CallPriority) -> float:
+        """Tokens a caller of this priority must leave in the bucket"""
+        return self.reserve * priority / max(CallPriority)
+    
+    def acquire(
+        self,
+        priority: Optional[CallPriority] = None,
+        timeout: Optional[float] = None,
+        symbol: str = ""
+    ) -> float:
+        """
+        Wait for a token
+        
+        Args:
+            priority: Caller priority (the context's priority if None)
+            timeout: Longest wait in seconds (max_wait if None, probes never wait)
+            symbol: Symbol the call is for (used in the error)
+        
+        Returns:
+            Seconds waited
+        
+        Raises:
+            RateLimitedError: If no token became available in time
+        """
+        if priority is None:
+            priority = current_priority()
+        if timeout is None:
+            timeout = 0.0 if priority == CallPriority.HEALTH_PROBE else self.max_wait
+        
+        start = time.monotonic()
+        with self._cond:
+            self._waiting[priority] += 1
+            try:
+                while True:
+                    ahead = any(self._waiting[p] for p in CallPriority if p < priority)
+                    wait = 1 / self.bucket.rate if ahead else self.bucket.try_take(self.floor(priority))
+                    if not wait:
+                        self._granted[priority] += 1
+                        return time.monotonic() - start
+                    
+                    remaining = start + timeout - time.monotonic()
+                    if remaining <= 0:
+                        self._rejected[priority] += 1
+                        raise RateLimitedError(self.name, priority.name.lower(), symbol)
+                    self._cond.wait(min(wait, remaining))
+            finally:
+                self._waiting[priority] -= 1
+                self._cond.notify_all()
+    
+    def throttled(self) -> None:
+        """Empty the bucket after the upstream reported rate limiting"""
+        with self._cond:
+            self.bucket.drain()
+        logger.warning(f"Upstream '{self.name}' throttled us; rate limiter drained")
+    
+    def close(self) -> None:
+        """Release the bucket's resources"""
+        self.bucket.close()
+    
+    def snapshot(self) -> dict:
+        """Counters for health reporting"""
+        with self._cond:
+            return {
+                "rate_per_second": self.bucket.rate,
+                "burst": self.bucket.burst,
+                "granted": {p.name.lower(): n for p, n in self._granted.items()},
+                "rejected": {p.name.lower(): n for p, n in self._rejected.items()},
+            }
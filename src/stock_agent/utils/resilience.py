@@ -0,0 +1,227 @@
+"""Retry backoff, failure classification and circuit breaking for upstream calls"""
+
+import random
+import re
+import socket
+import threading
+import time
+from typing import Callable, Optional
+
+import requests
+
+from stock_agent.utils.exceptions import CircuitOpenError
+from stock_agent.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+TRANSIENT_MARKERS = ("too many requests", "rate limit", "timed out", "currently down")
+
+_STATUS_IN_MESSAGE = re.compile(r"status[_ ]code\s*[=:]\s*(\d{3})", re.IGNORECASE)
+
+
+def status_code_of(error: BaseException) -> Optional[int]:
+    """HTTP status code carried by an exception (or quoted in its message), if any"""
+    response = getattr(error, "response", None)
+    status = getattr(response, "status_code", None)
+    if status is None:
+        match = _STATUS_IN_MESSAGE.search(str(error))
+        status = int(match.group(1)) if match else None
+    return status
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Decide whether a failed upstream call is worth retrying
+    
+    Timeouts, connection failures, rate limiting (429) and 5xx responses are
+    transient. Everything else (bad symbols, malformed data) will fail the
+    same way again.
+    
+    Args:
+        error: Exception raised by the call
+    
+    Returns:
+        True if the call should be retried
+    """
+    if isinstance(error, (requests.Timeout, requests.ConnectionError, TimeoutError, socket.timeout)):
+        return True
+    if type(error).__name__ == "YFRateLimitError":
+        return True
+    
+    status = status_code_of(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS_CODES
+    
+    message = str(error).lower()
+    return any(marker in message for marker in TRANSIENT_MARKERS)
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Seconds requested by a Retry-After header on the error's response"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter"""
+    
+    def __init__(
+        self,
+        attempts: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 8.0,
+        rng: Optional[random.Random] = None
+    ):
+        """
+        Initialize retry policy
+        
+        Args:
+            attempts: Total number of attempts (1 disables retries)
+            base_delay: Backoff ceiling after the first failure, in seconds
+            max_delay: Upper bound for any single delay, in seconds
+            rng: Random source (for deterministic tests)
+        """
+        self.attempts = max(attempts, 1)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._rng = rng or random.Random()
+    
+    def delay(self, attempt: int, minimum: Optional[float] = None) -> float:
+        """
+        Delay before the next attempt
+        
+        The ceiling doubles with every failed attempt and the delay is drawn
+        uniformly below it, so clients that failed together spread out.
+        
+        Args:
+            attempt: Number of the attempt that just failed (from 1)
+            minimum: Delay requested by the server (Retry-After)
+        
+        Returns:
+            Seconds to wait
+        """
+        ceiling = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        delay = self._rng.uniform(0, ceiling)
+        if minimum is not None:
+            delay = max(delay, min(minimum, self.max_delay))
+        return delay
+
+
+class CircuitBreaker:
+    """
+    Fail fast while an upstream dependency is down
+    
+    Closed: calls pass and consecutive failures are counted. After
+    failure_threshold failures the breaker opens and calls are rejected for
+    reset_timeout seconds. It then goes half-open and lets a single probe
+    through; success closes it, failure opens it again.
+    """
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize circuit breaker
+        
+        Args:
+            name: Dependency name used in logs and errors
+            failure_threshold: Consecutive failures that open the breaker
+            reset_timeout: Seconds to stay open before probing
+            clock: Monotonic time source (for tests)
+        """
+        self.name = name
+        self.failure_threshold = max(failure_threshold, 1)
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._rejected = 0
+    
+    @property
+    def state(self) -> str:
+        """Current state, moving from open to half-open once the timeout passed"""
+        with self._lock:
+            return self._current_state()
+    
+    def before_call(self, symbol: str = "") -> None:
+        """
+        Admit or reject a call
+        
+        Args:
+            symbol: Symbol the call is for (used in the error)
+        
+        Raises:
+            CircuitOpenError: If the breaker is open, or half-open with a
+                probe already in flight
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return
+            if state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return
+            
+            self._rejected += 1
+            retry_in = max(0.0, self._opened_at + self.reset_timeout - self._clock())
+        raise CircuitOpenError(self.name, retry_in, symbol)
+    
+    def record_success(self) -> None:
+        """Record a call that reached the upstream"""
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info(f"Circuit '{self.name}' closed")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+    
+    def record_failure(self) -> None:
+        """Record an upstream failure"""
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning(
+                        f"Circuit '{self.name}' opened after {self._failures} failure(s)"
+                    )
+                self._state = self.OPEN
+                self._opened_at = self._clock()
+    
+    def snapshot(self) -> dict:
+        """State for health reporting"""
+        with self._lock:
+            state = self._current_state()
+            retry_in = None
+            if state == self.OPEN:
+                retry_in = round(max(0.0, self._opened_at + self.reset_timeout - self._clock()), 1)
+            return {
+                "state": state,
+                "consecutive_failures": self._failures,
+                "rejected_calls": self._rejected,
+                "retry_in_seconds": retry_in,
+            }
+    
+    def _current_state(self) -> str:
+        """State with the open timeout applied (lock must be held)"""
+        if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
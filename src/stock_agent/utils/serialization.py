@@ -0,0 +1,53 @@
+"""JSON serialization helpers with an optional orjson fast path"""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+def dumps(obj: Any, indent: bool = False) -> bytes:
+    """
+    Serialize an object to UTF-8 JSON bytes
+    
+    Args:
+        obj: JSON-compatible object (datetimes are written as ISO 8601)
+        indent: Pretty-print with two-space indentation
+    
+    Returns:
+        Encoded JSON
+    """
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 if indent else 0
+        return orjson.dumps(obj, option=option)
+    
+    text = json.dumps(
+        obj,
+        indent=2 if indent else None,
+        ensure_ascii=False,
+        separators=None if indent else (",", ":"),
+        default=_default
+    )
+    return text.encode("utf-8")
+
+
+def loads(data: bytes) -> Any:
+    """
+    Parse JSON bytes
+    
+    Raises:
+        ValueError: If the data is not valid JSON
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _default(value: Any) -> Any:
+    """Fallback encoder for the standard library json module"""
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
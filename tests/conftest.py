@@ -1,60 +1,95 @@
-"""Test configuration and fixtures"""
-
-import pytest
-from fastapi.testclient import TestClient
-
-from stock_agent.api.app import create_app
-from stock_agent.config import Settings
-from stock_agent.repositories.stock_repository import StockRepository
-from stock_agent.services.alert_service import AlertService
-from stock_agent.services.market_data_service import MarketDataService
-from stock_agent.services.stock_service import StockService
-
-
-@pytest.fixture
-def test_settings():
-    """Create test settings"""
-    return Settings(
-        environment="testing",
-        telegram_bot_token="test_token",
-        telegram_chat_id="test_chat_id",
-        data_file_path="test_data/stocks.json",
-        log_level="DEBUG"
-    )
-
-
-@pytest.fixture
-def mock_market_service():
-    """Create mock market data service"""
-    class MockMarketDataService(MarketDataService):
-        def get_live_price(self, symbol: str) -> float:
-            # Return mock prices
-            mock_prices = {
-                "AAPL": 150.0,
-                "TCS.NS": 3750.0,
-                "INFY.NS": 1520.0
-            }
-            return mock_prices.get(symbol.upper(), 100.0)
-    
-    return MockMarketDataService()
-
-
-@pytest.fixture
-def mock_alert_service(test_settings):
-    """Create mock alert service"""
-    class MockAlertService(AlertService):
-        def __init__(self, settings):
-            super().__init__(settings)
-            self.sent_alerts = []
-        
-        def _send_telegram_message(self, message: str) -> None:
-            self.sent_alerts.append(message)
-    
-    return MockAlertService(test_settings)
-
-
-@pytest.fixture
-def test_client():
-    """Create test client"""
-    app = create_app()
-    return TestClient(app)
+"""Test configuration and fixtures"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from stock_agent.api.app import create_app
+from stock_agent.config import Settings
+from stock_agent.services.alert_service import AlertService
+from stock_agent.services.fx_service import FxService
+from stock_agent.services.market_data_service import MarketDataService
+from stock_agent.services.stock_service import StockService
+
+
+@pytest.fixture
+def test_settings():
+    """Create test settings"""
+    return Settings(
+        environment="testing",
+        telegram_bot_token="test_token",
+        telegram_chat_id="test_chat_id",
+        data_file_path="test_data/stocks.json",
+        log_level="DEBUG"
+    )
+
+
+@pytest.fixture
+def mock_market_service():
+    """Create mock market data service"""
+    class MockMarketDataService(MarketDataService):
+        def get_live_price(self, symbol: str) -> float:
+            # Return mock prices
+            mock_prices = {
+                "AAPL": 150.0,
+                "TCS.NS": 3750.0,
+                "INFY.NS": 1520.0
+            }
+            return mock_prices.get(symbol.upper(), 100.0)
+    
+    return MockMarketDataService()
+
+
+@pytest.fixture
+def fx_service():
+    """Create FX service backed by a local table of rates into USD"""
+    table = {"INR": 0.012, "EUR": 1.08}
+    
+    def source(currencies, reporting_currency):
+        source.calls.append(list(currencies))
+        return {currency: table[currency] for currency in currencies if currency in table}
+    
+    source.calls = []
+    return FxService(source, reporting_currency="USD", ttl_seconds=3600)
+
+
+@pytest.fixture
+def mock_alert_service(test_settings):
+    """Create mock alert service"""
+    class MockAlertService(AlertService):
+        def __init__(self, settings):
+            super().__init__(settings)
+            self.sent_alerts = []
+        
+        def _send_telegram_message(self, message: str) -> None:
+            self.sent_alerts.append(message)
+    
+    return MockAlertService(test_settings)
+
+
+@pytest.fixture
+def test_client():
+    """Create test client"""
+    app = create_app()
+    return TestClient(app)
+
+
+@pytest.fixture
+def offline_client(tmp_path, mock_market_service, mock_alert_service, fx_service, test_settings):
+    """Create test client backed by mock services and a temporary repository"""
+    from stock_agent.api.dependencies import get_stock_service
+    from stock_agent.repositories.run_history import RunHistoryStore
+    from stock_agent.repositories.stock_repository import JSONStockRepository
+    
+    repository = JSONStockRepository(str(tmp_path / "stocks.json"))
+    stock_service = StockService(
+        mock_market_service,
+        mock_alert_service,
+        repository,
+        test_settings,
+        run_history=RunHistoryStore(str(tmp_path / "runs")),
+        fx_service=fx_service
+    )
+    
+    app = create_app()
+    app.dependency_overrides[get_stock_service] = lambda: stock_service
+    return TestClient(app)
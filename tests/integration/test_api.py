@@ -78,3 +78,258 @@ def test_run_agent_endpoint(test_client):
     assert "total_stocks" in data
     assert "results" in data
     assert "time_ist" in data
+
+
+@pytest.mark.integration
+def test_stock_crud_endpoints(offline_client):
+    """Test update, get and delete of a tracked stock"""
+    offline_client.post(
+        "/api/v1/stocks/track",
+        json={"symbol": "AAPL", "buy_price": 150.0, "target_price": 180.0}
+    )
+    
+    response = offline_client.put("/api/v1/stocks/AAPL", json={"buy_price": 140.0, "target_price": 190.0})
+    assert response.status_code == 200
+    assert response.json()["target_price"] == 190.0
+    
+    assert offline_client.get("/api/v1/stocks/AAPL").json()["buy_price"] == 140.0
+    assert offline_client.delete("/api/v1/stocks/AAPL").status_code == 200
+    assert offline_client.get("/api/v1/stocks/AAPL").status_code == 404
+    assert offline_client.delete("/api/v1/stocks/AAPL").status_code == 404
+
+
+@pytest.mark.integration
+def test_list_stocks_pagination_and_filters(offline_client):
+    """Test cursor pagination and decision filter on the listing"""
+    for symbol, target in [("AAPL", 140.0), ("INFY.NS", 1600.0), ("TCS.NS", 3800.0)]:
+        offline_client.post(
+            "/api/v1/stocks/track",
+            json={"symbol": symbol, "buy_price": 100.0, "target_price": target}
+        )
+    offline_client.get("/api/v1/agent/run")
+    
+    first = offline_client.get("/api/v1/stocks", params={"limit": 2})
+    second = offline_client.get(
+        "/api/v1/stocks", params={"limit": 2, "cursor": first.headers["X-Next-Cursor"]}
+    )
+    assert [s["symbol"] for s in first.json()] == ["AAPL", "INFY.NS"]
+    assert [s["symbol"] for s in second.json()] == ["TCS.NS"]
+    assert "X-Next-Cursor" not in second.headers
+    
+    near = offline_client.get("/api/v1/stocks", params={"within_percent": 2})
+    assert [s["symbol"] for s in near.json()] == ["TCS.NS"]
+    
+    held = offline_client.get("/api/v1/stocks", params={"decision": "hold"})
+    assert [s["symbol"] for s in held.json()] == ["INFY.NS", "TCS.NS"]
+    
+    assert offline_client.get("/api/v1/stocks", params={"decision": "SELL"}).status_code == 400
+
+
+@pytest.mark.integration
+def test_list_stocks_conditional_get(offline_client):
+    """Test ETag and If-None-Match handling on the listing"""
+    first = offline_client.get("/api/v1/stocks")
+    etag = first.headers["ETag"]
+    
+    unchanged = offline_client.get("/api/v1/stocks", headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+    assert unchanged.content == b""
+    
+    offline_client.post(
+        "/api/v1/stocks/track",
+        json={"symbol": "AAPL", "buy_price": 150.0, "target_price": 180.0}
+    )
+    changed = offline_client.get("/api/v1/stocks", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+
+@pytest.mark.integration
+def test_last_analysis_conditional_get(offline_client):
+    """Test Last-Modified and If-Modified-Since on analysis snapshots"""
+    offline_client.post(
+        "/api/v1/stocks/track",
+        json={"symbol": "AAPL", "buy_price": 100.0, "target_price": 180.0}
+    )
+    assert offline_client.get("/api/v1/stocks/AAPL/analysis").status_code == 404
+    
+    offline_client.get("/api/v1/agent/run")
+    response = offline_client.get("/api/v1/stocks/AAPL/analysis")
+    assert response.status_code == 200
+    assert response.json()["current_price"] == 150.0
+    
+    cached = offline_client.get(
+        "/api/v1/stocks/AAPL/analysis",
+        headers={"If-Modified-Since": response.headers["Last-Modified"]}
+    )
+    assert cached.status_code == 304
+
+
+@pytest.mark.integration
+def test_health_reports_open_circuit(test_client):
+    """Test the market data breaker state is exposed on /health"""
+    from stock_agent.api.dependencies import get_market_service
+    from stock_agent.services.market_data_service import MarketDataService
+    from stock_agent.utils.resilience import CircuitBreaker
+    
+    breaker = CircuitBreaker("market_data", failure_threshold=1)
+    breaker.record_failure()
+    market_service = MarketDataService(circuit_breaker=breaker)
+    test_client.app.dependency_overrides[get_market_service] = lambda: market_service
+    
+    data = test_client.get("/health").json()
+    
+    assert data["dependencies"]["market_data"] == "degraded"
+    assert data["dependencies"]["market_data_circuit"]["state"] == "open"
+
+
+@pytest.mark.integration
+def test_history_endpoints(offline_client):
+    """Test agent runs are queryable per symbol and as run summaries"""
+    offline_client.post(
+        "/api/v1/stocks/track",
+        json={"symbol": "AAPL", "buy_price": 100.0, "target_price": 180.0}
+    )
+    offline_client.get("/api/v1/agent/run")
+    offline_client.get("/api/v1/agent/run")
+    
+    series = offline_client.get("/api/v1/history/AAPL")
+    assert series.status_code == 200
+    assert [point["current_price"] for point in series.json()] == [150.0, 150.0]
+    
+    runs = offline_client.get("/api/v1/history/runs").json()
+    assert [run["changed"] for run in runs] == [["AAPL"], ["AAPL"]]
+    
+    empty = offline_client.get("/api/v1/history/AAPL", params={"end": "2020-01-01T00:00:00"})
+    assert empty.json() == []
+    assert offline_client.get(
+        "/api/v1/history/AAPL", params={"start": "2021-01-01T00:00:00", "end": "2020-01-01T00:00:00"}
+    ).status_code == 400
+
+
+@pytest.mark.integration
+def test_agent_job_lifecycle(offline_client):
+    """Test a background agent job is started, polled to completion and reported"""
+    import time
+    
+    offline_client.post(
+        "/api/v1/stocks/track",
+        json={"symbol": "AAPL", "buy_price": 100.0, "target_price": 180.0}
+    )
+    
+    started = offline_client.post("/api/v1/agent/jobs")
+    assert started.status_code == 202
+    job_id = started.json()["job_id"]
+    assert started.headers["Location"] == f"/api/v1/agent/jobs/{job_id}"
+    
+    deadline = time.monotonic() + 5
+    while True:
+        job = offline_client.get(f"/api/v1/agent/jobs/{job_id}").json()
+        if job["status"] not in ("queued", "running") or time.monotonic() > deadline:
+            break
+        time.sleep(0.01)
+    
+    assert job["status"] == "succeeded"
+    assert job["progress"]["total"] == job["progress"]["done"] == 1
+    assert [result["symbol"] for result in job["results"]] == ["AAPL"]
+    
+    assert offline_client.get("/api/v1/agent/jobs/unknown").status_code == 404
+    assert offline_client.delete(f"/api/v1/agent/jobs/{job_id}").json()["status"] == "succeeded"
+
+
+@pytest.mark.integration
+def test_portfolio_summary(offline_client):
+    """Test portfolio totals reflect tracked positions and agent prices"""
+    for symbol, buy, target in [("AAPL", 100.0, 180.0), ("TCS.NS", 3500.0, 4000.0)]:
+        offline_client.post(
+            "/api/v1/stocks/track",
+            json={"symbol": symbol, "buy_price": buy, "target_price": target}
+        )
+    
+    before = offline_client.get("/api/v1/portfolio/summary").json()
+    assert (before["currency"], before["positions"], before["priced_positions"]) == ("USD", 2, 0)
+    assert before["cost_basis"] == pytest.approx(100.0 + 3500.0 * 0.012)
+    
+    offline_client.get("/api/v1/agent/run")
+    after = offline_client.get("/api/v1/portfolio/summary").json()
+    
+    assert after["market_value"] == pytest.approx(150.0 + 3750.0 * 0.012)
+    assert after["profit"] == pytest.approx(50.0 + 250.0 * 0.012)
+    assert [(h["symbol"], h["currency"]) for h in after["holdings"]] == [("AAPL", "USD"), ("TCS.NS", "INR")]
+    assert after["holdings"][1]["weight"] == pytest.approx(45.0 / 195.0)
+
+
+@pytest.mark.integration
+def test_memory_debug_endpoints(offline_client):
+    """Test run memory is reported and snapshots can be taken and diffed when tracking is on"""
+    from stock_agent.api.dependencies import get_memory_monitor, get_stock_service
+    from stock_agent.services.memory_monitor import MemoryMonitor
+    
+    assert offline_client.get("/debug/memory").status_code == 404
+    
+    monitor = MemoryMonitor()
+    offline_client.app.dependency_overrides[get_stock_service]().memory_monitor = monitor
+    offline_client.app.dependency_overrides[get_memory_monitor] = lambda: monitor
+    try:
+        offline_client.post(
+            "/api/v1/stocks/track",
+            json={"symbol": "AAPL", "buy_price": 100.0, "target_price": 180.0}
+        )
+        first = offline_client.post("/debug/memory/snapshots")
+        assert first.status_code == 201
+        run = offline_client.get("/api/v1/agent/run").json()
+        assert run["memory"]["peak_bytes"] > 0
+        second = offline_client.post("/debug/memory/snapshots", params={"limit": 3}).json()
+        assert len(second["top"]) <= 3
+        
+        stats = offline_client.get("/debug/memory").json()
+        assert stats["tracing"] and stats["runs_measured"] == 1
+        assert stats["snapshots"] == [first.json()["id"], second["id"]]
+        
+        diff = offline_client.get(f"/debug/memory/snapshots/{second['id']}/diff").json()
+        assert diff["base_id"] == first.json()["id"]
+        assert offline_client.get("/debug/memory/snapshots/999/diff").status_code == 404
+    finally:
+        monitor.stop()
+
+
+@pytest.mark.integration
+def test_listing_with_metadata_revalidates_after_refresh(tmp_path, mock_alert_service, test_settings):
+    """Test a listing cached before metadata was loaded is served again once it is"""
+    from fastapi.testclient import TestClient
+    
+    from stock_agent.api.app import create_app
+    from stock_agent.api.dependencies import get_stock_service
+    from stock_agent.models.stock import StockCreate
+    from stock_agent.providers import ReplayProvider
+    from stock_agent.repositories.metadata_cache import MetadataCache
+    from stock_agent.repositories.stock_repository import JSONStockRepository
+    from stock_agent.services.market_data_service import MarketDataService
+    from stock_agent.services.metadata_refresher import MetadataRefresher
+    from stock_agent.services.stock_service import StockService
+    
+    replay = tmp_path / "replay.csv"
+    replay.write_text("date,symbol,open,high,low,close,volume,name\n2024-01-02,AAPL,1,1,1,101,1,Apple Inc.\n")
+    market_service = MarketDataService(
+        provider=ReplayProvider(str(replay)),
+        metadata_cache=MetadataCache(str(tmp_path / "metadata.db"))
+    )
+    repository = JSONStockRepository(str(tmp_path / "stocks.json"))
+    repository.add(StockCreate(symbol="AAPL", buy_price=100.0, target_price=200.0))
+    stock_service = StockService(market_service, mock_alert_service, repository, test_settings)
+    app = create_app()
+    app.dependency_overrides[get_stock_service] = lambda: stock_service
+    client = TestClient(app)
+    
+    before = client.get("/api/v1/stocks", params={"with_metadata": True})
+    assert before.json()[0]["metadata"] is None
+    etag = before.headers["ETag"]
+    assert client.get(
+        "/api/v1/stocks", params={"with_metadata": True}, headers={"If-None-Match": etag}
+    ).status_code == 304
+    
+    MetadataRefresher(market_service, repository).refresh_once()
+    after = client.get("/api/v1/stocks", params={"with_metadata": True}, headers={"If-None-Match": etag})
+    
+    assert after.status_code == 200
+    assert after.json()[0]["metadata"]["name"] == "Apple Inc."
@@ -0,0 +1,75 @@
+"""Unit tests for batch analysis from files"""
+
+import io
+
+import pytest
+
+from stock_agent.providers import ReplayProvider
+from stock_agent.repositories.stock_repository import JSONStockRepository
+from stock_agent.services.batch_analysis import BatchAnalyzer, read_requests, write_csv, write_json_lines
+from stock_agent.services.market_data_service import MarketDataService
+from stock_agent.services.stock_service import StockService
+
+SYMBOLS = [f"SYM{i}" for i in range(120)]
+
+
+@pytest.fixture
+def stock_service(tmp_path, mock_alert_service, test_settings):
+    """Stock service over a replayed market where SYMi closes at 100 + i"""
+    replay = tmp_path / "replay.csv"
+    replay.write_text(
+        "date,symbol,open,high,low,close,volume\n"
+        + "".join(f"2024-01-02,{s},1,1,1,{100 + i},1\n" for i, s in enumerate(SYMBOLS))
+    )
+    return StockService(
+        MarketDataService(provider=ReplayProvider(str(replay)), batch_size=25),
+        mock_alert_service,
+        JSONStockRepository(str(tmp_path / "stocks.json")),
+        test_settings
+    )
+
+
+@pytest.mark.unit
+def test_read_requests_detects_format_and_flags_bad_rows():
+    """Test CSV and NDJSON are parsed and malformed rows carry errors"""
+    csv_rows = list(read_requests(io.StringIO("Symbol,Buy,Target\naapl,100,120\n,1,2\nTCS.NS,x,2\n")))
+    assert [(r.symbol, r.buy_price, r.error) for r in csv_rows] == [
+        ("AAPL", 100.0, None),
+        ("", None, "Missing symbol"),
+        ("TCS.NS", None, "buy_price and target_price must be numbers"),
+    ]
+    
+    json_rows = list(read_requests(io.StringIO('\n{"symbol": "AAPL", "buy_price": 1, "target_price": 2}\nnope\n')))
+    assert json_rows[0].symbol == "AAPL" and json_rows[0].error is None
+    assert json_rows[1].error.startswith("Invalid JSON")
+
+
+@pytest.mark.unit
+def test_batch_analysis_prices_every_row(stock_service):
+    """Test rows are priced in concurrent batches and every row yields one result"""
+    text = "symbol,buy_price,target_price\n" + "".join(f"{s},150,200\n" for s in SYMBOLS) + "MISSING,1,2\n"
+    analyzer = BatchAnalyzer(stock_service, chunk_size=25, workers=4)
+    
+    out = io.StringIO()
+    assert write_csv(analyzer.run(read_requests(io.StringIO(text))), out) == len(SYMBOLS) + 1
+    
+    lines = out.getvalue().splitlines()
+    assert lines[0] == "symbol,buy_price,target_price,current_price,profit,profit_percent,decision,error"
+    rows = {line.split(",")[0]: line.split(",") for line in lines[1:]}
+    assert rows["SYM0"][3:7] == ["100.0", "-50.0", "-33.33", "BELOW_BUY_PRICE"]
+    assert rows["SYM119"][6] == "TARGET_REACHED"
+    assert rows["MISSING"][7] == "No price available"
+
+
+@pytest.mark.unit
+def test_json_lines_output(stock_service):
+    """Test results can be streamed as JSON lines"""
+    requests = read_requests(io.StringIO('{"symbol": "SYM60", "buy": 150, "target": 200}\n'))
+    out = io.StringIO()
+    
+    write_json_lines(BatchAnalyzer(stock_service).run(requests), out)
+    
+    assert out.getvalue() == (
+        '{"symbol":"SYM60","buy_price":150.0,"target_price":200.0,"current_price":160.0,'
+        '"profit":10.0,"profit_percent":6.67,"decision":"HOLD","error":null}\n'
+    )
@@ -0,0 +1,98 @@
+"""Unit tests for the streaming update broadcaster"""
+
+import asyncio
+import threading
+
+import pytest
+
+from stock_agent.models.stock import StockCreate
+from stock_agent.repositories.stock_repository import JSONStockRepository
+from stock_agent.services.broadcaster import DROPPED_FRAME, Broadcaster
+from stock_agent.services.stock_service import StockService
+
+
+@pytest.mark.unit
+def test_update_is_encoded_once_for_all_clients():
+    """Test every client receives the same frame published from another thread"""
+    async def scenario():
+        broadcaster = Broadcaster()
+        first, second = broadcaster.subscribe(), broadcaster.subscribe()
+        
+        publisher = threading.Thread(target=broadcaster.publish, args=("analysis", {"symbol": "AAPL"}))
+        publisher.start()
+        publisher.join()
+        
+        frames = [await first.next(1), await second.next(1)]
+        assert frames[0] is frames[1]
+        assert frames[0] == b'id: 1\nevent: analysis\ndata: {"symbol":"AAPL"}\n\n'
+    
+    asyncio.run(scenario())
+
+
+@pytest.mark.unit
+def test_clients_receive_only_their_symbols():
+    """Test symbol filters pick which clients get the shared frame"""
+    async def scenario():
+        broadcaster = Broadcaster()
+        everything, aapl = broadcaster.subscribe(), broadcaster.subscribe({"AAPL"})
+        
+        assert broadcaster.publish("analysis", {"symbol": "TCS.NS"}, symbol="TCS.NS") == 1
+        assert broadcaster.publish("analysis", {"symbol": "AAPL"}, symbol="AAPL") == 2
+        assert broadcaster.publish("run", {"changed": ["AAPL", "TCS.NS"]}) == 2
+        await asyncio.sleep(0)
+        
+        assert b"TCS.NS" in await everything.next(1)
+        frame = await aapl.next(1)
+        assert frame is await everything.next(1)
+        assert b"event: run" in await aapl.next(1)
+    
+    asyncio.run(scenario())
+
+
+@pytest.mark.unit
+def test_slow_client_is_dropped():
+    """Test a client whose buffer overflows is ended without affecting others"""
+    async def scenario():
+        broadcaster = Broadcaster(max_buffer=3)
+        slow, fast = broadcaster.subscribe(), broadcaster.subscribe()
+        
+        received = []
+        for i in range(5):
+            broadcaster.publish("analysis", {"i": i})
+            await asyncio.sleep(0)
+            received.append(await fast.next(1))
+        
+        assert len(received) == 5
+        assert slow.dropped and not fast.dropped
+        assert await slow.next(1) == DROPPED_FRAME
+        assert await slow.next(1) is None
+        
+        broadcaster.unsubscribe(slow)
+        assert broadcaster.snapshot()["dropped_clients"] == 1
+        assert broadcaster.publish("analysis", {}) == 1
+    
+    asyncio.run(scenario())
+
+
+@pytest.mark.unit
+def test_agent_run_publishes_changed_analyses(
+    tmp_path, mock_market_service, mock_alert_service, test_settings
+):
+    """Test an agent run pushes each changed analysis and a run summary"""
+    async def scenario():
+        broadcaster = Broadcaster()
+        subscription = broadcaster.subscribe()
+        repository = JSONStockRepository(str(tmp_path / "stocks.json"))
+        repository.add(StockCreate(symbol="AAPL", buy_price=100.0, target_price=180.0))
+        service = StockService(
+            mock_market_service, mock_alert_service, repository, test_settings, broadcaster=broadcaster
+        )
+        
+        await asyncio.get_running_loop().run_in_executor(None, service.run_agent_diff)
+        
+        analysis = await subscription.next(1)
+        run = await subscription.next(1)
+        assert b"event: analysis" in analysis and b'"symbol":"AAPL"' in analysis
+        assert b"event: run" in run
+    
+    asyncio.run(scenario())
@@ -0,0 +1,67 @@
+"""Unit tests for the application service container"""
+
+import pytest
+
+from stock_agent.api.container import ServiceContainer
+from stock_agent.models.stock import StockCreate
+from stock_agent.providers import ReplayProvider
+from stock_agent.repositories.quote_cache import QuoteCache
+from stock_agent.repositories.stock_repository import JSONStockRepository
+from stock_agent.services.broadcaster import Broadcaster
+from stock_agent.services.jobs import JobManager
+from stock_agent.services.market_data_service import MarketDataService
+from stock_agent.services.stock_service import StockService
+
+REPLAY_CSV = """date,symbol,open,high,low,close,volume
+2024-01-02,AAPL,100,102,99,101,1000
+2024-01-02,TCS.NS,3700,3760,3690,3750,500
+"""
+
+
+@pytest.fixture
+def container(tmp_path, mock_alert_service, test_settings):
+    """Container over a replayed market, a quote cache and two positions"""
+    replay = tmp_path / "replay.csv"
+    replay.write_text(REPLAY_CSV)
+    market_service = MarketDataService(
+        provider=ReplayProvider(str(replay)),
+        quote_cache=QuoteCache(str(tmp_path / "quotes.db"))
+    )
+    repository = JSONStockRepository(str(tmp_path / "stocks.json"))
+    for symbol in ("AAPL", "TCS.NS"):
+        repository.add(StockCreate(symbol=symbol, buy_price=100.0, target_price=5000.0))
+    
+    stock_service = StockService(market_service, mock_alert_service, repository, test_settings)
+    return ServiceContainer(test_settings, stock_service, JobManager(), Broadcaster())
+
+
+@pytest.mark.unit
+def test_warm_up_prefetches_quotes(container):
+    """Test warm-up loads positions and fills the quote cache before readiness"""
+    assert not container.ready
+    
+    report = container.warm_up()
+    
+    assert container.ready
+    assert (report["positions"], report["quotes_prefetched"], report["errors"]) == (2, 2, [])
+    assert container.market_service.quote_cache.get_many(["AAPL", "TCS.NS"]) == {
+        "AAPL": 101.0,
+        "TCS.NS": 3750.0,
+    }
+    
+    container.close()
+    assert not container.ready
+
+
+@pytest.mark.integration
+def test_readiness_probe(test_client, container):
+    """Test the readiness probe fails until the container has warmed up"""
+    from stock_agent.api.dependencies import get_container
+    
+    test_client.app.dependency_overrides[get_container] = lambda: container
+    
+    assert test_client.get("/health/ready").status_code == 503
+    container.warm_up()
+    response = test_client.get("/health/ready")
+    assert response.status_code == 200
+    assert response.json()["warm_up"]["positions"] == 2
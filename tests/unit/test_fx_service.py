@@ -0,0 +1,86 @@
+"""Unit tests for FX rates and currency handling"""
+
+import numpy as np
+import pytest
+
+from stock_agent.repositories.stock_repository import JSONStockRepository
+from stock_agent.services.alert_service import money
+from stock_agent.services.fx_service import FxService
+from stock_agent.services.stock_service import StockService
+from stock_agent.utils.currency import convert_amounts, format_price, symbol_currency
+
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+    
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.unit
+def test_refresh_fetches_due_rates_in_one_batch():
+    """Test missing and expired rates are fetched together and cached until the TTL"""
+    calls = []
+    
+    def source(currencies, reporting_currency):
+        calls.append(list(currencies))
+        return {currency: {"INR": 0.012, "EUR": 1.08}[currency] for currency in currencies if currency != "XYZ"}
+    
+    clock = FakeClock()
+    fx = FxService(source, "USD", ttl_seconds=60, clock=clock)
+    
+    assert fx.refresh(["INR", "EUR", "USD", "XYZ"]) == {"INR": 0.012, "EUR": 1.08, "USD": 1.0}
+    fx.refresh(["INR", "EUR"])
+    clock.now = 61
+    fx.refresh(["INR"])
+    
+    assert calls == [["EUR", "INR", "XYZ"], ["INR"]]
+
+
+@pytest.mark.unit
+def test_convert_uses_one_rate_per_currency():
+    """Test vectorised conversion of mixed-currency amounts"""
+    converted = convert_amounts(
+        np.array([100.0, 3500.0, np.nan, 10.0]),
+        ["USD", "INR", "INR", "CHF"],
+        {"USD": 1.0, "INR": 0.012}
+    )
+    
+    np.testing.assert_allclose(converted, [100.0, 42.0, np.nan, np.nan])
+
+
+@pytest.mark.unit
+def test_symbol_currency_and_formatting():
+    """Test currency inference from exchange suffixes and price formatting"""
+    assert [symbol_currency(s) for s in ["AAPL", "TCS.NS", "BRK.B", "VOD.L"]] == ["USD", "INR", "USD", "GBP"]
+    assert format_price(1520.5, "INR") == "₹1520.50"
+    assert format_price(-3.0, "USD") == "-$3.00"
+    assert format_price(12.0, "CHF") == "12.00 CHF"
+
+
+@pytest.mark.unit
+def test_agent_run_fetches_rates_once_and_formats_alerts_by_currency(
+    tmp_path, mock_market_service, mock_alert_service, fx_service, test_settings
+):
+    """Test a run refreshes FX rates in one batch and analyses carry their currency"""
+    service = StockService(
+        mock_market_service,
+        mock_alert_service,
+        JSONStockRepository(str(tmp_path / "stocks.json")),
+        test_settings,
+        fx_service=fx_service
+    )
+    service.track_stock("TCS.NS", 3000.0, 3700.0)
+    service.track_stock("INFY.NS", 1400.0, 1600.0)
+    service.track_stock("AAPL", 100.0, 200.0)
+    
+    diff = service.run_agent_diff()
+    
+    assert fx_service.source.calls == [["INR"]]
+    tcs = next(a for a in diff.changed if a.symbol == "TCS.NS")
+    assert tcs.currency == "INR"
+    assert money(tcs, tcs.current_price) == "₹3750.00"
+    assert any("₹3750.00" in message for message in mock_alert_service.sent_alerts)
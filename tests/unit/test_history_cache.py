@@ -0,0 +1,115 @@
+"""Unit tests for the historical price cache"""
+
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from stock_agent.repositories.history_cache import HistoryCache, PriceHistory, missing_ranges
+from stock_agent.utils.exceptions import MarketDataError
+
+
+class FakeProvider:
+    """Provider with one bar per weekday, recording the ranges it served"""
+    
+    def __init__(self):
+        self.calls = []
+        self.offline = False
+    
+    def __call__(self, symbol, start, end):
+        if self.offline:
+            raise MarketDataError(symbol, "offline")
+        self.calls.append((start, end))
+        days = np.arange(np.datetime64(start, "D"), np.datetime64(end, "D") + 1)
+        days = days[np.is_busday(days)]
+        close = days.astype(float)
+        return PriceHistory(days, close - 1, close + 1, close - 2, close, np.full(len(days), 1e6))
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Empty history cache"""
+    return HistoryCache(str(tmp_path / "history"))
+
+
+@pytest.mark.unit
+def test_get_fetches_only_missing_tail(cache):
+    """Test a second request only fetches the dates not yet held"""
+    provider = FakeProvider()
+    start = date(2024, 1, 1)
+    
+    first = cache.get("AAPL", start, date(2024, 1, 31), fetch=provider)
+    second = cache.get("AAPL", start, date(2024, 2, 29), fetch=provider)
+    
+    assert len(first) == 23
+    assert provider.calls == [(start, date(2024, 1, 31)), (date(2024, 2, 1), date(2024, 2, 29))]
+    assert len(second) == 44
+    assert np.all(np.diff(second.dates.astype(int)) > 0)
+    assert cache.coverage("aapl") == [(start, date(2024, 2, 29))]
+
+
+@pytest.mark.unit
+def test_reads_are_memory_mapped_views_and_work_offline(cache, tmp_path):
+    """Test cached reads come from memory maps and need no provider"""
+    provider = FakeProvider()
+    cache.get("TCS.NS", date(2024, 1, 1), date(2024, 3, 31), fetch=provider)
+    provider.offline = True
+    
+    reopened = HistoryCache(str(tmp_path / "history"))
+    history = reopened.get("TCS.NS", date(2024, 2, 1), date(2024, 2, 29))
+    served = reopened.get("TCS.NS", date(2024, 2, 1), date.today(), fetch=provider)
+    
+    assert isinstance(history.close.base, np.memmap)
+    assert np.shares_memory(history.close, served.close)
+    assert history.dates[0] == np.datetime64("2024-02-01")
+    assert not history.close.flags.writeable
+
+
+@pytest.mark.unit
+def test_missing_ranges_always_include_today():
+    """Test gaps between held ranges are found and today is refetched"""
+    today = date(2024, 5, 10)
+    covered = [(date(2024, 5, 1), date(2024, 5, 3)), (date(2024, 5, 6), date(2024, 5, 10))]
+    
+    gaps = missing_ranges(covered, date(2024, 4, 28), today, today)
+    
+    assert gaps == [
+        (date(2024, 4, 28), date(2024, 4, 30)),
+        (date(2024, 5, 4), date(2024, 5, 5)),
+        (today, today),
+    ]
+    assert missing_ranges(covered, date(2024, 5, 1), today - timedelta(days=1)) == [
+        (date(2024, 5, 4), date(2024, 5, 5))
+    ]
+
+
+@pytest.mark.unit
+def test_fetch_without_new_bars_keeps_generation(cache):
+    """Test a fetched range without trading only extends coverage in meta.json"""
+    provider = FakeProvider()
+    cache.get("AAPL", date(2024, 1, 1), date(2024, 1, 5), fetch=provider)
+    generation = cache._read_meta("AAPL")["generation"]
+    
+    # 6-7 January 2024 is a weekend
+    weekend = cache.get("AAPL", date(2024, 1, 6), date(2024, 1, 7), fetch=provider)
+    
+    assert len(weekend) == 0
+    assert cache._read_meta("AAPL")["generation"] == generation
+    assert cache.coverage("AAPL") == [(date(2024, 1, 1), date(2024, 1, 7))]
+    assert len(provider.calls) == 2
+
+
+@pytest.mark.unit
+def test_reader_behind_a_new_generation_still_opens_it(cache, tmp_path):
+    """Test a worker that read meta.json before another worker's write can open that generation"""
+    provider = FakeProvider()
+    writer = HistoryCache(str(tmp_path / "history"))
+    writer.get("AAPL", date(2024, 1, 1), date(2024, 1, 31), fetch=provider)
+    stale_meta = cache._read_meta("AAPL")
+    
+    writer.get("AAPL", date(2024, 1, 1), date(2024, 2, 29), fetch=provider)
+    assert len(cache._open("AAPL", stale_meta)) == 23
+    
+    writer.get("AAPL", date(2024, 1, 1), date(2024, 3, 29), fetch=provider)
+    generations = sorted(int(d.name) for d in (tmp_path / "history" / "AAPL").iterdir() if d.is_dir())
+    assert generations == [stale_meta["generation"] + 1, stale_meta["generation"] + 2]
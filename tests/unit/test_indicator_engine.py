@@ -0,0 +1,127 @@
+"""Unit tests for the technical indicator engine"""
+
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from stock_agent.models.enums import IndicatorSignal
+from stock_agent.repositories.history_cache import HistoryCache, PriceHistory
+from stock_agent.repositories.stock_repository import JSONStockRepository
+from stock_agent.services.indicator_engine import IndicatorEngine, atr, ema, rsi, sma
+from stock_agent.services.stock_service import StockService
+
+TODAY = date(2024, 6, 3)
+
+
+def make_history(count, seed=7):
+    """Random-walk daily bars ending the day before TODAY"""
+    rng = np.random.default_rng(seed)
+    dates = np.arange(np.datetime64(TODAY, "D") - count, np.datetime64(TODAY, "D"))
+    close = 100 + np.cumsum(rng.normal(0, 1, count))
+    high = close + rng.uniform(0, 2, count)
+    low = close - rng.uniform(0, 2, count)
+    return PriceHistory(dates, close, high, low, close, np.full(count, 1e5))
+
+
+@pytest.mark.unit
+def test_vectorised_indicators_match_reference_loops():
+    """Test chunked EMA/RSI agree with the plain recurrences"""
+    history = make_history(1000)
+    close = history.close
+    
+    expected = close[:10].mean()
+    for value in close[10:]:
+        expected += 2 / 11 * (value - expected)
+    
+    gains = np.clip(np.diff(close), 0, None)
+    losses = np.clip(-np.diff(close), 0, None)
+    avg_gain, avg_loss = gains[:14].mean(), losses[:14].mean()
+    for gain, loss in zip(gains[14:], losses[14:]):
+        avg_gain += (gain - avg_gain) / 14
+        avg_loss += (loss - avg_loss) / 14
+    
+    assert ema(close, 10)[-1] == pytest.approx(expected)
+    assert rsi(close, 14)[-1] == pytest.approx(100 - 100 / (1 + avg_gain / avg_loss))
+    assert sma(close, 20)[-1] == pytest.approx(close[-20:].mean())
+    assert np.isnan(atr(history.high, history.low, close, 14)[13])
+
+
+@pytest.mark.unit
+def test_incremental_updates_match_full_recompute(tmp_path):
+    """Test per-bar updates from persisted state equal a vectorised pass"""
+    history = make_history(300)
+    state_path = str(tmp_path / "indicators.json")
+    
+    engine = IndicatorEngine(state_path)
+    engine.refresh("AAPL", history.slice(0, 250), today=date(2024, 1, 1))
+    engine.save()
+    
+    engine = IndicatorEngine(state_path)
+    values = engine.refresh("AAPL", history, today=TODAY)
+    
+    assert values.bars == 300
+    assert values.sma == pytest.approx(sma(history.close, 20)[-1])
+    assert values.ema == pytest.approx(ema(history.close, 20)[-1])
+    assert values.rsi == pytest.approx(rsi(history.close, 14)[-1])
+    assert values.atr == pytest.approx(atr(history.high, history.low, history.close, 14)[-1])
+
+
+@pytest.mark.unit
+def test_live_price_is_provisional():
+    """Test the live price is reflected without entering the persisted state"""
+    engine = IndicatorEngine()
+    history = make_history(60)
+    
+    live = engine.refresh("AAPL", history, current_price=1000.0, today=TODAY)
+    
+    assert live.as_of == TODAY
+    assert live.rsi > 90
+    assert engine.values("AAPL").bars == 60
+    assert engine.values("AAPL").rsi == pytest.approx(rsi(history.close, 14)[-1])
+
+
+@pytest.mark.unit
+def test_analysis_includes_indicators_and_signals(mock_market_service, mock_alert_service, tmp_path):
+    """Test analyze_stock exposes indicator values and derived signals"""
+    history = make_history(60)
+    mock_market_service.get_price_history = lambda symbol, start, end=None, offline=False: history
+    repo = JSONStockRepository(str(tmp_path / "stocks.json"))
+    service = StockService(
+        mock_market_service, mock_alert_service, repo, indicator_engine=IndicatorEngine()
+    )
+    
+    result = service.analyze_stock("AAPL", buy_price=100.0, target_price=200.0)
+    
+    assert result.indicators.bars == 61
+    assert result.indicators.sma is not None
+    assert IndicatorSignal.OVERBOUGHT in result.signals
+    assert IndicatorSignal.ABOVE_SMA in result.signals
+
+
+@pytest.mark.unit
+def test_repeated_analysis_fetches_history_once_per_day(mock_market_service, mock_alert_service, tmp_path):
+    """Test only completed sessions are requested, so a second analysis the same day fetches nothing"""
+    bars = make_history(400)
+    calls = []
+    
+    def fetch_history(symbol, start, end):
+        calls.append((start, end))
+        keep = (bars.dates >= np.datetime64(start, "D")) & (bars.dates <= np.datetime64(end, "D"))
+        return PriceHistory(*(column[keep] for column in bars))
+    
+    mock_market_service.history_cache = HistoryCache(str(tmp_path / "history"))
+    mock_market_service.fetch_history = fetch_history
+    repo = JSONStockRepository(str(tmp_path / "stocks.json"))
+    service = StockService(
+        mock_market_service, mock_alert_service, repo, indicator_engine=IndicatorEngine()
+    )
+    
+    first = service.analyze_stock("AAPL", buy_price=100.0, target_price=200.0)
+    generation = mock_market_service.history_cache._read_meta("AAPL")["generation"]
+    second = service.analyze_stock("AAPL", buy_price=100.0, target_price=200.0)
+    
+    assert len(calls) == 1
+    assert calls[0][1] == date.today() - timedelta(days=1)
+    assert mock_market_service.history_cache._read_meta("AAPL")["generation"] == generation
+    assert second.indicators == first.indicators
@@ -0,0 +1,120 @@
+"""Unit tests for background agent jobs"""
+
+import threading
+import time
+
+import pytest
+
+from stock_agent.models.enums import JobStatus
+from stock_agent.models.stock import AgentRunDiff, StockCreate
+from stock_agent.repositories.stock_repository import JSONStockRepository
+from stock_agent.services.jobs import JobManager, RunProgress
+from stock_agent.services.stock_service import StockService
+
+
+def wait_until_finished(job, timeout=5.0):
+    """Poll a job until it has finished"""
+    deadline = time.monotonic() + timeout
+    while not job.status.finished:
+        assert time.monotonic() < deadline, "job did not finish"
+        time.sleep(0.01)
+
+
+@pytest.mark.unit
+def test_one_active_job_at_a_time():
+    """Test submitting while a job runs returns that job"""
+    manager = JobManager()
+    release = threading.Event()
+    
+    def runner(progress):
+        release.wait(5)
+        return AgentRunDiff()
+    
+    first, created = manager.submit(runner)
+    second, created_again = manager.submit(runner)
+    assert created and not created_again
+    assert second is first
+    
+    release.set()
+    wait_until_finished(first)
+    assert first.status == JobStatus.SUCCEEDED
+    assert manager.submit(runner)[0] is not first
+    manager.shutdown()
+
+
+@pytest.mark.unit
+def test_failed_job_reports_error():
+    """Test an exception in the run marks the job failed"""
+    manager = JobManager()
+    
+    def runner(progress):
+        raise RuntimeError("boom")
+    
+    job, _ = manager.submit(runner)
+    wait_until_finished(job)
+    
+    assert job.status == JobStatus.FAILED
+    assert job.to_status().error == "boom"
+    manager.shutdown()
+
+
+@pytest.mark.unit
+def test_cancel_stops_run_between_positions(
+    tmp_path, mock_market_service, mock_alert_service, test_settings
+):
+    """Test a cancelled run keeps the positions processed so far"""
+    repository = JSONStockRepository(str(tmp_path / "stocks.json"))
+    for symbol in ("AAPL", "TCS.NS", "INFY.NS"):
+        repository.add(StockCreate(symbol=symbol, buy_price=100.0, target_price=10000.0))
+    service = StockService(mock_market_service, mock_alert_service, repository, test_settings)
+    
+    progress = RunProgress()
+    price = mock_market_service.get_live_price
+    
+    def cancelling_price(symbol):
+        # Cancel while the second position is being priced
+        if symbol == "TCS.NS":
+            progress.cancel()
+        return price(symbol)
+    
+    mock_market_service.get_live_price = cancelling_price
+    diff = service.run_agent_diff(progress)
+    
+    assert [analysis.symbol for analysis in diff.changed] == ["AAPL", "TCS.NS"]
+    counters = progress.counters()
+    assert (counters.total, counters.done, counters.changed) == (3, 2, 2)
+
+
+@pytest.mark.unit
+def test_direct_run_waits_for_running_job(mock_market_service, mock_alert_service, test_settings, tmp_path):
+    """Test a direct run started during a background job does not overlap it"""
+    repository = JSONStockRepository(str(tmp_path / "stocks.json"))
+    repository.add(StockCreate(symbol="AAPL", buy_price=100.0, target_price=200.0))
+    service = StockService(mock_market_service, mock_alert_service, repository, test_settings)
+    
+    active = []
+    overlaps = []
+    release = threading.Event()
+    run_agent = service._run_agent
+    
+    def slow_run(stocks, progress=None):
+        overlaps.append(len(active))
+        active.append(True)
+        release.wait(5)
+        try:
+            return run_agent(stocks, progress)
+        finally:
+            active.pop()
+    
+    service._run_agent = slow_run
+    manager = JobManager()
+    job, _ = manager.submit(lambda progress: service.run_agent_diff(progress))
+    direct = threading.Thread(target=service.run_agent_diff)
+    direct.start()
+    time.sleep(0.05)
+    release.set()
+    direct.join(5)
+    wait_until_finished(job)
+    
+    assert overlaps == [0, 0]
+    assert job.status == JobStatus.SUCCEEDED
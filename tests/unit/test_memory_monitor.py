@@ -0,0 +1,96 @@
+"""Unit tests for memory instrumentation of agent runs"""
+
+import tracemalloc
+
+import pytest
+
+from stock_agent.models.stock import StockCreate
+from stock_agent.providers import ReplayProvider
+from stock_agent.repositories.stock_repository import JSONStockRepository
+from stock_agent.services.market_data_service import MarketDataService
+from stock_agent.services.memory_monitor import MemoryMonitor
+from stock_agent.services.stock_service import StockService
+
+SYMBOLS = [f"SYM{i}" for i in range(50)]
+
+
+@pytest.fixture
+def monitor():
+    """Memory monitor that stops tracing after the test"""
+    monitor = MemoryMonitor(max_snapshots=3, max_runs=5)
+    yield monitor
+    monitor.stop()
+
+
+@pytest.fixture
+def stock_service(tmp_path, mock_alert_service, test_settings, monitor):
+    """Stock service over a replayed market, with every symbol tracked"""
+    replay = tmp_path / "replay.csv"
+    replay.write_text(
+        "date,symbol,open,high,low,close,volume\n"
+        + "".join(f"2024-01-02,{s},1,1,1,{100 + i},1\n" for i, s in enumerate(SYMBOLS))
+    )
+    repository = JSONStockRepository(str(tmp_path / "stocks.json"))
+    for symbol in SYMBOLS:
+        repository.add(StockCreate(symbol=symbol, buy_price=120.0, target_price=140.0))
+    return StockService(
+        MarketDataService(provider=ReplayProvider(str(replay)), batch_size=25),
+        mock_alert_service,
+        repository,
+        test_settings,
+        memory_monitor=monitor
+    )
+
+
+@pytest.mark.unit
+def test_agent_run_reports_memory(stock_service, monitor):
+    """Test a run reports its peak and retained memory and the monitor keeps it"""
+    diff = stock_service.run_agent_diff()
+    
+    assert tracemalloc.is_tracing()
+    assert diff.memory is not None
+    assert diff.memory.peak_bytes > 0
+    assert diff.memory.peak_bytes >= diff.memory.retained_bytes
+    
+    stats = monitor.stats()
+    assert stats["runs_measured"] == 1
+    assert stats["last_run"] == diff.memory
+
+
+@pytest.mark.unit
+def test_snapshot_diff_finds_growth(monitor):
+    """Test a diff between snapshots points at the line that allocated"""
+    first = monitor.snapshot()
+    hoard = [bytes(1024) for _ in range(256)]
+    second = monitor.snapshot()
+    
+    diff = monitor.diff(second["id"])
+    assert diff["base_id"] == first["id"]
+    assert diff["size_diff_bytes"] >= 256 * 1024
+    assert "test_memory_monitor.py" in diff["top"][0]["location"]
+    assert monitor.diff(999) is None
+    
+    # Only the most recent snapshots are kept
+    monitor.snapshot()
+    monitor.snapshot()
+    assert monitor.diff(first["id"] + 1, base_id=first["id"]) is None
+    del hoard
+
+
+@pytest.mark.unit
+@pytest.mark.slow
+def test_repeated_runs_keep_memory_flat(stock_service, monitor, mock_alert_service):
+    """Soak test: once warmed up, many agent runs retain no memory"""
+    for _ in range(5):
+        stock_service.run_agent_diff()
+    
+    before = monitor.snapshot()
+    for _ in range(100):
+        stock_service.run_agent_diff()
+        # The mock keeps every alert it sends
+        mock_alert_service.sent_alerts.clear()
+    after = monitor.snapshot()
+    
+    # Allow for caches settling, but not for anything kept per run
+    growth = after["traced_bytes"] - before["traced_bytes"]
+    assert growth < 64 * 1024, monitor.diff(after["id"], limit=5)
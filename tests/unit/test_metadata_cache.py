@@ -0,0 +1,117 @@
+"""Unit tests for the symbol metadata cache"""
+
+import time
+
+import pytest
+
+from stock_agent.models.stock import StockCreate
+from stock_agent.providers import ReplayProvider
+from stock_agent.repositories.metadata_cache import MetadataCache
+from stock_agent.repositories.stock_repository import JSONStockRepository
+from stock_agent.services.alert_service import stock_label
+from stock_agent.services.market_data_service import MarketDataService
+from stock_agent.services.metadata_refresher import MetadataRefresher
+from stock_agent.services.stock_service import StockService
+
+REPLAY_CSV = """date,symbol,open,high,low,close,volume,name,currency
+2024-01-02,AAPL,100,102,99,101,1000,Apple Inc.,USD
+2024-01-02,TCS.NS,3700,3760,3690,3750,500,Tata Consultancy Services,INR
+"""
+
+
+class FakeClock:
+    """Manually advanced wall clock"""
+    
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self):
+        return self.now
+
+
+class CountingReplayProvider(ReplayProvider):
+    """Replay provider counting info requests"""
+    
+    def __init__(self, path):
+        super().__init__(path)
+        self.info_calls = []
+    
+    def get_info(self, symbol):
+        self.info_calls.append(symbol)
+        return super().get_info(symbol)
+
+
+@pytest.fixture
+def replay_file(tmp_path):
+    """Small recorded market with names and currencies"""
+    path = tmp_path / "replay.csv"
+    path.write_text(REPLAY_CSV)
+    return str(path)
+
+
+@pytest.mark.unit
+def test_entries_expire_and_become_due(tmp_path):
+    """Test entries are served for the TTL and refreshed after refresh_after"""
+    clock = FakeClock()
+    path = str(tmp_path / "metadata.db")
+    cache = MetadataCache(path, ttl_seconds=100, refresh_after_seconds=10, clock=clock)
+    cache.put_many({"AAPL": {"symbol": "AAPL", "name": "Apple Inc."}})
+    
+    reopened = MetadataCache(path, ttl_seconds=100, refresh_after_seconds=10, clock=clock)
+    assert reopened.get_many(["AAPL", "MSFT"]) == {"AAPL": {"symbol": "AAPL", "name": "Apple Inc."}}
+    assert reopened.due(["AAPL", "MSFT"]) == ["MSFT"]
+    
+    clock.now += 50
+    assert reopened.due(["AAPL"]) == ["AAPL"]
+    assert "AAPL" in reopened.get_many(["AAPL"])
+    
+    clock.now += 50
+    assert reopened.get_many(["AAPL"]) == {}
+
+
+@pytest.mark.unit
+def test_info_is_fetched_once_and_shared(tmp_path, replay_file, mock_alert_service, test_settings):
+    """Test preload fetches each symbol once and listings and alerts read the cache"""
+    provider = CountingReplayProvider(replay_file)
+    market_service = MarketDataService(
+        provider=provider, metadata_cache=MetadataCache(str(tmp_path / "metadata.db"))
+    )
+    repository = JSONStockRepository(str(tmp_path / "stocks.json"))
+    for symbol in ("AAPL", "TCS.NS"):
+        repository.add(StockCreate(symbol=symbol, buy_price=100.0, target_price=5000.0))
+    
+    refresher = MetadataRefresher(market_service, repository)
+    assert refresher.refresh_once() == 2
+    assert refresher.refresh_once() == 0
+    assert market_service.get_stock_info("tcs.ns")["currency"] == "INR"
+    assert provider.info_calls == ["AAPL", "TCS.NS"]
+    
+    service = StockService(market_service, mock_alert_service, repository, test_settings)
+    rows, _ = service.list_stock_rows(with_metadata=True)
+    assert [row["metadata"]["name"] for row in rows] == ["Apple Inc.", "Tata Consultancy Services"]
+    
+    analysis = service.run_agent()[0]
+    assert stock_label(analysis) == "AAPL (Apple Inc.)"
+    assert provider.info_calls == ["AAPL", "TCS.NS"]
+
+
+@pytest.mark.unit
+def test_refresher_fills_cold_cache_in_background(tmp_path, replay_file):
+    """Test start() fetches metadata right away on its own thread"""
+    provider = CountingReplayProvider(replay_file)
+    market_service = MarketDataService(
+        provider=provider, metadata_cache=MetadataCache(str(tmp_path / "metadata.db"))
+    )
+    repository = JSONStockRepository(str(tmp_path / "stocks.json"))
+    repository.add(StockCreate(symbol="AAPL", buy_price=100.0, target_price=5000.0))
+    
+    refresher = MetadataRefresher(market_service, repository, interval_seconds=3600)
+    refresher.start()
+    for _ in range(100):
+        if provider.info_calls:
+            break
+        time.sleep(0.01)
+    refresher.stop()
+    
+    assert provider.info_calls == ["AAPL"]
+    assert market_service.get_cached_metadata(["AAPL"])["AAPL"].name == "Apple Inc."
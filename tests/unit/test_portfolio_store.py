@@ -0,0 +1,84 @@
+"""Unit tests for the columnar portfolio store"""
+
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from stock_agent.repositories.portfolio_store import PortfolioStore
+
+
+def make_row(symbol, buy=100.0, target=150.0, last=None):
+    """Stored row as written by the repository"""
+    return {
+        "symbol": symbol,
+        "buy_price": buy,
+        "target_price": target,
+        "created_at": "2024-01-01T09:15:00.123456",
+        "updated_at": "2024-01-02T09:15:00",
+        "last_price": last,
+        "last_price_at": None,
+    }
+
+
+@pytest.mark.unit
+def test_rows_round_trip_through_columns():
+    """Test stored rows survive conversion to columns and back"""
+    rows = [make_row("AAPL", last=120.5), make_row("TCS.NS", 3500.0, 4000.0)]
+    store = PortfolioStore.from_rows(rows)
+    
+    out = store.rows(store.live_rows())
+    
+    assert [r["symbol"] for r in out] == ["AAPL", "TCS.NS"]
+    assert out[0]["last_price"] == 120.5
+    assert out[1]["last_price"] is None
+    assert out[1]["last_price_at"] is None
+    assert out[0]["created_at"] == "2024-01-01T09:15:00.123456"
+    assert list(out[0]) == list(store.model(0).model_dump())
+
+
+@pytest.mark.unit
+def test_append_remove_and_compaction_keep_insertion_order():
+    """Test tombstones are skipped and compaction preserves order"""
+    store = PortfolioStore(capacity=2)
+    for i in range(3000):
+        store.append(f"S{i:04d}", buy_price=1.0, target_price=2.0, created_at=datetime(2024, 1, 1))
+    for i in range(0, 2900):
+        store.remove(f"S{i:04d}")
+    
+    assert len(store) == 100
+    assert store.symbols[store.live_rows()[0]] == "S2900"
+    assert store.model(store.row_of("S2999")).symbol == "S2999"
+    assert len(store.column("buy_price")) < 3000
+
+
+@pytest.mark.unit
+def test_columns_are_views_and_set_clears_values():
+    """Test column() exposes NumPy views and None clears a value"""
+    store = PortfolioStore.from_rows([make_row("AAPL", last=120.0)])
+    
+    store.set(0, last_price=None, last_price_at=datetime(2024, 3, 1))
+    
+    assert np.isnan(store.column("last_price")[0])
+    assert store.get(0, "last_price_at") == datetime(2024, 3, 1)
+    assert store.get(0, "last_price") is None
+
+
+@pytest.mark.unit
+def test_rows_are_cached_until_the_row_changes():
+    """Test listings reuse formatted rows and reformat only changed or compacted ones"""
+    store = PortfolioStore.from_rows([make_row("AAPL", last=120.0), make_row("MSFT", last=300.0)])
+    first = store.rows(store.live_rows())
+    # Timestamps shared by rows formatted together are formatted once
+    assert first[0]["updated_at"] is first[1]["updated_at"]
+    
+    store.set(0, last_price=125.0)
+    second = store.rows(store.live_rows())
+    
+    assert second[0] is not first[0] and second[0]["last_price"] == 125.0
+    assert second[1] is first[1]
+    assert first[0]["last_price"] == 120.0
+    
+    store.remove("AAPL")
+    store._compact()
+    assert store.rows(store.live_rows()) == [first[1]]
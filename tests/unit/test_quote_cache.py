@@ -0,0 +1,77 @@
+"""Unit tests for the shared quote cache"""
+
+import pytest
+
+from stock_agent.repositories.quote_cache import QuoteCache
+from stock_agent.services.market_data_service import MarketDataService
+
+
+class FakeClock:
+    """Manually advanced wall clock"""
+    
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self):
+        return self.now
+
+
+class CountingProvider:
+    """Provider stub counting upstream requests"""
+    
+    name = "counting"
+    
+    def __init__(self):
+        self.calls = []
+    
+    def get_quote(self, symbol):
+        self.calls.append(symbol)
+        return 100.0 + len(self.calls)
+    
+    def get_quotes(self, symbols):
+        self.calls.append(tuple(symbols))
+        return {symbol: 200.0 for symbol in symbols}
+
+
+@pytest.mark.unit
+def test_quotes_expire_and_invalidation_wins_over_late_fills(tmp_path):
+    """Test TTL expiry and that a fill started before an invalidation is discarded"""
+    clock = FakeClock()
+    cache = QuoteCache(str(tmp_path / "quotes.db"), ttl_seconds=60, clock=clock)
+    
+    cache.put("AAPL", 150.0, cache.now())
+    assert cache.get("AAPL") == 150.0
+    clock.now += 61
+    assert cache.get("AAPL") is None
+    
+    started = cache.now()
+    clock.now += 1
+    cache.invalidate(["AAPL"])
+    assert not cache.put("AAPL", 151.0, started)
+    assert cache.get("AAPL") is None
+    
+    assert cache.put("AAPL", 152.0, cache.now())
+    assert cache.get_many(["AAPL", "MSFT"]) == {"AAPL": 152.0}
+
+
+@pytest.mark.unit
+def test_processes_share_quotes_and_fill_claims(tmp_path):
+    """Test one worker's fetch serves another and only one worker claims a fill"""
+    path = str(tmp_path / "quotes.db")
+    first_provider, second_provider = CountingProvider(), CountingProvider()
+    first = MarketDataService(provider=first_provider, quote_cache=QuoteCache(path))
+    second = MarketDataService(provider=second_provider, quote_cache=QuoteCache(path))
+    
+    assert first.get_live_price("aapl") == 101.0
+    assert second.get_live_price("AAPL") == 101.0
+    assert second_provider.calls == []
+    
+    assert first.quote_cache.claim("MSFT")
+    assert not second.quote_cache.claim("MSFT")
+    
+    assert second.get_live_prices(["AAPL", "TCS.NS", "INFY.NS"]) == {
+        "AAPL": 101.0,
+        "TCS.NS": 200.0,
+        "INFY.NS": 200.0,
+    }
+    assert second_provider.calls == [("TCS.NS", "INFY.NS")]
@@ -0,0 +1,111 @@
+"""Unit tests for the upstream rate limiter"""
+
+import threading
+import time
+
+import pytest
+
+from stock_agent.services.market_data_service import MarketDataService
+from stock_agent.utils.exceptions import RateLimitedError
+from stock_agent.utils.rate_limiter import (
+    CallPriority,
+    RateLimiter,
+    SQLiteTokenBucket,
+    TokenBucket,
+    call_priority,
+)
+
+
+class FakeClock:
+    """Manually advanced clock"""
+    
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.unit
+def test_token_bucket_refills_up_to_burst():
+    """Test tokens are spent, refilled at the rate and capped at the burst"""
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2.0, burst=3, clock=clock)
+    
+    assert [bucket.try_take() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.try_take() == pytest.approx(0.5)
+    
+    clock.now = 10
+    assert [bucket.try_take() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.try_take() > 0
+
+
+@pytest.mark.unit
+def test_probes_leave_the_reserve_to_agent_runs():
+    """Test health probes are refused once only reserved tokens remain"""
+    limiter = RateLimiter("market_data", TokenBucket(rate=0.001, burst=4), reserve=2)
+    
+    limiter.acquire(CallPriority.HEALTH_PROBE)
+    limiter.acquire(CallPriority.HEALTH_PROBE)
+    with pytest.raises(RateLimitedError):
+        limiter.acquire(CallPriority.HEALTH_PROBE)
+    
+    limiter.acquire(CallPriority.AGENT_RUN, timeout=0)
+    limiter.acquire(CallPriority.AGENT_RUN, timeout=0)
+    with pytest.raises(RateLimitedError):
+        limiter.acquire(CallPriority.AGENT_RUN, timeout=0)
+    
+    assert limiter.snapshot()["rejected"] == {"agent_run": 1, "interactive": 0, "health_probe": 1}
+
+
+@pytest.mark.unit
+def test_waiting_agent_runs_are_served_first():
+    """Test a waiting agent run gets the next token before a waiting interactive call"""
+    limiter = RateLimiter("market_data", TokenBucket(rate=5.0, burst=1), max_wait=2)
+    limiter.acquire()
+    order = []
+    
+    def call(priority, delay):
+        time.sleep(delay)
+        limiter.acquire(priority)
+        order.append(priority)
+    
+    threads = [
+        threading.Thread(target=call, args=(CallPriority.INTERACTIVE, 0.0)),
+        threading.Thread(target=call, args=(CallPriority.AGENT_RUN, 0.05)),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert order == [CallPriority.AGENT_RUN, CallPriority.INTERACTIVE]
+
+
+@pytest.mark.unit
+def test_sqlite_bucket_is_shared(tmp_path):
+    """Test limiters on the same file spend the same tokens"""
+    path = str(tmp_path / "limits.db")
+    first = RateLimiter("market_data", SQLiteTokenBucket(path, rate=0.001, burst=2))
+    second = RateLimiter("market_data", SQLiteTokenBucket(path, rate=0.001, burst=2))
+    
+    first.acquire(timeout=0)
+    second.acquire(timeout=0)
+    with pytest.raises(RateLimitedError):
+        first.acquire(timeout=0)
+
+
+@pytest.mark.unit
+def test_market_service_takes_a_token_per_attempt():
+    """Test every upstream attempt passes the limiter at the context's priority"""
+    limiter = RateLimiter("market_data", TokenBucket(rate=0.001, burst=3), reserve=2)
+    service = MarketDataService(rate_limiter=limiter)
+    
+    assert service._call("AAPL", lambda: 1.0) == 1.0
+    with call_priority(CallPriority.HEALTH_PROBE):
+        with pytest.raises(RateLimitedError):
+            service._call("AAPL", lambda: 1.0)
+    with call_priority(CallPriority.AGENT_RUN):
+        assert service._call("AAPL", lambda: 2.0) == 2.0
+    
+    assert limiter.snapshot()["granted"]["agent_run"] == 1
@@ -0,0 +1,79 @@
+"""Unit tests for the replay market data provider"""
+
+from datetime import date
+
+import pytest
+
+from stock_agent.config import Settings
+from stock_agent.providers import ReplayProvider, create_provider
+from stock_agent.services.market_data_service import MarketDataService
+from stock_agent.utils.exceptions import InvalidSymbolError, MarketDataError
+from stock_agent.utils.resilience import RetryPolicy
+
+REPLAY_CSV = """date,symbol,open,high,low,close,volume,currency
+2024-01-02,AAPL,100,102,99,101,1000,USD
+2024-01-03,AAPL,101,104,100,103,1200,USD
+2024-01-04,AAPL,103,105,102,104,900,USD
+2024-01-02,tcs.ns,3700,3760,3690,3750,500,INR
+2024-01-04,TCS.NS,3750,3800,3740,3790,450,INR
+"""
+
+
+@pytest.fixture
+def replay_file(tmp_path):
+    """Small recorded market"""
+    path = tmp_path / "replay.csv"
+    path.write_text(REPLAY_CSV)
+    return str(path)
+
+
+@pytest.mark.unit
+def test_replay_quotes_history_and_info(replay_file):
+    """Test quotes come from the last bar on or before the replay date"""
+    provider = ReplayProvider(replay_file, as_of=date(2024, 1, 3))
+    
+    assert provider.get_quote("AAPL") == 103
+    assert provider.get_quotes(["AAPL", "TCS.NS", "MISSING"]) == {"AAPL": 103, "TCS.NS": 3750}
+    assert provider.get_info("TCS.NS") == {"currency": "INR", "symbol": "TCS.NS"}
+    
+    history = provider.get_history("AAPL", date(2024, 1, 1), date(2024, 1, 31))
+    assert list(history.close) == [101, 103]
+    
+    with pytest.raises(InvalidSymbolError):
+        provider.get_quote("MISSING")
+
+
+@pytest.mark.unit
+def test_replay_errors_go_through_retries(replay_file):
+    """Test injected transient errors are retried and then surface as MarketDataError"""
+    latencies, delays = [], []
+    provider = ReplayProvider(
+        replay_file, latency_ms=20, error_rate=1.0, error_kinds="timeout,server_error",
+        seed=7, sleep=latencies.append
+    )
+    service = MarketDataService(
+        provider=provider, retry_policy=RetryPolicy(attempts=3), sleep=delays.append
+    )
+    
+    with pytest.raises(MarketDataError):
+        service.get_live_price("AAPL")
+    
+    assert latencies == [0.02, 0.02, 0.02]
+    assert len(delays) == 2
+
+
+@pytest.mark.unit
+def test_service_uses_configured_provider(replay_file):
+    """Test settings select the replay provider and batches cover all symbols"""
+    settings = Settings(market_data_provider="replay", replay_data_path=replay_file)
+    service = MarketDataService(provider=create_provider(settings), batch_size=1)
+    
+    assert service.get_live_prices(["aapl", "TCS.NS", "MISSING", "AAPL"]) == {
+        "AAPL": 104,
+        "TCS.NS": 3790,
+    }
+    assert service.validate_symbol("TCS.NS")
+    assert not service.validate_symbol("MISSING")
+    
+    with pytest.raises(ValueError):
+        create_provider(Settings(market_data_provider="bloomberg"))
@@ -0,0 +1,99 @@
+"""Unit tests for retry backoff and circuit breaking"""
+
+import random
+
+import pytest
+import requests
+
+from stock_agent.services.market_data_service import MarketDataService
+from stock_agent.utils.exceptions import CircuitOpenError, InvalidSymbolError, MarketDataError
+from stock_agent.utils.resilience import CircuitBreaker, RetryPolicy, is_retryable
+
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+    
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+
+def rate_limited():
+    """HTTP 429 error as raised by requests"""
+    response = requests.Response()
+    response.status_code = 429
+    response.headers["Retry-After"] = "3"
+    return requests.HTTPError("429 Client Error: Too Many Requests", response=response)
+
+
+@pytest.mark.unit
+def test_retry_classification_and_backoff():
+    """Test transient errors are retried with bounded, growing jittered delays"""
+    policy = RetryPolicy(attempts=5, base_delay=0.5, max_delay=4.0, rng=random.Random(1))
+    
+    assert is_retryable(requests.Timeout())
+    assert is_retryable(rate_limited())
+    assert is_retryable(Exception("AAPL: No price data found (Yahoo status_code = 503)"))
+    assert not is_retryable(ValueError("malformed payload"))
+    assert all(0 <= policy.delay(1) <= 0.5 for _ in range(100))
+    assert all(0 <= policy.delay(6) <= 4.0 for _ in range(100))
+    assert policy.delay(1, minimum=3.0) == 3.0
+
+
+@pytest.mark.unit
+def test_circuit_breaker_opens_and_probes():
+    """Test the breaker opens after repeated failures and recovers via one probe"""
+    clock = FakeClock()
+    breaker = CircuitBreaker("market_data", failure_threshold=2, reset_timeout=30, clock=clock)
+    
+    breaker.record_failure()
+    breaker.record_failure()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call("AAPL")
+    
+    clock.now = 31
+    breaker.before_call("AAPL")
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call("MSFT")
+    breaker.record_success()
+    
+    assert breaker.snapshot() == {
+        "state": "closed",
+        "consecutive_failures": 0,
+        "rejected_calls": 2,
+        "retry_in_seconds": None,
+    }
+
+
+@pytest.mark.unit
+def test_market_calls_retry_only_transient_errors():
+    """Test symbol errors are not retried and an open breaker fails fast"""
+    delays = []
+    breaker = CircuitBreaker("market_data", failure_threshold=3)
+    service = MarketDataService(
+        retry_policy=RetryPolicy(attempts=3, rng=random.Random(1)),
+        circuit_breaker=breaker,
+        sleep=delays.append
+    )
+    calls = []
+    
+    def invalid():
+        calls.append("invalid")
+        raise InvalidSymbolError("XYZ")
+    
+    def throttled():
+        calls.append("throttled")
+        raise rate_limited()
+    
+    with pytest.raises(InvalidSymbolError):
+        service._call("XYZ", invalid)
+    with pytest.raises(MarketDataError):
+        service._call("AAPL", throttled)
+    with pytest.raises(CircuitOpenError):
+        service._call("AAPL", throttled)
+    
+    assert calls == ["invalid", "throttled", "throttled", "throttled"]
+    assert delays == [3.0, 3.0]
+    assert breaker.state == CircuitBreaker.OPEN
@@ -0,0 +1,74 @@
+"""Unit tests for position alert rules"""
+
+import numpy as np
+import pytest
+
+from stock_agent.models.enums import AlertType
+from stock_agent.models.rules import parse_rule
+from stock_agent.models.stock import StockCreate
+from stock_agent.repositories.stock_repository import JSONStockRepository
+from stock_agent.services.rule_engine import RuleSet
+from stock_agent.services.stock_service import StockService
+
+
+@pytest.mark.unit
+def test_parse_rule_normalizes_and_rejects_bad_rules():
+    """Test the rule language is parsed to canonical text"""
+    assert parse_rule("  Trailing_Stop 8.0% ").text == "trailing_stop 8%"
+    assert parse_rule("BAND 90.50 120").text == "band 90.5 120"
+    assert parse_rule("stop_loss 95").alert_type == AlertType.STOP_LOSS
+    
+    for bad in ["", "daily_update 5%", "band 120 90", "trailing_stop 8", "percent_move 150%"]:
+        with pytest.raises(ValueError):
+            parse_rule(bad)
+    with pytest.raises(ValueError):
+        StockCreate(symbol="AAPL", buy_price=1.0, target_price=2.0, rules=["stop_loss -1"])
+
+
+@pytest.mark.unit
+def test_rules_fire_once_on_crossing():
+    """Test all rule types are evaluated together and only fire on transitions"""
+    rule_set = RuleSet([
+        ("AAPL", [parse_rule("stop_loss 10%"), parse_rule("percent_move 5%")]),
+        ("TCS.NS", [parse_rule("trailing_stop 10%")]),
+        ("INFY.NS", [parse_rule("band 90 110")]),
+        ("MSFT", []),
+    ])
+    buy = np.array([100.0, 100.0, 100.0, 100.0])
+    
+    fired = rule_set.evaluate(
+        price=np.array([89.0, 134.0, 111.0, 1.0]),
+        previous=np.array([95.0, 140.0, np.nan, 100.0]),
+        buy_price=buy,
+        high_water=np.array([100.0, 150.0, np.nan, 100.0])
+    )
+    again = rule_set.evaluate(
+        price=np.array([88.0, 133.0, 112.0, 1.0]),
+        previous=np.array([89.0, 134.0, 111.0, 1.0]),
+        buy_price=buy,
+        high_water=np.array([100.0, 150.0, 111.0, 100.0])
+    )
+    
+    assert [(pos, rule.text) for pos, rule in fired] == [
+        (0, "stop_loss 10%"),
+        (0, "percent_move 5%"),
+        (1, "trailing_stop 10%"),
+        (2, "band 90 110"),
+    ]
+    assert again == []
+
+
+@pytest.mark.unit
+def test_run_agent_sends_rule_alerts(mock_market_service, mock_alert_service, tmp_path):
+    """Test the agent sends a stop-loss alert once and records it on the analysis"""
+    repo = JSONStockRepository(str(tmp_path / "stocks.json"))
+    repo.add(StockCreate(symbol="AAPL", buy_price=200.0, target_price=300.0, rules=["stop_loss 10%"]))
+    service = StockService(mock_market_service, mock_alert_service, repo)
+    
+    first = service.run_agent()
+    second = service.run_agent()
+    
+    assert first[0].triggered_rules == ["stop_loss 10%"]
+    assert second[0].triggered_rules == []
+    assert sum("STOP LOSS" in message for message in mock_alert_service.sent_alerts) == 1
+    assert repo.get_by_symbol("AAPL").high_water == 150.0
@@ -0,0 +1,62 @@
+"""Unit tests for the agent run history store"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from stock_agent.models.enums import DecisionType
+from stock_agent.models.stock import StockCreate
+from stock_agent.repositories.run_history import RunHistoryStore
+from stock_agent.repositories.stock_repository import JSONStockRepository
+from stock_agent.services.stock_service import StockService
+
+DAY = 86400.0
+T0 = 1_700_000_000.0 - 1_700_000_000.0 % DAY  # midnight UTC
+
+
+@pytest.mark.unit
+def test_range_queries_read_only_matching_runs(tmp_path):
+    """Test runs are returned by time range across day partitions"""
+    store = RunHistoryStore(str(tmp_path), clock=lambda: T0 + 3 * DAY)
+    for i in range(6):
+        store.append({"run": i}, ts=T0 + i * DAY / 2)
+    
+    assert sorted(p.name for p in tmp_path.iterdir() if p.is_dir()) == [
+        "2023-11-14", "2023-11-15", "2023-11-16"
+    ]
+    assert [r["run"] for _, r in store.runs(T0 + DAY / 2, T0 + 2 * DAY)] == [1, 2, 3, 4]
+    assert list(store.runs(T0 + 10 * DAY, T0 + 11 * DAY)) == []
+
+
+@pytest.mark.unit
+def test_compaction_downsamples_and_expires_old_days(tmp_path):
+    """Test old days keep one run per bucket and expired days are removed"""
+    store = RunHistoryStore(
+        str(tmp_path), retention_days=10, downsample_after_days=2, downsample_seconds=3600
+    )
+    for minute in range(0, 180, 15):
+        store.append({"minute": minute}, ts=T0 + minute * 60)
+    store.append({"minute": 0}, ts=T0 - 20 * DAY)
+    
+    assert store.compact(now=T0 + 5 * DAY) == {"removed": 1, "downsampled": 1}
+    assert [r["minute"] for _, r in store.runs(T0 - 30 * DAY, T0 + DAY)] == [45, 105, 165]
+    assert store.compact(now=T0 + 5 * DAY) == {"removed": 0, "downsampled": 0}
+
+
+@pytest.mark.unit
+def test_agent_runs_are_recorded_as_series(mock_market_service, mock_alert_service, tmp_path):
+    """Test each agent run adds a point to the symbol's series"""
+    repo = JSONStockRepository(str(tmp_path / "stocks.json"))
+    repo.add(StockCreate(symbol="AAPL", buy_price=100.0, target_price=140.0))
+    history = RunHistoryStore(str(tmp_path / "runs"))
+    service = StockService(mock_market_service, mock_alert_service, repo, run_history=history)
+    
+    service.run_agent()
+    service.run_agent()
+    
+    now = datetime.now()
+    points = service.get_symbol_history("aapl", now - timedelta(hours=1), now + timedelta(hours=1))
+    assert [(p.current_price, p.decision) for p in points] == [(150.0, DecisionType.TARGET_REACHED)] * 2
+    
+    runs = service.get_run_history(now - timedelta(hours=1), now + timedelta(hours=1))
+    assert runs[0].alerts == [{"symbol": "AAPL", "kind": "target"}]
@@ -0,0 +1,21 @@
+"""Unit tests for JSON serialization helpers"""
+
+from datetime import datetime
+
+import pytest
+
+from stock_agent.utils import serialization
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("fast", [True, False])
+def test_dumps_round_trip(monkeypatch, fast):
+    """Test orjson and stdlib paths produce the same JSON"""
+    if not fast:
+        monkeypatch.setattr(serialization, "orjson", None)
+    row = {"symbol": "TCS.NS", "price": 3750.5, "at": datetime(2024, 1, 2, 12, 30, 5, 123456)}
+    
+    data = serialization.dumps([row])
+    
+    assert serialization.loads(data) == [{**row, "at": "2024-01-02T12:30:05.123456"}]
+    assert serialization.loads(serialization.dumps([row], indent=True)) == serialization.loads(data)
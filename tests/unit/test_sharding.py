@@ -0,0 +1,162 @@
+"""Unit tests for sharded agent runs"""
+
+import pytest
+
+from stock_agent.models.stock import StockCreate
+from stock_agent.repositories.lease_store import LeaseStore
+from stock_agent.repositories.stock_repository import JSONStockRepository
+from stock_agent.services.sharding import HashRing, ShardCoordinator
+from stock_agent.services.stock_service import StockService
+
+SYMBOLS = [f"SYM{i}.NS" for i in range(200)]
+
+
+class FakeClock:
+    """Manually advanced wall clock"""
+    
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.unit
+def test_ring_moves_only_the_joining_instance_share():
+    """Test a new member takes over symbols only from others, and roughly its share"""
+    before = HashRing(["a", "b", "c"])
+    after = HashRing(["a", "b", "c", "d"])
+    
+    moved = [s for s in SYMBOLS if before.owner(s) != after.owner(s)]
+    
+    assert all(after.owner(s) == "d" for s in moved)
+    assert 20 < len(moved) < 90
+    assert HashRing([]).owner("AAPL") is None
+
+
+@pytest.mark.unit
+def test_instances_split_symbols_and_rebalance(tmp_path):
+    """Test live instances lease disjoint shards that cover the portfolio"""
+    clock = FakeClock()
+    store = LeaseStore(str(tmp_path / "shards.db"), clock=clock)
+    a = ShardCoordinator(store, "a", lease_seconds=60)
+    b = ShardCoordinator(store, "b", lease_seconds=60)
+    
+    a.begin_run(SYMBOLS)
+    a.end_run(SYMBOLS)
+    shard_b = b.begin_run(SYMBOLS)
+    shard_a = a.begin_run(SYMBOLS)
+    
+    assert set(shard_a).isdisjoint(shard_b)
+    assert sorted(shard_a + shard_b) == sorted(SYMBOLS)
+    
+    # b dies holding its leases: a takes over once they expire
+    a.end_run(shard_a)
+    clock.now += 61
+    assert a.begin_run(SYMBOLS) == SYMBOLS
+
+
+@pytest.mark.unit
+def test_leases_are_renewed_during_a_run(tmp_path):
+    """Test a run keeps its leases past their duration, and drops those taken over"""
+    clock = FakeClock()
+    store = LeaseStore(str(tmp_path / "shards.db"), clock=clock)
+    a = ShardCoordinator(store, "a", lease_seconds=60, clock=clock)
+    
+    shard = a.begin_run(["AAPL", "TCS.NS"])
+    for _ in range(5):
+        clock.now += 25
+        assert a.renew() == set(shard)
+    assert store.acquire("b", shard, 60) == []
+    
+    # a stalls past its lease and b takes AAPL over
+    clock.now += 61
+    assert store.acquire("b", ["AAPL"], 60) == ["AAPL"]
+    assert a.renew() == {"TCS.NS"}
+    assert not a.claim_alert("AAPL", "target", "200")
+
+
+@pytest.mark.unit
+def test_members_heartbeat_between_runs(tmp_path):
+    """Test a started instance stays in the ring without running"""
+    store = LeaseStore(str(tmp_path / "shards.db"))
+    a = ShardCoordinator(store, "a", heartbeat_seconds=0.01, member_ttl_seconds=5)
+    b = ShardCoordinator(store, "b")
+    
+    a.start()
+    try:
+        assert b.begin_run(SYMBOLS) != SYMBOLS
+        assert b.snapshot()["members"] == ["a", "b"]
+    finally:
+        a.leave()
+    
+    assert b.begin_run(SYMBOLS) == SYMBOLS
+
+
+@pytest.mark.unit
+def test_alerts_are_sent_once_across_instances(tmp_path, mock_market_service, mock_alert_service, test_settings):
+    """Test overlapping runs of two instances send each target alert once"""
+    store = LeaseStore(str(tmp_path / "shards.db"))
+    services = []
+    for instance in ("a", "b"):
+        repository = JSONStockRepository(str(tmp_path / f"{instance}.json"))
+        for symbol in ("AAPL", "TCS.NS", "INFY.NS"):
+            repository.add(StockCreate(symbol=symbol, buy_price=90.0, target_price=100.0))
+        services.append(StockService(
+            mock_market_service, mock_alert_service, repository, test_settings,
+            shard_coordinator=ShardCoordinator(store, instance)
+        ))
+    
+    analyzed = [result.symbol for service in services for result in service.run_agent()]
+    analyzed += [result.symbol for service in services for result in service.run_agent()]
+    
+    assert sorted(set(analyzed)) == ["AAPL", "INFY.NS", "TCS.NS"]
+    assert len(mock_alert_service.sent_alerts) == 3
+
+
+@pytest.mark.unit
+def test_alert_claims_are_keyed_on_the_transition(tmp_path):
+    """Test instances agree on a transition across any time boundary, and a new one is sent"""
+    clock = FakeClock()
+    store = LeaseStore(str(tmp_path / "shards.db"), clock=clock)
+    a = ShardCoordinator(store, "a", alert_window_seconds=300)
+    b = ShardCoordinator(store, "b", alert_window_seconds=300)
+    
+    clock.now = 299.0
+    a.begin_run(["AAPL"])
+    assert a.claim_alert("AAPL", "target", "200")
+    a.end_run(["AAPL"])
+    
+    # b takes over right after what used to be a window boundary
+    clock.now = 301.0
+    store.leave("a")
+    b.begin_run(["AAPL"])
+    assert not b.claim_alert("AAPL", "target", "200")
+    assert b.claim_alert("AAPL", "target", "210")
+    assert b.claim_alert("AAPL", "rule:stop_loss 90", "from 2024-01-02T10:00:00")
+    
+    # A state that persists is alerted again once the record expires
+    clock.now = 700.0
+    b.begin_run(["AAPL"])
+    assert b.claim_alert("AAPL", "target", "200")
+
+
+@pytest.mark.unit
+def test_alert_retention_is_set_per_claim(tmp_path):
+    """Test a long-lived claim outlasts the default window and the expiry of others"""
+    clock = FakeClock()
+    store = LeaseStore(str(tmp_path / "shards.db"), clock=clock)
+    a = ShardCoordinator(store, "a", alert_window_seconds=300)
+    
+    a.begin_run(["AAPL"])
+    assert a.claim_alert("AAPL", "daily_update", "2024-01-02", retention_seconds=8 * 3600)
+    assert a.claim_alert("AAPL", "target", "200")
+    
+    clock.now += 3600
+    a.begin_run(["AAPL"])
+    assert a.claim_alert("AAPL", "target", "200")
+    assert not a.claim_alert("AAPL", "daily_update", "2024-01-02", retention_seconds=7 * 3600)
+    
+    clock.now += 7 * 3600
+    a.begin_run(["AAPL"])
+    assert a.claim_alert("AAPL", "daily_update", "2024-01-02")
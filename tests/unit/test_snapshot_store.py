@@ -0,0 +1,34 @@
+"""Unit tests for the analysis snapshot store"""
+
+import pytest
+
+from stock_agent.repositories.snapshot_store import SnapshotStore
+
+
+@pytest.mark.unit
+def test_saves_merge_changes_of_instances_sharing_the_file(tmp_path):
+    """Test a store saving from a stale copy keeps what another store saved"""
+    path = str(tmp_path / "snapshots.json")
+    first, second = SnapshotStore(path), SnapshotStore(path)
+    first.put("AAPL", "fp-aapl", {"price": 1})
+    first.put("TCS.NS", "fp-tcs", {"price": 2})
+    first.save()
+    second.get("AAPL", "fp-aapl")
+    
+    first.put("INFY.NS", "fp-infy", {"price": 3})
+    second.put("MSFT", "fp-msft", {"price": 4})
+    second.discard(["TCS.NS"])
+    first.save()
+    second.save()
+    
+    merged = SnapshotStore(path)
+    assert merged.get("AAPL", "fp-aapl") == {"price": 1}
+    assert merged.get("INFY.NS", "fp-infy") == {"price": 3}
+    assert merged.get("MSFT", "fp-msft") == {"price": 4}
+    assert merged.get("TCS.NS", "fp-tcs") is None
+    # Unsaved changes survive a reload of the file
+    first.put("AMZN", "fp-amzn", {"price": 5})
+    second.put("AAPL", "fp-aapl-2", {"price": 6})
+    second.save()
+    assert first.get("AMZN", "fp-amzn") == {"price": 5}
+    assert first.get("AAPL", "fp-aapl-2") == {"price": 6}
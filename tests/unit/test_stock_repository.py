@@ -0,0 +1,159 @@
+"""Unit tests for stock repository"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from stock_agent.models.enums import DecisionType
+from stock_agent.models.stock import StockCreate
+from stock_agent.repositories.stock_repository import JSONStockRepository
+from stock_agent.utils.exceptions import DuplicateStockError, StockNotFoundError
+
+
+@pytest.fixture
+def repo(tmp_path):
+    """Repository with a few tracked stocks"""
+    repo = JSONStockRepository(str(tmp_path / "stocks.json"))
+    for symbol, buy, target in [
+        ("AAPL", 100.0, 200.0),
+        ("AMZN", 100.0, 150.0),
+        ("INFY.NS", 1400.0, 1600.0),
+        ("TCS.NS", 3500.0, 4000.0),
+    ]:
+        repo.add(StockCreate(symbol=symbol, buy_price=buy, target_price=target))
+    return repo
+
+
+@pytest.mark.unit
+def test_add_persists_and_rejects_duplicates(repo, tmp_path):
+    """Test stocks survive reload and duplicates are rejected"""
+    reloaded = JSONStockRepository(str(tmp_path / "stocks.json"))
+    
+    assert [s.symbol for s in reloaded.get_all()] == ["AAPL", "AMZN", "INFY.NS", "TCS.NS"]
+    with pytest.raises(DuplicateStockError):
+        repo.add(StockCreate(symbol="aapl", buy_price=1.0, target_price=2.0))
+
+
+@pytest.mark.unit
+def test_query_paginates_by_cursor(repo):
+    """Test cursor pagination walks all stocks in symbol order"""
+    first = repo.query(limit=3)
+    second = repo.query(cursor=first.next_cursor, limit=3)
+    
+    assert [s.symbol for s in first.items] == ["AAPL", "AMZN", "INFY.NS"]
+    assert [s.symbol for s in second.items] == ["TCS.NS"]
+    assert second.next_cursor is None
+
+
+@pytest.mark.unit
+def test_query_filters_by_prefix(repo):
+    """Test prefix filter"""
+    page = repo.query(prefix="a")
+    
+    assert [s.symbol for s in page.items] == ["AAPL", "AMZN"]
+
+
+@pytest.mark.unit
+def test_query_filters_by_decision_and_distance(repo):
+    """Test filters backed by last recorded prices"""
+    repo.record_prices({"AAPL": 197.0, "AMZN": 160.0, "INFY.NS": 1300.0})
+    
+    near_target = repo.query(within_percent=2)
+    reached = repo.query(decision=DecisionType.TARGET_REACHED)
+    below = repo.query(decision=DecisionType.BELOW_BUY_PRICE, within_percent=2)
+    
+    assert [s.symbol for s in near_target.items] == ["AAPL"]
+    assert [s.symbol for s in reached.items] == ["AMZN"]
+    assert below.items == []
+
+
+@pytest.mark.unit
+def test_update_reindexes_and_keeps_created_at(repo):
+    """Test update keeps creation time and moves the stock between indexes"""
+    repo.record_prices({"AAPL": 160.0})
+    original = repo.get_by_symbol("AAPL")
+    
+    updated = repo.update("AAPL", StockCreate(symbol="AAPL", buy_price=100.0, target_price=150.0))
+    
+    assert updated.created_at == original.created_at
+    assert updated.last_price == 160.0
+    assert [s.symbol for s in repo.query(decision=DecisionType.TARGET_REACHED).items] == ["AAPL"]
+    assert repo.query(decision=DecisionType.HOLD).items == []
+
+
+@pytest.mark.unit
+def test_delete_removes_from_indexes(repo):
+    """Test delete"""
+    repo.record_prices({"AAPL": 197.0})
+    
+    assert repo.delete("aapl") is True
+    assert repo.get_by_symbol("AAPL") is None
+    assert repo.query(within_percent=5).items == []
+    with pytest.raises(StockNotFoundError):
+        repo.delete("AAPL")
+
+
+@pytest.mark.unit
+def test_query_rejects_invalid_cursor(repo):
+    """Test malformed cursor"""
+    with pytest.raises(ValueError):
+        repo.query(cursor="!!!")
+
+
+@pytest.mark.unit
+def test_summary_follows_changes_incrementally(repo):
+    """Test running totals track adds, updates, deletes and prices"""
+    repo.record_prices({"AAPL": 150.0, "TCS.NS": 3600.0})
+    repo.update("AMZN", StockCreate(symbol="AMZN", buy_price=120.0, target_price=150.0))
+    repo.delete("INFY.NS")
+    repo.record_prices({"AAPL": 110.0})
+    
+    summary = repo.summary(rates={"INR": 0.5})
+    
+    assert (summary.positions, summary.priced_positions) == (3, 2)
+    assert summary.cost_basis == pytest.approx(220.0 + 1750.0)
+    assert summary.market_value == pytest.approx(110.0 + 1800.0)
+    assert summary.profit == pytest.approx(60.0)
+    assert [h.symbol for h in summary.holdings] == ["TCS.NS", "AAPL", "AMZN"]
+    assert summary.holdings[0].weight == pytest.approx(1800.0 / 1910.0)
+    assert summary.holdings[-1].weight is None
+    assert repo.summary(with_holdings=False).unconverted == ["INR"]
+    assert repo.check_aggregates()
+
+
+@pytest.mark.unit
+def test_consistency_check_replaces_drifted_totals(tmp_path):
+    """Test the periodic check repairs running totals that disagree with the positions"""
+    repo = JSONStockRepository(str(tmp_path / "stocks.json"), aggregate_check_interval=3)
+    repo.add(StockCreate(symbol="AAPL", buy_price=100.0, target_price=200.0))
+    repo._aggregates["USD"].market_value += 42.0
+    
+    repo.add(StockCreate(symbol="AMZN", buy_price=100.0, target_price=150.0))
+    assert repo.summary(with_holdings=False).market_value == 42.0
+    
+    repo.record_prices({"AAPL": 120.0})
+    summary = repo.summary(with_holdings=False)
+    
+    assert summary.market_value == 120.0
+    assert summary.holdings == []
+
+
+@pytest.mark.unit
+def test_instances_sharing_the_file_keep_each_others_writes(repo, tmp_path):
+    """Test concurrent writers through separate repositories lose no symbol"""
+    path = str(tmp_path / "stocks.json")
+    shards = [["AAPL"], ["AMZN"], ["INFY.NS"], ["TCS.NS"]]
+    instances = [JSONStockRepository(path) for _ in shards]
+    
+    def write(position):
+        instance, symbols = instances[position], shards[position]
+        for step in range(1, 26):
+            instance.record_prices({symbol: float(step) for symbol in symbols})
+        instance.add(StockCreate(symbol=f"NEW{position}", buy_price=1.0, target_price=2.0))
+    
+    with ThreadPoolExecutor(max_workers=len(shards)) as pool:
+        list(pool.map(write, range(len(shards))))
+    
+    stocks = {s.symbol: s for s in JSONStockRepository(path).get_all()}
+    assert sorted(stocks) == ["AAPL", "AMZN", "INFY.NS", "NEW0", "NEW1", "NEW2", "NEW3", "TCS.NS"]
+    assert all(stocks[symbol].last_price == 25.0 for shard in shards for symbol in shard)
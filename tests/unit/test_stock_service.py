@@ -4,6 +4,7 @@ import pytest
 
 from stock_agent.models.enums import DecisionType
 from stock_agent.models.stock import StockCreate
+from stock_agent.repositories.snapshot_store import SnapshotStore
 from stock_agent.repositories.stock_repository import JSONStockRepository
 from stock_agent.services.stock_service import StockService
 
@@ -90,3 +91,42 @@ def test_get_tracked_stocks(mock_market_service, mock_alert_service, tmp_path):
     assert len(stocks) == 2
     assert stocks[0].symbol == "AAPL"
     assert stocks[1].symbol == "TCS.NS"
+
+
+@pytest.mark.unit
+def test_run_agent_reanalyzes_only_changes(mock_market_service, mock_alert_service, tmp_path):
+    """Test incremental runs reuse snapshots until the price or position changes"""
+    repo = JSONStockRepository(str(tmp_path / "stocks.json"))
+    repo.add(StockCreate(symbol="AAPL", buy_price=100.0, target_price=140.0))
+    repo.add(StockCreate(symbol="TCS.NS", buy_price=3000.0, target_price=4000.0))
+    repo.add(StockCreate(symbol="BAD", buy_price=10.0, target_price=20.0))
+    
+    def get_live_price(symbol):
+        if symbol == "BAD":
+            raise ValueError("no quote")
+        return prices[symbol]
+    
+    prices = {"AAPL": 150.0, "TCS.NS": 3750.0}
+    mock_market_service.get_live_price = get_live_price
+    snapshots = SnapshotStore(str(tmp_path / "snapshots.json"))
+    service = StockService(mock_market_service, mock_alert_service, repo, snapshot_store=snapshots)
+    
+    first = service.run_agent_diff()
+    assert [a.symbol for a in first.changed] == ["AAPL", "TCS.NS"]
+    assert first.errored == [{"symbol": "BAD", "error": "no quote"}]
+    
+    prices["TCS.NS"] = 3760.0
+    service.update_stock("AAPL", buy_price=100.0, target_price=145.0)
+    second = StockService(
+        mock_market_service, mock_alert_service, repo,
+        snapshot_store=SnapshotStore(str(tmp_path / "snapshots.json"))
+    ).run_agent_diff()
+    assert sorted(a.symbol for a in second.changed) == ["AAPL", "TCS.NS"]
+    
+    third = service.run_agent_diff()
+    assert third.changed == []
+    assert [a.symbol for a in third.unchanged] == ["AAPL", "TCS.NS"]
+    assert third.unchanged[1].current_price == 3760.0
+    
+    # The target alert is sent when the position changes, not on every run
+    assert sum("TARGET" in message for message in mock_alert_service.sent_alerts) == 2
@@ -0,0 +1,103 @@
+"""Unit tests for symbol validation caching"""
+
+import pytest
+
+from stock_agent.providers.base import MarketDataProvider
+from stock_agent.repositories.symbol_cache import SymbolCache
+from stock_agent.services.market_data_service import MarketDataService
+from stock_agent.utils.exceptions import InvalidSymbolError
+
+
+class FakeClock:
+    """Manually advanced wall clock"""
+    
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self):
+        return self.now
+
+
+class CountingProvider(MarketDataProvider):
+    """Knows AAPL only and counts quote requests"""
+    
+    name = "counting"
+    
+    def __init__(self):
+        self.calls = []
+    
+    def get_quote(self, symbol):
+        self.calls.append(symbol)
+        if symbol != "AAPL":
+            raise InvalidSymbolError(symbol, "no data")
+        return 150.0
+    
+    def get_quotes(self, symbols):
+        return {symbol: self.get_quote(symbol) for symbol in symbols if symbol == "AAPL"}
+    
+    def get_history(self, symbol, start, end):
+        raise NotImplementedError
+    
+    def get_info(self, symbol):
+        return {}
+
+
+@pytest.mark.unit
+def test_separate_ttls_and_persistence(tmp_path):
+    """Test valid and invalid results expire independently and survive restarts"""
+    clock = FakeClock()
+    path = str(tmp_path / "symbols.db")
+    cache = SymbolCache(path, valid_ttl_seconds=100, invalid_ttl_seconds=10, clock=clock)
+    cache.put("AAPL", True)
+    cache.put("BAD", False, "no data")
+    
+    reopened = SymbolCache(path, valid_ttl_seconds=100, invalid_ttl_seconds=10, clock=clock)
+    assert reopened.get("BAD").reason == "no data"
+    
+    clock.now += 50
+    assert reopened.get("AAPL").valid
+    assert reopened.get("BAD") is None
+    
+    clock.now += 100
+    assert cache.get("AAPL") is None
+
+
+@pytest.mark.unit
+def test_repeated_invalid_symbol_skips_upstream(tmp_path):
+    """Test a symbol found invalid is rejected from the cache afterwards"""
+    provider = CountingProvider()
+    service = MarketDataService(
+        provider=provider, symbol_cache=SymbolCache(str(tmp_path / "symbols.db"))
+    )
+    
+    assert service.validate_symbol("aapl") and service.validate_symbol("AAPL")
+    assert not service.validate_symbol("BAD")
+    with pytest.raises(InvalidSymbolError, match="no data"):
+        service.check_symbol("BAD")
+    with pytest.raises(InvalidSymbolError):
+        service.get_live_price("BAD")
+    
+    assert provider.calls == ["AAPL", "BAD"]
+
+
+@pytest.mark.unit
+def test_track_rejects_invalid_symbol(tmp_path, mock_alert_service, test_settings):
+    """Test tracking validates the symbol through the cache"""
+    from stock_agent.repositories.stock_repository import JSONStockRepository
+    from stock_agent.services.stock_service import StockService
+    
+    provider = CountingProvider()
+    service = StockService(
+        MarketDataService(provider=provider, symbol_cache=SymbolCache(str(tmp_path / "symbols.db"))),
+        mock_alert_service,
+        JSONStockRepository(str(tmp_path / "stocks.json")),
+        test_settings
+    )
+    
+    for _ in range(2):
+        with pytest.raises(InvalidSymbolError):
+            service.track_stock("BAD", buy_price=10.0, target_price=20.0)
+    service.track_stock("AAPL", buy_price=100.0, target_price=200.0)
+    
+    assert provider.calls == ["BAD", "AAPL"]
+    assert [stock.symbol for stock in service.get_tracked_stocks()] == ["AAPL"]
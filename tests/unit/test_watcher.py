@@ -0,0 +1,102 @@
+"""Unit tests for the resident agent loop"""
+
+import pytest
+
+from stock_agent.models.stock import StockCreate
+from stock_agent.repositories.quote_cache import QuoteCache
+from stock_agent.repositories.snapshot_store import SnapshotStore
+from stock_agent.repositories.stock_repository import JSONStockRepository
+from stock_agent.services.stock_service import StockService
+from stock_agent.services.watcher import AgentWatcher
+
+
+@pytest.fixture
+def build_service(tmp_path, mock_market_service, mock_alert_service):
+    """Builds stock services over one repository and counts the builds"""
+    repository = JSONStockRepository(str(tmp_path / "stocks.json"))
+    repository.add(StockCreate(symbol="AAPL", buy_price=100.0, target_price=180.0))
+    builds = []
+    
+    def build(settings):
+        builds.append(settings)
+        return StockService(mock_market_service, mock_alert_service, repository, settings)
+    
+    build.builds = builds
+    return build
+
+
+@pytest.mark.unit
+def test_runs_reuse_services_and_report_timing(build_service, test_settings):
+    """Test every iteration reuses the services built at startup"""
+    lines = []
+    watcher = AgentWatcher(
+        lambda: test_settings, build_service, interval_seconds=0, report=lines.append
+    )
+    
+    assert watcher.run(iterations=3) == 3
+    assert len(build_service.builds) == 1
+    assert lines[0].startswith("[1] 1 changed, 0 unchanged, 0 failed")
+    assert lines[2].endswith("s")
+
+
+@pytest.mark.unit
+def test_reload_rebuilds_services_and_stop_ends_loop(build_service, test_settings):
+    """Test a reload request rebuilds before the next run and stop ends the loop"""
+    lines = []
+    watcher = AgentWatcher(
+        lambda: test_settings, build_service, interval_seconds=0, report=lines.append
+    )
+    
+    def report(line):
+        lines.append(line)
+        if watcher.iterations == 1 and len(build_service.builds) == 1:
+            watcher.reload()
+        elif watcher.iterations == 2:
+            watcher.stop()
+    
+    watcher.report = report
+    assert watcher.run() == 2
+    assert len(build_service.builds) == 2
+    assert lines[1].startswith("Reloaded configuration")
+
+
+@pytest.mark.unit
+def test_reload_and_stop_close_services(tmp_path, mock_market_service, mock_alert_service, test_settings):
+    """Test replaced and final services save snapshots and close their connections"""
+    repository = JSONStockRepository(str(tmp_path / "stocks.json"))
+    repository.add(StockCreate(symbol="AAPL", buy_price=100.0, target_price=180.0))
+    services = []
+    
+    def build(settings):
+        quote_cache = QuoteCache(str(tmp_path / "quotes.db"))
+        quote_cache.get("AAPL")
+        service = StockService(
+            type(mock_market_service)(quote_cache=quote_cache),
+            mock_alert_service,
+            repository,
+            settings,
+            snapshot_store=SnapshotStore(str(tmp_path / "snapshots.json"))
+        )
+        services.append(service)
+        return service
+    
+    watcher = AgentWatcher(lambda: test_settings, build, interval_seconds=0)
+    
+    def report(line):
+        if line.startswith("Reloaded"):
+            return
+        # Leave a change unsaved in each service before it is replaced
+        watcher.stock_service.snapshot_store.put(f"SYM{watcher.iterations}", "fingerprint", {})
+        if watcher.iterations == 1:
+            watcher.reload()
+        else:
+            watcher.stop()
+    
+    watcher.report = report
+    assert watcher.run() == 2
+    assert len(services) == 2
+    
+    saved = SnapshotStore(str(tmp_path / "snapshots.json"))
+    for iteration, service in enumerate(services, start=1):
+        assert service.market_service.quote_cache._connections == []
+        assert saved.get(f"SYM{iteration}", "fingerprint") == {}